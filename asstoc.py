@@ -0,0 +1,49 @@
+'''
+Arnold代理的包围盒文件 .asstoc
+
+arnoldExportAss -boundingBox 在.ass旁边写入同名的.asstoc,只有一行:
+    bounds -0.5 0 -0.5 0.5 1.2 0.5
+aiStandIn从该文件设置包围盒,放置代理时不需要解析完整的.ass
+
+    bounds = read_bounds("D:/asset/ass/DFH_fhsj_tree_hiRes.ass")     #(minx,miny,minz,maxx,maxy,maxz) 或 None
+    write_bounds("D:/asset/ass/DFH_fhsj_tree_hiRes.ass",bounds)
+不依赖Maya
+'''
+import os
+
+TOC_EXTENSION = ".asstoc"
+
+
+def toc_path(ass_path):
+    '''
+    xxx.ass / xxx.ass.gz > xxx.asstoc
+    '''
+    root,ext = os.path.splitext(ass_path)
+    if ext.lower() == ".gz":
+        root = os.path.splitext(root)[0]
+    return root + TOC_EXTENSION
+
+
+def read_bounds(ass_path):
+    '''
+    返回 (minx,miny,minz,maxx,maxy,maxz),文件不存在或格式错误返回None
+    '''
+    try:
+        with open(toc_path(ass_path),"r",encoding="utf-8") as f:
+            for line in f:
+                tokens = line.split()
+                if len(tokens) == 7 and tokens[0] == "bounds":
+                    bounds = tuple(float(value) for value in tokens[1:])
+                    if all(low <= high for low,high in zip(bounds[:3],bounds[3:])):
+                        return bounds
+                    return None
+    except (OSError,ValueError):
+        pass
+    return None
+
+
+def write_bounds(ass_path,bounds):
+    path = toc_path(ass_path)
+    with open(path,"w",encoding="utf-8") as f:
+        f.write("bounds " + " ".join(f"{value:g}" for value in bounds) + "\n")
+    return path
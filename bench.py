@@ -0,0 +1,1168 @@
+'''
+基于 fake_maya 场景模型的性能测试,不需要Maya授权
+
+    python bench.py                         #默认规模 1k,10k
+    python bench.py --sizes 1000,10000,100000
+    python bench.py --case get_component_node
+    python bench.py --update-baseline       #写入基线 bench_baseline.json
+    python bench.py --check                 #与基线比较,cmds调用次数增加时返回非0
+    python bench.py --check --check-time    #耗时超过基线 (1 + tolerance) 倍时也返回非0
+
+每个用例记录耗时和 maya.cmds 调用次数,调用次数不受机器性能影响,用于判断退化
+耗时与运行基线的机器相关,默认只输出警告
+用例只负责计时,功能检查在 tests/ 中(python -m unittest discover tests),场景生成函数两边共用
+'''
+import os,sys,io,json,time,shutil,argparse,importlib,tempfile,subprocess,contextlib
+from collections import Counter
+import fake_maya
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),"bench_baseline.json")
+
+DEFAULT_SIZES = (1000,10000)
+
+#同一个资产的组件数量,决定repalce_all_res中每组实例的数量
+COMPONENTS_PER_ASSET = 50
+
+RES_LIST = ["proxyRes","midRes","hiRes"]
+
+#耗时低于该值(秒)时只比较调用次数,避免计时抖动误报
+MIN_SECONDS = 0.05
+
+CASES = {}
+
+#与场景规模无关的用例,只执行一次
+SIZE_INDEPENDENT = set()
+
+
+def case(func):
+    CASES[func.__name__] = func
+    return func
+
+
+def load_common():
+    '''
+    安装fake_maya后导入common
+    '''
+    fake_maya.install()
+    import common
+    return common
+
+
+##########################################################################
+# 场景生成
+##########################################################################
+
+def build_library(root,asset_count,file_format="ass"):
+    '''
+    在磁盘上生成组件库,每个资产包含所有res的缓存文件
+    返回资产id列表
+    '''
+    folder = {"ass":"ass","gpuCache":"cache","abc":"alembic"}[file_format]
+    extension = {"ass":"ass","gpuCache":"abc","abc":"abc"}[file_format]
+    asset_ids = []
+    for i in range(asset_count):
+        asset_id = f"DFH_fhsj_asset{i:05d}"
+        asset_dir = f"{root}/{asset_id}/{folder}"
+        os.makedirs(asset_dir,exist_ok=True)
+        for res in RES_LIST:
+            with open(f"{asset_dir}/{asset_id}_{res}.{extension}","wb") as f:
+                f.write(b"\0" * 256)
+        asset_ids.append(asset_id)
+    return asset_ids
+
+
+def build_component_scene(scene,library_root,size,file_format="ass",resolution="proxyRes"):
+    '''
+    生成size个组件节点,每COMPONENTS_PER_ASSET个节点使用同一个资产
+    '''
+    folder = {"ass":"ass","gpuCache":"cache","abc":"alembic"}[file_format]
+    asset_ids = build_library(library_root,max(1,size // COMPONENTS_PER_ASSET),file_format)
+    layout = scene.create("transform","layout_grp")
+    for i in range(size):
+        asset_id = asset_ids[i % len(asset_ids)]
+        fake_maya.add_component(scene,f"{library_root}/{asset_id}/{folder}",f"{asset_id}_{resolution}",
+                        file_format,resolution,parent=layout,translate=(i * 0.1,0.0,float(i % 7)),
+                        rotate=(0.0,float(i % 360),0.0))
+    return asset_ids
+
+
+def build_export_scene(scene,texture_dir,size):
+    '''
+    RootLocator下每个res组生成 size//len(RES_LIST) 个mesh,每个mesh有一个file贴图节点
+    '''
+    os.makedirs(texture_dir,exist_ok=True)
+    meshes_per_res = max(1,size // len(RES_LIST))
+    texture_count = max(1,meshes_per_res // 20)
+    for i in range(texture_count):
+        with open(f"{texture_dir}/tex{i}.png","wb") as f:
+            f.write(b"\0" * 128)
+
+    root,groups = fake_maya.add_root_locator(scene,meshes_per_res=meshes_per_res,polygons=(100,1000,10000))
+    index = 0
+    for group in groups:
+        for transform in group.children:
+            mesh = transform.children[0]
+            fake_maya.add_shading(scene,mesh,f"{texture_dir}/tex{index % texture_count}.png")
+            index += 1
+    return root
+
+
+def write_texture_images(texture_dir):
+    '''
+    把build_export_scene的占位贴图改写为1024x768的PNG,用于缩小贴图
+    返回是否安装了Pillow,没有安装时保留占位文件(直接复制)
+    '''
+    try:
+        from PIL import Image
+    except ImportError:
+        return False
+    for name in os.listdir(texture_dir):
+        Image.new("RGB",(1024,768),(120,80,40)).save(f"{texture_dir}/{name}")
+    return True
+
+
+def preload_numpy():
+    '''
+    numpy在第一次面数检查时导入,用例中提前导入,不计入耗时
+    '''
+    importlib.import_module("numpy")
+
+
+def export_operator(common):
+    '''
+    导出用例的Operator,测试场景的面数远超推荐上限,只检查推荐的比例和包围盒
+    '''
+    polycount = common.polycount
+    operator = common.Operator(res_list=RES_LIST)
+    operator.polycount_validator = polycount.Validator(ratios=polycount.RECOMMENDED_RATIOS,
+                                    bounds_tolerance=polycount.RECOMMENDED_BOUNDS_TOLERANCE)
+    preload_numpy()
+    return operator
+
+
+##########################################################################
+# 用例,返回被测函数的执行耗时(秒)
+##########################################################################
+
+@case
+def get_component_node(common,scene,work_dir,size):
+    build_component_scene(scene,f"{work_dir}/library",size)
+    operator = common.Operator(res_list=RES_LIST)
+    scene.call_counts.clear()
+    start = time.perf_counter()
+    operator.get_component_node()
+    return time.perf_counter() - start
+
+
+@case
+def repalce_all_res(common,scene,work_dir,size):
+    build_component_scene(scene,f"{work_dir}/library",size)
+    operator = common.Operator(res_list=RES_LIST)
+    node_dict = operator.get_component_node()
+    scene.call_counts.clear()
+    start = time.perf_counter()
+    operator.replace_all_res(node_dict=node_dict,target_file_format="ass",target_res="hiRes")
+    return time.perf_counter() - start
+
+
+@case
+def get_texture_node(common,scene,work_dir,size):
+    build_export_scene(scene,f"{work_dir}/textures",size)
+    manager = common.MaterialManager()
+    scene.call_counts.clear()
+    start = time.perf_counter()
+    manager.get_texture_node(root_transform="|RootLocator",api_type=common.om.MFn.kMesh)
+    return time.perf_counter() - start
+
+
+@case
+def export_child_res(common,scene,work_dir,size):
+    build_export_scene(scene,f"{work_dir}/textures",size)
+    operator = export_operator(common)
+    operator.exportor.abc_res_options = {"proxyRes":{"uvWrite":False,"noNormals":True}}
+    output = f"{work_dir}/export"
+    scene.call_counts.clear()
+    start = time.perf_counter()
+    for file_type in ("ma","abc","gpuCache","ass"):
+        #面数只在第一个格式导出前检查一次
+        operator.export_child_res(node_name="|RootLocator",file_path=output,asset_name="bench",
+                        project_code="DFH",scene="fhsj",file_type=file_type,check_polycount=file_type == "ma")
+    return time.perf_counter() - start
+
+
+@case
+def export_job(common,scene,work_dir,size):
+    '''
+    通过JobRunner执行导出任务(贴图复制在工作线程)
+    '''
+    import jobs
+    build_export_scene(scene,f"{work_dir}/textures",size)
+    operator = export_operator(common)
+    runner = jobs.JobRunner()
+    try:
+        scene.call_counts.clear()
+        start = time.perf_counter()
+        job = operator.create_export_job(node_name="|RootLocator",file_path=f"{work_dir}/export",asset_name="bench",
+                        project_code="DFH",scene="fhsj",file_types=["ma","ass"],copy_texture=True)
+        runner.run_until_complete(job)
+        return time.perf_counter() - start
+    finally:
+        runner.shutdown(wait=True)
+
+
+@case
+def export_downsample(common,scene,work_dir,size):
+    '''
+    导出任务生成proxyRes/midRes缩小贴图(进程池)
+    '''
+    import jobs
+    texture_dir = f"{work_dir}/textures"
+    build_export_scene(scene,texture_dir,size)
+    write_texture_images(texture_dir)
+    operator = export_operator(common)
+    runner = jobs.JobRunner()
+    try:
+        start = time.perf_counter()
+        job = operator.create_export_job(node_name="|RootLocator",file_path=f"{work_dir}/export",asset_name="bench",
+                        project_code="DFH",scene="fhsj",file_types=["ma"],copy_texture=True,downsample_texture=True)
+        runner.run_until_complete(job)
+        return time.perf_counter() - start
+    finally:
+        runner.shutdown(wait=True)
+
+
+@case
+def scan_library(common,scene,work_dir,size):
+    '''
+    扫描size个资产目录的组件库,不涉及Maya
+    '''
+    import library
+    root = f"{work_dir}/library"
+    for i in range(size):
+        os.makedirs(f"{root}/DFH_fhsj_asset{i:05d}")
+    start = time.perf_counter()
+    library.scan_library(root)
+    return time.perf_counter() - start
+
+
+SEARCH_WORDS = ["tree","rock","house","lamp","chair","table","fence","wall","door","window","bush","stone","barrel","crate","bridge","tower"]
+
+SEARCH_QUERIES = ["tree","trei","rockho","DFH","fhsj tree","barrelcrate0012","has:abc","has:ass.hires lamp","towr","d"]
+
+
+def build_search_index(work_dir,size):
+    '''
+    size个资产的搜索索引,资产名由SEARCH_WORDS组合,SEARCH_QUERIES都有结果
+    '''
+    from search_index import SearchIndex
+    index = SearchIndex()
+    for i in range(size):
+        first = SEARCH_WORDS[i % len(SEARCH_WORDS)]
+        second = SEARCH_WORDS[(i // len(SEARCH_WORDS)) % len(SEARCH_WORDS)]
+        asset_id = f"{('DFH','XYZ','ABC')[i % 3]}_{('fhsj','jzcj','sl','mk')[i % 4]}_{first}{second.title()}{i:05d}"
+        index.add(asset_id,f"{work_dir}/{asset_id}",{"ass":["proxyRes","hiRes"]} if i % 3 else {"abc":["midRes"]})
+    return index
+
+
+@case
+def search_index(common,scene,work_dir,size):
+    '''
+    size个资产的搜索索引,返回单次查询的最大耗时
+    '''
+    index = build_search_index(work_dir,size)
+    index.search("warm")
+
+    slowest = 0.0
+    for query in SEARCH_QUERIES:
+        start = time.perf_counter()
+        index.search(query)
+        slowest = max(slowest,time.perf_counter() - start)
+    return slowest
+
+
+INTEGRITY_FILES = {
+    "ma":b'requires maya "2020";\nsetAttr ".ftn" -type "string" "{texture}";\n// End of {name}\n',
+    "abc":b"Ogawa\xff\x00\x01" + (16).to_bytes(8,"little") + b"\0" * 64,
+    "ass":b'image\n{\n name tex\n filename "{texture}"\n}\n',
+}
+
+
+def build_integrity_library(root,asset_count):
+    '''
+    每个资产12个文件和一张贴图,每10个资产中有一个截断的hiRes ma和一个空的hiRes ass
+    '''
+    import integrity as integrity_check
+    import library
+    for i in range(asset_count):
+        asset_id = f"DFH_fhsj_asset{i:05d}"
+        entry = library.AssetEntry(asset_id,f"{root}/{asset_id}")
+        os.makedirs(f"{entry.path}/textures")
+        texture = f"{entry.path}/textures/{asset_id}_color.png"
+        open(texture,"wb").close()
+        for file_format in integrity_check.FORMATS:
+            for res in RES_LIST:
+                path = entry.ma_path(res) if file_format == "ma" else entry.file_path(res,file_format)
+                os.makedirs(os.path.dirname(path),exist_ok=True)
+                data = INTEGRITY_FILES[path.rsplit(".",1)[1]]
+                data = data.replace(b"{texture}",texture.encode()).replace(b"{name}",os.path.basename(path).encode())
+                if i % 10 == 0 and res == "hiRes":
+                    data = b"" if file_format == "ass" else data[:data.find(b"// End")] if file_format == "ma" else data
+                with open(path,"wb") as f:
+                    f.write(data)
+
+
+@case
+def integrity(common,scene,work_dir,size):
+    '''
+    size/20个资产的完整性检查
+    '''
+    import integrity as integrity_check
+    root = f"{work_dir}/library"
+    build_integrity_library(root,max(1,size // 20))
+    start = time.perf_counter()
+    integrity_check.check_library(root,workers=8)
+    return time.perf_counter() - start
+
+
+def build_resolve_requests(size):
+    '''
+    size个(资产目录,资产名,res,格式)请求,其中一半重复,资产名包含res字符串,每7个资产缺少hiRes
+    返回 (存在的文件集合,请求列表,列出目录的函数,列出的目录列表)
+    '''
+    import resolver
+    asset_count = max(1,size // 20)
+    files = set()
+    requests = []
+    for i in range(asset_count):
+        asset_id = f"DFH_fhsj_midResTree{i:05d}"
+        asset_dir = f"Z:\\library\\{asset_id}"
+        for file_format in ("ma","abc","gpuCache","ass"):
+            for res in RES_LIST:
+                if not (i % 7 == 0 and res == "hiRes"):
+                    files.add(resolver.build_path(asset_dir,asset_id,res,file_format))
+                requests.append((asset_dir,asset_id,res,file_format))
+    requests = (requests * (size // len(requests) + 1))[:size]
+
+    dir_files = {}
+    for path in files:
+        directory,_,name = path.rpartition("/")
+        dir_files.setdefault(directory,[]).append(name)
+    listed = []
+    def listdir(directory):
+        listed.append(directory)
+        return dir_files.get(directory,[])
+    return files,requests,listdir,listed
+
+
+@case
+def resolve_paths(common,scene,work_dir,size):
+    '''
+    批量解析size个(资产,res,格式)请求,文件系统为内存实现
+    '''
+    import resolver
+    files,requests,listdir,_ = build_resolve_requests(size)
+    path_resolver = resolver.PathResolver(cache_size=size,isfile=files.__contains__,listdir=listdir)
+    start = time.perf_counter()
+    path_resolver.resolve_many(requests)
+    return time.perf_counter() - start
+
+
+class FakeDirEntry():
+    '''
+    内存文件系统的目录项,stat时计数
+    '''
+
+    def __init__(self,name,size,counter):
+        self.name = name
+        self._size = size
+        self._counter = counter
+
+    def is_file(self):
+        return True
+
+    def stat(self):
+        self._counter["stat"] += 1
+        return os.stat_result((0o100644,0,0,1,0,0,self._size,0,0,0))
+
+
+class FakeScandir():
+    '''
+    计数的内存文件系统 {目录:{文件名:大小}}
+    '''
+
+    def __init__(self,tree):
+        self.tree = tree
+        self.counter = {"scandir":0,"stat":0,"isfile":0}
+
+    def __call__(self,directory):
+        self.counter["scandir"] += 1
+        if directory not in self.tree:
+            raise FileNotFoundError(directory)
+        entries = [FakeDirEntry(name,size,self.counter) for name,size in self.tree[directory].items()]
+        return contextlib.nullcontext(iter(entries))
+
+    def isfile(self,path):
+        self.counter["isfile"] += 1
+        directory,_,name = path.rpartition("/")
+        return name in self.tree.get(directory,{})
+
+
+def build_probe_scene(scene,size,library_root="Z:/library"):
+    '''
+    size个ass组件,缓存文件在计数的内存文件系统中
+    返回 (FakeScandir,资产数量)
+    '''
+    asset_count = max(1,size // COMPONENTS_PER_ASSET)
+    tree = {}
+    layout = scene.create("transform","layout_grp")
+    for i in range(asset_count):
+        asset_id = f"DFH_fhsj_asset{i:05d}"
+        tree[f"{library_root}/{asset_id}/ass"] = {f"{asset_id}_{res}.ass":1024 for res in RES_LIST}
+    for i in range(size):
+        asset_id = f"DFH_fhsj_asset{i % asset_count:05d}"
+        fake_maya.add_component(scene,f"{library_root}/{asset_id}/ass",f"{asset_id}_proxyRes","ass","proxyRes",parent=layout)
+    return FakeScandir(tree),asset_count
+
+
+@case
+def probe_replace(common,scene,work_dir,size):
+    '''
+    逐个替换size个ass组件的分辨率(界面"替换选择"的方式),缓存在计数的内存文件系统中
+    '''
+    fake_fs,_ = build_probe_scene(scene,size)
+    operator = common.Operator(res_list=RES_LIST)
+    operator.path_resolver = common.resolver.PathResolver(isfile=fake_fs.isfile,scandir=fake_fs)
+    nodes = [node for node_list in operator.get_component_node().values() for node in node_list]
+    scene.call_counts.clear()
+
+    start = time.perf_counter()
+    with operator.path_resolver.operation():
+        for node in nodes:
+            operator.replace_select_res(sel_node=node,target_file_format="ass",target_res="hiRes")
+    return time.perf_counter() - start
+
+
+UDIM_TILES = (1001,1002,1011,1099,1100,1234,1999)
+
+
+def build_udim_scene(scene,texture_dir,size):
+    '''
+    size/3个UDIM贴图节点共用一个贴图目录,节点路径为 <UDIM>,<UVTILE> 或某一个象限的文件名
+    每组贴图包含UDIM_TILES的 wood(UDIM),stone(Mudbox u1_v1),clay(ZBrush u0_v0) 和超出范围的 wood.2001
+    返回 (贴图节点的路径列表,贴图组数)
+    '''
+    import udim
+    os.makedirs(texture_dir)
+    set_count = max(1,size // 100)
+    for i in range(set_count):
+        for tile in UDIM_TILES:
+            open(f"{texture_dir}/wood{i}.{tile}.png","wb").close()
+            u,v = udim.udim_to_uv(tile)
+            open(f"{texture_dir}/stone{i}_u{u}_v{v}.exr","wb").close()
+            #ZBrush从0开始编号
+            open(f"{texture_dir}/clay{i}_u{u - 1}_v{v - 1}.tif","wb").close()
+        open(f"{texture_dir}/wood{i}.2001.png","wb").close()
+
+    paths = []
+    root,groups = fake_maya.add_root_locator(scene,meshes_per_res=max(1,size // 3),polygons=(100,100,100))
+    index = 0
+    for group in groups:
+        for transform in group.children:
+            i = index % set_count
+            path = (f"{texture_dir}/wood{i}.<UDIM>.png",f"{texture_dir}/stone{i}_<UVTILE>.exr",f"{texture_dir}/wood{i}.1234.png")[index % 3]
+            fake_maya.add_shading(scene,transform.children[0],path,udim=True)
+            paths.append(path)
+            index += 1
+    return paths,set_count
+
+
+@case
+def udim_plan(common,scene,work_dir,size):
+    '''
+    size/3个UDIM贴图节点的贴图复制计划
+    '''
+    build_udim_scene(scene,f"{work_dir}/textures",size)
+    operator = common.Operator(res_list=RES_LIST)
+    scene.call_counts.clear()
+    start = time.perf_counter()
+    operator.plan_texture_copy(node_name="|RootLocator",path=f"{work_dir}/export",project_code="DFH",scene="fhsj",asset_name="bench")
+    return time.perf_counter() - start
+
+
+@case
+def polycount_check(common,scene,work_dir,size):
+    '''
+    size个mesh分布在三个res组,hiRes超出面数上限
+    '''
+    polycount = common.polycount
+    meshes_per_res = max(1,size // len(RES_LIST))
+    fake_maya.add_root_locator(scene,meshes_per_res=meshes_per_res,polygons=(100,1000,10000))
+    operator = common.Operator(res_list=RES_LIST)
+    operator.polycount_validator = polycount.Validator(limits={"hiRes":{"triangles":meshes_per_res * 20000 - 1}})
+    preload_numpy()
+    scene.call_counts.clear()
+    start = time.perf_counter()
+    operator.validate_polycount("|RootLocator")
+    return time.perf_counter() - start
+
+
+def build_preflight_scene(scene,root_count):
+    '''
+    root_count个RootLocator,每10个依次加入
+    缺少res组,轴心偏移,空组,命名空间,多余的组,res组重名mesh
+    返回 Counter({问题类型:数量})
+    '''
+    expected = Counter()
+    for i in range(root_count):
+        root,groups = fake_maya.add_root_locator(scene,name=f"Asset{i:04d}",meshes_per_res=10,polygons=(10,10,10))
+        problem = i % 10
+        if problem == 1:
+            scene.delete(groups[1])
+            expected["missing_res"] += 1
+        elif problem == 2:
+            root.attrs["rotatePivotX"] = 1.0
+            root.attrs["scalePivotX"] = 1.0
+            expected["pivot"] += 1
+        elif problem == 3:
+            scene.create("transform","empty_grp",groups[2],exact=True)
+            expected["empty_group"] += 1
+        elif problem == 4:
+            scene.rename(groups[0].children[0],"ns:proxyRes_mesh0")
+            expected["namespace"] += 1
+        elif problem == 5:
+            scene.create("transform","tmp_grp",root,exact=True)
+            expected["unknown_group"] += 1
+        elif problem == 6:
+            sub_group = scene.create("transform","sub_grp",groups[2],exact=True)
+            duplicate = scene.create("transform",groups[2].children[0].name,sub_group,exact=True)
+            scene.create("mesh",f"{duplicate.name}Shape",duplicate)
+            expected["duplicate_name"] += 1
+    return expected
+
+
+@case
+def preflight(common,scene,work_dir,size):
+    '''
+    size个mesh分布在size/30个RootLocator中,一次预检查所有RootLocator
+    '''
+    build_preflight_scene(scene,max(10,size // 30))
+    operator = common.Operator(res_list=RES_LIST)
+    scene.call_counts.clear()
+    start = time.perf_counter()
+    operator.preflight_check()
+    return time.perf_counter() - start
+
+
+def build_queue_scene(scene,size,root_count=6):
+    '''
+    size个mesh分布在root_count个RootLocator(Asset0,Asset1...)中
+    '''
+    for i in range(root_count):
+        fake_maya.add_root_locator(scene,name=f"Asset{i}",meshes_per_res=max(1,size // (root_count * 3)),
+                                   polygons=(10,100,1000))
+
+
+def run_export_queue(operator,runner,queue,output,file_types,cancel_index=None):
+    '''
+    与界面相同,依次为队列项创建导出任务并执行,队列执行到cancel_index时在第一个输出后取消
+    '''
+    import jobs
+    while True:
+        item = queue.next_item()
+        if item is None:
+            return
+        root_node,asset_name = item
+        job = operator.create_export_job(node_name=root_node,file_path=output,asset_name=asset_name,
+                        project_code="DFH",scene="fhsj",file_types=file_types,journal=queue.journal,
+                        on_output=lambda res,file_type:queue.output_done())
+        runner.submit(job)
+        while runner.pump(budget=0.0):
+            if queue.index == cancel_index and job.done_units:
+                job.cancel()
+        if job.state == jobs.CANCELLED:
+            queue.cancel()
+
+
+@case
+def export_queue(common,scene,work_dir,size):
+    '''
+    size个mesh分布在多个RootLocator中,按队列依次导出ma/abc并写入导出日志
+    第3个资产导出一个输出后取消,重新读取日志后只导出剩余的输出
+    '''
+    import jobs
+    import export_queue
+    build_queue_scene(scene,size)
+    operator = export_operator(common)
+    output = f"{work_dir}/export"
+    file_types = ["ma","abc"]
+    runner = jobs.JobRunner()
+    try:
+        journal_path = export_queue.default_journal_path(output,"DFH","fhsj")
+        items = [(root,operator.get_queue_asset_name(root,"DFH","fhsj")) for root in operator.find_root_locators()]
+
+        scene.call_counts.clear()
+        start = time.perf_counter()
+        journal = export_queue.Journal(journal_path)
+        pending,total,done,failed = operator.plan_export_queue(items=items,file_path=output,project_code="DFH",
+                                scene="fhsj",file_types=file_types,journal=journal)
+        queue = export_queue.ExportQueue(pending,journal,total_outputs=total,failed=failed)
+        run_export_queue(operator,runner,queue,output,file_types,cancel_index=2)
+
+        #中断后重新执行,日志从磁盘读取
+        journal = export_queue.Journal(journal_path)
+        pending,total,done,failed = operator.plan_export_queue(items=items,file_path=output,project_code="DFH",
+                                scene="fhsj",file_types=file_types,journal=journal)
+        queue = export_queue.ExportQueue(pending,journal,total_outputs=total,failed=failed)
+        run_export_queue(operator,runner,queue,output,file_types)
+        return time.perf_counter() - start
+    finally:
+        runner.shutdown(wait=True)
+
+def build_gpu_cache_assets(scene,size,asset_count=5):
+    '''
+    size个mesh分布在asset_count个RootLocator中
+    返回 [(资产名,[res组长名称...]),...]
+    '''
+    assets = []
+    for i in range(asset_count):
+        root,groups = fake_maya.add_root_locator(scene,name=f"Asset{i}",meshes_per_res=max(1,size // (asset_count * 3)),
+                                                 polygons=(10,100,1000))
+        assets.append((f"Asset{i}",[f"|{root.name}|{group.name}" for group in groups]))
+    return assets
+
+
+@case
+def gpu_cache_batch(common,scene,work_dir,size):
+    '''
+    size个mesh分布在5个RootLocator中
+    逐组导出gpuCache(export_select_res)和批量导出(export_gpu_cache_assets)
+    返回批量导出耗时,打印节省的时间
+    '''
+    assets = build_gpu_cache_assets(scene,size)
+    operator = export_operator(common)
+    operator.exportor.gpu_cache_res_thresholds = {"proxyRes":2000}
+
+    start = time.perf_counter()
+    for asset_name,res_groups in assets:
+        for child_group in res_groups:
+            operator.export_select_res(node_name=child_group,file_path=f"{work_dir}/single",asset_name=asset_name,
+                            project_code="DFH",scene="fhsj",file_type="gpuCache")
+    single = time.perf_counter() - start
+
+    scene.call_counts.clear()
+    start = time.perf_counter()
+    operator.export_gpu_cache_assets(assets=assets,file_path=f"{work_dir}/batch",project_code="DFH",scene="fhsj")
+    elapsed = time.perf_counter() - start
+    #用例执行期间stdout被屏蔽
+    print(f"gpuCache[{size}] 逐组 {single:.4f}s 批量 {elapsed:.4f}s 节省 {single - elapsed:.4f}s",file=sys.stderr)
+    return elapsed
+
+
+@case
+def ass_profiles(common,scene,work_dir,size):
+    '''
+    size/20个mesh,按full和component配置导出所有res的.ass,比较文件大小
+    和放置代理时读取包围盒的耗时: full没有.asstoc,需要读取整个.ass;component只读取.asstoc
+    返回component配置的导出耗时
+    '''
+    #占位文件最大64KB,面数较少时文件大小可以比较
+    fake_maya.add_root_locator(scene,meshes_per_res=max(1,size // 60),polygons=(1,2,4))
+    operator = export_operator(common)
+    res_groups = operator.get_res_groups("|RootLocator")
+
+    sizes = {}
+    load_seconds = {}
+    for profile in ("full","component"):
+        operator.exportor.ass_profile = profile
+        scene.call_counts.clear()
+        start = time.perf_counter()
+        for child_group in res_groups:
+            operator.export_select_res(node_name=child_group,file_path=f"{work_dir}/{profile}",asset_name="bench",
+                            project_code="DFH",scene="fhsj",file_type="ass")
+        elapsed = time.perf_counter() - start
+        ass_dir = f"{work_dir}/{profile}/DFH_fhsj_bench/ass"
+        ass_paths = sorted(f"{ass_dir}/{name}" for name in os.listdir(ass_dir) if name.endswith(".ass"))
+        sizes[profile] = sum(os.path.getsize(path) for path in ass_paths)
+        load_seconds[profile] = ass_load_seconds(ass_paths)
+    #用例执行期间stdout被屏蔽
+    print(f"ass[{size}] full {sizes['full']} bytes, component {sizes['component']} bytes "
+          f"({1 - sizes['component'] / sizes['full']:.1%}), 读取包围盒 full {load_seconds['full'] * 1000:.3f}ms "
+          f"component {load_seconds['component'] * 1000:.3f}ms",file=sys.stderr)
+    return elapsed
+
+
+def ass_load_seconds(ass_paths,repeat=20):
+    '''
+    放置代理需要的包围盒: 有.asstoc时只读取.asstoc,否则读取整个.ass(Arnold和视口解析完整文件)
+    返回读取所有res一次的平均耗时
+    '''
+    import asstoc
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for path in ass_paths:
+            if asstoc.read_bounds(path) is None:
+                with open(path,"rb") as f:
+                    f.read()
+    return (time.perf_counter() - start) / repeat
+
+
+def build_thumbnail_library(root,asset_count):
+    '''
+    asset_count个资产的组件库: 预览图最新/缺失/过期/没有源文件各四分之一,另有一个渲染时进程崩溃的资产
+    返回需要渲染的正常资产数量
+    '''
+    old = time.time() - 3600
+    expected = 0
+    for i in range(asset_count + 1):
+        asset_id = f"DFH_fhsj_crash{i:05d}" if i == asset_count else f"DFH_fhsj_asset{i:05d}"
+        asset_dir = f"{root}/{asset_id}"
+        os.makedirs(asset_dir)
+        kind = i % 4 if i < asset_count else 1
+        if kind == 3:
+            continue
+        source = f"{asset_dir}/{asset_id}_proxyRes.ma"
+        with open(source,"wb") as f:
+            f.write(b'requires maya "2020";\n')
+        if kind in (0,2):
+            preview = f"{asset_dir}/{asset_id}_preview.png"
+            write_png(preview,64,64)
+            #过期: 预览图比源文件旧
+            os.utime(preview,(old,old))
+            if kind == 0:
+                os.utime(source,(old - 60,old - 60))
+        if kind in (1,2) and i < asset_count:
+            expected += 1
+    return expected
+
+
+def stub_thumbnail_farm(workers=4):
+    '''
+    stub渲染进程,渲染前输出GBK编码的日志,资产名包含crash时进程崩溃
+    '''
+    import thumbnail_farm
+    worker = os.path.join(os.path.dirname(os.path.abspath(__file__)),"thumbnail_worker.py")
+    return thumbnail_farm.ThumbnailFarm(command=[sys.executable,worker,"--renderer","stub","--crash","crash",
+                                                 "--log-encoding","gbk"],
+                                        workers=workers,size=(64,64))
+
+
+@case
+def thumbnail_farm(common,scene,work_dir,size):
+    '''
+    size/20 个资产的组件库,4个stub渲染进程渲染缺失和过期的预览图,返回渲染耗时
+    '''
+    import thumbnail_farm
+    root = f"{work_dir}/library"
+    expected = build_thumbnail_library(root,max(8,size // 20))
+    tasks,_ = thumbnail_farm.plan(root,prefix="DFH_fhsj")
+    start = time.perf_counter()
+    summary = stub_thumbnail_farm().run(tasks)
+    elapsed = time.perf_counter() - start
+    print(f"previews[{size}] {expected} rendered in {elapsed:.2f}s (worker {summary['worker_seconds']:.2f}s)",
+          file=sys.stderr)
+    return elapsed
+
+
+def build_display_scene(scene,work_dir,size):
+    '''
+    size个ass/gpuCache代理按网格排列,相机在原点上方500
+    返回 [(shape,是否应该实体显示)...]  只有相机2000以内的非hiRes代理实体显示
+    '''
+    camera = scene.create("transform","persp")
+    camera.attrs.update({"translateX":0.0,"translateY":500.0,"translateZ":0.0})
+    layout = scene.create("transform","layout_grp")
+    shapes = []
+    for i in range(size):
+        file_format = ("ass","gpuCache")[i % 2]
+        resolution = RES_LIST[i % 3]
+        position = ((i % 100) * 100.0,0.0,(i // 100) * 100.0)
+        transform,shape = fake_maya.add_component(scene,f"{work_dir}/asset{i}",f"DFH_fhsj_asset{i:05d}_{resolution}",
+                                                  file_format,resolution,parent=layout,translate=position)
+        near = position[0] ** 2 + 500.0 ** 2 + position[2] ** 2 <= 2000.0 ** 2
+        shapes.append((shape,resolution != "hiRes" and near))
+    return shapes
+
+
+@case
+def display_policy(common,scene,work_dir,size):
+    '''
+    size个ass/gpuCache代理,代理数量超过max_shaded,只有相机附近的非hiRes代理实体显示
+    返回第一次apply的耗时,打印选择一个hiRes代理后的更新耗时
+    '''
+    import display_policy
+    shapes = build_display_scene(scene,work_dir,size)
+    policy = display_policy.DisplayPolicy(max_shaded=size // 4,near_distance=2000.0)
+    manager = common.DisplayManager(policy,camera="persp")
+    
+    scene.call_counts.clear()
+    start = time.perf_counter()
+    report = manager.enable(measure=True)
+    elapsed = time.perf_counter() - start
+    
+    hires = next(shape for shape,expected in shapes if shape.attrs.get("dso","").endswith("hiRes.ass"))
+    update_start = time.perf_counter()
+    common.cmds.select(scene.path_name(scene.primary_path(hires.parents[0])))
+    update_seconds = time.perf_counter() - update_start
+    manager.disable(restore=True)
+    print(f"display[{size}] apply {elapsed * 1000:.1f}ms selection update {update_seconds * 1000:.2f}ms "
+          f"{display_policy.format_report(report).splitlines()[0]}",file=sys.stderr)
+    return elapsed
+
+
+USAGE_COMPONENT = '''createNode transform -n "{name}_{suffix}" -p "layout_grp";
+	rename -uid "{uid}";
+	addAttr -ci true -sn "assetDir" -ln "assetDir" -dt "string";
+	addAttr -ci true -sn "assetName" -ln "assetName" -dt "string";
+	setAttr ".t" -type "double3" {i} 0 {i} ;
+	setAttr ".assetDir" -type "string" "Z:/library/{asset_id}/{folder}";
+	setAttr ".assetName" -type "string" "{name}";
+	setAttr ".fileFormat" -type "string" "{file_format}";
+	setAttr ".resolutionType" -type "string" "{res}";
+createNode {shape_type} -n "{name}_{suffix}Shape" -p "{name}_{suffix}";
+	setAttr -k off ".v";
+	setAttr ".{cache_attr}" -type "string" "Z:/library/{asset_id}/{folder}/{name}.{extension}";
+'''
+
+USAGE_MESH = '''createNode mesh -n "ground_geoShape" -p "ground_geo";
+	setAttr -s {count} ".vt";
+	setAttr ".vt[0:{last}]" {points};
+	setAttr ".ftn" -type "string" "Z:/textures/ground.png";
+'''
+
+
+def build_usage_scenes(root,scene_count):
+    '''
+    scene_count个.ma场景,每个场景引用street.ma,20个ass/gpuCache组件和一段较大的mesh数据
+    第s个场景的第i个组件使用资产 (s + i) % 50
+    '''
+    points = "\n\t\t".join(f"{i} 0 {i}" for i in range(400))
+    for s in range(scene_count):
+        folder_path = f"{root}/ep{s % 4:02d}/sc{s:04d}"
+        os.makedirs(folder_path)
+        parts = ['//Maya ASCII 2020 scene\nrequires maya "2020";\n',
+                 'file -rdi 1 -ns "set" -rfn "setRN"\n\t\t-typ "mayaAscii" "Z:/sets/street.ma";\n',
+                 'file -r -ns "set" -dr 1 -rfn "setRN"\n\t\t-typ "mayaAscii" "Z:/sets/street.ma";\n',
+                 USAGE_MESH.format(count=400,last=399,points=points)]
+        for i in range(20):
+            file_format = ("ass","gpuCache")[i % 2]
+            asset_id = f"DFH_fhsj_asset{(s + i) % 50:05d}"
+            res = RES_LIST[i % 3]
+            parts.append(USAGE_COMPONENT.format(
+                name=f"{asset_id}_{res}",suffix=file_format,uid=f"{s}-{i}",i=i,asset_id=asset_id,res=res,
+                file_format=file_format,folder={"ass":"ass","gpuCache":"cache"}[file_format],
+                shape_type={"ass":"aiStandIn","gpuCache":"gpuCache"}[file_format],
+                cache_attr={"ass":"dso","gpuCache":"cfn"}[file_format],
+                extension={"ass":"ass","gpuCache":"abc"}[file_format]))
+        parts.append("// End of scene.ma\n")
+        with open(f"{folder_path}/sc{s:04d}_layout.ma","w",encoding="utf-8") as f:
+            f.write("".join(parts))
+
+
+def touch_usage_scenes(root):
+    '''
+    修改第一个场景,删除第二个场景
+    '''
+    with open(f"{root}/ep00/sc0000/sc0000_layout.ma","a",encoding="utf-8") as f:
+        f.write("// touched\n")
+    os.remove(f"{root}/ep01/sc0001/sc0001_layout.ma")
+
+
+@case
+def usage_index(common,scene,work_dir,size):
+    '''
+    size/20 个.ma场景,2个进程建立索引,修改一个场景并删除一个场景后增量更新
+    返回第一次建立索引的耗时
+    '''
+    import usage_index
+    root = f"{work_dir}/shots"
+    scene_count = max(4,size // 20)
+    build_usage_scenes(root,scene_count)
+    
+    with usage_index.UsageIndex(f"{work_dir}/usage.sqlite") as index:
+        start = time.perf_counter()
+        index.update(root,workers=2)
+        elapsed = time.perf_counter() - start
+        touch_usage_scenes(root)
+        update_start = time.perf_counter()
+        index.update(root,workers=2)
+        update_seconds = time.perf_counter() - update_start
+    print(f"usage[{size}] {scene_count} scenes {elapsed:.2f}s, incremental {update_seconds * 1000:.1f}ms",
+          file=sys.stderr)
+    return elapsed
+
+
+@case
+def library_watcher(common,scene,work_dir,size):
+    '''
+    size/2 个ass和size/2 个gpuCache组件,每COMPONENTS_PER_ASSET个节点引用同一个文件
+    打印没有变化时poll的耗时,返回重新加载一个ass和一个gpuCache文件的耗时
+    '''
+    import library_watcher
+    build_component_scene(scene,f"{work_dir}/ass_library",size // 2,"ass")
+    build_component_scene(scene,f"{work_dir}/gpu_library",size // 2,"gpuCache")
+    operator = common.Operator(res_list=RES_LIST)
+    reloader = operator.library_reloader
+    paths = reloader.build_index()
+    watcher = library_watcher.LibraryWatcher(settle=0.0,full_every=10)
+    watcher.set_paths(paths)
+    
+    start = time.perf_counter()
+    watcher.poll()
+    quiet_seconds = time.perf_counter() - start
+    
+    changed = [next(path for path in paths if path.endswith(extension)) for extension in (".ass",".abc")]
+    scene.call_counts.clear()
+    start = time.perf_counter()
+    report = reloader.reload(changed)
+    elapsed = time.perf_counter() - start
+    print(f"watch[{size}] {len(paths)} files quiet poll {quiet_seconds * 1000:.2f}ms, "
+          f"reload {report['nodes']} nodes {elapsed * 1000:.1f}ms",file=sys.stderr)
+    return elapsed
+
+
+STATS_FORMATS = ("ass","gpuCache","abc")
+
+
+def write_png(path,width,height):
+    '''
+    只写入PNG签名和IHDR,用于读取文件头
+    '''
+    import struct
+    with open(path,"wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sIIBBBBB",13,b"IHDR",width,height,8,6,0,0,0) + b"\0" * 4)
+
+
+def build_stats_scene(common,scene,work_dir,size):
+    '''
+    size个ass/gpuCache/abc组件,一半节点是实例
+    ass文件和ma文件引用PNG贴图(1024的贴图和两个512的<UDIM>象限)
+    返回 (资产数量,贴图组数)
+    '''
+    library_root = f"{work_dir}/library"
+    texture_dir = f"{work_dir}/textures"
+    os.makedirs(texture_dir)
+    asset_count = max(1,size // COMPONENTS_PER_ASSET)
+    texture_count = max(1,asset_count // 10)
+    for i in range(texture_count):
+        write_png(f"{texture_dir}/tex{i}.png",1024,1024)
+        for tile in (1001,1002):
+            write_png(f"{texture_dir}/udim{i}.{tile}.png",512,512)
+
+    asset_ids = []
+    for i in range(asset_count):
+        asset_id = f"DFH_fhsj_asset{i:05d}"
+        file_format = STATS_FORMATS[i % len(STATS_FORMATS)]
+        folder,extension = common.resolver.FORMAT_FOLDERS[file_format]
+        os.makedirs(f"{library_root}/{asset_id}/{folder}")
+        textures = (f"{texture_dir}/tex{i % texture_count}.png",f"{texture_dir}/udim{i % texture_count}.<UDIM>.png")
+        with open(f"{library_root}/{asset_id}/{folder}/{asset_id}_proxyRes.{extension}","wb") as f:
+            if file_format == "ass":
+                f.write("".join(f'image\n{{\n filename "{texture}"\n}}\n' for texture in textures).encode())
+            else:
+                f.write(b"\0" * 2400)
+        with open(f"{library_root}/{asset_id}/{asset_id}_proxyRes.ma","wb") as f:
+            f.write("".join(f'setAttr ".ftn" -type "string" "{texture}";\n' for texture in textures).encode())
+        asset_ids.append((asset_id,file_format,folder))
+
+    layout = scene.create("transform","layout_grp")
+    shapes = {}
+    for i in range(size):
+        asset_id,file_format,folder = asset_ids[i % asset_count]
+        #每个资产的第2个节点开始,一半使用实例
+        instance = shapes.get(asset_id) if (i // asset_count) % 2 else None
+        _,shape = fake_maya.add_component(scene,f"{library_root}/{asset_id}/{folder}",f"{asset_id}_proxyRes",
+                        file_format,"proxyRes",parent=layout,shape_node=instance)
+        shapes.setdefault(asset_id,shape)
+    return asset_count,texture_count
+
+
+@case
+def scene_stats(common,scene,work_dir,size):
+    '''
+    size个ass/gpuCache/abc组件的统计和贴图显存估算
+    '''
+    import scene_report
+    build_stats_scene(common,scene,work_dir,size)
+    operator = common.Operator(res_list=RES_LIST)
+    scene.call_counts.clear()
+    start = time.perf_counter()
+    scene_report.build_report(operator.collect_scene_stats(),path_resolver=operator.path_resolver,
+                        cache=scene_report.StatsCache())
+    return time.perf_counter() - start
+
+
+IMPORT_SCRIPT = '''
+import sys,time
+sys.path.insert(0,{root!r})
+import fake_maya
+fake_maya.install()
+sys.modules.pop("maya.OpenMayaUI",None)
+start = time.perf_counter()
+import common
+print(time.perf_counter() - start)
+print(",".join(name for name in ("PySide2","shiboken2","maya.OpenMayaUI","ui") if name in sys.modules))
+'''
+
+
+def import_common_seconds():
+    '''
+    在新进程中安装fake_maya后导入common
+    返回 (导入耗时,已经加载的UI模块列表)
+    '''
+    script = IMPORT_SCRIPT.format(root=os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable,"-c",script],capture_output=True,text=True)
+    if output.returncode != 0:
+        raise RuntimeError(output.stderr)
+    lines = output.stdout.splitlines()
+    return float(lines[-2]),[name for name in lines[-1].split(",") if name]
+
+
+@case
+def layout_snapshot(common,scene,work_dir,size):
+    '''
+    size个组件节点(20个资产,3个父层级)写入快照,删除组件节点和其中一个父层级后还原
+    返回还原的耗时
+    '''
+    cmds = common.cmds
+    transforms = fake_maya.add_layout(scene,f"{work_dir}/library",size)
+    operator = common.Operator(res_list=RES_LIST)
+    snapshot_path = f"{work_dir}/layout.csnp"
+    operator.export_layout_snapshot(snapshot_path)
+    cmds.delete([scene.path_name(scene.primary_path(transform)) for transform in transforms])
+    cmds.delete("|layout|blockB")
+
+    scene.call_counts.clear()
+    start = time.perf_counter()
+    operator.import_layout_snapshot(snapshot_path)
+    return time.perf_counter() - start
+
+
+def build_duplicate_scene(common,scene,work_dir,size):
+    '''
+    size个组件节点(20个资产,3个父层级),缓存文件1KB,每个资产的第二个节点已经是实例
+    返回 (组件transform列表,{资产名:已经是实例的节点})
+    '''
+    transforms = fake_maya.add_layout(scene,f"{work_dir}/library",size)
+    for asset_dir in {transform.attrs["assetDir"] for transform in transforms}:
+        for name in os.listdir(asset_dir):
+            with open(f"{asset_dir}/{name}","wb") as f:
+                f.write(b"\0" * 1024)
+    instanced = {}
+    for transform in transforms[20:40]:
+        common.cmds.instance(scene.path_name(scene.primary_path(transform)))
+        instanced[transform.attrs["assetName"]] = scene.path_name(scene.primary_path(transform))
+    return transforms,instanced
+
+
+@case
+def duplicate_components(common,scene,work_dir,size):
+    '''
+    size个组件节点中分析重复节点并全部替换为实例,返回分析和替换的耗时
+    '''
+    build_duplicate_scene(common,scene,work_dir,size)
+    operator = common.Operator(res_list=RES_LIST)
+    scene.call_counts.clear()
+    start = time.perf_counter()
+    report = operator.analyze_duplicate_components()
+    operator.consolidate_duplicate_components(report=report,dry_run=False)
+    return time.perf_counter() - start
+
+@case
+def import_common(common,scene,work_dir,size):
+    '''
+    在新进程中导入common,返回导入耗时
+    size参数不影响该用例
+    '''
+    return import_common_seconds()[0]
+
+SIZE_INDEPENDENT.add("import_common")
+
+
+##########################################################################
+
+def run_case(name,size,common,repeat=1):
+    '''
+    执行用例,返回 {"seconds","calls"}  多次执行时取最小耗时
+    '''
+    best = None
+    calls = None
+    for _ in range(repeat):
+        scene = fake_maya.reset()
+        work_dir = tempfile.mkdtemp(prefix="component_bench_")
+        try:
+            #工具本身的print输出较多,用例执行期间屏蔽
+            with contextlib.redirect_stdout(io.StringIO()):
+                elapsed = CASES[name](common,scene,work_dir,size)
+        finally:
+            shutil.rmtree(work_dir,ignore_errors=True)
+        if best is None or elapsed < best:
+            best = elapsed
+        calls = sum(scene.call_counts.values())
+    return {"seconds":round(best,6),"calls":calls}
+
+
+def compare(results,baseline,tolerance):
+    '''
+    返回 (调用次数退化列表,耗时退化列表),每项为 (key,说明)
+    '''
+    regressions = []
+    slower = []
+    for key,result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if result["calls"] > base["calls"]:
+            regressions.append((key,f"cmds调用 {base['calls']} > {result['calls']}"))
+        if result["seconds"] > max(base["seconds"] * (1.0 + tolerance),MIN_SECONDS):
+            slower.append((key,f"耗时 {base['seconds']:.4f}s > {result['seconds']:.4f}s"))
+    return regressions,slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Component Tool benchmark")
+    parser.add_argument("--sizes",default=",".join(str(s) for s in DEFAULT_SIZES))
+    parser.add_argument("--case",action="append",choices=sorted(CASES))
+    parser.add_argument("--repeat",type=int,default=1)
+    parser.add_argument("--baseline",default=BASELINE_FILE)
+    parser.add_argument("--update-baseline",action="store_true")
+    parser.add_argument("--check",action="store_true")
+    parser.add_argument("--check-time",action="store_true",help="耗时超过基线时也返回非0")
+    parser.add_argument("--tolerance",type=float,default=1.0,help="允许的耗时增长比例")
+    args = parser.parse_args(argv)
+
+    common = load_common()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    names = args.case or list(CASES)
+
+    results = {}
+    print(f"{'case':<32}{'size':>8}{'seconds':>12}{'calls':>10}")
+    for name in names:
+        for size in sizes[:1] if name in SIZE_INDEPENDENT else sizes:
+            result = run_case(name,size,common,args.repeat)
+            results[f"{name}[{size}]"] = result
+            print(f"{name:<32}{size:>8}{result['seconds']:>12.4f}{result['calls']:>10}")
+
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline,"r",encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline,"w",encoding="utf-8") as f:
+            json.dump(baseline,f,indent=2,sort_keys=True)
+        print(f"基线已更新 > {args.baseline}")
+        return 0
+
+    regressions,slower = compare(results,baseline,args.tolerance)
+    for key,message in regressions:
+        print(f"退化 {key} > {message}")
+    for key,message in slower:
+        print(f"{'退化' if args.check_time else '耗时警告'} {key} > {message}")
+    if args.check and (regressions or (args.check_time and slower)):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,59 @@
 import maya.cmds as cmds
 import maya.mel as mel
 import maya.api.OpenMaya as om
-import maya.OpenMayaUI as omui
-from PySide2.QtWidgets import QSizePolicy,QTabBar,QStackedWidget,QFrame,QAction,QComboBox,QListWidget,QDialog,QCheckBox,QTabWidget,QPushButton,QLabel,QLineEdit,QMainWindow,QDialog,QFileDialog,QMessageBox,QWidget,QVBoxLayout,QHBoxLayout,QFormLayout,QGridLayout,QMenuBar,QMenu,QTableWidget,QScrollArea,QStyle
-from PySide2.QtCore import Qt,Signal,QSize
-from PySide2.QtWidgets import QApplication
-from PySide2.QtGui import QFont,QIcon,QPixmap
-from shiboken2 import wrapInstance
 from collections import defaultdict
-import os,sys,shutil,subprocess
-
-def maya_main_window():
+import os,sys,glob,time,shutil,subprocess
+import layout_snapshot
+import resolver
+import udim
+import texture_downsample
+import scene_report
+import polycount
+import export_queue
+import asstoc
+import display_policy
+from jobs import Job
+from profiler import profiler
+
+#AbcExport -j 参数,True为开关参数,其他值写在参数后面,False/None不写入
+ABC_OPTIONS = {"worldSpace":True,"uvWrite":True}
+
+#按res覆盖ABC_OPTIONS,例如proxyRes不写入UV和法线减小文件:
+#    {"proxyRes":{"uvWrite":False,"noNormals":True}}
+ABC_RES_OPTIONS = {}
+
+#gpuCache -optimizationThreshold,面数低于阈值的mesh合并,按res覆盖,例如 {"proxyRes":2000}
+GPU_CACHE_THRESHOLD = 40000
+GPU_CACHE_RES_THRESHOLDS = {}
+
+#Arnold节点类型 (ai_node_entry.h),arnoldExportAss -mask
+AI_NODE_OPTIONS = 0x0001
+AI_NODE_CAMERA = 0x0002
+AI_NODE_LIGHT = 0x0004
+AI_NODE_SHAPE = 0x0008
+AI_NODE_SHADER = 0x0010
+
+#arnoldExportAss参数
+#    component > 组件代理只需要几何体和材质,不导出options,相机,灯光和灯光链接,写入.asstoc包围盒
+#    full > arnoldExportAss默认导出的所有节点
+ASS_EXPORT_PROFILES = {
+    "component":{"mask":AI_NODE_SHAPE | AI_NODE_SHADER,"lightLinks":0,"shadowLinks":0,"boundingBox":True},
+    "full":{"boundingBox":True},
+}
+ASS_EXPORT_PROFILE = "component"
+
+def get_file_size(path):
+    '''
+    返回文件大小,文件不存在返回0
+    '''
     try:
-        main_window = omui.MQtUtil.mainWindow()
-        if main_window is None:
-            print("无法获取Maya主窗口")
-            return None
-        return wrapInstance(int(main_window),QWidget)
-    except Exception as e:
-        print(f"获取Maya主窗口失败:{e}")
-        return None
-        
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
 class MaterialManager():
     
+    @profiler.timed()
     def iter_all_children(self,root_transform=None, api_type=None):
         """
         从指定的 transform 节点开始，遍历其下所有 DAG 子节点，
@@ -101,8 +132,10 @@ class MaterialManager():
 
             it.next()
 
+        profiler.current().add(nodes=len(result))
         return result
     
+    @profiler.timed()
     def get_mesh_shading_engine(self,mesh_shape_list):
         """
         mesh_shape_list : List[om.MObject] （mesh shape）
@@ -157,6 +190,7 @@ class MaterialManager():
         
         return file_texture_node
     
+    @profiler.timed()
     def get_texture_node(self,root_transform=None,api_type=None):
         '''
         获取输入transform节点下的所有贴图节点
@@ -175,13 +209,22 @@ class MaterialManager():
             temp_file_texture_node.extend(temp)
         
         file_node = list(set(temp_file_texture_node))
+        profiler.current().add(nodes=len(file_node))
         
         return file_node
 
 class ExportManager():
     
-    def __init__(self):
-        pass
+    def __init__(self,abc_res_options=None,gpu_cache_res_thresholds=None,ass_profile=ASS_EXPORT_PROFILE):
+        '''
+        abc_res_options > 每个res的AbcExport参数,为空时使用ABC_RES_OPTIONS
+        gpu_cache_res_thresholds > 每个res的gpuCache合并阈值,为空时使用GPU_CACHE_RES_THRESHOLDS
+        ass_profile > ASS_EXPORT_PROFILES中的名称
+        '''
+        self.ass_profile = ass_profile
+        self.abc_res_options = dict(ABC_RES_OPTIONS if abc_res_options is None else abc_res_options)
+        self.gpu_cache_res_thresholds = dict(GPU_CACHE_RES_THRESHOLDS if gpu_cache_res_thresholds is None
+                                             else gpu_cache_res_thresholds)
         
     def check_plugin(self,plugin_name = None):
         '''
@@ -209,12 +252,14 @@ class ExportManager():
         
         return path
     
-    def export_gpu_cache(self,file_path = None,file_name = None,node_name=None):
+    @profiler.timed()
+    def export_gpu_cache(self,file_path = None,file_name = None,node_name=None,optimization_threshold=None):
         '''
         导出gpucache
         file_path > 文件路径
         file_name > 导出文件路径  不能带文件后缀
         node_name > 导出物体    
+        optimization_threshold > 合并阈值,为空时使用gpuCache的默认值
         '''
         
         if not cmds.pluginInfo("gpuCache",query=True,loaded=True):
@@ -230,33 +275,49 @@ class ExportManager():
         #gpuCache无法导出空组,导出前检查是否为空组
         if cmds.listRelatives(node_name,children=True):
             cmds.select(node_name)
-            mel_cmd = f'gpuCache -optimize -writeMaterials -dataFormat "abc" -directory "{file_path}" -fileName "{file_name}" -startTime 1 -endTime 1 {node_name};'
+            threshold = f"-optimizationThreshold {optimization_threshold} " if optimization_threshold else ""
+            mel_cmd = f'gpuCache -optimize {threshold}-writeMaterials -dataFormat "abc" -directory "{file_path}" -fileName "{file_name}" -startTime 1 -endTime 1 {node_name};'
             try:
                 mel.eval(mel_cmd)
+                if profiler.enabled:
+                    profiler.current().add(bytes=get_file_size(f"{file_path}/{file_name}.abc"),files=1)
                 print("导出gpuCache成功")
             except Exception as e:
                 cmds.error(f"导出gpuCache错误 > {e}")
         else:
             print(f"{node_name}为空组,跳过")
         
-    def export_arnold_ass(self,file_path = None,node_name = None,start_frame=1,end_frame=1):
+    @profiler.timed()
+    def export_arnold_ass(self,file_path = None,node_name = None,start_frame=1,end_frame=1,profile=None):
         '''
         导出Arnold代理文件
         file_name > 导出文件名称  > 路径+文件名称+.ass > W:/WXR/temp/zjx/Script/temp/.test.ass
         selected > 是否导出选择代理
+        profile > ASS_EXPORT_PROFILES中的名称,为空时使用self.ass_profile
         
+        profile写入包围盒时,MtoA没有生成.asstoc则按节点的世界包围盒写入(导出时RootLocator变换为0)
         '''
         if not file_path:
             cmds.error("file name is none")
+        
+        profile = profile or self.ass_profile
+        if profile not in ASS_EXPORT_PROFILES:
+            cmds.error(f"ass导出配置不存在 > {profile}")
+        options = ASS_EXPORT_PROFILES[profile]
             
         cmds.select(node_name)
         print(file_path)
         try:
-            cmds.arnoldExportAss(filename = file_path,selected = True)
+            cmds.arnoldExportAss(filename = file_path,selected = True,**options)
+            if options.get("boundingBox") and asstoc.read_bounds(file_path) is None:
+                asstoc.write_bounds(file_path,cmds.exactWorldBoundingBox(node_name))
+            if profiler.enabled:
+                profiler.current().add(bytes=get_file_size(file_path),files=1)
         except Exception as e:
             
             raise Exception(f"export ass error > {e}")
     
+    @profiler.timed()
     def export_maya_file(self,object_name = None,file_path = None,file_format="ma"):
         '''
         根据file_path,file_name和file_format自动计算保存的文件path
@@ -285,25 +346,125 @@ class ExportManager():
             cmds.error("file_format type error")
         
         cmds.file(file_path,force=True,type=file_type,exportSelected=True)
+        if profiler.enabled:
+            profiler.current().add(bytes=get_file_size(file_path),files=1)
+    
+    def build_abc_job(self,node_name = None,file_path = None,start_time=1,end_time=1,options=None):
+        '''
+        返回AbcExport的一个 -j 参数
+        options > 覆盖ABC_OPTIONS
+        '''
+        options = dict(ABC_OPTIONS,**(options or {}))
+        args = [f"-frameRange {start_time} {end_time}"]
+        for flag,value in options.items():
+            if value is True:
+                args.append(f"-{flag}")
+            elif value is not False and value is not None:
+                args.append(f"-{flag} {value}")
+        args.append(f"-root {node_name}")
+        args.append(f'-file "{file_path}"')
+        return " ".join(args)
     
-    def export_abc(self,node_name = None,start_time=1,end_time=1,uv_write = True,file_path = None):
+    @profiler.timed()
+    def export_abc(self,node_name = None,start_time=1,end_time=1,uv_write = True,file_path = None,options=None):
         if not self.check_plugin("AbcExport"):
             cmds.error("Plugin > Unloaded AbcExport")
         
         if not file_path:
             cmds.error("file path is None")
         
-        job = " ".join([
-        f"-frameRange {start_time} {end_time}",
-        "-worldSpace",
-        "-uvWrite",
-        f"-root {node_name}",
-        f'-file "{file_path}"'
-        ])
+        job = self.build_abc_job(node_name=node_name,file_path=file_path,start_time=start_time,end_time=end_time,
+                    options=dict({"uvWrite":uv_write},**(options or {})))
         
         print("job",job)
         
         cmds.AbcExport(j = job)
+        if profiler.enabled:
+            profiler.current().add(bytes=get_file_size(file_path),files=1)
+    
+    @profiler.timed()
+    def export_abc_batch(self,items = None,start_time=1,end_time=1):
+        '''
+        一次AbcExport调用导出多个组,每个组一个 -j 参数,场景只计算一次
+        items > [(节点长名称,文件路径,参数),...] 参数覆盖ABC_OPTIONS
+        返回 {文件路径:是否成功},导出后文件存在并且已更新时为成功
+        AbcExport在某个任务出错时会中断,之后的文件不会写入
+        '''
+        if not self.check_plugin("AbcExport"):
+            cmds.error("Plugin > Unloaded AbcExport")
+        
+        if not items:
+            return {}
+        
+        jobs = []
+        before = {}
+        for node_name,file_path,options in items:
+            if not file_path:
+                cmds.error("file path is None")
+            jobs.append(self.build_abc_job(node_name=node_name,file_path=file_path,start_time=start_time,
+                        end_time=end_time,options=options))
+            before[file_path] = self._file_stamp(file_path)
+        
+        for job in jobs:
+            print("job",job)
+        
+        try:
+            cmds.AbcExport(j = jobs)
+        except Exception as e:
+            print(f"AbcExport错误 > {e}")
+        
+        results = {}
+        for file_path,stamp in before.items():
+            current = self._file_stamp(file_path)
+            results[file_path] = current is not None and current != stamp
+            print(f"{'导出abc成功' if results[file_path] else '导出abc失败'} > {file_path}")
+            if results[file_path] and profiler.enabled:
+                profiler.current().add(bytes=current[0],files=1)
+        return results
+    
+    @profiler.timed()
+    def export_gpu_cache_batch(self,items = None,start_time=1,end_time=1):
+        '''
+        批量导出gpuCache,同一目录,文件名前缀和合并阈值的组一次gpuCache调用写入多个文件
+        文件名为 {前缀}{组短名称}.abc
+        items > [(节点长名称,目录,文件名前缀,合并阈值),...] 阈值为空时使用GPU_CACHE_THRESHOLD
+        返回 {文件路径:是否成功},导出后文件存在并且已更新时为成功
+        gpuCache只有一个 -directory 参数,多个资产按目录分别调用
+        '''
+        if not cmds.pluginInfo("gpuCache",query=True,loaded=True):
+            cmds.error("Unload Plugin gpuCache")
+        
+        batches = defaultdict(list)
+        for node_name,directory,prefix,threshold in items or []:
+            batches[(directory,prefix,threshold or GPU_CACHE_THRESHOLD)].append(node_name)
+        
+        results = {}
+        for (directory,prefix,threshold),node_names in batches.items():
+            paths = [f"{directory}/{prefix}{node_name.split('|')[-1]}.abc" for node_name in node_names]
+            before = {path:self._file_stamp(path) for path in paths}
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+            try:
+                cmds.gpuCache(*node_names,directory=directory,filePrefix=prefix,saveMultipleFiles=True,
+                              optimize=True,optimizationThreshold=threshold,writeMaterials=True,
+                              dataFormat="abc",startTime=start_time,endTime=end_time)
+            except Exception as e:
+                print(f"gpuCache错误 > {e}")
+            
+            for path,stamp in before.items():
+                current = self._file_stamp(path)
+                results[path] = current is not None and current != stamp
+                print(f"{'导出gpuCache成功' if results[path] else '导出gpuCache失败'} > {path}")
+                if results[path] and profiler.enabled:
+                    profiler.current().add(bytes=current[0],files=1)
+        return results
+    
+    def _file_stamp(self,path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size,stat.st_mtime_ns
     
 class NodeCreator():
     
@@ -349,810 +510,340 @@ class NodeCreator():
             cmds.setAttr(f"{group_node}.scaleY",lock=True)
             cmds.setAttr(f"{group_node}.scaleZ",lock=True)
 
-class UI(QMainWindow):
-    
-    def __init__(self,parent=maya_main_window(),file_path=None,project_code=None,scene_prefix=None):
-        super().__init__(parent)
-        self.setFixedSize(400,700)
-        self.setWindowTitle("Component Tool 2022")
-        central_widget = QWidget()
-        self.central_layout = QVBoxLayout(central_widget)
-        self.setCentralWidget(central_widget)
-        
-        self.resolution_type = ["proxyRes","midRes","hiRes"]
-        self.operator = Operator(res_list=self.resolution_type)
-        
-        self.file_path = file_path
-        self.project_code = project_code
-        self.scene_prefix = scene_prefix
-
-        self.create_ui()
-        self.bind()
-    
-    def bind(self):
-        self.create_locator_button.clicked.connect(self.operator.create_locator)
-        self.export_selected_res_button.clicked.connect(self.export_selected_res_button_command)
-        self.export_all_res_button.clicked.connect(self.export_all_res_button_command)
-        self.update_source_button.clicked.connect(self.update_source_button_command)
-        self.screen_btn.clicked.connect(self.screen_shot)
-        
-        self.import_abc_button.clicked.connect(lambda :self.import_cache(cache_type="abc"))
-        self.import_gpu_button.clicked.connect(lambda :self.import_cache(cache_type="gpuCache"))
-        self.import_ass_button.clicked.connect(lambda :self.import_cache(cache_type="ass"))
-        
-        self.switch_abc_res_button.clicked.connect(self.repalce_select_res_command)
-        self.switch_gpu_res_button.clicked.connect(self.repalce_select_res_command)
-        self.switch_ass_res_button.clicked.connect(self.repalce_select_res_command)
-        
-        self.replace_abc_res_button.clicked.connect(self.repalce_all_res_command)
-        self.replace_gpu_res_button.clicked.connect(self.repalce_all_res_command)
-        self.replace_ass_res_button.clicked.connect(self.repalce_all_res_command)
-        
-        self.import_custom_res_button.clicked.connect(self.import_source)
-        self.import_source_button.clicked.connect(self.import_source)
-
-    def create_ui(self):
-        self.create_tab_bar()
-        self.create_export_ui()
-        self.create_import_ui()
-
-    def create_button(self,text):
-        button = QPushButton(text)
-        button.setFixedHeight(40)
-        return button
-    
-    def create_tab_bar(self):
-        
-        self.tab_bar = QTabBar()
-        self.tab_bar.setDrawBase(False)
-        self.tab_bar.setFixedWidth(350)
-        self.tab_bar.addTab("导出")
-        self.tab_bar.addTab("导入")
-        self.tab_bar.addTab("大纲")
-
-        self.stack = QStackedWidget()
-        import_widget = QWidget()
-        self.import_layout = QVBoxLayout(import_widget)
-
-        export_widget = QWidget()
-        self.export_layout = QVBoxLayout(export_widget)
-        
-        preview_widget = QWidget()
-        self.preview_widget = QVBoxLayout(preview_widget)
-
-        self.stack.addWidget(export_widget)
-        self.stack.addWidget(import_widget)
-        self.stack.addWidget(preview_widget)
-        self.central_layout.addWidget(self.tab_bar)
-        self.central_layout.addWidget(self.stack)
-
-        self.tab_bar.currentChanged.connect(self.stack.setCurrentIndex)
-
-    def create_export_ui(self):
-        
-        input_widget = QWidget()
-        
-        init_label=QLabel("创建大纲层级")
-        export_label = QLabel("导出文件类型选项")
-        screen_label = QLabel("预览图")
-
-        input_layout = QHBoxLayout(input_widget)
-        input_label = QLabel("资产名称")
-        self.input_text = QLineEdit()
-        self.input_text.setPlaceholderText("请输入组件名称")
-        input_layout.addWidget(input_label)
-        input_layout.addWidget(self.input_text)
-
-        self.create_locator_button = self.create_button("创建 Locator")
-
-        check_box_widget_01 = QWidget()
-        check_box_widget_02 = QWidget()
-        check_box_layout_01 = QHBoxLayout(check_box_widget_01)
-        check_box_layout_02 = QHBoxLayout(check_box_widget_02)
-        self.check_ma = QCheckBox("导出 MA")
-        self.check_ass = QCheckBox("导出 ASS")
-        self.check_gpu_cache = QCheckBox("导出 GPU")
-        self.check_abc = QCheckBox("导出 ABC")
-        self.check_texture = QCheckBox("导出 TEX")
-        
-        self.check_ma.setChecked(True)
-        self.check_ass.setChecked(True)
-        self.check_gpu_cache.setChecked(True)
-        self.check_abc.setChecked(True)
-        self.check_texture.setChecked(True)
-
-        check_box_layout_01.addWidget(self.check_ass)
-        check_box_layout_01.addWidget(self.check_gpu_cache)
-        check_box_layout_01.addWidget(self.check_abc)
-        check_box_layout_01.addWidget(self.check_texture)
-        check_box_layout_02.addWidget(self.check_ma)
-        
-        export_button_widget = QWidget()
-        export_button_layout = QHBoxLayout(export_button_widget)
-        export_button_layout.setContentsMargins(0,0,0,0)
-        
-        self.export_selected_res_button = self.create_button("导出选中 Res")
-        self.export_all_res_button = self.create_button("导出所有 Res")
-        export_button_layout.addWidget(self.export_selected_res_button)
-        export_button_layout.addWidget(self.export_all_res_button)
-        
-        self.update_source_button = self.create_button("更新 Src")
-        
-        self.export_layout.addWidget(init_label)
-        self.export_layout.addWidget(self.create_frame())
-        self.export_layout.addWidget(self.create_locator_button)
-        #self.export_layout.addSpacing(15)
-        self.export_layout.addWidget(self.create_frame())
-        
-        self.export_layout.addWidget(input_widget)
-        self.export_layout.addSpacing(15)
-        
-        self.export_layout.addWidget(export_label)
-        self.export_layout.addWidget(self.create_frame())
-        self.export_layout.addWidget(check_box_widget_01)
-        self.export_layout.addWidget(check_box_widget_02)
-        self.export_layout.addWidget(export_button_widget)
-        #self.export_layout.addWidget(self.export_all_res_button)
-        self.export_layout.addWidget(self.update_source_button)
-        self.export_layout.addSpacing(15)
-        
-        self.export_layout.addWidget(screen_label)
-        self.export_layout.addWidget(self.create_frame())
-        
-        screen_widget,self.preview_label,self.screen_btn = self.create_screen_shot_widget()
-        
-        self.export_layout.addWidget(screen_widget)
-
-        self.export_layout.addStretch()
-
-    def create_import_ui(self):
-        import_abc_widget = QWidget()
-        import_abc_layout = QHBoxLayout(import_abc_widget)
-        import_abc_layout.setContentsMargins(2,2,2,2)
-        
-        switch_res_widget = QWidget()
-        switch_res_layout = QHBoxLayout(switch_res_widget)
-        switch_res_layout.setContentsMargins(2,2,2,2)
-        
-        replace_all_widget = QWidget()
-        replace_all_layout = QHBoxLayout(replace_all_widget)
-        replace_all_layout.setContentsMargins(2,2,2,2)
-        
-        import_label = QLabel("导入Cache选项")
-        replace_label = QLabel("切换/替换Cache选项")
-        import_ma_label = QLabel("导入当前选择Cache的Ma文件")
-        replace_current_label = QLabel("切换当前选择节点")
-        replace_all_label = QLabel("切换场景中所有节点")
-        replace_all_label_widget = QWidget()
-        replace_all_label_layout = QHBoxLayout(replace_all_label_widget)
-        replace_all_label_layout.setContentsMargins(0,0,0,0)
-        
-        self.enabled_instance_check_box = QCheckBox("启用实例")
-        self.enabled_instance_check_box.setChecked(True)
-        self.enabled_instance_check_box.setToolTip("勾选后,将以实例对象替换场景中的节点")
-        
-        replace_all_label_layout.addWidget(replace_all_label)
-        replace_all_label_layout.addSpacing(15)
-        replace_all_label_layout.addWidget(self.enabled_instance_check_box)
-        replace_all_label_layout.addStretch()
-        
-        self.import_abc_button = self.create_button("导入 Abc")
-        self.import_gpu_button = self.create_button("导入 GPU Cache")
-        self.import_ass_button = self.create_button("导入 Arnold Ass")
-        
-        self.switch_abc_res_button = self.create_button("切换选择 Res Abc")
-        self.switch_abc_res_button.setProperty("action","abc")
-        
-        self.switch_gpu_res_button = self.create_button("切换选择 Res GPU")
-        self.switch_gpu_res_button.setProperty("action","gpuCache")
-        
-        self.switch_ass_res_button = self.create_button("切换选择 Res Ass")
-        self.switch_ass_res_button.setProperty("action","ass")
-        
-        self.replace_abc_res_button = self.create_button("切换全部 Res Abc")
-        self.replace_abc_res_button.setToolTip("替换场景中所有Abc为选择的res")
-        self.replace_abc_res_button.setProperty("action","abc")
-        
-        self.replace_gpu_res_button = self.create_button("切换全部 Res GPU")
-        self.replace_gpu_res_button.setToolTip("替换场景中所有GPU为选择的res")
-        self.replace_gpu_res_button.setProperty("action","gpuCache")
-        
-        self.replace_ass_res_button = self.create_button("切换全部 Res Ass")
-        self.replace_ass_res_button.setToolTip("替换场景中所有Ass为选择的res")
-        self.replace_ass_res_button.setProperty("action","ass")
-        
-        import_abc_layout.addWidget(self.import_abc_button)
-        import_abc_layout.addWidget(self.import_gpu_button)
-        import_abc_layout.addWidget(self.import_ass_button)
-        
-        switch_res_layout.addWidget(self.switch_abc_res_button)
-        switch_res_layout.addWidget(self.switch_gpu_res_button)
-        switch_res_layout.addWidget(self.switch_ass_res_button)
-        
-        replace_all_layout.addWidget(self.replace_abc_res_button)
-        replace_all_layout.addWidget(self.replace_gpu_res_button)
-        replace_all_layout.addWidget(self.replace_ass_res_button)
-
-        self.list_widget = QListWidget()
-        self.list_widget.addItems(self.resolution_type)
-        self.list_widget.setCurrentRow(0)
-        self.list_widget.setFixedHeight(100)
-        
-        self.import_custom_res_button = self.create_button("导入选择Res ma文件")
-        self.import_custom_res_button.setProperty("action","res")
-        self.import_custom_res_button.setToolTip("选择一个或者多个缓存类型,替换为指定的Res对应的ma文件")
-        
-        self.import_source_button = self.create_button("导入Source ma文件")
-        self.import_source_button.setProperty("action","source")
-        self.import_source_button.setToolTip("选择一个或者多个缓存类型,替换为Source ma文件")
-        
-        self.import_layout.addWidget(import_label)
-        self.import_layout.addWidget(self.create_frame())
-        self.import_layout.addWidget(import_abc_widget)
-        self.import_layout.addSpacing(15)
-        
-        self.import_layout.addWidget(replace_label)
-        self.import_layout.addWidget(self.create_frame())
-        self.import_layout.addWidget(self.list_widget)
-        self.import_layout.addWidget(replace_current_label)
-        
-        self.import_layout.addWidget(self.create_frame())
-        
-        self.import_layout.addWidget(switch_res_widget)
-        self.import_layout.addSpacing(15)
-        self.import_layout.addWidget(replace_all_label_widget)
-        self.import_layout.addWidget(self.create_frame())
-        self.import_layout.addWidget(replace_all_widget)
-        self.import_layout.addSpacing(15)
-        
-        self.import_layout.addWidget(import_ma_label)
-        self.import_layout.addWidget(self.create_frame())
-        self.import_layout.addWidget(self.import_custom_res_button)
-        self.import_layout.addWidget(self.import_source_button)
-        
-        self.import_layout.addStretch()
-
-    def create_frame(self):
-        separator = QFrame()
-        separator.setFrameShape(QFrame.HLine)
-        separator.setFrameShadow(QFrame.Sunken)
-        return separator
-    
-    def create_screen_shot_widget(self):
-        screen_widget = QWidget()
-        layout = QVBoxLayout(screen_widget)
-        layout.setContentsMargins(0, 6, 0, 0)
-        layout.setSpacing(6)
-
-        preview_label = QLabel("调整相机角度后点击截图生成图片预览")
-        preview_label.setFixedSize(288,162)
-        preview_label.setStyleSheet(
-            "QLabel{border:1px solid rgba(255,255,255,40); border-radius:6px;}"
-        )
-        preview_label.setAlignment(Qt.AlignCenter)
-       # preview_label.setMinimumSize(QSize(x_size=200, y_size=200))
-        #preview_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-
-        capture_btn = QPushButton("截屏")
-        capture_btn.setFixedHeight(40)
-
-        layout.addWidget(preview_label,alignment=Qt.AlignCenter)
-        layout.addWidget(capture_btn)
-        
-        return screen_widget,preview_label,capture_btn
+class DisplayManager():
+    '''
+    按display_policy的规则批量设置场景中aiStandIn/gpuCache的视口显示
+    enable后监听代理的创建,删除和选择变化,只重新计算变化的代理
+    显示设置通过MDGModifier一次写入,不进入撤销队列,代理重命名或移动后执行apply重新计算
+    '''
     
-    def get_user_input(self):
-                    
-        return self.input_text.text()
+    def __init__(self,policy=None,camera="persp"):
+        '''
+        policy > display_policy.DisplayPolicy
+        camera > 计算距离使用的相机transform
+        '''
+        self.policy = policy or display_policy.DisplayPolicy()
+        self.camera = camera
+        #shape长名称 > DisplayRecord
+        self.records = {}
+        #shape长名称 > MObjectHandle
+        self.handles = {}
+        #shape长名称 > 当前的显示级别
+        self.levels = {}
+        #shape长名称 > 第一次修改前的属性值 [(属性,值)],disable时恢复
+        self.original = {}
+        self.selected = set()
+        self.callback_ids = []
+        #新创建的代理,创建时属性还没有设置,空闲时统一计算
+        self.pending = []
+    
+    @property
+    def enabled(self):
+        return bool(self.callback_ids)
+    
+    def camera_position(self):
+        if not self.camera or not cmds.objExists(self.camera):
+            return None
+        return tuple(cmds.xform(self.camera,query=True,translation=True,worldSpace=True))
+    
+    def get_selected(self):
+        return set(cmds.ls(selection=True,dag=True,type=list(display_policy.NODE_TYPES),long=True) or [])
     
-    def export_selected_res_button_command(self):
+    def add_records(self,dag_paths):
         '''
-        导出当前选择组
-        导出前将把组的parent变换设置为0,并且检查povit轴心
+        读取代理的缓存文件分辨率和世界坐标,返回新增的shape长名称列表
         '''
-        sel = cmds.ls(selection=True,long=True)
-        if not sel:
-            cmds.error("未选择任何节点")
+        names = []
+        for dag_path in dag_paths:
+            node = dag_path.node()
+            node_fn = om.MFnDependencyNode(node)
+            node_type = node_fn.typeName
+            file_attr = "dso" if node_type == "aiStandIn" else "cacheFileName"
+            file_path = node_fn.findPlug(file_attr,False).asString()
+            resolution = resolver.split_asset_name(os.path.splitext(os.path.basename(file_path))[0])[1]
+            matrix = dag_path.inclusiveMatrix()
             
-        node_name = sel[0]
-        asset_name = self.get_user_input()
-        if not asset_name:
-            om.MGlobal.displayError("资产名称不能为空!")
-            return
-        #获取父对象locator的transform节点
-        parent_node = cmds.listRelatives(node_name,parent=True,fullPath=True)
-        #保存原始位置
-        original_pos,original_rot,original_scale = self.operator.get_transform(parent_node)
-        
-        try:
-            #将物体移动到世界坐标中心
-            self.operator.reset_transform(parent_node)
-            #检查物体轴心是否在坐标原点
-            if self.operator.check_pivot(parent_node):
-            
-                if self.check_ma.isChecked():
-                    self.operator.export_select_res(node_name = node_name,
-                                file_path = self.file_path,
-                                asset_name = self.input_text.text(),
-                                project_code = self.project_code,
-                                scene = self.scene_prefix,
-                                file_type = "ma"
-                        )
-                
-                if self.check_abc.isChecked():
-                    self.operator.export_select_res(node_name = node_name,
-                                file_path = self.file_path,
-                                asset_name = self.input_text.text(),
-                                project_code = self.project_code,
-                                scene = self.scene_prefix,
-                                file_type = "abc"
-                        )
-                
-                if self.check_gpu_cache.isChecked():
-                    self.operator.export_select_res(node_name = node_name,
-                                file_path = self.file_path,
-                                asset_name = self.input_text.text(),
-                                project_code = self.project_code,
-                                scene = self.scene_prefix,
-                                file_type = "gpuCache"
-                        )
-                        
-                if self.check_ass.isChecked():
-                    self.operator.export_select_res(node_name = node_name,
-                                file_path = self.file_path,
-                                asset_name = self.input_text.text(),
-                                project_code = self.project_code,
-                                scene = self.scene_prefix,
-                                file_type = "ass"
-                        )
-        
-        finally:
-            #将物体设置回原始坐标
-            self.operator.set_transform(parent_node,original_pos,original_rot,original_scale)
-                
-    def export_all_res_button_command(self):
+            name = dag_path.fullPathName()
+            self.records[name] = display_policy.DisplayRecord(name,node_type,resolution,(matrix[12],matrix[13],matrix[14]))
+            self.handles[name] = om.MObjectHandle(node)
+            names.append(name)
+        return names
+    
+    def forget(self,name):
+        for table in (self.records,self.handles,self.levels,self.original):
+            table.pop(name,None)
+    
+    def set_levels(self,levels):
         '''
-        导出当前root下的所有组
+        levels > {shape长名称:显示级别}
+        只写入级别变化的代理,返回修改的数量
         '''
-        sel = cmds.ls(selection=True,long=True)
-        if not sel:
-            cmds.error("未选择任何节点")
-            
-        node_name = sel[0]
-        asset_name = self.get_user_input()
-        if not asset_name:
-            om.MGlobal.displayError("资产名称不能为空!")
-            return
-            
-        #保存原始位置
-        original_pos,original_rot,original_scale = self.operator.get_transform(node_name)
-        
-        try:
-            #将物体移动到世界坐标中心
-            self.operator.reset_transform(node_name)
-            #检查物体轴心是否在坐标原点
-            if self.operator.check_pivot(node_name):
-        
-                if self.check_texture.isCheckable():
-                    self.operator.copy_texture_to_target_file(node_name = node_name,path = self.file_path,project_code = self.project_code,
-                                    scene=self.scene_prefix,asset_name=self.input_text.text())
-                
-                if self.check_ma.isChecked():
-                    self.operator.export_child_res(node_name = node_name,
-                                file_path = self.file_path,
-                                asset_name = self.input_text.text(),
-                                project_code = self.project_code,
-                                scene = self.scene_prefix,
-                                file_type = "ma"
-                        )
-                
-                if self.check_abc.isChecked():
-                    self.operator.export_child_res(node_name = node_name,
-                                file_path = self.file_path,
-                                asset_name = self.input_text.text(),
-                                project_code = self.project_code,
-                                scene = self.scene_prefix,
-                                file_type = "abc"
-                        )
-                
-                if self.check_gpu_cache.isChecked():
-                    self.operator.export_child_res(node_name = node_name,
-                                file_path = self.file_path,
-                                asset_name = self.input_text.text(),
-                                project_code = self.project_code,
-                                scene = self.scene_prefix,
-                                file_type = "gpuCache"
-                        )
-                        
-                if self.check_ass.isChecked():
-                    self.operator.export_child_res(node_name = node_name,
-                                file_path = self.file_path,
-                                asset_name = self.input_text.text(),
-                                project_code = self.project_code,
-                                scene = self.scene_prefix,
-                                file_type = "ass"
-                        )
-        finally:
-            
-            #将物体设置回原始坐标
-            self.operator.set_transform(node_name,original_pos,original_rot,original_scale)
+        modifier = om.MDGModifier()
+        changed = 0
+        for name,level in levels.items():
+            if self.levels.get(name) == level:
+                continue
+            handle = self.handles.get(name)
+            if handle is None or not handle.isValid():
+                self.forget(name)
+                continue
+            node_fn = om.MFnDependencyNode(handle.object())
+            values = display_policy.plug_values(self.records[name].node_type,level)
+            plugs = [node_fn.findPlug(attr,False) for attr,value in values]
+            if name not in self.original:
+                self.original[name] = [(attr,plug.asInt()) for (attr,value),plug in zip(values,plugs)]
+            for (attr,value),plug in zip(values,plugs):
+                if isinstance(value,bool):
+                    modifier.newPlugValueBool(plug,value)
+                else:
+                    modifier.newPlugValueInt(plug,value)
+            self.levels[name] = level
+            changed += 1
+        if changed:
+            modifier.doIt()
+        return changed
     
-    def repalce_select_res_command(self):
-        current_clicked_button = self.sender()
-        target_file_format = current_clicked_button.property("action")
-        node_list = cmds.ls(selection=True,long=True)
-        
-        if node_list:
-            for node in node_list:
-                self.replace_select_res(sel_node = node,target_file_format = target_file_format)
-        else:
-            om.MGlobal.displayError("未选择任何节点!")
+    def report(self,changed,seconds):
+        levels = defaultdict(int)
+        for level in self.levels.values():
+            levels[level] += 1
+        return {"nodes":len(self.records),"changed":changed,"levels":dict(levels),"seconds":seconds,
+                "draw_before":None,"draw_after":None}
     
-    def replace_select_res(self,sel_node=None,target_file_format=None):
+    def measure_draw_time(self,frames=3):
         '''
-        替换选择的分辨率组件
-        如果用户选择的节点类型和需要替换的类型一致,则直接替换
-        如果不一致,则删除掉原始节点后,重新导入
-        导入后继承原始的变换以及parent层级
-        node_list > 需要替换的节点
-        target_file_format > 目标文件类型
+        强制刷新当前视口frames次,返回平均耗时(秒)
         '''
-        #记录不同类型切换导入时,重新parent的节点路径
-        full_path = None
-        #记录原始节点parent层级
-        parent = cmds.listRelatives(sel_node,parent=True,fullPath=True)
-        #记录导入的节点
-        import_transform=None
+        start = time.perf_counter()
+        for _ in range(frames):
+            cmds.refresh(currentView=True,force=True)
+        return (time.perf_counter() - start) / frames
     
-        #获取当前选择节点的类型
-        current_node_format = self.operator.get_file_format(sel_node)
-        
-        #后续添加导入信息报告可以修改
-        if not current_node_format:
-            #如果当前选择的物体不为插件导入的,则返回,不执行操作
-            print(f"{current_node_format} 不为插件导入的节点,跳过")
-            return
-        
-        #获取用户需要切换的分辨率
-        target_res = self.list_widget.currentItem().text()
-        
-        #如果是同类型fileFormat节点替换,则修改路径
-        if current_node_format == target_file_format:
-            #print("相同类型节点")
-            if target_file_format == "ass":
-                self.operator.replace_ass_res(transform_node = sel_node,target_res_type=target_res)
-
-                import_transform = sel_node
-            elif target_file_format == "gpuCache":
-                self.operator.replace_gpu_cache_res(transform_node = sel_node,target_res_type=target_res)
-
-                import_transform = sel_node
-            elif target_file_format == "abc":
-                #获取abc Node节点的变换坐标
-                original_pos,original_rotate,original_scale = self.operator.get_transform(sel_node)
-                #导入新的res,并且继承变换坐标
-                import_transform = self.operator.replace_abc_res(transform_node = sel_node,target_res_type=target_res,
-                                target_pos=original_pos,target_rotate = original_rotate,
-                                target_scale=original_scale)
-        
-            full_path = import_transform
-                                
-        #不同类型节点的替换
-        else:
-            '''
-            获取节点属性,反求出不带fileFormat的文件路径
-            如果为不同节点类型的替换,则删除掉原来节点,重新导入用户指定的节点类型
-            并继承变换和父子层级
-            '''
-            #分离路径 [Z:,project,DFH,Asset,component,DFH_fhsj_test]
-            asset_dir_split = cmds.getAttr(f"{sel_node}.assetDir").split("/")[0:-1]
-            #拼接路径,没有后面asset_type的路径
-            asset_dir = "/".join(asset_dir_split)
-            
-            asset_name = cmds.getAttr(f"{sel_node}.assetName")
-            res_type = cmds.getAttr(f"{sel_node}.resolutionType")
-            current_res = cmds.getAttr(f"{sel_node}.resolutionType")
-            
-            #记录选择节点,方便后续还原位置
-            original_pos,original_rotate,original_scale = self.operator.get_transform(sel_node)
-            
-            new_asset_name = asset_name.replace(current_res,target_res)
-            
-            if target_file_format == "ass":
-                #反求新的res资产名称
-                
-                new_asset_file = f"{asset_dir}/ass/{new_asset_name}.ass"
-                if os.path.isfile(new_asset_file):
-                    
-                    #导入新的ass节点,并且获取节点名称
-                    import_transform = self.operator.import_ass(new_asset_file)
-                    #继承原来的变换坐标
-                    self.operator.set_transform(import_transform,translation = original_pos,
-                                    rotation = original_rotate,scale = original_scale)
-                                    
-                    cmds.select(clear=True)
-                    cmds.delete(sel_node)
-                    if parent:
-                        cmds.parent(import_transform,parent)
-                else:
-                    om.MGlobal.displayError(f"{new_asset_file} 文件路径不存在")
-                
-                
-            elif target_file_format == "gpuCache":
-                new_asset_file = f"{asset_dir}/cache/{new_asset_name}.abc"
-                
-                if os.path.isfile(new_asset_file):
-                    
-                    #导入新的ass节点,并且获取节点名称
-                    import_transform = self.operator.import_gpu_cache(new_asset_file)
-                    #继承原来的变换坐标
-                    self.operator.set_transform(import_transform,translation = original_pos,
-                                    rotation = original_rotate,scale = original_scale)
-                    cmds.select(clear=True)
-                    cmds.delete(sel_node)
-                    
-                    if parent:
-                        cmds.parent(import_transform,parent)
-                    
-                else:
-                    om.MGlobal.displayError(f"{new_asset_file} 文件路径不存在")
-            
-            elif target_file_format == "abc":
-                new_asset_file = f"{asset_dir}/alembic/{new_asset_name}.abc"
-                
-                if os.path.isfile(new_asset_file):
-                    #导入新的ass节点,并且获取节点名称
-                    import_transform = self.operator.import_abc(new_asset_file)
-                    #继承原来的变换坐标
-                    self.operator.set_transform(import_transform,translation = original_pos,
-                                    rotation = original_rotate,scale = original_scale)
-                                    
-                    cmds.select(clear=True)                
-                    cmds.delete(sel_node)
-                    
-                    if parent:
-                        cmds.parent(import_transform,parent)
-                    
-                else:
-                    om.MGlobal.displayError(f"{new_asset_file} 文件路径不存在")
-            if parent:
-                p = parent[0]
-                full_path = f"{p}|{import_transform}"
-            else:
-                full_path = f"{import_transform}"
-
-        return full_path
-              
-    def repalce_all_res_command(self):
-        all_component_node_dict = self.operator.get_component_node()
-        
-        #print("all_component_node_dict >>> ",all_component_node_dict)
-        
-        current_clicked_button = self.sender()
-        target_file_format = current_clicked_button.property("action")
-        print(all_component_node_dict)
-        
-        if all_component_node_dict:
-            self.repalce_all_res(node_dict = all_component_node_dict,target_file_format = target_file_format)
+    @profiler.timed()
+    def apply(self,measure=False,frames=3):
+        '''
+        重新读取场景中所有代理并计算显示级别
+        measure > 比较修改前后的视口刷新耗时
+        返回报告,见display_policy.format_report
+        '''
+        draw_before = self.measure_draw_time(frames) if measure else None
+        start = time.perf_counter()
         
+        names = cmds.ls(type=list(display_policy.NODE_TYPES),long=True) or []
+        sel = om.MSelectionList()
+        for name in names:
+            sel.add(name)
+        for name in set(self.records) - set(names):
+            self.forget(name)
+        self.add_records([sel.getDagPath(i) for i in range(sel.length())])
+        
+        self.selected = self.get_selected()
+        levels = self.policy.evaluate(list(self.records.values()),camera=self.camera_position(),selected=self.selected)
+        report = self.report(self.set_levels(levels),time.perf_counter() - start)
+        
+        if measure:
+            report["draw_before"] = draw_before
+            report["draw_after"] = self.measure_draw_time(frames)
+        profiler.current().add(nodes=len(names))
+        return report
+    
+    def update(self,names):
+        '''
+        只重新计算names中的代理,代理总数量使用已记录的数量
+        '''
+        records = [self.records[name] for name in names if name in self.records]
+        levels = self.policy.evaluate(records,camera=self.camera_position(),selected=self.selected,
+                                      count=len(self.records))
+        return self.set_levels(levels)
+    
+    def flush_pending(self):
+        '''
+        计算新创建的代理,代理数量超过或低于max_shaded时重新计算所有代理
+        '''
+        handles,self.pending = self.pending,[]
+        if not self.enabled:
+            return None
+        start = time.perf_counter()
+        dag_paths = [om.MDagPath.getAPathTo(handle.object()) for handle in handles if handle.isValid()]
+        before = len(self.records)
+        names = self.add_records(dag_paths)
+        
+        limit = self.policy.max_shaded
+        if limit is not None and (before > limit) != (len(self.records) > limit):
+            report = self.apply()
         else:
-            om.MGlobal.displayError("场景中无任何节点可以替换")
-                
-    def repalce_all_res(self,node_dict=None,target_file_format=None):
+            report = self.report(self.update(names),time.perf_counter() - start)
+        print(f"显示策略 新增代理 {len(names)} > {display_policy.format_report(report)}")
+        return report
+    
+    def node_added(self,node,client_data=None):
+        self.pending.append(om.MObjectHandle(node))
+        if len(self.pending) == 1:
+            cmds.evalDeferred(self.flush_pending,lowestPriority=True)
+    
+    def node_removed(self,node,client_data=None):
+        code = om.MObjectHandle(node).hashCode()
+        for name,handle in list(self.handles.items()):
+            if handle.hashCode() == code:
+                self.forget(name)
+                break
+    
+    def selection_changed(self,client_data=None):
+        selected = self.get_selected()
+        changed = (selected ^ self.selected) & self.records.keys()
+        self.selected = selected
+        if changed:
+            self.update(changed)
+    
+    def enable(self,measure=True):
         '''
-        替换场景中所有的节点为指定类型的节点
-        node_dict > {资产名:资产节点...}
-        target_file_format > 需要替换的分辨率类型
-        '''
-        for asset_name,node_list in node_dict.items():
-            #如果只有单个,则重新替换,不检测实例
-            if len(node_list)==1:
-                #记录原始变换信息
-                original_pos,original_rotation,original_scale = self.operator.get_transform(node_list[0])
-                new_master_node = self.replace_select_res(node_list[0],target_file_format = target_file_format)
-                self.operator.set_transform(new_master_node,translation = original_pos,rotation = original_rotation,
-                                scale=original_scale)
-                cmds.select(clear=True)
-                #cmds.delete(node_list[0])
-                self.operator.set_transform(new_master_node)
-                print("只有单个节点 >>>>>>>>>>>>>>>>>>>>>")
-                continue
-            
-            #启用实例替换
-            #导入组第一个对象,其余对象使用第一个对象instance
-            if self.enabled_instance_check_box.isChecked():
-                master_node = node_list[0]
-                instance_node = node_list[1:]
-                print(f"master_node  >>>>>>>>>>>>> {master_node}")
-                print(f"instance_node  >>>>>>>>>>>>> {instance_node}")
-                
-                #返回新的导入节点路径
-                new_master_node = self.replace_select_res(master_node,target_file_format)
-                
-                count=0
-                for ins_node in instance_node:
-                    #记录原始变换信息
-                    original_pos,original_rotation,original_scale = self.operator.get_transform(ins_node,space="object")
-                    #获取物体父层级节点
-                    parent = cmds.listRelatives(ins_node,parent=True,fullPath=True)
-                    
-                    count = count+1
-                    short_name = ins_node.split("|")[-1]
-                    #asset_name = cmds.getAttr(f"{ins_node}.assetName")
-                    
-                    #复制父实例对象
-                    node = cmds.instance(new_master_node)[0]
-                    new_node = cmds.rename(node,f"{asset_name}_{target_file_format}{count}",ignoreShape=True)
-                    self.operator.reset_transform(new_node)
-
-                    #只在父节点不同的情况下重设parent，避免"already a child"报错
-                    if parent:
-                        current_parent = cmds.listRelatives(new_node,parent=True,fullPath=True)
-                        if not current_parent or current_parent[0] != parent[0]:
-                            new_node = cmds.parent(new_node,parent[0])[0]
-
-                    #删除原始节点
-                    cmds.select(clear=True)
-                    cmds.delete(ins_node)
-                    #继承原始节点坐标
-                    self.operator.set_transform(new_node,original_pos,original_rotation,original_scale)
-                    
-                    #如果有层级,则继承原来的层级
-                    # if parent:
-                    #     print(cmds.nodeType(parent[0]))
-                    #     print(f"ins_node  {ins_node}")
-                    #     print(f"new_node  {new_node}")
-                    #     print(f"parent  ",parent[0])
-                    #     cmds.parent(new_node,parent[0],shape=True)
-            else:
-                count=0
-                for dup_node in node_list:
-                    #记录原始变换信息
-                    original_pos,original_rotation,original_scale = self.operator.get_transform(dup_node,space="object")
-                    #获取物体父层级节点
-                    parent = cmds.listRelatives(dup_node,parent=True,fullPath=True)
-                    
-                    count = count+1
-                    short_name = ins_node.split("|")[-1]
-                    #删除原始节点
-                    
-                    #复制父实例对象
-                    new_node = cmds.duplicate(new_master_node,name=f"{short_name}_dup{count}",renameChildren=True)
-                    cmds.select(clear=True)
-                    cmds.delete(dup_node)
-                    #继承原始节点坐标
-                    self.operator.set_transform(new_node,original_pos,original_rotation,original_scale)
-                    
-                    # #如果有层级,则继承原来的层级
-                    # if parent:
-                    #     cmds.parent(new_node,parent)
-                        
-        
-    def screen_shot(self):
+        应用显示策略并开始监听场景变化,返回报告
         '''
-        生成图片保存路径和名称
-        拍屏后将图片保存到指定路径
-        label标签生成预览图
+        if not self.enabled:
+            for node_type in display_policy.NODE_TYPES:
+                self.callback_ids.append(om.MDGMessage.addNodeAddedCallback(self.node_added,node_type))
+                self.callback_ids.append(om.MDGMessage.addNodeRemovedCallback(self.node_removed,node_type))
+            self.callback_ids.append(om.MEventMessage.addEventCallback("SelectionChanged",self.selection_changed))
+        report = self.apply(measure=measure)
+        print(display_policy.format_report(report))
+        return report
+    
+    def disable(self,restore=True):
         '''
-        asset_name = self.get_user_input()
-        if not asset_name:
-            om.MGlobal.displayError("资产名称不能为空!")
-            return
-        output_path = f"{self.file_path}/{self.project_code}_{self.scene_prefix}_{asset_name}/{self.project_code}_{self.scene_prefix}_{asset_name}_preview.png"
-        print(output_path)
-        self.operator.screen_shot(output_path)
-        
-        if not os.path.exists(output_path):
-            om.MGlobal.displayError("截图文件路径不存在")
-        
-        pix = QPixmap(output_path)
-        self.preview_label.setPixmap(pix)
-        self.preview_label.setScaledContents(True)
-        
+        停止监听,restore时恢复启用前的显示设置
+        '''
+        om.MMessage.removeCallbacks(self.callback_ids)
+        self.callback_ids = []
+        self.pending = []
+        if restore:
+            modifier = om.MDGModifier()
+            for name,values in self.original.items():
+                handle = self.handles.get(name)
+                if handle is None or not handle.isValid():
+                    continue
+                node_fn = om.MFnDependencyNode(handle.object())
+                for attr,value in values:
+                    modifier.newPlugValueInt(node_fn.findPlug(attr,False),value)
+            modifier.doIt()
+        self.records.clear()
+        self.handles.clear()
+        self.levels.clear()
+        self.original.clear()
+        self.selected = set()
+
+
+class LibraryReloader():
+    '''
+    缓存文件路径 > 代理节点的内存索引,组件库文件重新导出后只重新加载引用该文件的aiStandIn/gpuCache
+    不需要重新打开场景或执行"切换全部"
+    '''
     
-    def update_source_button_command(self):
-        
-        if not self.get_user_input():
-            om.MGlobal.displayError("输入名称不能为空")
-            return
-        
-        sel = cmds.ls(selection=True,long=True)
-        
-        if not sel:
-            om.MGlobal.displayError("未选择任何物体")
-            return
-
-        node_name = sel[0]
-        
-        if not cmds.nodeType(node_name) =="transform":
-            om.MGlobal.displayError("所选节点类型错误")
-            return
-        
-        #保存原始位置
-        original_pos,original_rot,original_scale = self.operator.get_transform(node_name)
-        try:
-            
-            self.operator.reset_transform(node_name)
-            #检查轴
-            self.operator.check_pivot(node_name)
-
-            self.operator.export_source(node_name = node_name,
-                            file_path = self.file_path,
-                            asset_name = self.get_user_input(),
-                            project_code = self.project_code,
-                            scene = self.scene_prefix
-                    )
-        
-        finally:
-            
-            self.operator.set_transform(node_name,translation = original_pos,
-                            rotation = original_rot,
-                            scale = original_scale)
+    #节点类型 > 缓存路径属性
+    PATH_ATTRS = {"aiStandIn":"dso","gpuCache":"cacheFileName"}
     
-    def file_dialog(self,parent=None,title = None,file_filter = None):
-        file_path, _ = QFileDialog.getOpenFileName(
-            parent,
-            title,
-            self.file_path,
-            file_filter
-        )
-        if not file_path:
-            return
-            
-        return file_path.replace("\\","/")
+    def __init__(self,set_standin_bounds=None):
+        '''
+        set_standin_bounds > set_standin_bounds(ass_node,ass_path),重新加载后更新代理包围盒
+        '''
+        self.set_standin_bounds = set_standin_bounds
+        #规范化路径 > [(MObjectHandle,节点类型)]
+        self.index = {}
+        #规范化路径 > 节点上的原始路径
+        self.paths = {}
     
-    def import_cache(self,cache_type = None):
-        
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(path.replace("\\","/"))
+    
+    @profiler.timed()
+    def build_index(self):
         '''
-        导入cache,并创建属性
-            isComponent
-            assetName
-            assetDir
-            fileFormat
-            resolutionType
+        读取场景中所有代理的缓存路径,返回引用的文件列表
         '''
-        
-        if cache_type =="abc":
-            file_path = self.file_dialog(parent=self,title = "选择一个Abc文件",
-                            file_filter = "Alembic (*.abc)"
-                    )
-            if not file_path:
-                return
-            self.operator.import_abc(file_path)
-                    
-        elif cache_type == "gpuCache":
-            file_path = self.file_dialog(parent=self,title = "选择一个gpuCache文件",
-                            file_filter = "gpuCache (*.abc)"
-                    )
-            if not file_path:
-                return
-            self.operator.import_gpu_cache(file_path)
-        
-        elif cache_type == "ass":
-            file_path = self.file_dialog(parent=self,title = "选择一个gpuCache文件",
-                            file_filter = "Arnold ASS (*.ass)"
-                    )
-            if not file_path:
-                return
-            self.operator.import_ass(file_path)
+        self.index = defaultdict(list)
+        self.paths = {}
+        names = cmds.ls(type=list(self.PATH_ATTRS),long=True) or []
+        sel = om.MSelectionList()
+        for name in names:
+            sel.add(name)
+        for i in range(sel.length()):
+            node = sel.getDependNode(i)
+            node_fn = om.MFnDependencyNode(node)
+            node_type = node_fn.typeName
+            path = node_fn.findPlug(self.PATH_ATTRS[node_type],False).asString()
+            if not path:
+                continue
+            key = self._key(path)
+            self.index[key].append((om.MObjectHandle(node),node_type))
+            self.paths.setdefault(key,path)
+        profiler.current().add(nodes=len(names))
+        return list(self.paths.values())
     
-    def import_source(self):
-        
-        current_clicked_button = self.sender()
-        target_res = self.list_widget.currentItem().text()
-        ma_type = current_clicked_button.property("action")
-        
-        sel_node = cmds.ls(selection=True,long=True)
-        for node in sel_node:
-            self.operator.import_select_res_ma(select_node = node,target_res = target_res,
-                                ma_type = ma_type)
+    def nodes_for(self,paths):
+        '''
+        返回引用paths的节点 [(MObject,节点类型,路径)],跳过已经删除或已经切换到其他文件的节点
+        '''
+        result = []
+        for path in paths:
+            key = self._key(path)
+            for handle,node_type in self.index.get(key,()):
+                if not handle.isValid():
+                    continue
+                node = handle.object()
+                current = om.MFnDependencyNode(node).findPlug(self.PATH_ATTRS[node_type],False).asString()
+                if self._key(current) == key:
+                    result.append((node,node_type,current))
+        return result
     
+    @profiler.timed()
+    def reload(self,paths):
+        '''
+        重新加载引用paths的代理,已经删除的文件跳过
+        aiStandIn先清空dso再设置回原路径,gpuCache一次gpuCache -edit -refresh
+        返回 {"files","missing","nodes","standins","gpu_caches","seconds"}
+        '''
+        start = time.perf_counter()
+        existing = [path for path in paths if os.path.isfile(path)]
+        nodes = self.nodes_for(existing)
+        standins = [(node,path) for node,node_type,path in nodes if node_type == "aiStandIn"]
+        gpu_caches = [node for node,node_type,path in nodes if node_type == "gpuCache"]
+        
+        if standins:
+            plugs = [om.MFnDependencyNode(node).findPlug("dso",False) for node,path in standins]
+            clear = om.MDGModifier()
+            for plug in plugs:
+                clear.newPlugValueString(plug,"")
+            clear.doIt()
+            restore = om.MDGModifier()
+            for plug,(node,path) in zip(plugs,standins):
+                restore.newPlugValueString(plug,path)
+            restore.doIt()
+            if self.set_standin_bounds is not None:
+                for node,path in standins:
+                    self.set_standin_bounds(om.MDagPath.getAPathTo(node).fullPathName(),path)
+        
+        if gpu_caches:
+            cmds.gpuCache(*[om.MDagPath.getAPathTo(node).fullPathName() for node in gpu_caches],edit=True,refresh=True)
+        
+        profiler.current().add(nodes=len(nodes))
+        return {"files":len(existing),"missing":len(paths) - len(existing),"nodes":len(nodes),
+                "standins":len(standins),"gpu_caches":len(gpu_caches),"seconds":time.perf_counter() - start}
+
+
 class Operator():
     
     def __init__(self,res_list=None):
         self.exportor = ExportManager()
         self.node_creator = NodeCreator()
         self.material_manager = MaterialManager()
+        #代理的视口显示策略
+        self.display_manager = DisplayManager()
+        #组件库文件变化时重新加载代理
+        self.library_reloader = LibraryReloader(self.set_standin_bounds)
+        #缓存路径规则和文件存在检查
+        self.path_resolver = resolver.PathResolver()
+        #导出前的面数检查,只在配置了COMPONENT_POLYCOUNT_CONFIG时执行,None时跳过
+        self.polycount_validator = polycount.load_default()
         
         self.res_list = res_list
     
@@ -1214,6 +905,7 @@ class Operator():
         cmds.setAttr(f"{node_name}.scaleY",scale[1])
         cmds.setAttr(f"{node_name}.scaleZ",scale[2])
     
+    @profiler.timed()
     def get_component_node(self):
         '''
         获取场景中所有插件导入的节点(属性有isComponent的节点)
@@ -1228,6 +920,7 @@ class Operator():
             
             all_component_node_dict[asset_name].append(node)
         
+        profiler.current().add(nodes=len(all_component_node))
         return all_component_node_dict
     
     def reset_transform(self,node_name=None):
@@ -1298,6 +991,7 @@ class Operator():
         else:
             om.MGlobal.displayError("选择节点类型错误")
     
+    @profiler.timed()
     def replace_ass_res(self,transform_node=None,target_res_type=None,target_pos=None,target_rotate=None,target_scale=None,parent=None):
         '''
         替换选择的ass代理为指定的分辨率
@@ -1322,18 +1016,18 @@ class Operator():
             if cmds.nodeType(ass_node) == "aiStandIn":
                 #获取arnold节点路径
                 ass_file_path = cmds.getAttr(f"{ass_node}.dso")
-                dir_name = os.path.dirname(ass_file_path)
                 base_name = os.path.splitext(os.path.basename(ass_file_path))[0]
-                current_res_type = base_name.split("_")[-1]
+                asset_id,current_res_type = resolver.split_asset_name(base_name)
                 
                 if target_res_type != current_res_type:
                     #目标res和当前res不一样,则修改当前res名称为目标res
-                    new_asset_name = base_name.replace(current_res_type,target_res_type)
-                    new_ass_file_path = f"{dir_name}/{new_asset_name}.ass"
+                    new_asset_name = f"{asset_id}_{target_res_type}"
+                    new_ass_file_path = resolver.switch_res(ass_file_path,target_res_type)
                     
                     #判断目标文件是否存在,如果存在则直接替换
-                    if os.path.isfile(new_ass_file_path):
+                    if self.path_resolver.exists(new_ass_file_path):
                         cmds.setAttr(f"{ass_node}.dso",new_ass_file_path,type="string")
+                        self.set_standin_bounds(ass_node,new_ass_file_path)
                         #更新
                         cmds.setAttr(f"{transform_node}.assetName",new_asset_name,type="string")
                         cmds.setAttr(f"{transform_node}.resolutionType",target_res_type,type="string")
@@ -1352,6 +1046,7 @@ class Operator():
             om.MGlobal.displayError("替换失败!所选择节点不是使用Component Tool导入的节点!")
         
         
+    @profiler.timed()
     def replace_gpu_cache_res(self,transform_node=None,target_res_type=None,target_pos=None,target_rotate=None,target_scale=None,parent=None):
         
         if cmds.listRelatives(transform_node,children=True,fullPath=True):
@@ -1364,17 +1059,16 @@ class Operator():
             #判断子节点的类型是否为gpuCache代理节点
             if cmds.nodeType(gpu_node) == "gpuCache":
                 #获取gpuCache节点路径
-                ass_file_path = cmds.getAttr(f"{gpu_node}.cacheFileName")
-                dir_name = os.path.dirname(ass_file_path)
-                base_name = os.path.splitext(os.path.basename(ass_file_path))[0]
-                current_res_type = base_name.split("_")[-1]
+                gpu_file_path = cmds.getAttr(f"{gpu_node}.cacheFileName")
+                base_name = os.path.splitext(os.path.basename(gpu_file_path))[0]
+                asset_id,current_res_type = resolver.split_asset_name(base_name)
                 
                 if target_res_type != current_res_type:
                     #目标res和当前res不一样,则修改当前res名称为目标res
-                    new_asset_name = base_name.replace(current_res_type,target_res_type)
-                    new_gpu_cache_file_path = f"{dir_name}/{new_asset_name}.abc"
+                    new_asset_name = f"{asset_id}_{target_res_type}"
+                    new_gpu_cache_file_path = resolver.switch_res(gpu_file_path,target_res_type)
                     #判断目标文件是否存在,如果存在则直接替换
-                    if os.path.isfile(new_gpu_cache_file_path):
+                    if self.path_resolver.exists(new_gpu_cache_file_path):
                         cmds.setAttr(f"{gpu_node}.cacheFileName",new_gpu_cache_file_path,type="string")
                         
                         #更新transform节点信息
@@ -1394,6 +1088,7 @@ class Operator():
         else:
             om.MGlobal.displayError("替换失败!所选择节点不是使用Component Tool导入的节点!")
     
+    @profiler.timed()
     def replace_abc_res(self,transform_node=None,target_res_type=None,target_pos=None,target_rotate=None,target_scale=None,parent=None):
         '''
         abc 缓存导入后,没有特殊节点,因此需要根据组的属性判断是否为插件导入的abc
@@ -1414,10 +1109,10 @@ class Operator():
                 current_asset_path = cmds.getAttr(f"{transform_node}.assetDir")
                 
                 #根据目标res反求新的res类型名称
-                new_asset_name = current_asset_name.replace(current_res_type,target_res_type)
-                new_asset_path = f"{current_asset_path}/{new_asset_name}.abc"
+                component = resolver.from_node_attributes(current_asset_path,current_asset_name,"abc")
+                new_asset_path = component.replace(res=target_res_type).path
                 
-                if os.path.isfile(new_asset_path):
+                if self.path_resolver.exists(new_asset_path):
                     if current_res_type != target_res_type:
                         #删除旧的abc文件
                         cmds.select(clear=True)
@@ -1426,15 +1121,229 @@ class Operator():
                         abc_node = self.import_abc(abc_path=new_asset_path)
                         return abc_node
                 else:
-                    #如果文件不存在,则返回当前代理节点的transform
-                    #用于后续提示用户替换内容是否成功信息
-                    raise FileExistsError("文件不存在!")
-
-            else:
-                om.MGlobal.displayError("替换失败!所选择节点不是abc类型的节点!")
-        
-        else:
-            om.MGlobal.displayError("替换失败!所选择节点不是使用Component Tool导入的节点!")
+                    #如果文件不存在,则返回当前代理节点的transform
+                    #用于后续提示用户替换内容是否成功信息
+                    raise FileExistsError("文件不存在!")
+
+            else:
+                om.MGlobal.displayError("替换失败!所选择节点不是abc类型的节点!")
+        
+        else:
+            om.MGlobal.displayError("替换失败!所选择节点不是使用Component Tool导入的节点!")
+    
+    @profiler.timed()
+    def replace_select_res(self,sel_node=None,target_file_format=None,target_res=None):
+        '''
+        替换选择的分辨率组件
+        如果用户选择的节点类型和需要替换的类型一致,则直接替换
+        如果不一致,则删除掉原始节点后,重新导入
+        导入后继承原始的变换以及parent层级
+        node_list > 需要替换的节点
+        target_file_format > 目标文件类型
+        target_res > 目标分辨率
+        '''
+        #记录不同类型切换导入时,重新parent的节点路径
+        full_path = None
+        #记录原始节点parent层级
+        parent = cmds.listRelatives(sel_node,parent=True,fullPath=True)
+        #记录导入的节点
+        import_transform=None
+    
+        #获取当前选择节点的类型
+        current_node_format = self.get_file_format(sel_node)
+        
+        #后续添加导入信息报告可以修改
+        if not current_node_format:
+            #如果当前选择的物体不为插件导入的,则返回,不执行操作
+            print(f"{current_node_format} 不为插件导入的节点,跳过")
+            return
+        
+        #如果是同类型fileFormat节点替换,则修改路径
+        if current_node_format == target_file_format:
+            #print("相同类型节点")
+            if target_file_format == "ass":
+                self.replace_ass_res(transform_node = sel_node,target_res_type=target_res)
+
+                import_transform = sel_node
+            elif target_file_format == "gpuCache":
+                self.replace_gpu_cache_res(transform_node = sel_node,target_res_type=target_res)
+
+                import_transform = sel_node
+            elif target_file_format == "abc":
+                #获取abc Node节点的变换坐标
+                original_pos,original_rotate,original_scale = self.get_transform(sel_node)
+                #导入新的res,并且继承变换坐标
+                import_transform = self.replace_abc_res(transform_node = sel_node,target_res_type=target_res,
+                                target_pos=original_pos,target_rotate = original_rotate,
+                                target_scale=original_scale)
+        
+            full_path = import_transform
+                                
+        #不同类型节点的替换
+        else:
+            '''
+            获取节点属性,反求出不带fileFormat的文件路径
+            如果为不同节点类型的替换,则删除掉原来节点,重新导入用户指定的节点类型
+            并继承变换和父子层级
+            '''
+            #assetDir为格式子目录 Z:/project/DFH/Asset/component/DFH_fhsj_test/ass
+            component = resolver.from_node_attributes(cmds.getAttr(f"{sel_node}.assetDir"),
+                            cmds.getAttr(f"{sel_node}.assetName"),current_node_format)
+            
+            #记录选择节点,方便后续还原位置
+            original_pos,original_rotate,original_scale = self.get_transform(sel_node)
+            
+            if target_file_format not in resolver.FORMAT_FOLDERS:
+                om.MGlobal.displayError(f"不支持的文件类型 > {target_file_format}")
+                return
+            
+            #反求新的res资产路径
+            new_asset_file = component.replace(res=target_res,file_format=target_file_format).path
+            
+            if self.path_resolver.exists(new_asset_file):
+                #导入新的节点,并且获取节点名称
+                import_transform = self.import_component_file(new_asset_file,target_file_format)
+                #继承原来的变换坐标
+                self.set_transform(import_transform,translation = original_pos,
+                                rotation = original_rotate,scale = original_scale)
+                
+                cmds.select(clear=True)
+                cmds.delete(sel_node)
+                if parent:
+                    cmds.parent(import_transform,parent)
+            else:
+                om.MGlobal.displayError(f"{new_asset_file} 文件路径不存在")
+            
+            if parent:
+                p = parent[0]
+                full_path = f"{p}|{import_transform}"
+            else:
+                full_path = f"{import_transform}"
+
+        return full_path
+              
+    @profiler.timed()
+    def replace_all_res(self,node_dict=None,target_file_format=None,target_res=None,use_instance=True):
+        '''
+        替换场景中所有的节点为指定类型的节点
+        node_dict > {资产名:资产节点...}
+        target_file_format > 需要替换的文件类型
+        target_res > 目标分辨率
+        use_instance > 是否以实例对象替换场景中的节点
+        '''
+        for _ in self.iter_replace_all_res(node_dict,target_file_format,target_res,use_instance):
+            pass
+    
+    def create_replace_all_job(self,node_dict=None,target_file_format=None,target_res=None,use_instance=True):
+        '''
+        创建替换任务,返回jobs.Job,每个资产为一个主线程分片
+        '''
+        job = Job(f"替换 {target_file_format} {target_res}")
+        
+        def replace(job):
+            for asset_name,count in self.iter_replace_all_res(node_dict,target_file_format,target_res,use_instance):
+                job.advance(1,message=f"替换 {asset_name} > {count} 个节点")
+                yield
+        
+        job.add("replace",replace,weight=len(node_dict))
+        job.add_finally(lambda job:cmds.select(clear=True))
+        return job
+    
+    def iter_replace_all_res(self,node_dict=None,target_file_format=None,target_res=None,use_instance=True):
+        '''
+        replace_all_res的生成器版本,每替换完一个资产yield一次 (资产名,节点数量)
+        用于在主线程中分片执行
+        '''
+        #整个替换过程中每个资产目录只列出一次
+        with self.path_resolver.operation():
+            for asset_name,node_list in node_dict.items():
+                #如果只有单个,则重新替换,不检测实例
+                if len(node_list)==1:
+                    #记录原始变换信息
+                    original_pos,original_rotation,original_scale = self.get_transform(node_list[0])
+                    new_master_node = self.replace_select_res(node_list[0],target_file_format = target_file_format,target_res = target_res)
+                    self.set_transform(new_master_node,translation = original_pos,rotation = original_rotation,
+                                    scale=original_scale)
+                    cmds.select(clear=True)
+                    #cmds.delete(node_list[0])
+                    self.set_transform(new_master_node)
+                    print("只有单个节点 >>>>>>>>>>>>>>>>>>>>>")
+                    yield asset_name,1
+                    continue
+            
+                #启用实例替换
+                #导入组第一个对象,其余对象使用第一个对象instance
+                if use_instance:
+                    master_node = node_list[0]
+                    instance_node = node_list[1:]
+                    print(f"master_node  >>>>>>>>>>>>> {master_node}")
+                    print(f"instance_node  >>>>>>>>>>>>> {instance_node}")
+                
+                    #返回新的导入节点路径
+                    new_master_node = self.replace_select_res(master_node,target_file_format,target_res)
+                
+                    count=0
+                    for ins_node in instance_node:
+                        #记录原始变换信息
+                        original_pos,original_rotation,original_scale = self.get_transform(ins_node,space="object")
+                        #获取物体父层级节点
+                        parent = cmds.listRelatives(ins_node,parent=True,fullPath=True)
+                    
+                        count = count+1
+                        short_name = ins_node.split("|")[-1]
+                        #asset_name = cmds.getAttr(f"{ins_node}.assetName")
+                    
+                        #复制父实例对象
+                        node = cmds.instance(new_master_node)[0]
+                        new_node = cmds.rename(node,f"{asset_name}_{target_file_format}{count}",ignoreShape=True)
+                        self.reset_transform(new_node)
+
+                        #只在父节点不同的情况下重设parent，避免"already a child"报错
+                        if parent:
+                            current_parent = cmds.listRelatives(new_node,parent=True,fullPath=True)
+                            if not current_parent or current_parent[0] != parent[0]:
+                                new_node = cmds.parent(new_node,parent[0])[0]
+
+                        #删除原始节点
+                        cmds.select(clear=True)
+                        cmds.delete(ins_node)
+                        #继承原始节点坐标
+                        self.set_transform(new_node,original_pos,original_rotation,original_scale)
+                    
+                        #如果有层级,则继承原来的层级
+                        # if parent:
+                        #     print(cmds.nodeType(parent[0]))
+                        #     print(f"ins_node  {ins_node}")
+                        #     print(f"new_node  {new_node}")
+                        #     print(f"parent  ",parent[0])
+                        #     cmds.parent(new_node,parent[0],shape=True)
+                else:
+                    #导入组第一个对象,其余对象复制第一个对象
+                    new_master_node = self.replace_select_res(node_list[0],target_file_format,target_res)
+                
+                    count=0
+                    for dup_node in node_list[1:]:
+                        #记录原始变换信息
+                        original_pos,original_rotation,original_scale = self.get_transform(dup_node,space="object")
+                        #获取物体父层级节点
+                        parent = cmds.listRelatives(dup_node,parent=True,fullPath=True)
+                    
+                        count = count+1
+                        short_name = dup_node.split("|")[-1]
+                        #删除原始节点
+                    
+                        #复制父实例对象
+                        new_node = cmds.duplicate(new_master_node,name=f"{short_name}_dup{count}",renameChildren=True)[0]
+                        cmds.select(clear=True)
+                        cmds.delete(dup_node)
+                        #继承原始节点坐标
+                        self.set_transform(new_node,original_pos,original_rotation,original_scale)
+                    
+                        # #如果有层级,则继承原来的层级
+                        # if parent:
+                        #     cmds.parent(new_node,parent)
+            
+                yield asset_name,len(node_list)
     
     def is_component_node(self,node):
         '''
@@ -1481,6 +1390,7 @@ class Operator():
         cmds.setAttr(f"{node_name}.scene",scene,type="string")
         cmds.setAttr(f"{node_name}.isComponent",True)
     
+    @profiler.timed()
     def export_select_res(self,node_name = None,file_path=None,file_name=None,asset_name=None,project_code=None,scene=None,file_type="ma"):
         '''
         导出选择节点为ma 到指定的文件路径
@@ -1491,6 +1401,7 @@ class Operator():
         asset_name > 资产名称
         project_code > 项目缩写
         file_type > 文件类型  ma,mb,ass,gpucache,abc
+        返回是否导出了文件,空组跳过时返回None
         '''
         #node_name = node_name.split(":")[-1]
         res_type = node_name.split("|")[-1]
@@ -1543,7 +1454,8 @@ class Operator():
                 #print("selection_list >>>>>>>>>> ",selection_list)
                 cmds.select(selection_list)
                     
-                self.exportor.export_abc(node_name = node_name,file_path=output_file)
+                self.exportor.export_abc(node_name = node_name,file_path=output_file,
+                            options=self.exportor.abc_res_options.get(res_type))
                 
             elif file_type == "gpuCache":
                 
@@ -1553,7 +1465,8 @@ class Operator():
                 
                 output_name = f"{project_code}_{scene}_{asset_name}_{res_type}"
                 
-                self.exportor.export_gpu_cache(node_name = node_name,file_path=output_file,file_name=output_name)
+                self.exportor.export_gpu_cache(node_name = node_name,file_path=output_file,file_name=output_name,
+                            optimization_threshold=self.exportor.gpu_cache_res_thresholds.get(res_type))
             
             elif file_type == "ass":
                 output_file = f"{file_path}/{project_code}_{scene}_{asset_name}/ass/{project_code}_{scene}_{asset_name}_{res_type}.ass"
@@ -1568,11 +1481,15 @@ class Operator():
             cmds.error(f"导出文件失败 > {e}")
         
         finally:
+            #导出了新文件,文件存在检查需要重新执行
+            self.path_resolver.clear()
             cmds.select(None)
+        
+        return True
     
-    def export_child_res(self,node_name = None,file_path=None,asset_name=None,project_code=None,scene=None,file_type="ma"):
+    def get_res_groups(self,node_name = None):
         '''
-        导出选择的RootLocator的所有child组
+        返回RootLocator下所有res组的长名称,层级不符合规范时报错
         '''
         #获取子组的长名称,防止重命名
         child_node = cmds.listRelatives(node_name,children=True,fullPath=True)
@@ -1590,10 +1507,7 @@ class Operator():
                 print(new_child_node)
                 if set(self.res_list).issubset(set(new_child_node)):
                     #切片,去除所有子集的第一个shape节点留下transform
-                    res_group = child_node[1:]
-                    for child_group in res_group:
-                        self.export_select_res(node_name=child_group,file_path=file_path,
-                            asset_name=asset_name,project_code=project_code,scene=scene,file_type=file_type)
+                    return child_node[1:]
                 
                 else:
                     cmds.error("结构层级错误")
@@ -1604,6 +1518,524 @@ class Operator():
         else:
             cmds.error("所选择节点为空") 
     
+    def find_root_locators(self):
+        '''
+        场景中所有RootLocator(locator的父节点下有res组),只遍历一次locator
+        '''
+        res_set = set(self.res_list or [])
+        roots = []
+        dag_it = om.MItDag(om.MItDag.kDepthFirst,om.MFn.kLocator)
+        while not dag_it.isDone():
+            parent_path = dag_it.getPath()
+            parent_path.pop()
+            parent_fn = om.MFnDagNode(parent_path)
+            names = {om.MFnDagNode(parent_fn.child(i)).name().split(":")[-1] for i in range(parent_fn.childCount())}
+            if names & res_set:
+                roots.append(parent_path.fullPathName())
+            dag_it.next()
+        return list(dict.fromkeys(roots))
+    
+    @profiler.timed()
+    def preflight_check(self,root_nodes=None):
+        '''
+        导出前批量检查多个RootLocator,不修改场景也不写入文件
+        每个RootLocator只遍历一次DAG,检查:
+            hierarchy > 第一个子节点不是locator shape(get_res_groups依赖该顺序)
+            missing_res > 缺少res_list中的res组
+            unknown_group > RootLocator下不属于res_list的组
+            pivot > 旋转轴心和缩放轴心不一致或不在原点(导出时变换归零后检查)
+            empty_group > res组或其中的组没有子节点
+            duplicate_name > 同一res组中短名称重复
+            namespace > 带命名空间的节点,res组带命名空间时文件名不合法
+        root_nodes > RootLocator列表,为空时检查场景中所有RootLocator
+        return {
+            "roots" > 检查的RootLocator
+            "nodes" > 遍历的节点数量
+            "issues" > [{"root","node","type","severity","message"}...] severity为error或warning
+            "errors","warnings" > 数量
+            "passed" > 没有error
+        }
+        '''
+        root_nodes = root_nodes or self.find_root_locators()
+        res_set = set(self.res_list or [])
+        issues = []
+        
+        def add_issue(root,node,issue_type,message,severity="error"):
+            issues.append({"root":root,"node":node,"type":issue_type,"severity":severity,"message":message})
+        
+        sel = om.MSelectionList()
+        roots = []
+        for root in root_nodes:
+            try:
+                sel.add(root)
+            except RuntimeError:
+                add_issue(root,root,"hierarchy",f"{root} 节点不存在")
+                continue
+            roots.append(root)
+        
+        node_count = 0
+        zero = om.MVector(0,0,0)
+        dag_it = om.MItDag(om.MItDag.kDepthFirst,om.MFn.kInvalid)
+        for i in range(sel.length()):
+            root_path = sel.getDagPath(i)
+            root = root_path.fullPathName()
+            
+            if not root_path.hasFn(om.MFn.kTransform):
+                add_issue(root,root,"hierarchy",f"{root} 不是transform节点")
+                continue
+            
+            transform_fn = om.MFnTransform(root_path)
+            rotate_pivot = om.MVector(transform_fn.rotatePivot(om.MSpace.kTransform))
+            scale_pivot = om.MVector(transform_fn.scalePivot(om.MSpace.kTransform))
+            if rotate_pivot != scale_pivot:
+                add_issue(root,root,"pivot","旋转轴和缩放轴不一致")
+            elif rotate_pivot != zero:
+                add_issue(root,root,"pivot","物体轴心不在世界坐标中心")
+            
+            #res组长名称 > res名称,组内短名称 > 长名称
+            res_groups = {}
+            group_names = defaultdict(dict)
+            first_child = None
+            
+            dag_it.reset(root_path,om.MItDag.kDepthFirst,om.MFn.kInvalid)
+            dag_it.next()
+            while not dag_it.isDone():
+                node_path = dag_it.getPath()
+                node = node_path.fullPathName()
+                parent = node.rpartition("|")[0]
+                dag_fn = om.MFnDagNode(node_path)
+                name = dag_fn.name()
+                is_transform = node_path.hasFn(om.MFn.kTransform)
+                node_count += 1
+                
+                if parent == root:
+                    if first_child is None:
+                        first_child = node
+                        if not node_path.hasFn(om.MFn.kLocator):
+                            add_issue(root,node,"hierarchy",f"{root} 第一个子节点不是locator shape")
+                    if is_transform:
+                        res_name = name.split(":")[-1]
+                        if res_name in res_set:
+                            res_groups[node] = res_name
+                        else:
+                            add_issue(root,node,"unknown_group",f"{node} 不是res组({','.join(self.res_list or [])})","warning")
+                        if ":" in name:
+                            add_issue(root,node,"namespace",f"{node} res组带有命名空间,导出文件名不合法")
+                elif ":" in name:
+                    add_issue(root,node,"namespace",f"{node} 带有命名空间","warning")
+                
+                if parent != root and is_transform:
+                    #所属的res组
+                    group = next((res_group for res_group in res_groups if node.startswith(res_group + "|")),None)
+                    if group is not None:
+                        previous = group_names[group].get(name)
+                        if previous is not None:
+                            add_issue(root,node,"duplicate_name",f"{node} 与 {previous} 重名","warning")
+                        else:
+                            group_names[group][name] = node
+                
+                if is_transform and not dag_fn.childCount():
+                    if node in res_groups:
+                        add_issue(root,node,"empty_group",f"{node} 子节点为空,导出时跳过","warning")
+                    elif parent != root:
+                        add_issue(root,node,"empty_group",f"{node} 空组","warning")
+                
+                dag_it.next()
+            
+            if first_child is None:
+                add_issue(root,root,"hierarchy",f"{root} 没有子节点")
+            missing = [res for res in (self.res_list or []) if res not in res_groups.values()]
+            if missing:
+                add_issue(root,root,"missing_res",f"{root} 缺少res组 {','.join(missing)}")
+        
+        errors = sum(1 for issue in issues if issue["severity"] == "error")
+        profiler.current().add(nodes=node_count)
+        return {
+            "roots":roots,
+            "nodes":node_count,
+            "issues":issues,
+            "errors":errors,
+            "warnings":len(issues) - errors,
+            "passed":not errors,
+        }
+    
+    def print_preflight_report(self,report=None):
+        for issue in report["issues"]:
+            print(f"[{issue['severity']}] {issue['type']:<15}{issue['message']}")
+        print(f"预检查 {len(report['roots'])} 个RootLocator, {report['nodes']} 个节点, "
+              f"{report['errors']} 个错误, {report['warnings']} 个警告")
+    
+    @profiler.timed()
+    def collect_mesh_arrays(self,node_name=None,res_groups=None):
+        '''
+        读取RootLocator下每个res组所有mesh的三角面,顶点数量和世界包围盒,跳过中间对象
+        三角面 = 面顶点数 - 2 * 面数,不需要读取三角化数组
+        每个mesh逐个读取MFnMesh的数量(API没有批量读取多个mesh的接口),每个mesh读取4个标量和包围盒,
+        不读取顶点和面数组,之后的统计和检查在polycount中按数组计算
+        return {res:polycount.MeshArrays}
+        '''
+        res_groups = res_groups or self.get_res_groups(node_name)
+        sel = om.MSelectionList()
+        for group in res_groups:
+            sel.add(group)
+        
+        res_arrays = {}
+        dag_it = om.MItDag(om.MItDag.kDepthFirst,om.MFn.kMesh)
+        mesh_count = 0
+        for i in range(sel.length()):
+            group_path = sel.getDagPath(i)
+            res = group_path.partialPathName().split("|")[-1].split(":")[-1]
+            
+            names,triangles,vertices,bounds,matrices = [],[],[],[],[]
+            dag_it.reset(group_path,om.MItDag.kDepthFirst,om.MFn.kMesh)
+            while not dag_it.isDone():
+                mesh_path = dag_it.getPath()
+                mesh_fn = om.MFnMesh(mesh_path)
+                if not mesh_fn.isIntermediateObject:
+                    bbox = mesh_fn.boundingBox
+                    names.append(mesh_path.fullPathName())
+                    triangles.append(mesh_fn.numFaceVertices - 2 * mesh_fn.numPolygons)
+                    vertices.append(mesh_fn.numVertices)
+                    bounds.extend((bbox.min.x,bbox.min.y,bbox.min.z,bbox.max.x,bbox.max.y,bbox.max.z))
+                    matrices.extend(mesh_path.inclusiveMatrix())
+                dag_it.next()
+            
+            res_arrays[res] = polycount.MeshArrays.from_local(names,triangles,vertices,bounds,matrices)
+            mesh_count += len(names)
+        
+        profiler.current().add(nodes=mesh_count)
+        return res_arrays
+    
+    @profiler.timed()
+    def validate_polycount(self,node_name=None,res_groups=None):
+        '''
+        检查每个res组的面数上限和分辨率之间的比例,输出表格
+        没有配置面数检查(polycount.CONFIG_ENV)或没有安装numpy时跳过,返回None
+        返回polycount报告,report["passed"]为False时不应该导出,空的res组只在report["warnings"]中
+        '''
+        if self.polycount_validator is None:
+            print(f"没有配置面数检查({polycount.CONFIG_ENV})或没有安装numpy,跳过")
+            return None
+        
+        report = self.polycount_validator.validate(self.collect_mesh_arrays(node_name,res_groups))
+        print(polycount.format_report(report))
+        for issue in report["issues"] + report["warnings"]:
+            om.MGlobal.displayWarning(issue["message"])
+        return report
+    
+    @profiler.timed()
+    def export_abc_res(self,res_groups = None,file_path=None,asset_name=None,project_code=None,scene=None):
+        '''
+        一次AbcExport导出RootLocator下的多个res组,每个res使用exportor.abc_res_options中的参数
+        返回 {res:是否成功},空组跳过,结果为None
+        '''
+        component = export_queue.component_id(project_code,scene,asset_name)
+        output_dir = f"{file_path}/{component}/alembic"
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        
+        results = {}
+        items = []
+        for child_group in res_groups:
+            res = child_group.split("|")[-1]
+            if not cmds.listRelatives(child_group,children=True,fullPath=True):
+                print(f"{child_group}子节点为空,跳过导出")
+                results[res] = None
+                continue
+            output_file = f"{output_dir}/{component}_{res}.abc"
+            results[res] = output_file
+            items.append((child_group,output_file,self.exportor.abc_res_options.get(res)))
+        
+        try:
+            exported = self.exportor.export_abc_batch(items=items)
+        finally:
+            #导出了新文件,文件存在检查需要重新执行
+            self.path_resolver.clear()
+        
+        return {res:exported.get(output_file,False) if output_file else None for res,output_file in results.items()}
+    
+    @profiler.timed()
+    def export_gpu_cache_assets(self,assets = None,file_path=None,project_code=None,scene=None):
+        '''
+        批量导出多个资产的res组gpuCache,每个资产目录和合并阈值一次gpuCache调用
+        assets > [(资产名,[res组长名称,...]),...]
+        每个res使用exportor.gpu_cache_res_thresholds中的合并阈值
+        返回 {(资产名,res):是否成功},空组跳过,结果为None
+        '''
+        outputs = {}
+        items = []
+        for asset_name,res_groups in assets:
+            component = export_queue.component_id(project_code,scene,asset_name)
+            output_dir = f"{file_path}/{component}/cache"
+            for child_group in res_groups:
+                res = child_group.split("|")[-1]
+                if not cmds.listRelatives(child_group,children=True,fullPath=True):
+                    print(f"{child_group}为空组,跳过")
+                    outputs[(asset_name,res)] = None
+                    continue
+                outputs[(asset_name,res)] = f"{output_dir}/{component}_{res}.abc"
+                items.append((child_group,output_dir,f"{component}_",self.exportor.gpu_cache_res_thresholds.get(res)))
+        
+        try:
+            exported = self.exportor.export_gpu_cache_batch(items=items)
+        finally:
+            #导出了新文件,文件存在检查需要重新执行
+            self.path_resolver.clear()
+        
+        return {key:exported.get(output_file,False) if output_file else None for key,output_file in outputs.items()}
+    
+    def export_gpu_cache_res(self,res_groups = None,file_path=None,asset_name=None,project_code=None,scene=None):
+        '''
+        批量导出一个资产的res组gpuCache,返回 {res:是否成功}
+        '''
+        results = self.export_gpu_cache_assets(assets=[(asset_name,res_groups)],file_path=file_path,
+                        project_code=project_code,scene=scene)
+        return {res:result for (_,res),result in results.items()}
+    
+    @profiler.timed()
+    def export_child_res(self,node_name = None,file_path=None,asset_name=None,project_code=None,scene=None,file_type="ma",
+                    check_polycount=True):
+        '''
+        导出选择的RootLocator的所有child组
+        check_polycount > 导出前检查面数和分辨率比例,不通过时报错
+        '''
+        res_groups = self.get_res_groups(node_name)
+        if check_polycount:
+            report = self.validate_polycount(node_name,res_groups)
+            if report is not None and not report["passed"]:
+                cmds.error(f"{node_name} 面数检查失败")
+        
+        batch_exporters = {"abc":self.export_abc_res,"gpuCache":self.export_gpu_cache_res}
+        if file_type in batch_exporters:
+            results = batch_exporters[file_type](res_groups=res_groups,file_path=file_path,asset_name=asset_name,
+                            project_code=project_code,scene=scene)
+            failed = [res for res,result in results.items() if result is False]
+            if failed:
+                cmds.error(f"导出{file_type}失败 > {failed}")
+            return
+        
+        for child_group in res_groups:
+            self.export_select_res(node_name=child_group,file_path=file_path,
+                asset_name=asset_name,project_code=project_code,scene=scene,file_type=file_type)
+    
+    def create_export_job(self,node_name = None,file_path=None,asset_name=None,project_code=None,scene=None,
+                    file_types=None,copy_texture=False,all_res=True,downsample_texture=False,check_polycount=True,
+                    journal=None,on_output=None):
+        '''
+        创建导出任务,返回jobs.Job,由JobRunner执行
+        node_name > all_res为True时为RootLocator,否则为单个res组
+        file_types > 导出的文件类型列表 ma,abc,gpuCache,ass
+        copy_texture > 是否复制贴图,复制在工作线程中执行,规划和重新链接在主线程
+        all_res > 导出RootLocator下所有res组
+        downsample_texture > 为proxyRes/midRes生成缩小的贴图(需要copy_texture),
+                            导出这些res组时临时链接到 textures/{res}/,导出后还原
+        check_polycount > all_res时检查面数和分辨率比例,不通过时任务失败,不写入文件
+        journal > export_queue.Journal,跳过日志中已经完成的输出,每导出一个输出追加一行
+        on_output > 每导出一个输出调用 on_output(res,file_type)
+        
+        导出前执行preflight_check(all_res),将RootLocator变换设置为0并检查轴心,任务结束(包括取消和失败)后还原
+        '''
+        file_types = list(file_types or [])
+        if all_res:
+            root_node = node_name
+            res_groups = self.get_res_groups(node_name)
+        else:
+            parent = cmds.listRelatives(node_name,parent=True,fullPath=True)
+            if not parent:
+                cmds.error("节点层级错误!")
+            root_node = parent[0]
+            res_groups = [node_name]
+        
+        job = Job(f"导出 {asset_name}")
+        state = {}
+        
+        def prepare(job):
+            #写入文件前检查层级,轴心,命名和空组
+            if all_res:
+                report = self.preflight_check([root_node])
+                if not report["passed"]:
+                    self.print_preflight_report(report)
+                    raise RuntimeError(f"{root_node} 预检查失败 {report['errors']} 个错误")
+            #保存原始位置
+            state["transform"] = self.get_transform(root_node)
+            #将物体移动到世界坐标中心
+            self.reset_transform(root_node)
+            #检查物体轴心是否在坐标原点
+            if not self.check_pivot(root_node):
+                raise RuntimeError(f"{root_node} 轴心检查失败")
+            if check_polycount and all_res:
+                report = self.validate_polycount(root_node,res_groups)
+                if report is not None and not report["passed"]:
+                    raise RuntimeError(f"{root_node} 面数检查失败")
+        
+        def restore(job):
+            #还原为原始贴图
+            if state.get("texture_res"):
+                self.relink_textures_for_res(job.results["plan_textures"],None)
+            #将物体设置回原始坐标
+            if "transform" in state:
+                original_pos,original_rot,original_scale = state["transform"]
+                self.set_transform(root_node,original_pos,original_rot,original_scale)
+            cmds.select(clear=True)
+        
+        component = export_queue.component_id(project_code,scene,asset_name)
+        #所有res组一次命令导出的格式,不包含材质贴图路径,不需要切换贴图
+        batch_exporters = {"abc":self.export_abc_res,"gpuCache":self.export_gpu_cache_res}
+        
+        def export(job):
+            #有缩小贴图的res
+            texture_res = set(job.results.get("downsample_textures",{}).get("res",[]))
+            for file_type in file_types:
+                if file_type in batch_exporters:
+                    pending = []
+                    for child_group in res_groups:
+                        res = child_group.split('|')[-1]
+                        if journal is not None and journal.is_done(component,res,file_type):
+                            job.advance(1,message=f"已导出,跳过 {file_type} > {res}")
+                        else:
+                            pending.append(child_group)
+                    if not pending:
+                        continue
+                    
+                    job.advance(0,message=f"导出 {file_type} > {len(pending)} 个res")
+                    results = batch_exporters[file_type](res_groups=pending,file_path=file_path,asset_name=asset_name,
+                                    project_code=project_code,scene=scene)
+                    for res,result in results.items():
+                        #失败(False)或空组跳过(None)时不写入日志
+                        if not result:
+                            continue
+                        if journal is not None:
+                            journal.record(component,res,file_type,root=root_node)
+                        if on_output is not None:
+                            on_output(res,file_type)
+                    job.advance(len(pending))
+                    failed = [res for res,result in results.items() if result is False]
+                    if failed:
+                        cmds.error(f"导出{file_type}失败 > {failed}")
+                    yield
+                    continue
+                
+                for child_group in res_groups:
+                    res = child_group.split('|')[-1]
+                    if journal is not None and journal.is_done(component,res,file_type):
+                        job.advance(1,message=f"已导出,跳过 {file_type} > {res}")
+                        continue
+                    
+                    target_res = res if res in texture_res else None
+                    if state.get("texture_res") != target_res:
+                        self.relink_textures_for_res(job.results["plan_textures"],target_res)
+                        state["texture_res"] = target_res
+                    
+                    job.advance(0,message=f"导出 {file_type} > {res}")
+                    if not self.export_select_res(node_name=child_group,file_path=file_path,
+                        asset_name=asset_name,project_code=project_code,scene=scene,file_type=file_type):
+                        #空组没有写入文件,不记录为完成
+                        job.advance(1,message=f"空组,跳过 {file_type} > {res}")
+                        continue
+                    if journal is not None:
+                        journal.record(component,res,file_type,root=root_node)
+                    if on_output is not None:
+                        on_output(res,file_type)
+                    job.advance(1)
+                    yield
+        
+        prepare_task = job.add("prepare",prepare)
+        export_deps = [prepare_task]
+        
+        if copy_texture:
+            def plan(job):
+                texture_plan = self.plan_texture_copy(node_name=root_node,path=file_path,project_code=project_code,
+                                scene=scene,asset_name=asset_name)
+                job.add_units(len(texture_plan["copy"]))
+                return texture_plan
+            
+            def copy(job):
+                return self.copy_texture_files(job.results["plan_textures"],job=job)
+            
+            def relink(job):
+                self.relink_textures(job.results["plan_textures"])
+            
+            plan_task = job.add("plan_textures",plan,deps=[prepare_task])
+            copy_task = job.add("copy_textures",copy,kind="io",deps=[plan_task])
+            #导出的ma需要引用复制后的贴图路径
+            export_deps.append(job.add("relink_textures",relink,deps=[copy_task]))
+            
+            res_max_size = {res:size for res,size in texture_downsample.RES_MAX_SIZE.items()
+                            if res in [group.split("|")[-1] for group in res_groups]}
+            if downsample_texture and res_max_size:
+                def downsample(job):
+                    texture_plan = job.results["plan_textures"]
+                    sources = [target_file for _,target_file in texture_plan["copy"]]
+                    summary = texture_downsample.downsample_textures(sources,texture_plan["dir"],res_max_size,job=job)
+                    print(f"缩小贴图 > {summary}")
+                    summary["res"] = list(res_max_size)
+                    return summary
+                
+                export_deps.append(job.add("downsample_textures",downsample,kind="io",deps=[copy_task]))
+        
+        job.add("export",export,deps=export_deps,weight=len(file_types) * len(res_groups))
+        job.add_finally(restore)
+        return job
+    
+    def get_queue_asset_name(self,root_node=None,project_code=None,scene=None):
+        '''
+        导出队列的默认资产名
+        已经导出过的RootLocator从assetName属性({project}_{scene}_{asset}_{res})中还原,否则使用节点短名称
+        '''
+        if cmds.attributeQuery("assetName",node=root_node,exists=True):
+            asset_name = cmds.getAttr(f"{root_node}.assetName") or ""
+            prefix = f"{project_code}_{scene}_"
+            if asset_name.startswith(prefix):
+                asset_id,_ = resolver.split_asset_name(asset_name[len(prefix):])
+                if asset_id:
+                    return asset_id
+        return root_node.split("|")[-1].split(":")[-1]
+    
+    @profiler.timed()
+    def plan_export_queue(self,items=None,file_path=None,project_code=None,scene=None,file_types=None,journal=None):
+        '''
+        比较导出日志和磁盘上的文件,返回需要导出的队列项
+        日志中已完成但文件不存在的输出从日志中移除(重新导出),空的res组导出时跳过,不计入输出
+        items > [(RootLocator,资产名),...]
+        层级错误的RootLocator记录为失败,不影响其他队列项
+        return (需要导出的队列项,需要导出的输出数量,已完成的输出数量,[(失败的队列项,错误信息),...])
+        '''
+        outputs = []
+        failed = []
+        for root_node,asset_name in items:
+            component = export_queue.component_id(project_code,scene,asset_name)
+            component_dir = f"{file_path}/{component}"
+            try:
+                res_groups = self.get_res_groups(root_node)
+            except (RuntimeError,ValueError) as e:
+                om.MGlobal.displayWarning(f"{root_node} 无法导出,跳过 > {e}")
+                failed.append(((root_node,asset_name),str(e)))
+                continue
+            for child_group in res_groups:
+                if not cmds.listRelatives(child_group,children=True,fullPath=True):
+                    continue
+                res = child_group.split("|")[-1]
+                for file_type in file_types:
+                    key = (component,res,file_type)
+                    outputs.append(((root_node,asset_name),key,resolver.build_path(component_dir,component,res,file_type)))
+        
+        #日志中已完成的输出批量检查一次文件
+        found = self.path_resolver.exists_many(path for _,key,path in outputs if journal.is_done(*key))
+        pending = {}
+        done = 0
+        for item,key,path in outputs:
+            if journal.is_done(*key) and found.get(path):
+                done += 1
+                continue
+            journal.forget(*key)
+            pending[item] = pending.get(item,0) + 1
+        
+        pending_items = [item for item in items if item in pending]
+        print(f"导出队列 {len(pending_items)}/{len(items)} 个资产, {sum(pending.values())} 个输出, "
+              f"已完成 {done} 个, 失败 {len(failed)} 个")
+        return pending_items,sum(pending.values()),done,failed
+    
+    @profiler.timed()
     def export_source(self,node_name = None,file_path=None,asset_name=None,project_code=None,scene=None,file_type="ma"):
         
         child_node = cmds.listRelatives(node_name,fullPath=True,children=True)
@@ -1624,79 +2056,116 @@ class Operator():
         else:
             om.MGlobal.displayError("请选择一个符合规范的locator节点")
             
+    @profiler.timed()
     def copy_texture_to_target_file(self,node_name = None,path = None,project_code=None,scene=None,asset_name=None):
         '''
+        复制贴图到资产的textures目录并重新链接贴图节点
+        分为 plan_texture_copy(主线程) > copy_texture_files(可在工作线程) > relink_textures(主线程) 三步
+        '''
+        texture_plan = self.plan_texture_copy(node_name=node_name,path=path,project_code=project_code,
+                        scene=scene,asset_name=asset_name)
+        self.copy_texture_files(texture_plan)
+        self.relink_textures(texture_plan)
+    
+    @profiler.timed()
+    def plan_texture_copy(self,node_name = None,path = None,project_code=None,scene=None,asset_name=None):
+        '''
+        读取贴图节点,生成复制计划,不复制文件
         dir_texture_path > 目标贴图路径
+        return {"dir":目标贴图路径,"copy":[(源文件,目标文件)...],"relink":[(贴图节点,新路径,colorSpace)...]}
         '''
         dir_texture_path = f"{path}/{project_code}_{scene}_{asset_name}/textures"
         print("dir_texture_path",dir_texture_path)
         
-        if not os.path.exists(dir_texture_path):
-            os.makedirs(dir_texture_path)
-        
         # file_node=cmds.ls(type="file")
         file_node = self.material_manager.get_texture_node(root_transform=node_name,api_type=om.MFn.kMesh)
         
-        #re规则，匹配10##的UDIM数字字符串
-        pattern=r'10\d{2}'  
-        os.makedirs(dir_texture_path,exist_ok=True)
+        copy_list = []
+        relink_list = []
+        #同一个贴图被多个节点引用时只复制一次
+        planned = set()
+        #UDIM目录只列出一次,所有贴图节点共用象限索引
+        udim_index = udim.UdimIndex()
+        
         for node in file_node:
             file_path=cmds.getAttr(node + ".fileTextureName")
             tiling_attri=cmds.getAttr(node + ".uvTilingMode")
             color_space = cmds.getAttr(node + ".colorSpace")
             file_name=os.path.basename(file_path)
-            file_dir = os.path.dirname(file_path)
             
-            #判断贴图是否已经在目标路径
-            #如果不在贴图目标贴图路径则
             #贴图节点为非UDIM多象限
             if tiling_attri == 0:
-                print("贴图不是多象限")
-                if not os.path.isfile(dir_texture_path + "\\" + file_name):
-                    shutil.copy2(file_path,dir_texture_path)
-                    print("复制贴图{0}到  >>>>  {1}  <<<<    成功".format(file_name,dir_texture_path))
-                    cmds.setAttr(node + ".fileTextureName",dir_texture_path + "\\" + file_name,type="string")
-                    cmds.setAttr(node + ".ignoreColorSpaceFileRules ",True)
-                    cmds.setAttr(node + ".colorSpace",color_space,type="string")
-                else:
-                    print("贴图为重复使用，已经存在目标文件夹，不执行复制。")
-                    cmds.setAttr(node + ".fileTextureName",dir_texture_path + "\\" + file_name,type="string")
-                    cmds.setAttr(node + ".ignoreColorSpaceFileRules ",True)
-                    cmds.setAttr(node + ".colorSpace",color_space,type="string")
-                
+                source_list = [file_path]
+            
             #如果贴图格式是UDIM多象限
             else:
                 print("贴图是UDIM多象限节点")
-                original_tex_folder_list = os.listdir(file_dir)
-                
-                tex_file_pattern = r'10\d{2}'
-                
-
-                #udim_match = re.findall(tex_file_pattern,file_name)[0]
-                udim_match = re.findall(tex_file_pattern,file_name)[0]
-                file_name_split = file_name.split(udim_match)
-                file_name_prefix = file_name_split[0]
-                file_name_suffix = file_name_split[1]
-                
-                udim_pattern = rf'{file_name_prefix}10\d{{2}}{file_name_suffix}'
-                for tex_file in original_tex_folder_list:
-                    if re.match(udim_pattern,tex_file):
-                        #判断每个符合规则的文件是否都存在指定路径
-                        if not os.path.isfile(dir_texture_path + "\\" + tex_file):
-                            original_tex_file = file_dir + "\\" + tex_file
-                            shutil.copy2(original_tex_file,dir_texture_path)
-                            print("复制 UDIM 贴图{0}到  >>>>  {1}  <<<<    成功".format(tex_file,dir_texture_path))
-                            cmds.setAttr(node + ".fileTextureName",dir_texture_path + "\\" + file_name,type="string")
-                            cmds.setAttr(node + ".ignoreColorSpaceFileRules",True)
-                            cmds.setAttr(node + ".colorSpace",color_space,type="string")
-                            print(original_tex_file)
-                            print(tex_file)
-                        else:
-                            print("贴图为重复使用，已经存在目标文件夹，不执行复制。")
-                            cmds.setAttr(node + ".fileTextureName",dir_texture_path + "\\" + file_name,type="string")
-                            cmds.setAttr(node + ".ignoreColorSpaceFileRules ",True)
-                            cmds.setAttr(node + ".colorSpace",color_space,type="string")
+                #支持 <UDIM>,<UVTILE> 和 1001~1999 象限文件名
+                #ZBrush(1)从u0_v0开始,Mudbox(2)从u1_v1开始,其他模式按文件名判断
+                source_list = udim_index.tile_paths(file_path,base=udim.tiling_base(tiling_attri))
+                if not source_list:
+                    om.MGlobal.displayWarning(f"{node} 没有找到UDIM象限贴图 > {file_path}")
+            
+            for source_file in source_list:
+                target_file = f"{dir_texture_path}/{os.path.basename(source_file)}"
+                if target_file not in planned:
+                    planned.add(target_file)
+                    copy_list.append((source_file,target_file))
+            
+            relink_list.append((node,f"{dir_texture_path}/{file_name}",color_space))
+        
+        return {"dir":dir_texture_path,"copy":copy_list,"relink":relink_list}
+    
+    @profiler.timed()
+    def copy_texture_files(self,texture_plan=None,job=None):
+        '''
+        按plan_texture_copy的计划复制贴图,只使用文件系统操作,可以在工作线程中执行
+        目标文件已经存在时不复制
+        job > jobs.Job,用于汇报进度和响应取消
+        返回复制的文件数量
+        '''
+        os.makedirs(texture_plan["dir"],exist_ok=True)
+        
+        copied = 0
+        for source_file,target_file in texture_plan["copy"]:
+            if job is not None:
+                job.check_cancelled()
+            
+            file_name = os.path.basename(target_file)
+            size = 0
+            if not os.path.isfile(target_file):
+                shutil.copy2(source_file,target_file)
+                size = get_file_size(target_file)
+                copied += 1
+                print("复制贴图{0}到  >>>>  {1}  <<<<    成功".format(file_name,texture_plan["dir"]))
+            else:
+                print("贴图为重复使用，已经存在目标文件夹，不执行复制。")
+            
+            profiler.current().add(bytes=size,files=1)
+            if job is not None:
+                job.advance(1,bytes_done=size,message=f"复制贴图 > {file_name}")
+        
+        return copied
+    
+    def relink_textures_for_res(self,texture_plan=None,res=None):
+        '''
+        将贴图节点链接到res的缩小贴图 textures/{res}/,res为None时还原为原始贴图
+        '''
+        for node,new_path,color_space in texture_plan["relink"]:
+            if res is not None:
+                new_path = texture_downsample.res_texture_path(new_path,res)
+            cmds.setAttr(node + ".fileTextureName",new_path,type="string")
+    
+    def relink_textures(self,texture_plan=None):
+        '''
+        将贴图节点链接到复制后的路径,保持原来的colorSpace
+        '''
+        for node,new_path,color_space in texture_plan["relink"]:
+            cmds.setAttr(node + ".fileTextureName",new_path,type="string")
+            cmds.setAttr(node + ".ignoreColorSpaceFileRules",True)
+            cmds.setAttr(node + ".colorSpace",color_space,type="string")
     
+    @profiler.timed()
     def screen_shot(self,output_png,width=1280,height=720,frame=None,show_ornaments=False,offscreen=True,cleanup_variants=True):
         """
         Maya 视口截屏到 PNG（用 playblast），返回最终生成的图片路径（可能是 xxx.0000.png 这种变体）
@@ -1780,6 +2249,7 @@ class Operator():
         cmds.setAttr(f"{node_name}.resolutionType",resolution_type,type="string")
         cmds.setAttr(f"{node_name}.isComponent",True)
     
+    @profiler.timed()
     def import_abc(self,abc_path=None):
         '''
         生成新空组后将导入的abc文件reparent到新建的空组中,并创建路径属性
@@ -1789,7 +2259,7 @@ class Operator():
         '''
         dir_name = os.path.dirname(abc_path)
         base_name = os.path.splitext(os.path.basename(abc_path))[0]
-        resolution_type = base_name.split("_")[-1]
+        resolution_type = resolver.split_asset_name(base_name)[1]
         
         empty_group = cmds.group(name = "abc_import",empty = True)
         #导入abc,并将设置为指定组的子节点
@@ -1803,12 +2273,25 @@ class Operator():
         
         return new_group
     
+    def set_standin_bounds(self,ass_node = None,ass_path = None):
+        '''
+        从.asstoc设置aiStandIn的包围盒,视口和Arnold放置代理时不需要解析完整的.ass
+        没有.asstoc时返回None,代理在加载时计算包围盒
+        '''
+        bounds = asstoc.read_bounds(ass_path)
+        if bounds is None:
+            return None
+        cmds.setAttr(f"{ass_node}.MinBoundingBox",*bounds[:3])
+        cmds.setAttr(f"{ass_node}.MaxBoundingBox",*bounds[3:])
+        return bounds
+    
+    @profiler.timed()
     def import_ass(self,ass_path = None):
         
         ass_dir = os.path.dirname(ass_path)
         
         ass_name = os.path.splitext(os.path.basename(ass_path))[0]
-        resolution_type = ass_name.split("_")[-1]
+        resolution_type = resolver.split_asset_name(ass_name)[1]
         
         #创建ass节点,命名为asset_name
         ass_node = cmds.createNode("aiStandIn",name=ass_name + "_ass")
@@ -1816,18 +2299,20 @@ class Operator():
         
         #设置属性
         cmds.setAttr(f"{parent_transform}.dso",ass_path,type="string")
+        self.set_standin_bounds(ass_node,ass_path)
         self.set_import_attribute(node_name = parent_transform,dir_name = ass_dir,
                         asset_name = ass_name,file_format = "ass",
                         resolution_type = resolution_type,asset_type="ass")
         
         return parent_transform
         
+    @profiler.timed()
     def import_gpu_cache(self,gpu_path = None):
         
         ass_dir = os.path.dirname(gpu_path)
         
         gpu_name = os.path.splitext(os.path.basename(gpu_path))[0]
-        resolution_type = gpu_name.split("_")[-1]
+        resolution_type = resolver.split_asset_name(gpu_name)[1]
         
         #创建gpuCache节点,命名为asset_name
         ass_node = cmds.createNode("gpuCache",name=gpu_name + "_gpuCache")
@@ -1841,19 +2326,26 @@ class Operator():
         
         return parent_transform
     
+    @profiler.timed()
     def import_ma(self,file_path = None):
         
         dir_name = os.path.dirname(file_path)
-        ma_name = os.path.splitext(os.path.basename(gpu_path))[0]
-        resolution_type = ma_name.split("_")[-1]
+        ma_name = os.path.splitext(os.path.basename(file_path))[0]
+        resolution_type = resolver.split_asset_name(ma_name)[1]
         
         return_node = cmds.file(file_path,i=True,returnNewNodes=True)
 
         transform_node =[node for node in return_node if cmds.nodeType(node) == "transform"]
         
-        for node in transform_node:
-            if not cmds.listRelatives(node,parent=True,fullPath=True):
+        #属性设置在顶层节点上
+        node = None
+        for transform in transform_node:
+            if not cmds.listRelatives(transform,parent=True,fullPath=True):
+                node = transform
                 cmds.select(node)
+        if node is None:
+            om.MGlobal.displayError(f"{file_path} 没有可导入的节点")
+            return
                 
         self.set_import_attribute(node_name = node,dir_name=dir_name,
                         asset_name = ma_name,file_format="mayaAscii",
@@ -1862,6 +2354,7 @@ class Operator():
         
         return node
     
+    @profiler.timed()
     def import_select_res_ma(self,select_node = None,target_res = None,ma_type="res"):
         '''
         将选择的节点替换为用户选择分辨率的ma文件
@@ -1872,27 +2365,22 @@ class Operator():
             source > 导入source文件
         '''
         
-        #获取当前资产路径
-        dir_temp = cmds.getAttr(f"{select_node}.assetDir").split("/")[:-1]
-        #拼装路径名称(不带assetFormat)
-        asset_dir = "/".join(dir_temp)
-        
-        #当前资产名称
-        asset_name = cmds.getAttr(f"{select_node}.assetName")
-        #当前分辨率类型
-        current_res_type = cmds.getAttr(f"{select_node}.resolutionType")
+        #由资产路径和资产名称反求ma路径,assetDir可以是格式子目录
+        component = resolver.from_node_attributes(cmds.getAttr(f"{select_node}.assetDir"),
+                        cmds.getAttr(f"{select_node}.assetName"),resolver.MA_FORMAT)
         
         if ma_type == "res":
-            #构建新资产名称
-            new_asset_name = asset_name.replace(current_res_type,target_res)
-            new_asset_path = f"{asset_dir}/{new_asset_name}.ma"
+            new_asset_path = component.replace(res=target_res,file_format=resolver.MA_FORMAT).path
             
         elif ma_type == "source":
-            new_asset_name = asset_name.replace(current_res_type,"src")
-            new_asset_path = f"{asset_dir}/{new_asset_name}.ma"
+            new_asset_path = component.replace(res=resolver.SOURCE_RES,file_format=resolver.MA_FORMAT).path
+        
+        else:
+            om.MGlobal.displayError(f"ma_type错误 > {ma_type}")
+            return
         
         #如果文件存在
-        if os.path.isfile(new_asset_path):
+        if self.path_resolver.exists(new_asset_path):
             #导入文件获取返回节点
             return_node = cmds.file(new_asset_path,i=True,returnNewNodes=True)
             #过滤保留transform
@@ -1910,10 +2398,430 @@ class Operator():
             
         else:
             om.MGlobal.displayError(f"{new_asset_path} 文件路径不存在")
+    
+    ##########################################################################
+    
+    def get_component_file_path(self,asset_dir=None,asset_name=None,file_format=None):
+        '''
+        根据组件节点属性得到缓存文件路径,使用resolver的路径规则,assetDir可以是资产目录或格式子目录
+        file_format > abc,gpuCache,ass
+        assetName中没有分辨率或格式不是缓存格式时返回None
+        '''
+        if not asset_dir or not asset_name or file_format not in resolver.FORMAT_FOLDERS:
+            return
+        component = resolver.from_node_attributes(asset_dir,asset_name,file_format)
+        if not component.res:
+            return
+        return component.path
+    
+    def import_component_file(self,file_path=None,file_format=None):
+        '''
+        按fileFormat导入组件缓存,返回导入的transform节点
+        '''
+        if file_format == "ass":
+            return self.import_ass(file_path)
+        elif file_format == "gpuCache":
+            return self.import_gpu_cache(file_path)
+        elif file_format == "abc":
+            return self.import_abc(file_path)
+    
+    def _plug_string(self,dep_fn,attr_name):
+        '''
+        读取字符串属性,属性不存在时返回空字符串
+        '''
+        if not dep_fn.hasAttribute(attr_name):
+            return ""
+        return dep_fn.findPlug(attr_name,False).asString()
+    
+    def ensure_parent_path(self,parent_path=None,parent_cache=None):
+        '''
+        确保长路径parent_path存在,不存在的层级使用空组创建
+        parent_cache > {长路径:是否存在} 批量还原时避免重复objExists
+        '''
+        if not parent_path:
+            return
+        if parent_cache is not None and parent_path in parent_cache:
+            return parent_path
+        
+        if not cmds.objExists(parent_path):
+            current = ""
+            for name in parent_path.strip("|").split("|"):
+                child = f"{current}|{name}"
+                if not cmds.objExists(child):
+                    if current:
+                        cmds.group(name=name,empty=True,parent=current)
+                    else:
+                        cmds.group(name=name,empty=True,world=True)
+                current = child
+        
+        if parent_cache is not None:
+            parent_cache[parent_path] = True
+        return parent_path
+    
+    @profiler.timed()
+    def collect_layout(self):
+        '''
+        通过API批量读取场景中所有组件节点的布局信息
+        return
+            columns > {列名:[str,...]} 列名见layout_snapshot.COLUMNS
+            matrices > 扁平的世界矩阵列表
+        '''
+        columns = {name:[] for name in layout_snapshot.COLUMNS}
+        matrices = []
+        
+        all_component_node = cmds.ls("*.isComponent",long=True,objectsOnly=True)
+        if not all_component_node:
+            return columns,matrices
+        
+        sel = om.MSelectionList()
+        for node in all_component_node:
+            sel.add(node)
+        
+        for i in range(sel.length()):
+            dag_path = sel.getDagPath(i)
+            dep_fn = om.MFnDependencyNode(dag_path.node())
+            
+            file_format = self._plug_string(dep_fn,"fileFormat")
+            #RootLocator导出时也会带有isComponent属性,没有fileFormat的节点跳过
+            if not file_format:
+                continue
+            
+            parent_path = om.MDagPath(dag_path)
+            parent_path.pop()
+            
+            columns["node_name"].append(dep_fn.name())
+            columns["asset_name"].append(self._plug_string(dep_fn,"assetName"))
+            columns["resolution"].append(self._plug_string(dep_fn,"resolutionType"))
+            columns["file_format"].append(file_format)
+            columns["asset_dir"].append(self._plug_string(dep_fn,"assetDir"))
+            columns["parent"].append(parent_path.fullPathName() if parent_path.length() else "")
+            matrices.extend(dag_path.inclusiveMatrix())
+        
+        profiler.current().add(nodes=len(columns["node_name"]))
+        return columns,matrices
+    
+    @profiler.timed()
+    def export_layout_snapshot(self,file_path=None):
+        '''
+        导出场景中所有组件节点的布局快照
+        file_path > 快照文件路径(.csnp)
+        '''
+        if not file_path:
+            cmds.error("file path is None")
+        
+        columns,matrices = self.collect_layout()
+        count = layout_snapshot.write_snapshot(file_path,columns,matrices)
+        print(f"导出布局快照 {count} 个节点 > {file_path}")
+        return count
+    
+    @profiler.timed()
+    def import_layout_snapshot(self,file_path=None,use_instance=True):
+        '''
+        从布局快照还原组件节点
+        相同文件的节点只导入一次,其余节点由duplicate -instanceLeaf(或完整复制)创建,名称在复制时指定,
+        复制的transform保留组件属性,不需要逐个设置
+        同一父层级的节点一次parent,最后逐个设置世界矩阵,每个节点只有复制和xform两次调用
+        file_path > 快照文件路径
+        use_instance > 是否使用实例创建重复节点
+        
+        返回新建的节点列表(长名称,与快照中的顺序一致)
+        '''
+        if not file_path or not os.path.isfile(file_path):
+            cmds.error(f"{file_path} 文件路径不存在")
+        
+        parent_cache = {}
+        
+        with layout_snapshot.read_snapshot(file_path) as snapshot:
+            node_names = snapshot.column("node_name")
+            parents = snapshot.column("parent")
+            matrices = snapshot.matrices
+            
+            #按(资产目录,资产名,格式)分组,每组只导入一次
+            group_dict = defaultdict(list)
+            for i,key in enumerate(zip(snapshot.column("asset_dir"),snapshot.column("asset_name"),snapshot.column("file_format"))):
+                group_dict[key].append(i)
+            
+            #所有缓存文件批量检查一次
+            asset_files = {key:self.get_component_file_path(*key) for key in group_dict}
+            found = self.path_resolver.exists_many(path for path in asset_files.values() if path)
+            
+            #快照索引 > 新节点长名称,父层级 > [快照索引]
+            created = {}
+            parent_dict = defaultdict(list)
+            
+            cmds.undoInfo(openChunk=True,chunkName="importLayoutSnapshot")
+            try:
+                for (asset_dir,asset_name,file_format),indices in group_dict.items():
+                    asset_file = asset_files[(asset_dir,asset_name,file_format)]
+                    if not asset_file or not found[asset_file]:
+                        om.MGlobal.displayWarning(f"{asset_file} 文件路径不存在,跳过 {len(indices)} 个节点")
+                        continue
+                    
+                    #导入的节点在世界下,复制的节点与其同级
+                    master_node = self.import_component_file(asset_file,file_format)
+                    master_node = cmds.rename(master_node,node_names[indices[0]],ignoreShape=True)
+                    created[indices[0]] = master_node
+                    for i in indices[1:]:
+                        created[i] = cmds.duplicate(master_node,name=node_names[i],instanceLeaf=use_instance)[0]
+                    for i in indices:
+                        parent_dict[parents[i]].append(i)
+                
+                #同一父层级一次parent
+                for parent,indices in parent_dict.items():
+                    parent_path = self.ensure_parent_path(parent,parent_cache)
+                    if parent_path:
+                        names = cmds.parent([self._world_path(created[i]) for i in indices],parent_path)
+                        for i,name in zip(indices,names):
+                            created[i] = f"{parent_path}|{name.split('|')[-1]}"
+                    else:
+                        for i in indices:
+                            created[i] = self._world_path(created[i])
+                
+                for i,node in created.items():
+                    cmds.xform(node,matrix=list(matrices[i * 16:(i + 1) * 16]),worldSpace=True)
+            finally:
+                cmds.undoInfo(closeChunk=True)
+        
+        new_nodes = [created[i] for i in sorted(created)]
+        profiler.current().add(nodes=len(new_nodes))
+        print(f"还原布局快照 {len(new_nodes)} 个节点 < {file_path}")
+        return new_nodes
+    
+    @staticmethod
+    def _world_path(name):
+        '''
+        世界下节点的长名称
+        '''
+        return name if name.startswith("|") else f"|{name}"
+    
+    def is_instanced_component(self,node):
+        '''
+        组件节点的子节点是否已经是实例
+        '''
+        children = cmds.listRelatives(node,children=True,fullPath=True)
+        if not children:
+            return False
+        
+        sel = om.MSelectionList()
+        sel.add(children[0])
+        return om.MFnDagNode(sel.getDagPath(0)).isInstanced()
+    
+    @profiler.timed()
+    def analyze_duplicate_components(self):
+        '''
+        分析场景中assetName,resolutionType,fileFormat都相同,但不是实例的组件节点
+        同一组中已经有实例时使用实例作为master,其余不是实例的节点都转换为master的实例
+        return [{
+            "asset_name","resolution","file_format" > 组件信息
+            "file_path" > 缓存文件路径
+            "file_size" > 缓存文件大小(byte)
+            "master" > 保留的节点,优先使用已有的实例
+            "duplicates" > 可以替换为实例的节点列表(不包含已经是实例的节点)
+            "saved_bytes" > 预计节省的内存(按缓存文件大小估算)
+        }...]
+        '''
+        report = []
+        
+        #同一目录中的文件大小只列出一次目录
+        with self.path_resolver.operation():
+            for asset_name,node_list in self.get_component_node().items():
+                if len(node_list) < 2:
+                    continue
+            
+                group_dict = defaultdict(list)
+                for node in node_list:
+                    file_format = self.get_file_format(node)
+                    if not file_format:
+                        continue
+                    res_type = cmds.getAttr(f"{node}.resolutionType")
+                    asset_dir = cmds.getAttr(f"{node}.assetDir")
+                    group_dict[(res_type,file_format,asset_dir)].append(node)
+            
+                for (res_type,file_format,asset_dir),nodes in group_dict.items():
+                    #已经是实例的节点共享几何体,不再计入,但可以作为master
+                    instanced = []
+                    copies = []
+                    for node in nodes:
+                        (instanced if self.is_instanced_component(node) else copies).append(node)
+                    if instanced:
+                        master_node,duplicates = instanced[0],copies
+                    else:
+                        master_node,duplicates = copies[0],copies[1:]
+                    if not duplicates:
+                        continue
+                
+                    file_path = self.get_component_file_path(asset_dir,asset_name,file_format)
+                    file_size = self.path_resolver.size(file_path) if file_path else 0
+                
+                    report.append({
+                        "asset_name":asset_name,
+                        "resolution":res_type,
+                        "file_format":file_format,
+                        "file_path":file_path,
+                        "file_size":file_size,
+                        "master":master_node,
+                        "duplicates":duplicates,
+                        "saved_bytes":file_size * len(duplicates),
+                    })
+        
+        report.sort(key=lambda item:item["saved_bytes"],reverse=True)
+        return report
+    
+    def print_duplicate_report(self,report=None):
+        total_nodes = sum(len(item["duplicates"]) for item in report)
+        total_bytes = sum(item["saved_bytes"] for item in report)
+        
+        print(f"{'重复数':>6}  {'格式':<9}{'分辨率':<10}{'预计节省(MB)':>12}  资产")
+        for item in report:
+            print(f"{len(item['duplicates']):>6}  {item['file_format']:<9}{item['resolution']:<10}"
+                  f"{item['saved_bytes'] / 1048576.0:>12.2f}  {item['asset_name']}")
+        print(f"共 {len(report)} 组, {total_nodes} 个重复节点可替换为实例, 预计节省 {total_bytes / 1048576.0:.2f} MB")
+    
+    @profiler.timed()
+    def consolidate_duplicate_components(self,report=None,dry_run=True):
+        '''
+        将重复的组件节点替换为master节点的实例,保留世界变换和父层级
+        所有修改在一个undo chunk中,可以一次撤销
+        report > analyze_duplicate_components的结果,为空时重新分析
+        dry_run > 只输出报告,不修改场景
+        
+        返回新建的实例节点列表
+        '''
+        if report is None:
+            report = self.analyze_duplicate_components()
+        
+        self.print_duplicate_report(report)
+        if dry_run or not report:
+            return []
+        
+        new_nodes = []
+        cmds.undoInfo(openChunk=True,chunkName="consolidateDuplicateComponents")
+        try:
+            for item in report:
+                master_node = item["master"]
+                asset_dir = cmds.getAttr(f"{master_node}.assetDir")
+                
+                for dup_node in item["duplicates"]:
+                    matrix = cmds.xform(dup_node,query=True,matrix=True,worldSpace=True)
+                    parent = cmds.listRelatives(dup_node,parent=True,fullPath=True)
+                    short_name = dup_node.split("|")[-1]
+                    
+                    cmds.select(clear=True)
+                    cmds.delete(dup_node)
+                    
+                    node = cmds.instance(master_node)[0]
+                    node = cmds.rename(node,short_name,ignoreShape=True)
+                    
+                    current_parent = cmds.listRelatives(node,parent=True,fullPath=True)
+                    if parent:
+                        if not current_parent or current_parent[0] != parent[0]:
+                            node = cmds.parent(node,parent[0])[0]
+                    elif current_parent:
+                        node = cmds.parent(node,world=True)[0]
+                    
+                    node = cmds.ls(node,long=True)[0]
+                    self.set_import_attribute(node_name=node,dir_name=asset_dir,asset_name=item["asset_name"],
+                                    file_format=item["file_format"],resolution_type=item["resolution"])
+                    cmds.xform(node,matrix=matrix,worldSpace=True)
+                    new_nodes.append(node)
+        finally:
+            cmds.undoInfo(closeChunk=True)
+        
+        print(f"已将 {len(new_nodes)} 个重复节点替换为实例")
+        return new_nodes
+    
+    def count_triangles(self,dag_path=None,dag_it=None):
+        '''
+        统计节点下所有mesh的三角面数量,跳过中间对象
+        dag_it > 复用的MItDag,批量统计时不需要每个节点创建一次
+        '''
+        total = 0
+        dag_it = dag_it or om.MItDag(om.MItDag.kDepthFirst,om.MFn.kMesh)
+        dag_it.reset(dag_path,om.MItDag.kDepthFirst,om.MFn.kMesh)
+        while not dag_it.isDone():
+            mesh_fn = om.MFnMesh(dag_it.getPath())
+            if not mesh_fn.isIntermediateObject:
+                counts,_ = mesh_fn.getTriangles()
+                total += sum(counts)
+            dag_it.next()
+        return total
+    
+    @profiler.timed()
+    def collect_scene_stats(self):
+        '''
+        通过API批量读取场景中所有组件节点,返回scene_report.build_report需要的记录
+        shape > 第一个子节点的路径,实例节点共享同一个shape
+        triangles > abc组件的三角面数量,同一个缓存文件只统计一次,gpuCache/ass为None(按文件大小估算)
+        '''
+        records = []
+        all_component_node = cmds.ls("*.isComponent",long=True,objectsOnly=True)
+        if not all_component_node:
+            return records
         
+        sel = om.MSelectionList()
+        for node in all_component_node:
+            sel.add(node)
+        
+        triangle_cache = {}
+        dag_it = None
+        for i in range(sel.length()):
+            dag_path = sel.getDagPath(i)
+            dag_fn = om.MFnDagNode(dag_path)
+            
+            file_format = self._plug_string(dag_fn,"fileFormat")
+            #RootLocator导出时也会带有isComponent属性,没有fileFormat的节点跳过
+            if not file_format:
+                continue
+            
+            asset_dir = self._plug_string(dag_fn,"assetDir")
+            asset_name = self._plug_string(dag_fn,"assetName")
+            shape = om.MFnDagNode(dag_fn.child(0)).fullPathName() if dag_fn.childCount() else ""
+            
+            key = (asset_dir,asset_name,file_format)
+            if file_format == "abc" and key not in triangle_cache:
+                dag_it = dag_it or om.MItDag(om.MItDag.kDepthFirst,om.MFn.kMesh)
+                triangle_cache[key] = self.count_triangles(dag_path,dag_it)
+            
+            records.append({
+                "node":dag_path.fullPathName(),
+                "asset_dir":asset_dir,
+                "asset_name":asset_name,
+                "file_format":file_format,
+                "resolution":self._plug_string(dag_fn,"resolutionType"),
+                "shape":shape,
+                "triangles":triangle_cache.get(key),
+            })
+        
+        profiler.current().add(nodes=len(records))
+        return records
+    
+    @profiler.timed()
+    def build_scene_report(self,file_path=None):
+        '''
+        统计场景中的组件节点,输出报告
+        file_path > 不为空时按扩展名导出 .csv 或 .json
+        '''
+        report = scene_report.build_report(self.collect_scene_stats(),path_resolver=self.path_resolver)
+        print(scene_report.format_report(report))
+        if file_path:
+            scene_report.write_report(report,file_path)
+            print(f"导出场景统计 > {file_path}")
+        return report
+
+def __getattr__(name):
+    '''
+    UI层延迟导入,只使用Operator/ExportManager等逻辑时不会加载PySide2和OpenMayaUI
+    保留 common.UI / common.maya_main_window 的访问方式
+    '''
+    if name in ("UI","maya_main_window"):
+        import ui
+        return getattr(ui,name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     
+    from ui import UI
+    
     #文件保存路径
     file_path = r"Z:\Project\DFH\Asset\component"
     #项目代号缩写
@@ -0,0 +1,148 @@
+'''
+aiStandIn和gpuCache代理的视口显示策略
+
+场景中有上千个代理时全部按实体显示会拖慢视口,按规则为每个代理选择显示级别:
+    选择的代理 > 实体显示
+    selected_only_res中的分辨率(默认hiRes) > 没有选择时显示包围盒
+    与相机距离超过far_distance > 包围盒
+    代理数量超过max_shaded时,距离相机near_distance以内的代理实体显示,其他为包围盒
+
+aiStandIn使用mode属性,gpuCache没有显示模式属性,使用显示覆盖的细节级别(包围盒)
+
+    policy = DisplayPolicy(max_shaded=2000,near_distance=2000.0)
+    levels = policy.evaluate(records,camera=(0,500,1000),selected={"|tree_ass|tree_assShape"})
+    plug_values("aiStandIn",BBOX)       #[("mode",0)]
+
+规则可以在json中配置:
+    {"max_shaded":2000,"near_distance":2000.0,"far_distance":null,"selected_only_res":["hiRes"]}
+不依赖Maya
+'''
+import json
+from collections import Counter
+
+SHADED = "shaded"
+BBOX = "bbox"
+
+#显示级别 > aiStandIn.mode (0 Bounding Box, 6 Shaded)
+STANDIN_MODES = {SHADED:6,BBOX:0}
+
+#显示级别 > gpuCache的overrideLevelOfDetail (0 Full, 1 Bounding Box)
+GPU_CACHE_LOD = {SHADED:0,BBOX:1}
+
+NODE_TYPES = ("aiStandIn","gpuCache")
+
+#超过该数量时只有相机附近的代理实体显示
+MAX_SHADED = 2000
+
+#相机附近的距离(Maya单位,厘米)
+NEAR_DISTANCE = 2000.0
+
+#只在选择时实体显示的分辨率
+SELECTED_ONLY_RES = ("hiRes",)
+
+
+class DisplayRecord():
+    '''
+    一个代理shape
+    name > shape长名称
+    node_type > aiStandIn / gpuCache
+    resolution > 从缓存文件名解析的分辨率
+    position > 世界坐标 (x,y,z)
+    '''
+    __slots__ = ("name","node_type","resolution","position")
+
+    def __init__(self,name,node_type,resolution,position):
+        self.name = name
+        self.node_type = node_type
+        self.resolution = resolution
+        self.position = position
+
+    def __repr__(self):
+        return f"<DisplayRecord {self.name} {self.resolution}>"
+
+
+def plug_values(node_type,level):
+    '''
+    返回需要设置的 [(属性,值)]
+    '''
+    if node_type == "aiStandIn":
+        return [("mode",STANDIN_MODES[level])]
+    lod = GPU_CACHE_LOD[level]
+    return [("overrideEnabled",bool(lod)),("overrideLevelOfDetail",lod)]
+
+
+class DisplayPolicy():
+
+    def __init__(self,max_shaded=MAX_SHADED,near_distance=NEAR_DISTANCE,far_distance=None,
+                 selected_only_res=SELECTED_ONLY_RES):
+        '''
+        max_shaded > 代理数量超过该值时只有near_distance以内的代理实体显示,None时不限制
+        near_distance > 相机附近的距离
+        far_distance > 超过该距离的代理显示包围盒,None时不检查
+        selected_only_res > 只在选择时实体显示的分辨率
+        '''
+        self.max_shaded = max_shaded
+        self.near_distance = near_distance
+        self.far_distance = far_distance
+        self.selected_only_res = set(selected_only_res or ())
+
+    @staticmethod
+    def _distance_squared(position,camera):
+        return sum((a - b) * (a - b) for a,b in zip(position,camera))
+
+    def level(self,record,count,camera=None,selected=()):
+        '''
+        count > 场景中代理的总数量
+        camera > 相机世界坐标,None时不检查距离
+        '''
+        if record.name in selected:
+            return SHADED
+        if record.resolution in self.selected_only_res:
+            return BBOX
+        crowded = self.max_shaded is not None and count > self.max_shaded
+        if camera is None:
+            return BBOX if crowded else SHADED
+        distance_squared = self._distance_squared(record.position,camera)
+        if self.far_distance is not None and distance_squared > self.far_distance * self.far_distance:
+            return BBOX
+        if crowded and (self.near_distance is None or distance_squared > self.near_distance * self.near_distance):
+            return BBOX
+        return SHADED
+
+    def evaluate(self,records,camera=None,selected=(),count=None):
+        '''
+        返回 {shape长名称:显示级别}
+        count > 代理总数量,增量更新只传入新增的代理时需要指定
+        '''
+        count = len(records) if count is None else count
+        return {record.name:self.level(record,count,camera,selected) for record in records}
+
+    def to_dict(self):
+        return {"max_shaded":self.max_shaded,"near_distance":self.near_distance,
+                "far_distance":self.far_distance,"selected_only_res":sorted(self.selected_only_res)}
+
+
+def load_config(file_path):
+    '''
+    从json创建DisplayPolicy,没有配置的项使用默认值
+    '''
+    with open(file_path,"r",encoding="utf-8") as f:
+        config = json.load(f)
+    return DisplayPolicy(max_shaded=config.get("max_shaded",MAX_SHADED),
+                         near_distance=config.get("near_distance",NEAR_DISTANCE),
+                         far_distance=config.get("far_distance"),
+                         selected_only_res=config.get("selected_only_res",SELECTED_ONLY_RES))
+
+
+def format_report(report):
+    '''
+    report > DisplayManager.apply的返回值
+    '''
+    levels = Counter(report["levels"])
+    lines = [f"代理 {report['nodes']}  实体 {levels[SHADED]}  包围盒 {levels[BBOX]}  "
+             f"修改 {report['changed']}  {report['seconds']:.3f}s"]
+    if report.get("draw_before") is not None and report.get("draw_after") is not None:
+        before,after = report["draw_before"],report["draw_after"]
+        change = (after - before) / before if before else 0.0
+        lines.append(f"视口刷新 {before * 1000:.1f}ms > {after * 1000:.1f}ms ({change:+.0%})")
+    return "\n".join(lines)
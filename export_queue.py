@@ -0,0 +1,159 @@
+'''
+多资产导出队列和可恢复的导出日志
+
+队列中每一项为 (RootLocator,资产名),按顺序为每一项创建导出任务(Operator.create_export_job)
+每导出一个 (组件id,分辨率,格式) 立即在日志中追加一行,重新执行时跳过已经完成的输出:
+    {file_path}/.export_journal_{project_code}_{scene}.jsonl
+    {"component":"DFH_fhsj_tree","res":"hiRes","format":"abc","root":"|tree_root","time":1700000000.0}
+
+日志只追加,崩溃时最多丢失最后一行,读取时忽略不完整的行
+日志中已完成但文件已经被删除的输出由 Operator.plan_export_queue 重新导出
+
+    journal = Journal(default_journal_path(file_path,"DFH","fhsj"))
+    queue = ExportQueue([("|tree_root","tree"),("|rock_root","rock")],journal,total_outputs=24)
+    queue.status_text()       #资产 1/2  输出 5/24  0.8 个/秒  剩余 24 秒
+不依赖Maya
+'''
+import os,json,time
+
+JOURNAL_PREFIX = ".export_journal"
+
+
+def default_journal_path(file_path,project_code,scene):
+    return f"{file_path.replace(chr(92),'/').rstrip('/')}/{JOURNAL_PREFIX}_{project_code}_{scene}.jsonl"
+
+
+def component_id(project_code,scene,asset_name):
+    return f"{project_code}_{scene}_{asset_name}"
+
+
+class Journal():
+
+    def __init__(self,path):
+        self.path = path
+        #(组件id,分辨率,格式)
+        self.completed = set()
+        self.load()
+
+    def load(self):
+        self.completed.clear()
+        try:
+            with open(self.path,"r",encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        #崩溃时写入不完整的行
+                        continue
+                    self.completed.add((record["component"],record["res"],record["format"]))
+        except OSError:
+            pass
+        return self
+
+    def is_done(self,component,res,file_format):
+        return (component,res,file_format) in self.completed
+
+    def forget(self,component,res,file_format):
+        '''
+        只在内存中移除,文件丢失的输出重新导出后会再次记录
+        '''
+        self.completed.discard((component,res,file_format))
+
+    def record(self,component,res,file_format,root=None):
+        '''
+        追加一行并立即写入磁盘
+        '''
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory,exist_ok=True)
+        line = json.dumps({"component":component,"res":res,"format":file_format,"root":root,"time":time.time()},
+                          ensure_ascii=False)
+        with open(self.path,"a",encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.completed.add((component,res,file_format))
+
+    def reset(self):
+        '''
+        删除日志,重新导出所有输出
+        '''
+        self.completed.clear()
+        if os.path.isfile(self.path):
+            os.remove(self.path)
+
+
+class ExportQueue():
+
+    def __init__(self,items,journal,total_outputs=0,failed=None):
+        '''
+        items > [(RootLocator,资产名),...] 按顺序导出
+        journal > Journal
+        total_outputs > 本次需要导出的输出数量,日志中已经完成的输出不计入
+        failed > 计划时已经失败的 [(队列项,错误信息),...],不导出,在结果中报告
+        '''
+        self.items = list(items)
+        self.journal = journal
+        self.total_outputs = total_outputs
+        self.done_outputs = 0
+        self.index = -1
+        self.failed = list(failed or [])
+        self.cancelled = False
+        self.start_time = None
+        self.end_time = None
+
+    def next_item(self):
+        '''
+        返回下一项 (RootLocator,资产名),队列完成或取消时返回None
+        '''
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+        self.index += 1
+        if self.cancelled or self.index >= len(self.items):
+            self.end_time = self.end_time or time.perf_counter()
+            return None
+        return self.items[self.index]
+
+    def output_done(self,count=1):
+        self.done_outputs += count
+
+    def item_failed(self,message=""):
+        self.failed.append((self.items[self.index],message))
+
+    def cancel(self):
+        self.cancelled = True
+
+    @property
+    def finished(self):
+        return self.end_time is not None
+
+    @property
+    def elapsed(self):
+        if self.start_time is None:
+            return 0.0
+        return (self.end_time or time.perf_counter()) - self.start_time
+
+    @property
+    def throughput(self):
+        elapsed = self.elapsed
+        if elapsed <= 0:
+            return 0.0
+        return self.done_outputs / elapsed
+
+    @property
+    def eta(self):
+        rate = self.throughput
+        if not rate:
+            return None
+        return max(0.0,(self.total_outputs - self.done_outputs) / rate)
+
+    def status_text(self):
+        current = min(self.index + 1,len(self.items))
+        text = (f"资产 {current}/{len(self.items)}  输出 {self.done_outputs}/{self.total_outputs}"
+                f"  {self.throughput:.2f} 个/秒")
+        eta = self.eta
+        if eta is not None and not self.finished:
+            text += f"  剩余 {eta:.0f} 秒"
+        if self.failed:
+            text += f"  失败 {len(self.failed)}"
+        return text
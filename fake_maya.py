@@ -0,0 +1,1779 @@
+'''
+不依赖Maya的场景模型,实现 common.py 使用到的 maya.cmds / maya.mel / maya.api.OpenMaya 子集
+用于在没有Maya授权的环境中跑性能测试和调试
+
+    import fake_maya
+    scene = fake_maya.install()     #注册到sys.modules,之后 import maya.cmds 得到假实现
+    import common
+
+    scene.call_counts               #每个cmds命令的调用次数
+
+实现范围:
+    DAG层级(transform/shape,实例共享子节点),动态属性,TRS与世界矩阵
+    ls/getAttr/setAttr/addAttr/attributeQuery/listRelatives/xform/group/createNode/parent/instance...
+    MSelectionList/MDagPath/MItDag/MFnDependencyNode/MFnDagNode/MFnMesh/MFnTransform/MItDependencyGraph
+    简单的材质网络(mesh > shadingEngine < material < file)
+    AbcExport/gpuCache/arnoldExportAss/file 导出时写入占位文件
+'''
+import os,sys,math,types,fnmatch,shlex
+from collections import Counter,defaultdict
+
+##########################################################################
+# 矩阵
+##########################################################################
+
+IDENTITY = (1.0,0.0,0.0,0.0, 0.0,1.0,0.0,0.0, 0.0,0.0,1.0,0.0, 0.0,0.0,0.0,1.0)
+
+
+def mat_mul(a,b):
+    '''
+    4x4行优先矩阵相乘(Maya行向量约定 p' = p * M)
+    '''
+    return tuple(
+        a[r * 4] * b[c] + a[r * 4 + 1] * b[4 + c] + a[r * 4 + 2] * b[8 + c] + a[r * 4 + 3] * b[12 + c]
+        for r in range(4) for c in range(4)
+    )
+
+
+def mat_inverse(m):
+    '''
+    高斯-约旦消元求逆
+    '''
+    a = [list(m[r * 4:r * 4 + 4]) + [1.0 if r == c else 0.0 for c in range(4)] for r in range(4)]
+    for col in range(4):
+        pivot = max(range(col,4),key=lambda r:abs(a[r][col]))
+        if abs(a[pivot][col]) < 1e-12:
+            raise ValueError("matrix is singular")
+        a[col],a[pivot] = a[pivot],a[col]
+        factor = a[col][col]
+        a[col] = [v / factor for v in a[col]]
+        for r in range(4):
+            if r != col and a[r][col]:
+                f = a[r][col]
+                a[r] = [v - f * p for v,p in zip(a[r],a[col])]
+    return tuple(a[r][4 + c] for r in range(4) for c in range(4))
+
+
+def compose(translate,rotate,scale):
+    '''
+    TRS(旋转顺序xyz,角度) > 矩阵
+    '''
+    rx,ry,rz = [math.radians(v) for v in rotate]
+    cx,sx = math.cos(rx),math.sin(rx)
+    cy,sy = math.cos(ry),math.sin(ry)
+    cz,sz = math.cos(rz),math.sin(rz)
+    rot = (
+        (cy * cz, cy * sz, -sy),
+        (sx * sy * cz - cx * sz, sx * sy * sz + cx * cz, sx * cy),
+        (cx * sy * cz + sx * sz, cx * sy * sz - sx * cz, cx * cy),
+    )
+    m = []
+    for r in range(3):
+        m.extend([rot[r][0] * scale[r],rot[r][1] * scale[r],rot[r][2] * scale[r],0.0])
+    m.extend([translate[0],translate[1],translate[2],1.0])
+    return tuple(m)
+
+
+def decompose(m):
+    '''
+    矩阵 > (translate,rotate(角度),scale),不处理负缩放和切变
+    '''
+    translate = [m[12],m[13],m[14]]
+    scale = [math.sqrt(m[r * 4] ** 2 + m[r * 4 + 1] ** 2 + m[r * 4 + 2] ** 2) for r in range(3)]
+    rot = [[m[r * 4 + c] / (scale[r] or 1.0) for c in range(3)] for r in range(3)]
+
+    sy = max(-1.0,min(1.0,-rot[0][2]))
+    y = math.asin(sy)
+    if abs(math.cos(y)) > 1e-8:
+        x = math.atan2(rot[1][2],rot[2][2])
+        z = math.atan2(rot[0][1],rot[0][0])
+    else:
+        x = math.atan2(-rot[2][1],rot[1][1])
+        z = 0.0
+    return translate,[math.degrees(x),math.degrees(y),math.degrees(z)],scale
+
+
+##########################################################################
+# 场景
+##########################################################################
+
+SHAPE_TYPES = {"mesh","locator","aiStandIn","gpuCache","camera","nurbsCurve"}
+DAG_TYPES = {"transform"} | SHAPE_TYPES
+
+TRANSFORM_ATTRS = {
+    "translateX":0.0,"translateY":0.0,"translateZ":0.0,
+    "rotateX":0.0,"rotateY":0.0,"rotateZ":0.0,
+    "scaleX":1.0,"scaleY":1.0,"scaleZ":1.0,
+    "rotatePivotX":0.0,"rotatePivotY":0.0,"rotatePivotZ":0.0,
+    "scalePivotX":0.0,"scalePivotY":0.0,"scalePivotZ":0.0,
+    "visibility":True,
+    "overrideEnabled":False,"overrideLevelOfDetail":0,
+}
+
+NODE_DEFAULT_ATTRS = {
+    "transform":TRANSFORM_ATTRS,
+    "locator":{"localScaleX":1.0,"localScaleY":1.0,"localScaleZ":1.0,"visibility":True},
+    "mesh":{"visibility":True,"numPolygons":0,"numVertices":0,"numTriangles":0,
+            "overrideEnabled":False,"overrideLevelOfDetail":0},
+    "aiStandIn":{"dso":"","mode":6,"visibility":True,"overrideEnabled":False,"overrideLevelOfDetail":0,
+                 "MinBoundingBox0":-1.0,"MinBoundingBox1":-1.0,"MinBoundingBox2":-1.0,
+                 "MaxBoundingBox0":1.0,"MaxBoundingBox1":1.0,"MaxBoundingBox2":1.0},
+    "gpuCache":{"cacheFileName":"","cacheGeomPath":"|","visibility":True,
+                "overrideEnabled":False,"overrideLevelOfDetail":0},
+    "file":{"fileTextureName":"","uvTilingMode":0,"colorSpace":"sRGB","ignoreColorSpaceFileRules":False},
+    "shadingEngine":{},
+    "lambert":{},
+    "aiStandardSurface":{},
+}
+
+COMPOUND_ATTRS = {
+    "translate":("translateX","translateY","translateZ"),
+    "rotate":("rotateX","rotateY","rotateZ"),
+    "scale":("scaleX","scaleY","scaleZ"),
+    "rotatePivot":("rotatePivotX","rotatePivotY","rotatePivotZ"),
+    "scalePivot":("scalePivotX","scalePivotY","scalePivotZ"),
+    "MinBoundingBox":("MinBoundingBox0","MinBoundingBox1","MinBoundingBox2"),
+    "MaxBoundingBox":("MaxBoundingBox0","MaxBoundingBox1","MaxBoundingBox2"),
+}
+
+#Maya短属性名
+SHORT_ATTRS = {"t":"translate","r":"rotate","s":"scale","v":"visibility","ftn":"fileTextureName",
+               "cfn":"cacheFileName","tx":"translateX","ty":"translateY","tz":"translateZ",
+               "rx":"rotateX","ry":"rotateY","rz":"rotateZ","sx":"scaleX","sy":"scaleY","sz":"scaleZ"}
+
+
+class Node():
+    __slots__ = ("name","type","parents","children","attrs","dynamic","locked")
+
+    def __init__(self,name,node_type):
+        self.name = name
+        self.type = node_type
+        self.parents = []
+        self.children = []
+        self.attrs = dict(NODE_DEFAULT_ATTRS.get(node_type,{}))
+        self.dynamic = set()
+        self.locked = set()
+
+    def __repr__(self):
+        return f"<Node {self.type} {self.name}>"
+
+    @property
+    def is_dag(self):
+        return self.type in DAG_TYPES
+
+    @property
+    def is_shape(self):
+        return self.type in SHAPE_TYPES
+
+    def local_matrix(self):
+        if self.type != "transform":
+            return IDENTITY
+        a = self.attrs
+        return compose((a["translateX"],a["translateY"],a["translateZ"]),
+                       (a["rotateX"],a["rotateY"],a["rotateZ"]),
+                       (a["scaleX"],a["scaleY"],a["scaleZ"]))
+
+    def set_local_matrix(self,matrix):
+        translate,rotate,scale = decompose(matrix)
+        for axis,t,r,s in zip("XYZ",translate,rotate,scale):
+            self.attrs["translate" + axis] = t
+            self.attrs["rotate" + axis] = r
+            self.attrs["scale" + axis] = s
+
+
+class Scene():
+
+    def __init__(self):
+        #id > Node,保持创建顺序
+        self.nodes = {}
+        self.by_name = defaultdict(list)
+        #世界下的节点,使用dict保持顺序并且O(1)删除
+        self.world = {}
+        self.selection = []
+        #(src,src_attr,dst,dst_attr)
+        self.connections = []
+        self._inputs = defaultdict(list)
+        self._outputs = defaultdict(list)
+        self.call_counts = Counter()
+        self.messages = []
+        self.undo_depth = 0
+        #最外层undo chunk的名称,按打开顺序
+        self.undo_chunks = []
+        self.current_time = 1.0
+        self._name_counter = Counter()
+        #父节点id(世界为None) > 子节点名称计数,用于同级重名检查
+        self._child_names = defaultdict(Counter)
+        #回调id > (消息,节点类型或事件名称,函数,clientData)
+        self.callbacks = {}
+        #evalDeferred的函数,idle()时执行
+        self.deferred = []
+        #gpuCache -edit -refresh 的节点名称 > 次数
+        self.refreshed = Counter()
+
+    ######################################################################
+
+    def _taken(self,name,parents):
+        if parents is None:
+            return bool(self.by_name.get(name))
+        return any(self._child_names[key][name] for key in parents)
+
+    def unique_name(self,name,parents=None):
+        '''
+        DAG节点只需要在同级中唯一(与Maya一致),其他节点全局唯一
+        parents > 父节点key列表(id或None),None表示全局检查
+        '''
+        name = name.split("|")[-1]
+        if not self._taken(name,parents):
+            return name
+        base = name.rstrip("0123456789") or name
+        while True:
+            self._name_counter[base] += 1
+            candidate = f"{base}{self._name_counter[base]}"
+            if not self._taken(candidate,parents):
+                return candidate
+
+    def create(self,node_type,name=None,parent=None,exact=False):
+        '''
+        创建节点,parent为Node或None(世界)
+        新节点名称全局唯一(与createNode/group一致)
+        exact > 只检查同级重名,用于模拟导入/复制后出现的同名节点
+        '''
+        name = name or f"{node_type}1"
+        if exact and node_type in DAG_TYPES:
+            name = self.unique_name(name,[self._key(parent)])
+        else:
+            name = self.unique_name(name)
+        node = Node(name,node_type)
+        self.nodes[id(node)] = node
+        self.by_name[node.name].append(node)
+        if node.is_dag:
+            self.attach(node,parent)
+        if self.callbacks:
+            self.notify_node("nodeAdded",node)
+        return node
+
+    def notify_node(self,message,node):
+        for kind,node_type,func,client in list(self.callbacks.values()):
+            if kind == message and node_type in ("dependNode",node.type):
+                func(MObject(node),client)
+
+    def notify_event(self,event):
+        for kind,name,func,client in list(self.callbacks.values()):
+            if kind == "event" and name == event:
+                func(client)
+
+    def idle(self):
+        '''
+        执行evalDeferred的函数,与Maya空闲时一致
+        '''
+        while self.deferred:
+            self.deferred.pop(0)()
+
+    @staticmethod
+    def _key(parent):
+        return None if parent is None else id(parent)
+
+    def attach(self,node,parent=None):
+        self._child_names[self._key(parent)][node.name] += 1
+        if parent is None:
+            node.parents.append(None)
+            self.world[node] = None
+        else:
+            node.parents.append(parent)
+            parent.children.append(node)
+
+    def detach(self,node,parent=None):
+        if parent in node.parents:
+            self._child_names[self._key(parent)][node.name] -= 1
+        if parent is None:
+            self.world.pop(node,None)
+        elif node in parent.children:
+            parent.children.remove(node)
+        if parent in node.parents:
+            node.parents.remove(parent)
+
+    def rename(self,node,new_name):
+        '''
+        重命名时名称全局唯一,避免transform与其shape同名导致短名称解析歧义
+        '''
+        new_name = new_name.split("|")[-1]
+        if new_name == node.name:
+            return node.name
+        unique = self.unique_name(new_name)
+        keys = [self._key(parent) for parent in node.parents]
+        for key in keys:
+            self._child_names[key][node.name] -= 1
+            self._child_names[key][unique] += 1
+        self.by_name[node.name].remove(node)
+        node.name = unique
+        self.by_name[node.name].append(node)
+        return node.name
+
+    def delete(self,node):
+        if id(node) not in self.nodes:
+            return
+        if self.callbacks:
+            self.notify_node("nodeRemoved",node)
+        for parent in list(node.parents):
+            self.detach(node,parent)
+        for child in list(node.children):
+            self.detach(child,node)
+            if not child.parents:
+                self.delete(child)
+        for conn in [c for c in self.connections if c[0] is node or c[2] is node]:
+            self.disconnect(*conn)
+        del self.nodes[id(node)]
+        self.by_name[node.name].remove(node)
+        self.selection = [path for path in self.selection if path[-1] is not node]
+
+    def connect(self,src,src_attr,dst,dst_attr):
+        conn = (src,src_attr,dst,dst_attr)
+        self.connections.append(conn)
+        self._outputs[src].append(conn)
+        self._inputs[dst].append(conn)
+
+    def disconnect(self,src,src_attr,dst,dst_attr):
+        conn = (src,src_attr,dst,dst_attr)
+        self.connections.remove(conn)
+        self._outputs[src].remove(conn)
+        self._inputs[dst].remove(conn)
+
+    def inputs(self,node):
+        return self._inputs.get(node,[])
+
+    def outputs(self,node):
+        return self._outputs.get(node,[])
+
+    ######################################################################
+    # 路径,路径为根到节点的Node列表
+
+    def primary_path(self,node):
+        path = []
+        while node is not None:
+            path.append(node)
+            node = node.parents[0] if node.parents else None
+        return path[::-1]
+
+    def all_paths(self,node):
+        if not node.parents:
+            return [[node]]
+        result = []
+        for parent in node.parents:
+            if parent is None:
+                result.append([node])
+            else:
+                result.extend(p + [node] for p in self.all_paths(parent))
+        return result
+
+    def path_name(self,path):
+        return "|" + "|".join(n.name for n in path)
+
+    def resolve(self,name):
+        '''
+        名称或长路径 > 路径(Node列表),不存在时返回None
+        '''
+        if isinstance(name,(list,tuple)):
+            return list(name)
+        if isinstance(name,Node):
+            return self.primary_path(name)
+        name = str(name).split(".")[0]
+        if not name:
+            return None
+        is_long = name.startswith("|")
+        parts = [p.split(":")[-1] for p in name.strip("|").split("|")]
+        candidates = self.by_name.get(parts[-1])
+        if not candidates:
+            return None
+        for node in candidates:
+            if not node.is_dag:
+                return [node]
+            for path in self.all_paths(node):
+                names = [n.name for n in path]
+                if is_long:
+                    if names == parts:
+                        return path
+                elif names[-len(parts):] == parts:
+                    return path
+        return None
+
+    def node(self,name):
+        path = self.resolve(name)
+        return path[-1] if path else None
+
+    def world_matrix(self,path):
+        matrix = IDENTITY
+        for node in path:
+            matrix = mat_mul(node.local_matrix(),matrix)
+        return matrix
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value,(list,tuple)):
+        result = []
+        for v in value:
+            result.extend(_as_list(v))
+        return result
+    return [value]
+
+
+##########################################################################
+# maya.cmds
+##########################################################################
+
+class FakeCmds():
+    '''
+    绑定到Scene的cmds命令集合
+    '''
+
+    def __init__(self,scene):
+        self.scene = scene
+
+    def _count(self,name):
+        self.scene.call_counts[name] += 1
+
+    def _name(self,path,long=True):
+        if long:
+            return self.scene.path_name(path)
+        return path[-1].name
+
+    def _path(self,name):
+        path = self.scene.resolve(name)
+        if path is None:
+            raise ValueError(f"No object matches name: {name}")
+        return path
+
+    @staticmethod
+    def _attr_owner(node,attr):
+        '''
+        与Maya一致,transform上不存在的属性转发到第一个shape
+        '''
+        if attr not in node.attrs and node.type == "transform":
+            for child in node.children:
+                if child.is_shape and attr in child.attrs:
+                    return child
+        return node
+
+    @staticmethod
+    def _split_plug(plug):
+        node,attr = plug.split(".",1)
+        attr = attr.strip()
+        return node,SHORT_ATTRS.get(attr,attr)
+
+    ######################################################################
+
+    def error(self,message=""):
+        self._count("error")
+        raise RuntimeError(message)
+
+    def warning(self,message=""):
+        self._count("warning")
+        self.scene.messages.append(("warning",message))
+
+    def objExists(self,name):
+        self._count("objExists")
+        return self.scene.resolve(name) is not None
+
+    def ls(self,*args,**kwargs):
+        self._count("ls")
+        scene = self.scene
+        long = kwargs.get("long",kwargs.get("l",False))
+        node_type = _as_list(kwargs.get("type",kwargs.get("typ")))
+
+        if kwargs.get("selection",kwargs.get("sl",False)):
+            paths = list(scene.selection)
+            if kwargs.get("dag"):
+                #选择的节点及其所有子节点
+                expanded = []
+                stack = list(reversed(paths))
+                while stack:
+                    current = stack.pop()
+                    expanded.append(current)
+                    stack.extend(current + [child] for child in reversed(current[-1].children))
+                paths = expanded
+        elif args:
+            paths = []
+            for pattern in _as_list(args):
+                attr = None
+                if "." in pattern:
+                    pattern,attr = pattern.split(".",1)
+                if any(ch in pattern for ch in "*?["):
+                    short = pattern.split("|")[-1]
+                    for node in list(scene.nodes.values()):
+                        if fnmatch.fnmatchcase(node.name,short) and (attr is None or attr in node.attrs):
+                            paths.append(scene.primary_path(node))
+                else:
+                    path = scene.resolve(pattern)
+                    if path and (attr is None or attr in path[-1].attrs):
+                        paths.append(path)
+        else:
+            paths = [scene.primary_path(node) for node in scene.nodes.values()]
+
+        if node_type:
+            paths = [p for p in paths if p[-1].type in node_type]
+        if kwargs.get("shapes"):
+            paths = [p for p in paths if p[-1].is_shape]
+        if kwargs.get("transforms"):
+            paths = [p for p in paths if p[-1].type == "transform"]
+
+        return [self._name(p,long) for p in paths]
+
+    def nodeType(self,name):
+        self._count("nodeType")
+        return self._path(name)[-1].type
+
+    def getAttr(self,plug,**kwargs):
+        self._count("getAttr")
+        name,attr = self._split_plug(plug)
+        path = self._path(name)
+        node = self._attr_owner(path[-1],attr)
+        if attr == "worldMatrix":
+            return list(self.scene.world_matrix(path))
+        if attr in COMPOUND_ATTRS:
+            return [tuple(node.attrs[a] for a in COMPOUND_ATTRS[attr])]
+        if attr not in node.attrs:
+            raise ValueError(f"No object matches name: {plug}")
+        return node.attrs[attr]
+
+    def setAttr(self,plug,*values,**kwargs):
+        self._count("setAttr")
+        name,attr = self._split_plug(plug)
+        node = self._attr_owner(self._path(name)[-1],attr)
+        if "lock" in kwargs or "l" in kwargs:
+            if kwargs.get("lock",kwargs.get("l")):
+                node.locked.add(attr)
+            else:
+                node.locked.discard(attr)
+            if not values:
+                return
+        if attr in COMPOUND_ATTRS:
+            for a,v in zip(COMPOUND_ATTRS[attr],values):
+                node.attrs[a] = v
+            return
+        if attr not in node.attrs:
+            raise RuntimeError(f"setAttr: No object matches name: {plug}")
+        if attr in node.locked:
+            raise RuntimeError(f"setAttr: The attribute '{plug}' is locked or connected and cannot be modified.")
+        node.attrs[attr] = values[0] if values else None
+
+    def addAttr(self,node_name,longName=None,dataType=None,attributeType=None,**kwargs):
+        self._count("addAttr")
+        node = self._path(node_name)[-1]
+        attr = longName or kwargs.get("ln")
+        if attr in node.attrs:
+            raise RuntimeError(f"Found a matching attribute of name {attr}")
+        if dataType:
+            default = None
+        elif attributeType == "bool":
+            default = False
+        else:
+            default = kwargs.get("defaultValue",0)
+        node.attrs[attr] = default
+        node.dynamic.add(attr)
+
+    def attributeQuery(self,attr,node=None,exists=False,**kwargs):
+        self._count("attributeQuery")
+        target = self._path(node)[-1]
+        return attr in target.attrs or attr in COMPOUND_ATTRS
+
+    def listRelatives(self,name=None,children=False,parent=False,shapes=False,fullPath=False,
+                      allDescendents=False,type=None,**kwargs):
+        self._count("listRelatives")
+        children = children or kwargs.get("c",False)
+        parent = parent or kwargs.get("p",False)
+        shapes = shapes or kwargs.get("s",False)
+        fullPath = fullPath or kwargs.get("f",False)
+        allDescendents = allDescendents or kwargs.get("ad",False)
+
+        result = []
+        for item in _as_list(name):
+            path = self._path(item)
+            if parent:
+                if len(path) > 1:
+                    result.append(path[:-1])
+                continue
+            if allDescendents:
+                stack = [path]
+                while stack:
+                    current = stack.pop()
+                    for child in current[-1].children:
+                        result.append(current + [child])
+                        stack.append(current + [child])
+            else:
+                result.extend(path + [child] for child in path[-1].children)
+
+        if shapes:
+            result = [p for p in result if p[-1].is_shape]
+        if type:
+            types_ = _as_list(type)
+            result = [p for p in result if p[-1].type in types_]
+        if not result:
+            return None
+        return [self._name(p,fullPath) for p in result]
+
+    def xform(self,name=None,query=False,translation=None,rotation=None,scale=None,matrix=None,
+              worldSpace=False,objectSpace=False,**kwargs):
+        self._count("xform")
+        query = query or kwargs.get("q",False)
+        translation = translation if translation is not None else kwargs.get("t")
+        rotation = rotation if rotation is not None else kwargs.get("ro")
+        matrix = matrix if matrix is not None else kwargs.get("m")
+        worldSpace = worldSpace or kwargs.get("ws",False)
+
+        path = self._path(name)
+        node = path[-1]
+        if query:
+            local = node.local_matrix()
+            m = self.scene.world_matrix(path) if worldSpace else local
+            if matrix:
+                return list(m)
+            t,r,s = decompose(m)
+            if translation:
+                return t
+            if rotation:
+                return r
+            if scale:
+                return s
+            return None
+
+        if matrix is not None:
+            m = tuple(float(v) for v in matrix)
+            if worldSpace and len(path) > 1:
+                m = mat_mul(m,mat_inverse(self.scene.world_matrix(path[:-1])))
+            node.set_local_matrix(m)
+            return
+        for prefix,values in (("translate",translation),("rotate",rotation),("scale",scale)):
+            if values not in (None,True,False):
+                for axis,v in zip("XYZ",values):
+                    node.attrs[prefix + axis] = float(v)
+
+    ######################################################################
+
+    def group(self,*nodes,name=None,empty=False,parent=None,world=False,**kwargs):
+        self._count("group")
+        scene = self.scene
+        parent_node = scene.node(parent) if parent else None
+        group_node = scene.create("transform",name or "group1",parent_node)
+        if not empty:
+            for item in _as_list(nodes) or [self._name(p) for p in scene.selection]:
+                child_path = self._path(item)
+                old_parent = child_path[-2] if len(child_path) > 1 else None
+                scene.detach(child_path[-1],old_parent)
+                scene.attach(child_path[-1],group_node)
+        return group_node.name
+
+    def createNode(self,node_type,name=None,parent=None,**kwargs):
+        self._count("createNode")
+        scene = self.scene
+        name = name or kwargs.get("n")
+        parent = parent or kwargs.get("p")
+        parent_node = scene.node(parent) if parent else None
+        if node_type in SHAPE_TYPES and parent_node is None:
+            parent_node = scene.create("transform","transform1")
+        node = scene.create(node_type,name,parent_node)
+        return node.name
+
+    def spaceLocator(self,name="locator1",position=None,**kwargs):
+        self._count("spaceLocator")
+        transform = self.scene.create("transform",name)
+        self.scene.create("locator",f"{transform.name}Shape",transform)
+        return [transform.name]
+
+    def rename(self,name,new_name,ignoreShape=False,**kwargs):
+        self._count("rename")
+        return self.scene.rename(self._path(name)[-1],new_name)
+
+    def delete(self,*names,**kwargs):
+        self._count("delete")
+        targets = _as_list(names) or [self._name(p) for p in self.scene.selection]
+        for name in targets:
+            path = self.scene.resolve(name)
+            if path:
+                self.scene.delete(path[-1])
+
+    def select(self,*names,clear=False,add=False,**kwargs):
+        self._count("select")
+        scene = self.scene
+        names = [n for n in _as_list(names) if n]
+        if clear or not names:
+            scene.selection = []
+        else:
+            paths = [self._path(n) for n in names]
+            scene.selection = (scene.selection if add else []) + paths
+        scene.notify_event("SelectionChanged")
+
+    def parent(self,*args,world=False,**kwargs):
+        self._count("parent")
+        scene = self.scene
+        items = _as_list(args)
+        if world or kwargs.get("w"):
+            targets,new_parent = items,None
+        else:
+            targets,new_parent = items[:-1],scene.node(items[-1])
+        result = []
+        for name in targets:
+            path = self._path(name)
+            node = path[-1]
+            old_parent = path[-2] if len(path) > 1 else None
+            if old_parent is new_parent:
+                raise RuntimeError(f"Maya command error: {node.name} is already a child of {items[-1]}.")
+            scene.detach(node,old_parent)
+            scene.attach(node,new_parent)
+            result.append(node.name)
+        return result
+
+    def instance(self,name,**kwargs):
+        self._count("instance")
+        scene = self.scene
+        path = self._path(name)
+        node = path[-1]
+        parent = path[-2] if len(path) > 1 else None
+        new_node = scene.create(node.type,node.name,parent)
+        #实例只复制内置属性,动态属性不会继承
+        new_node.attrs.update({k:v for k,v in node.attrs.items() if k not in node.dynamic})
+        for child in node.children:
+            scene.attach(child,new_node)
+        return [new_node.name]
+
+    def _copy_tree(self,node,parent,name=None,exact=False,instance_leaf=False):
+        new_node = self.scene.create(node.type,name or node.name,parent,exact=exact)
+        new_node.attrs.update(node.attrs)
+        new_node.dynamic = set(node.dynamic)
+        #子节点保留原名称(同级唯一),instanceLeaf时shape共享
+        for child in node.children:
+            if instance_leaf and not child.children:
+                self.scene.attach(child,new_node)
+            else:
+                self._copy_tree(child,new_node,exact=True,instance_leaf=instance_leaf)
+        return new_node
+
+    def duplicate(self,*names,name=None,instanceLeaf=False,renameChildren=False,**kwargs):
+        self._count("duplicate")
+        result = []
+        for item in _as_list(names) or [self._name(p) for p in self.scene.selection]:
+            path = self._path(item)
+            parent = path[-2] if len(path) > 1 else None
+            new_node = self._copy_tree(path[-1],parent,name or kwargs.get("n"),
+                                       instance_leaf=instanceLeaf or kwargs.get("ilf",False))
+            result.append(new_node.name)
+        return result
+
+    ######################################################################
+
+    def pluginInfo(self,name,query=False,loaded=False,**kwargs):
+        self._count("pluginInfo")
+        return True
+
+    def loadPlugin(self,name,**kwargs):
+        self._count("loadPlugin")
+
+    def undoInfo(self,openChunk=False,closeChunk=False,**kwargs):
+        self._count("undoInfo")
+        if openChunk:
+            if not self.scene.undo_depth:
+                self.scene.undo_chunks.append(kwargs.get("chunkName",""))
+            self.scene.undo_depth += 1
+        if closeChunk:
+            self.scene.undo_depth -= 1
+
+    def currentTime(self,*args,query=False,**kwargs):
+        self._count("currentTime")
+        if query or kwargs.get("q"):
+            return self.scene.current_time
+        if args:
+            self.scene.current_time = args[0]
+
+    def inViewMessage(self,**kwargs):
+        self._count("inViewMessage")
+
+    def refresh(self,**kwargs):
+        self._count("refresh")
+
+    def evalDeferred(self,func,**kwargs):
+        self._count("evalDeferred")
+        if callable(func):
+            self.scene.deferred.append(func)
+
+    def _write(self,path,size=64):
+        '''
+        写入占位文件,大小随导出的面数增长,最大64KB
+        '''
+        folder = os.path.dirname(path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        with open(path,"wb") as f:
+            f.write(b"\0" * min(size,65536))
+
+    def _polygon_count(self,names):
+        total = 0
+        for name in names:
+            path = self.scene.resolve(name)
+            if not path:
+                continue
+            stack = [path[-1]]
+            while stack:
+                node = stack.pop()
+                total += node.attrs.get("numPolygons",0) or 0
+                stack.extend(node.children)
+        return total
+
+    def AbcExport(self,j=None,**kwargs):
+        self._count("AbcExport")
+        for job in _as_list(j or kwargs.get("jobArg")):
+            tokens = shlex.split(job)
+            roots = [tokens[i + 1] for i,t in enumerate(tokens) if t == "-root"]
+            file_path = tokens[tokens.index("-file") + 1]
+            self._write(file_path,64 + self._polygon_count(roots) * 16)
+
+    def AbcImport(self,file_path,mode="import",reparent=None,**kwargs):
+        self._count("AbcImport")
+        parent = self.scene.node(reparent) if reparent else None
+        base_name = os.path.splitext(os.path.basename(file_path))[0]
+        transform = self.scene.create("transform",f"{base_name}_geo",parent)
+        mesh = self.scene.create("mesh",f"{base_name}_geoShape",transform)
+        mesh.attrs["numPolygons"] = max(0,(os.path.getsize(file_path) - 64) // 16) if os.path.isfile(file_path) else 0
+        return transform.name
+
+    def arnoldExportAss(self,filename=None,selected=False,mask=None,lightLinks=1,shadowLinks=1,boundingBox=False,
+                        **kwargs):
+        '''
+        文件大小: 几何体 + 没有mask时的options/相机/灯光/驱动节点 + 每个shape的灯光和阴影链接
+        boundingBox时写入.asstoc
+        '''
+        self._count("arnoldExportAss")
+        names = [self._name(p) for p in self.scene.selection]
+        size = 64 + self._polygon_count(names) * 24
+        if mask is None or mask & 0x7:
+            size += 4096
+        shapes = self._shape_count(names)
+        size += shapes * 48 * (bool(lightLinks) + bool(shadowLinks))
+        self._write(filename,size)
+        if boundingBox:
+            bounds = self._world_bounds(names)
+            with open(os.path.splitext(filename)[0] + ".asstoc","w") as f:
+                f.write("bounds " + " ".join(str(v) for v in bounds) + "\n")
+        return [filename]
+
+    def _shape_count(self,names):
+        total = 0
+        for name in names:
+            path = self.scene.resolve(name)
+            if not path:
+                continue
+            stack = [path[-1]]
+            while stack:
+                node = stack.pop()
+                total += node.type in SHAPE_TYPES
+                stack.extend(node.children)
+        return total
+
+    def exactWorldBoundingBox(self,*names,**kwargs):
+        self._count("exactWorldBoundingBox")
+        return self._world_bounds(names)
+
+    def _world_bounds(self,names):
+        '''
+        shape的boundingSize(默认为1)立方体按世界矩阵变换后的包围盒
+        '''
+        low = [float("inf")] * 3
+        high = [float("-inf")] * 3
+        for name in _as_list(names):
+            path = self._path(name)
+            stack = [(path[-1],self.scene.world_matrix(path))]
+            while stack:
+                node,matrix = stack.pop()
+                if node.type == "mesh":
+                    half = node.attrs.get("boundingSize",1.0) * 0.5
+                    for axis in range(3):
+                        extent = half * (abs(matrix[axis]) + abs(matrix[4 + axis]) + abs(matrix[8 + axis]))
+                        low[axis] = min(low[axis],matrix[12 + axis] - extent)
+                        high[axis] = max(high[axis],matrix[12 + axis] + extent)
+                for child in node.children:
+                    stack.append((child,self._child_matrix(child,matrix)))
+        if low[0] == float("inf"):
+            return [0.0] * 6
+        return low + high
+
+    def _child_matrix(self,child,matrix):
+        if child.type != "transform":
+            return matrix
+        a = child.attrs
+        if (a["rotateX"],a["rotateY"],a["rotateZ"]) != (0.0,0.0,0.0) or (a["scaleX"],a["scaleY"],a["scaleZ"]) != (1.0,1.0,1.0):
+            return mat_mul(child.local_matrix(),matrix)
+        #只有位移时只变换位移
+        t = (a["translateX"],a["translateY"],a["translateZ"])
+        moved = list(matrix)
+        for j in range(3):
+            moved[12 + j] += t[0] * matrix[j] + t[1] * matrix[4 + j] + t[2] * matrix[8 + j]
+        return moved
+
+    def gpuCache(self,*objects,directory="",fileName="",**kwargs):
+        self._count("gpuCache")
+        if kwargs.get("edit",kwargs.get("e")) and kwargs.get("refresh"):
+            #重新读取缓存文件
+            for obj in _as_list(objects):
+                self.scene.refreshed[self._path(obj)[-1].name] += 1
+            return None
+        written = []
+        prefix = kwargs.get("filePrefix","")
+        for obj in _as_list(objects):
+            name = fileName if fileName and len(_as_list(objects)) == 1 else prefix + obj.split("|")[-1]
+            path = f"{directory}/{name}.abc"
+            self._write(path,64 + self._polygon_count([obj]) * 12)
+            written.append(path)
+        return written
+
+    def file(self,file_path=None,force=False,type=None,exportSelected=False,i=False,
+             returnNewNodes=False,**kwargs):
+        self._count("file")
+        if exportSelected:
+            names = [self._name(p) for p in self.scene.selection]
+            self._write(file_path,64 + self._polygon_count(names) * 32)
+            return file_path
+        if i:
+            base_name = os.path.splitext(os.path.basename(file_path))[0]
+            root = self.scene.create("transform","RootLocator")
+            shape = self.scene.create("locator",f"{root.name}Shape",root)
+            group = self.scene.create("transform",base_name.split("_")[-1],root,exact=True)
+            new_nodes = [root,shape,group]
+            return [self._name(self.scene.primary_path(n)) for n in new_nodes] if returnNewNodes else file_path
+        return file_path
+
+    def playblast(self,completeFilename=None,**kwargs):
+        self._count("playblast")
+        self._write(completeFilename,128)
+        return completeFilename
+
+
+##########################################################################
+# maya.mel
+##########################################################################
+
+class FakeMel():
+
+    def __init__(self,cmds):
+        self.cmds = cmds
+
+    def eval(self,command):
+        '''
+        只解析 gpuCache 命令,其他命令忽略
+        '''
+        self.cmds._count("mel.eval")
+        tokens = shlex.split(command.rstrip().rstrip(";"))
+        if not tokens or tokens[0] != "gpuCache":
+            return None
+        flags = {}
+        objects = []
+        i = 1
+        while i < len(tokens):
+            token = tokens[i]
+            if token.startswith("-"):
+                if i + 1 < len(tokens) and not tokens[i + 1].startswith("-"):
+                    flags[token[1:]] = tokens[i + 1]
+                    i += 2
+                    continue
+                flags[token[1:]] = True
+            else:
+                objects.append(token)
+            i += 1
+        return self.cmds.gpuCache(*objects,directory=flags.get("directory",""),
+                        fileName=flags.get("fileName",""),filePrefix=flags.get("filePrefix",""))
+
+
+##########################################################################
+# maya.api.OpenMaya
+##########################################################################
+
+class MFn():
+    kInvalid = 0
+    kBase = 1
+    kDependencyNode = 2
+    kDagNode = 3
+    kTransform = 4
+    kShape = 5
+    kMesh = 6
+    kLocator = 7
+    kPluginShape = 8
+    kCamera = 9
+    kLight = 10
+    kFileTexture = 11
+    kShadingEngine = 12
+    kSet = 13
+    kLambert = 14
+    kNurbsCurve = 15
+
+
+FN_TYPES = {
+    "transform":(MFn.kDagNode,MFn.kTransform),
+    "locator":(MFn.kDagNode,MFn.kShape,MFn.kLocator),
+    "mesh":(MFn.kDagNode,MFn.kShape,MFn.kMesh),
+    "aiStandIn":(MFn.kDagNode,MFn.kShape,MFn.kPluginShape),
+    "gpuCache":(MFn.kDagNode,MFn.kShape,MFn.kPluginShape),
+    "camera":(MFn.kDagNode,MFn.kShape,MFn.kCamera),
+    "nurbsCurve":(MFn.kDagNode,MFn.kShape,MFn.kNurbsCurve),
+    "file":(MFn.kFileTexture,),
+    "shadingEngine":(MFn.kSet,MFn.kShadingEngine),
+    "lambert":(MFn.kLambert,),
+    "aiStandardSurface":(),
+}
+
+
+class MSpace():
+    kInvalid = 0
+    kTransform = 1
+    kPreTransform = 2
+    kPostTransform = 3
+    kWorld = 4
+    kObject = kPreTransform
+
+
+class MVector():
+
+    def __init__(self,x=0.0,y=0.0,z=0.0):
+        if isinstance(x,(MVector,MPoint)):
+            x,y,z = x.x,x.y,x.z
+        self.x,self.y,self.z = float(x),float(y),float(z)
+
+    def __eq__(self,other):
+        return all(abs(a - b) < 1e-9 for a,b in zip(self,other))
+
+    def __iter__(self):
+        return iter((self.x,self.y,self.z))
+
+    def __repr__(self):
+        return f"MVector({self.x}, {self.y}, {self.z})"
+
+
+class MPoint(MVector):
+
+    def __repr__(self):
+        return f"MPoint({self.x}, {self.y}, {self.z})"
+
+
+class MMatrix():
+
+    def __init__(self,values=IDENTITY):
+        self._m = tuple(float(v) for v in values)
+
+    def __iter__(self):
+        return iter(self._m)
+
+    def __len__(self):
+        return 16
+
+    def __getitem__(self,index):
+        return self._m[index]
+
+    def __mul__(self,other):
+        return MMatrix(mat_mul(self._m,other._m))
+
+    def inverse(self):
+        return MMatrix(mat_inverse(self._m))
+
+    def getElement(self,row,col):
+        return self._m[row * 4 + col]
+
+
+class MBoundingBox():
+
+    def __init__(self,min_point=None,max_point=None):
+        self.min = MPoint(*(min_point or (0,0,0)))
+        self.max = MPoint(*(max_point or (0,0,0)))
+
+    @property
+    def width(self):
+        return self.max.x - self.min.x
+
+    @property
+    def height(self):
+        return self.max.y - self.min.y
+
+    @property
+    def depth(self):
+        return self.max.z - self.min.z
+
+
+class MObject():
+    __slots__ = ("_node",)
+
+    def __init__(self,node=None):
+        self._node = node
+
+    def __eq__(self,other):
+        return isinstance(other,MObject) and other._node is self._node
+
+    def __hash__(self):
+        return id(self._node)
+
+    def isNull(self):
+        return self._node is None
+
+    def hasFn(self,fn):
+        return self._node is not None and fn in FN_TYPES.get(self._node.type,())
+
+    def apiType(self):
+        types_ = FN_TYPES.get(self._node.type,()) if self._node else ()
+        return types_[-1] if types_ else MFn.kDependencyNode
+
+
+MObject.kNullObj = MObject()
+
+
+class MObjectArray(list):
+    pass
+
+
+class MIntArray(list):
+    pass
+
+
+class MDagPath():
+
+    def __init__(self,other=None):
+        self._path = list(other._path) if isinstance(other,MDagPath) else []
+
+    @classmethod
+    def _from(cls,path):
+        dag = cls()
+        dag._path = list(path)
+        return dag
+
+    @staticmethod
+    def getAPathTo(obj):
+        return MDagPath._from(_scene().primary_path(obj._node))
+
+    def node(self):
+        return MObject(self._path[-1]) if self._path else MObject()
+
+    def transform(self):
+        for node in reversed(self._path):
+            if node.type == "transform":
+                return MObject(node)
+        return MObject()
+
+    def hasFn(self,fn):
+        return self.node().hasFn(fn)
+
+    def apiType(self):
+        return self.node().apiType()
+
+    def length(self):
+        return len(self._path)
+
+    def pop(self,num=1):
+        del self._path[-num:]
+        return self
+
+    def push(self,obj):
+        self._path.append(obj._node)
+        return self
+
+    def child(self,index):
+        return MObject(self._path[-1].children[index])
+
+    def childCount(self):
+        return len(self._path[-1].children)
+
+    def fullPathName(self):
+        return _scene().path_name(self._path) if self._path else ""
+
+    def partialPathName(self):
+        return self._path[-1].name if self._path else ""
+
+    def isInstanced(self,indirect=True):
+        return any(len(node.parents) > 1 for node in self._path)
+
+    def instanceNumber(self):
+        node = self._path[-1]
+        if len(self._path) > 1 and len(node.parents) > 1:
+            return node.parents.index(self._path[-2])
+        return 0
+
+    def inclusiveMatrix(self):
+        return MMatrix(_scene().world_matrix(self._path))
+
+    def exclusiveMatrix(self):
+        return MMatrix(_scene().world_matrix(self._path[:-1]))
+
+    def inclusiveMatrixInverse(self):
+        return self.inclusiveMatrix().inverse()
+
+    def exclusiveMatrixInverse(self):
+        return self.exclusiveMatrix().inverse()
+
+
+class MSelectionList():
+
+    def __init__(self):
+        self._items = []
+
+    def add(self,item):
+        if isinstance(item,MDagPath):
+            self._items.append(list(item._path))
+            return self
+        if isinstance(item,MObject):
+            self._items.append([item._node])
+            return self
+        path = _scene().resolve(item)
+        if path is None:
+            raise RuntimeError(f"(kInvalidParameter): Object does not exist: {item}")
+        self._items.append(path)
+        return self
+
+    def length(self):
+        return len(self._items)
+
+    def getDagPath(self,index):
+        path = self._items[index]
+        if not path[-1].is_dag:
+            raise TypeError("(kInvalidParameter): Object is not a DAG node")
+        if len(path) == 1 and path[-1].parents and path[-1].parents[0] is not None:
+            path = _scene().primary_path(path[-1])
+        return MDagPath._from(path)
+
+    def getDependNode(self,index):
+        return MObject(self._items[index][-1])
+
+
+class MPlug():
+
+    def __init__(self,node,attr):
+        self._node = node
+        self._attr = attr
+
+    def name(self):
+        return f"{self._node.name}.{self._attr}"
+
+    def asString(self):
+        value = self._node.attrs.get(self._attr)
+        return "" if value is None else str(value)
+
+    def asInt(self):
+        return int(self._node.attrs.get(self._attr) or 0)
+
+    def asBool(self):
+        return bool(self._node.attrs.get(self._attr))
+
+    def asDouble(self):
+        return float(self._node.attrs.get(self._attr) or 0.0)
+
+    def setString(self,value):
+        self._node.attrs[self._attr] = value
+
+    def setInt(self,value):
+        self._node.attrs[self._attr] = int(value)
+
+    def setBool(self,value):
+        self._node.attrs[self._attr] = bool(value)
+
+    def setDouble(self,value):
+        self._node.attrs[self._attr] = float(value)
+
+
+class MFnDependencyNode():
+
+    def __init__(self,obj=None):
+        self._node = obj._node if obj is not None else None
+
+    def setObject(self,obj):
+        self._node = obj._node
+        return self
+
+    def name(self):
+        return self._node.name
+
+    @property
+    def typeName(self):
+        return self._node.type
+
+    def hasAttribute(self,attr):
+        return attr in self._node.attrs
+
+    def findPlug(self,attr,want_networked=False):
+        if attr not in self._node.attrs:
+            raise RuntimeError(f"(kInvalidParameter): Cannot find plug {attr}")
+        return MPlug(self._node,attr)
+
+
+class MFnDagNode(MFnDependencyNode):
+
+    def __init__(self,obj=None):
+        if isinstance(obj,MDagPath):
+            self._path = list(obj._path)
+            obj = obj.node()
+        else:
+            self._path = _scene().primary_path(obj._node) if obj is not None else []
+        super().__init__(obj)
+
+    def isInstanced(self,indirect=True):
+        return any(len(node.parents) > 1 for node in self._path)
+
+    @property
+    def isIntermediateObject(self):
+        return bool(self._node.attrs.get("intermediateObject",False))
+
+    def instanceCount(self,indirect=True):
+        return len(_scene().all_paths(self._node))
+
+    def childCount(self):
+        return len(self._node.children)
+
+    def child(self,index):
+        return MObject(self._node.children[index])
+
+    def parentCount(self):
+        return len([p for p in self._node.parents if p is not None])
+
+    def fullPathName(self):
+        return _scene().path_name(self._path)
+
+    def getPath(self):
+        return MDagPath._from(self._path)
+
+    @property
+    def boundingBox(self):
+        size = self._node.attrs.get("boundingSize",1.0)
+        return MBoundingBox((-size * 0.5,) * 3,(size * 0.5,) * 3)
+
+
+class MFnTransform(MFnDagNode):
+
+    def _pivot(self,prefix,space):
+        local = [self._node.attrs.get(f"{prefix}{axis}",0.0) for axis in "XYZ"]
+        if space != MSpace.kWorld:
+            return MPoint(*local)
+        m = _scene().world_matrix(self._path)
+        return MPoint(*[local[0] * m[c] + local[1] * m[4 + c] + local[2] * m[8 + c] + m[12 + c] for c in range(3)])
+
+    def rotatePivot(self,space=MSpace.kTransform):
+        return self._pivot("rotatePivot",space)
+
+    def scalePivot(self,space=MSpace.kTransform):
+        return self._pivot("scalePivot",space)
+
+    def translation(self,space=MSpace.kTransform):
+        a = self._node.attrs
+        return MVector(a["translateX"],a["translateY"],a["translateZ"])
+
+
+class MFnMesh(MFnDagNode):
+
+    @property
+    def numPolygons(self):
+        return int(self._node.attrs.get("numPolygons",0))
+
+    @property
+    def numVertices(self):
+        return int(self._node.attrs.get("numVertices",0))
+
+    @property
+    def numFaceVertices(self):
+        #假数据中的面都是四边形
+        return self.numPolygons * 4
+
+    def numTriangles(self):
+        return int(self._node.attrs.get("numTriangles",0) or self.numPolygons * 2)
+
+    def getTriangles(self):
+        '''
+        返回 (每个面的三角形数量,三角形顶点索引),假数据中每个面两个三角形
+        '''
+        counts = MIntArray([2] * self.numPolygons)
+        return counts,MIntArray([0] * (self.numPolygons * 6))
+
+    def getConnectedShaders(self,instance_number):
+        scene = _scene()
+        shaders = MObjectArray()
+        for src,src_attr,dst,dst_attr in scene.outputs(self._node):
+            if dst.type == "shadingEngine" and src_attr.startswith("instObjGroups"):
+                if MObject(dst) not in shaders:
+                    shaders.append(MObject(dst))
+        return shaders,MIntArray([0] * self.numPolygons)
+
+
+class MItDag():
+    kDepthFirst = 0
+    kBreadthFirst = 1
+
+    def __init__(self,traversal=kDepthFirst,filter_type=MFn.kInvalid):
+        self._filter = filter_type
+        self._stack = [[node] for node in reversed(list(_scene().world))]
+        self._advance()
+
+    def _advance(self):
+        while self._stack and self._filter != MFn.kInvalid and not MObject(self._stack[-1][-1]).hasFn(self._filter):
+            self._expand()
+
+    def _expand(self):
+        path = self._stack.pop()
+        self._stack.extend(path + [child] for child in reversed(path[-1].children))
+
+    def reset(self,root=None,traversal=None,filter_type=None):
+        if filter_type is not None:
+            self._filter = filter_type
+        if isinstance(root,MDagPath):
+            self._stack = [list(root._path)]
+        elif isinstance(root,MObject):
+            self._stack = [_scene().primary_path(root._node)]
+        else:
+            self._stack = [[node] for node in reversed(list(_scene().world))]
+        self._advance()
+
+    def isDone(self):
+        return not self._stack
+
+    def next(self):
+        self._expand()
+        self._advance()
+
+    def getPath(self):
+        return MDagPath._from(self._stack[-1])
+
+    def currentItem(self):
+        return MObject(self._stack[-1][-1])
+
+    def depth(self):
+        return len(self._stack[-1]) - 1
+
+
+class MItDependencyGraph():
+    kDownstream = 0
+    kUpstream = 1
+    kDepthFirst = 0
+    kBreadthFirst = 1
+    kNodeLevel = 0
+    kPlugLevel = 1
+
+    def __init__(self,root,direction=kDownstream,traversal=kDepthFirst,level=kNodeLevel,*args):
+        scene = _scene()
+        start = root._node
+        visited = {start}
+        order = [start]
+        queue = [start]
+        while queue:
+            node = queue.pop(0) if traversal == self.kBreadthFirst else queue.pop()
+            conns = scene.inputs(node) if direction == self.kUpstream else scene.outputs(node)
+            for conn in conns:
+                other = conn[0] if direction == self.kUpstream else conn[2]
+                if other not in visited:
+                    visited.add(other)
+                    order.append(other)
+                    queue.append(other)
+        self._order = order
+        self._index = 0
+
+    def isDone(self):
+        return self._index >= len(self._order)
+
+    def next(self):
+        self._index += 1
+
+    def currentNode(self):
+        return MObject(self._order[self._index])
+
+    def currentItem(self):
+        return self.currentNode()
+
+
+class MObjectHandle():
+
+    def __init__(self,obj):
+        self._obj = obj
+
+    def isValid(self):
+        return self._obj._node is not None and id(self._obj._node) in _scene().nodes
+
+    def isAlive(self):
+        return self.isValid()
+
+    def object(self):
+        return self._obj
+
+    def hashCode(self):
+        return id(self._obj._node)
+
+
+class MDGModifier():
+    '''
+    只支持设置属性值,doIt时一次写入
+    '''
+
+    def __init__(self):
+        self._operations = []
+
+    def newPlugValueInt(self,plug,value):
+        self._operations.append((plug,int(value)))
+        return self
+
+    def newPlugValueBool(self,plug,value):
+        self._operations.append((plug,bool(value)))
+        return self
+
+    def newPlugValueString(self,plug,value):
+        self._operations.append((plug,str(value)))
+        return self
+
+    def newPlugValueDouble(self,plug,value):
+        self._operations.append((plug,float(value)))
+        return self
+
+    def doIt(self):
+        for plug,value in self._operations:
+            plug._node.attrs[plug._attr] = value
+        self._operations = []
+        return self
+
+
+class MMessage():
+    _next_id = [1]
+
+    @staticmethod
+    def _add(kind,key,func,client):
+        callback_id = MMessage._next_id[0]
+        MMessage._next_id[0] += 1
+        _scene().callbacks[callback_id] = (kind,key,func,client)
+        return callback_id
+
+    @staticmethod
+    def removeCallback(callback_id):
+        _scene().callbacks.pop(callback_id,None)
+
+    @staticmethod
+    def removeCallbacks(callback_ids):
+        for callback_id in callback_ids:
+            MMessage.removeCallback(callback_id)
+
+
+class MDGMessage(MMessage):
+
+    @staticmethod
+    def addNodeAddedCallback(func,nodeType="dependNode",clientData=None):
+        return MMessage._add("nodeAdded",nodeType,func,clientData)
+
+    @staticmethod
+    def addNodeRemovedCallback(func,nodeType="dependNode",clientData=None):
+        return MMessage._add("nodeRemoved",nodeType,func,clientData)
+
+
+class MEventMessage(MMessage):
+
+    @staticmethod
+    def addEventCallback(event,func,clientData=None):
+        return MMessage._add("event",event,func,clientData)
+
+
+class MGlobal():
+
+    @staticmethod
+    def _message(level,message):
+        _scene().messages.append((level,message))
+
+    @staticmethod
+    def displayError(message):
+        MGlobal._message("error",message)
+
+    @staticmethod
+    def displayWarning(message):
+        MGlobal._message("warning",message)
+
+    @staticmethod
+    def displayInfo(message):
+        MGlobal._message("info",message)
+
+
+##########################################################################
+# 安装
+##########################################################################
+
+_current = {"scene":None}
+
+
+def _scene():
+    return _current["scene"]
+
+
+def _module(name,**attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+
+def install(scene=None):
+    '''
+    将假实现注册为 maya / maya.cmds / maya.mel / maya.api.OpenMaya / maya.OpenMayaUI / maya.utils
+    scene > 使用的场景,为空时新建
+
+    返回当前场景
+    '''
+    scene = scene or Scene()
+    _current["scene"] = scene
+
+    cmds = FakeCmds(scene)
+    cmds_module = _module("maya.cmds")
+    for name in dir(cmds):
+        if not name.startswith("_") and name != "scene":
+            setattr(cmds_module,name,getattr(cmds,name))
+    cmds_module._fake = cmds
+
+    mel_module = _module("maya.mel",eval=FakeMel(cmds).eval)
+
+    om_module = _module("maya.api.OpenMaya",
+        MFn=MFn,MSpace=MSpace,MVector=MVector,MPoint=MPoint,MMatrix=MMatrix,MBoundingBox=MBoundingBox,
+        MObject=MObject,MObjectArray=MObjectArray,MIntArray=MIntArray,MDagPath=MDagPath,
+        MSelectionList=MSelectionList,MPlug=MPlug,MFnDependencyNode=MFnDependencyNode,
+        MFnDagNode=MFnDagNode,MFnTransform=MFnTransform,MFnMesh=MFnMesh,MItDag=MItDag,
+        MItDependencyGraph=MItDependencyGraph,MGlobal=MGlobal,MObjectHandle=MObjectHandle,
+        MDGModifier=MDGModifier,MMessage=MMessage,MDGMessage=MDGMessage,MEventMessage=MEventMessage)
+
+    class MQtUtil():
+        @staticmethod
+        def mainWindow():
+            return None
+
+    omui_module = _module("maya.OpenMayaUI",MQtUtil=MQtUtil)
+    utils_module = _module("maya.utils",executeDeferred=lambda func,*args:func(*args),
+                           executeInMainThreadWithResult=lambda func,*args:func(*args))
+
+    api_module = _module("maya.api",OpenMaya=om_module)
+    maya_module = _module("maya",cmds=cmds_module,mel=mel_module,api=api_module,
+                          OpenMayaUI=omui_module,utils=utils_module)
+    maya_module.__path__ = []
+    api_module.__path__ = []
+
+    sys.modules.update({
+        "maya":maya_module,
+        "maya.cmds":cmds_module,
+        "maya.mel":mel_module,
+        "maya.api":api_module,
+        "maya.api.OpenMaya":om_module,
+        "maya.OpenMayaUI":omui_module,
+        "maya.utils":utils_module,
+    })
+    return scene
+
+
+def reset():
+    '''
+    保留已注册的模块,切换到新的空场景
+    '''
+    scene = Scene()
+    _current["scene"] = scene
+    cmds_module = sys.modules.get("maya.cmds")
+    if cmds_module is not None:
+        fake = cmds_module._fake
+        fake.scene = scene
+    return scene
+
+
+##########################################################################
+# 场景构建
+##########################################################################
+
+def add_shading(scene,mesh,texture_path,udim=False,tiling_mode=3):
+    '''
+    为mesh创建 file > aiStandardSurface > shadingEngine 材质网络
+    tiling_mode > udim时的uvTilingMode 1:ZBrush 2:Mudbox 3:UDIM
+    '''
+    file_node = scene.create("file","file1")
+    file_node.attrs["fileTextureName"] = texture_path
+    file_node.attrs["uvTilingMode"] = tiling_mode if udim else 0
+    material = scene.create("aiStandardSurface","aiStandardSurface1")
+    shading_engine = scene.create("shadingEngine","aiStandardSurface1SG")
+    scene.connect(file_node,"outColor",material,"baseColor")
+    scene.connect(material,"outColor",shading_engine,"surfaceShader")
+    scene.connect(mesh,"instObjGroups[0]",shading_engine,"dagSetMembers")
+    return shading_engine
+
+
+def add_mesh(scene,parent,name,polygons=100):
+    transform = scene.create("transform",name,parent)
+    mesh = scene.create("mesh",f"{name}Shape",transform)
+    mesh.attrs["numPolygons"] = polygons
+    mesh.attrs["numVertices"] = polygons + 2
+    mesh.attrs["numTriangles"] = polygons * 2
+    return transform,mesh
+
+
+def add_component(scene,asset_dir,asset_name,file_format,resolution,parent=None,
+                  translate=(0.0,0.0,0.0),rotate=(0.0,0.0,0.0),scale=(1.0,1.0,1.0),shape_node=None):
+    '''
+    创建一个与Operator.import_*相同结构的组件节点
+    shape_node > 传入已有的shape时创建实例(共享shape)
+    '''
+    suffix = {"ass":"ass","gpuCache":"gpuCache","abc":"abc"}[file_format]
+    transform = scene.create("transform",f"{asset_name}_{suffix}",parent)
+    if shape_node is not None:
+        scene.attach(shape_node,transform)
+    elif file_format == "ass":
+        shape_node = scene.create("aiStandIn",f"{asset_name}_assShape",transform)
+        shape_node.attrs["dso"] = f"{asset_dir}/{asset_name}.ass"
+    elif file_format == "gpuCache":
+        shape_node = scene.create("gpuCache",f"{asset_name}_gpuCacheShape",transform)
+        shape_node.attrs["cacheFileName"] = f"{asset_dir}/{asset_name}.abc"
+    else:
+        shape_node,_ = add_mesh(scene,transform,f"{asset_name}_geo")
+
+    for attr in ("assetDir","assetName","fileFormat","resolutionType"):
+        transform.attrs[attr] = None
+        transform.dynamic.add(attr)
+    transform.attrs["isComponent"] = True
+    transform.dynamic.add("isComponent")
+    transform.attrs.update({"assetDir":asset_dir,"assetName":asset_name,
+                            "fileFormat":file_format,"resolutionType":resolution})
+    for axis,t,r,s in zip("XYZ",translate,rotate,scale):
+        transform.attrs["translate" + axis] = float(t)
+        transform.attrs["rotate" + axis] = float(r)
+        transform.attrs["scale" + axis] = float(s)
+    return transform,shape_node
+
+
+def add_layout(scene,library_root,count,assets=20,file_format="ass"):
+    '''
+    创建count个组件节点,分布在assets个资产和 世界/|layout|blockA/|layout|blockB 三个父层级
+    每个资产在library_root下创建空的缓存文件,父层级和组件都有变换
+    返回组件transform列表
+    '''
+    folder,extension = {"ass":("ass","ass"),"gpuCache":("cache","abc"),"abc":("alembic","abc")}[file_format]
+    layout = scene.create("transform","layout")
+    blocks = [None]
+    for i,name in enumerate(("blockA","blockB")):
+        block = scene.create("transform",name,layout)
+        block.attrs.update({"translateX":100.0 * (i + 1),"rotateY":30.0 * (i + 1),"scaleX":1.5,"scaleY":1.5,"scaleZ":1.5})
+        blocks.append(block)
+
+    asset_dirs = []
+    for i in range(assets):
+        asset_dir = f"{library_root}/DFH_fhsj_tree{i:03d}/{folder}"
+        os.makedirs(asset_dir,exist_ok=True)
+        open(f"{asset_dir}/DFH_fhsj_tree{i:03d}_proxyRes.{extension}","wb").close()
+        asset_dirs.append(asset_dir)
+
+    transforms = []
+    for i in range(count):
+        asset = i % assets
+        transform,_ = add_component(scene,asset_dirs[asset],f"DFH_fhsj_tree{asset:03d}_proxyRes",file_format,"proxyRes",
+                                    parent=blocks[i % len(blocks)],translate=(i * 10.0,i % 7,-i * 0.5),
+                                    rotate=(0.0,i % 360,i % 11),scale=(1.0 + i % 3 * 0.5,) * 3)
+        #布局中的组件通常重新命名过,与导入时创建的shape名称不同
+        scene.rename(transform,f"tree{i:05d}")
+        transforms.append(transform)
+    return transforms
+
+
+def add_root_locator(scene,name="RootLocator",res_list=("proxyRes","midRes","hiRes"),meshes_per_res=1,
+                     polygons=(100,1000,10000),texture_path=None):
+    '''
+    创建 RootLocator > res组 > mesh 的导出层级
+    '''
+    root = scene.create("transform",name)
+    scene.create("locator",f"{root.name}Shape",root)
+    groups = []
+    for res,count in zip(res_list,polygons):
+        group = scene.create("transform",res,root,exact=True)
+        for i in range(meshes_per_res):
+            _,mesh = add_mesh(scene,group,f"{res}_mesh{i}",count)
+            if texture_path:
+                add_shading(scene,mesh,texture_path)
+        groups.append(group)
+    return root,groups
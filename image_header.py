@@ -0,0 +1,162 @@
+'''
+只读取文件头获取贴图尺寸,不解码像素,用于估算贴图内存
+
+支持 PNG,JPEG,TIFF(.tif/.tx),OpenEXR,TGA
+    info = read_header("D:/tex/wood.png")     #ImageInfo(width,height,channels,bits) 或 None
+    memory_bytes(info)                        #包含mipmap的显存估算
+'''
+import os,struct
+from collections import namedtuple
+
+ImageInfo = namedtuple("ImageInfo","width height channels bits")
+
+#mipmap链约为原图的1/3
+MIPMAP_FACTOR = 4.0 / 3.0
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+EXR_MAGIC = b"\x76\x2f\x31\x01"
+
+#PNG colorType > 通道数
+PNG_CHANNELS = {0:1,2:3,3:3,4:2,6:4}
+
+#EXR pixelType > 位数 (UINT,HALF,FLOAT)
+EXR_BITS = {0:32,1:16,2:32}
+
+#JPEG SOF标记,不包含DHT(C4),JPG(C8),DAC(CC)
+JPEG_SOF = {0xc0,0xc1,0xc2,0xc3,0xc5,0xc6,0xc7,0xc9,0xca,0xcb,0xcd,0xce,0xcf}
+
+#EXR文件头一般小于几KB,超过该大小时认为文件损坏
+EXR_HEADER_LIMIT = 1 << 20
+
+
+def memory_bytes(info,mipmaps=True):
+    if info is None:
+        return 0
+    size = info.width * info.height * info.channels * max(1,info.bits // 8)
+    return int(size * MIPMAP_FACTOR) if mipmaps else size
+
+
+def read_header(path):
+    '''
+    返回ImageInfo,格式不支持或文件损坏时返回None
+    '''
+    try:
+        with open(path,"rb") as f:
+            head = f.read(32)
+            if head.startswith(PNG_SIGNATURE):
+                return _read_png(head)
+            if head.startswith(b"\xff\xd8"):
+                return _read_jpeg(f)
+            if head[:4] in (b"II*\x00",b"MM\x00*"):
+                return _read_tiff(f,head)
+            if head.startswith(EXR_MAGIC):
+                return _read_exr(f)
+            if path.lower().endswith(".tga"):
+                return _read_tga(head)
+    except (OSError,struct.error,ValueError):
+        pass
+    return None
+
+
+def _read_png(head):
+    #签名(8) + IHDR长度(4) + "IHDR"(4) + 宽(4) + 高(4) + 位深(1) + 颜色类型(1)
+    if head[12:16] != b"IHDR":
+        return None
+    width,height,bits,color_type = struct.unpack(">IIBB",head[16:26])
+    return ImageInfo(width,height,PNG_CHANNELS.get(color_type,4),bits)
+
+
+def _read_jpeg(f):
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xff:
+            return None
+        #填充字节
+        while marker[1] == 0xff:
+            marker = marker[1:] + f.read(1)
+        code = marker[1]
+        if code in (0xd8,0x01) or 0xd0 <= code <= 0xd7:
+            continue
+        length = struct.unpack(">H",f.read(2))[0]
+        if code in JPEG_SOF:
+            bits,height,width,channels = struct.unpack(">BHHB",f.read(6))
+            return ImageInfo(width,height,channels,bits)
+        if code == 0xd9 or length < 2:
+            return None
+        f.seek(length - 2,os.SEEK_CUR)
+
+
+def _read_tiff(f,head):
+    endian = "<" if head[:2] == b"II" else ">"
+    offset = struct.unpack(endian + "I",head[4:8])[0]
+    f.seek(offset)
+    count = struct.unpack(endian + "H",f.read(2))[0]
+    entries = f.read(count * 12)
+    tags = {}
+    for i in range(count):
+        tag,field_type,value_count = struct.unpack(endian + "HHI",entries[i * 12:i * 12 + 8])
+        value = entries[i * 12 + 8:i * 12 + 12]
+        if field_type == 3:
+            tags[tag] = struct.unpack(endian + "H",value[:2])[0]
+        elif field_type == 4:
+            tags[tag] = struct.unpack(endian + "I",value)[0]
+        if tag == 258 and value_count > 1 and field_type == 3:
+            #多个通道的位深存放在偏移位置,值都相同时读取第一个
+            if value_count * 2 > 4:
+                position = f.tell()
+                f.seek(struct.unpack(endian + "I",value)[0])
+                tags[tag] = struct.unpack(endian + "H",f.read(2))[0]
+                f.seek(position)
+    if 256 not in tags or 257 not in tags:
+        return None
+    return ImageInfo(tags[256],tags[257],tags.get(277,1),tags.get(258,8))
+
+
+def _read_exr(f):
+    f.seek(8)
+    data_window = None
+    channels = []
+    read = 8
+    while read < EXR_HEADER_LIMIT:
+        name = _read_cstring(f)
+        if not name:
+            break
+        attr_type = _read_cstring(f)
+        size = struct.unpack("<i",f.read(4))[0]
+        value = f.read(size)
+        read += len(name) + len(attr_type) + 6 + size
+        if name == b"dataWindow" and attr_type == b"box2i":
+            data_window = struct.unpack("<iiii",value)
+        elif name == b"channels" and attr_type == b"chlist":
+            position = 0
+            while position < len(value) and value[position] != 0:
+                end = value.index(b"\0",position)
+                pixel_type = struct.unpack("<i",value[end + 1:end + 5])[0]
+                channels.append(EXR_BITS.get(pixel_type,16))
+                position = end + 17
+    if data_window is None or not channels:
+        return None
+    xmin,ymin,xmax,ymax = data_window
+    return ImageInfo(xmax - xmin + 1,ymax - ymin + 1,len(channels),max(channels))
+
+
+def _read_cstring(f,limit=256):
+    result = bytearray()
+    while len(result) < limit:
+        char = f.read(1)
+        if not char or char == b"\0":
+            break
+        result += char
+    return bytes(result)
+
+
+def _read_tga(head):
+    image_type = head[2]
+    if image_type not in (1,2,3,9,10,11):
+        return None
+    width,height,depth = struct.unpack("<HHB",head[12:17])
+    if image_type in (1,9):
+        #调色板图片展开为RGB
+        return ImageInfo(width,height,3,8)
+    return ImageInfo(width,height,max(1,depth // 8),8)
@@ -0,0 +1,269 @@
+'''
+组件库完整性检查,不依赖Maya,可以在Linux上运行
+
+对每个资产检查:
+    missing          > 每个分辨率在每种格式(ma,abc,gpuCache,ass)中都存在
+    empty            > 文件大小为0
+    truncated        > 文件不完整
+                        .abc  Ogawa文件头未写完(frozen标记不是0xff)或根节点偏移超出文件大小
+                        .ma   结尾没有 "// End of" 注释
+                        .ass  最后一个节点没有以 "}" 结束
+    corrupt          > .abc 既不是Ogawa也不是HDF5
+    texture_missing  > .ma/.ass中引用的贴图不存在
+    texture_external > 引用的贴图不在资产的textures目录中(没有复制)
+
+    python integrity.py Z:/.../component --output report.json
+    python integrity.py /mnt/library --map Z:/lib=/mnt/library --prefix DFH_fhsj --workers 16
+
+有问题时返回1
+'''
+import os,re,sys,json,time,struct,argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import library
+import udim
+
+RES_LIST = ("proxyRes","midRes","hiRes")
+
+FORMATS = ("ma",) + tuple(library.FORMAT_FOLDERS)
+
+OGAWA_MAGIC = b"Ogawa"
+HDF5_MAGIC = b"\x89HDF"
+#magic(5) + frozen(1) + version(2) + 根节点偏移(uint64)
+OGAWA_HEADER = struct.Struct("<5sBHQ")
+OGAWA_FROZEN = 0xff
+
+MA_END_MARKER = b"// End of"
+
+#file节点的fileTextureName
+MA_TEXTURE_PATTERN = re.compile(rb'setAttr\s+"\.(?:ftn|fileTextureName)"\s+-type\s+"string"\s+"([^"]*)"')
+#ass中image节点的filename
+ASS_TEXTURE_PATTERN = re.compile(rb'^\s*filename\s+"([^"]*)"',re.M)
+
+TAIL_SIZE = 256
+
+
+class Checker():
+
+    def __init__(self,res_list=RES_LIST,formats=FORMATS,path_map=None,check_textures=True):
+        '''
+        path_map > [(原路径前缀,本机路径前缀)],用于在Linux上检查Windows路径
+        '''
+        self.res_list = list(res_list)
+        self.formats = list(formats)
+        self.path_map = [(src.replace("\\","/"),dst.replace("\\","/")) for src,dst in (path_map or [])]
+        self.check_textures = check_textures
+
+    def map_path(self,path):
+        path = path.replace("\\","/")
+        for src,dst in self.path_map:
+            if path.lower().startswith(src.lower()):
+                return dst + path[len(src):]
+        return path
+
+    def expected_path(self,entry,res,file_format):
+        if file_format == "ma":
+            return entry.ma_path(res)
+        return entry.file_path(res,file_format)
+
+    ######################################################################
+
+    def check_asset(self,entry):
+        '''
+        返回问题列表 [{"asset","type","path","detail"}]
+        '''
+        issues = []
+
+        def issue(issue_type,path,detail=""):
+            issues.append({"asset":entry.asset_id,"type":issue_type,"path":path,"detail":detail})
+
+        textures = {}
+        for file_format in self.formats:
+            for res in self.res_list:
+                path = self.expected_path(entry,res,file_format)
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    issue("missing",path,f"{file_format} {res}")
+                    continue
+                if size == 0:
+                    issue("empty",path)
+                    continue
+
+                problem = check_file(path,size)
+                if problem:
+                    issue(*problem)
+                    continue
+
+                if self.check_textures and path.endswith((".ma",".ass")):
+                    for texture in read_texture_references(path):
+                        textures.setdefault(texture,path)
+
+        texture_dir = f"{entry.path}/textures/".lower()
+        udim_index = udim.UdimIndex()
+        for texture,source in textures.items():
+            local = self.map_path(texture)
+            if not texture_exists(local,udim_index):
+                issue("texture_missing",source,texture)
+            elif not local.lower().startswith(texture_dir):
+                issue("texture_external",source,texture)
+        return issues
+
+
+def check_file(path,size):
+    '''
+    检查文件是否完整,返回 (问题类型,路径,说明) 或None
+    '''
+    if path.endswith(".abc"):
+        with open(path,"rb") as f:
+            header = f.read(OGAWA_HEADER.size)
+        if header.startswith(HDF5_MAGIC):
+            return None
+        if not header.startswith(OGAWA_MAGIC):
+            return ("corrupt",path,"不是Alembic文件")
+        if len(header) < OGAWA_HEADER.size:
+            return ("truncated",path,"文件头不完整")
+        _,frozen,_,root_offset = OGAWA_HEADER.unpack(header)
+        if frozen != OGAWA_FROZEN:
+            return ("truncated",path,"Ogawa未完成写入")
+        if root_offset >= size:
+            return ("truncated",path,f"根节点偏移 {root_offset} 超出文件大小 {size}")
+
+    elif path.endswith(".ma"):
+        if MA_END_MARKER not in _read_tail(path,size):
+            return ("truncated",path,"缺少 // End of")
+
+    elif path.endswith(".ass"):
+        if not _read_tail(path,size).rstrip().endswith(b"}"):
+            return ("truncated",path,"最后一个节点没有结束")
+    return None
+
+
+def _read_tail(path,size,length=TAIL_SIZE):
+    with open(path,"rb") as f:
+        f.seek(max(0,size - length))
+        return f.read()
+
+
+def read_texture_references(path):
+    '''
+    返回.ma/.ass中引用的贴图路径,逐行读取,只对包含关键字的行执行正则
+    '''
+    result = []
+    if path.endswith(".ma"):
+        pattern,keys = MA_TEXTURE_PATTERN,(b'".ftn"',b'".fileTextureName"')
+    else:
+        pattern,keys = ASS_TEXTURE_PATTERN,(b"filename",)
+
+    with open(path,"rb") as f:
+        for line in f:
+            if not any(key in line for key in keys):
+                continue
+            for match in pattern.finditer(line):
+                texture = match.group(1).decode("utf-8","replace")
+                if texture:
+                    result.append(texture)
+    return result
+
+
+def texture_exists(path,udim_index=None):
+    '''
+    <UDIM>/<UVTILE>路径只要有一个象限存在即可
+    udim_index > udim.UdimIndex,同一资产的贴图共用目录列表
+    '''
+    if udim.has_token(path):
+        return bool((udim_index or udim.UdimIndex()).tiles(path))
+    return os.path.isfile(path)
+
+
+def check_library(root,checker=None,prefix=None,workers=8,progress=None):
+    '''
+    在线程池中检查组件库
+    prefix > 只检查以该前缀开头的资产,例如 DFH_fhsj
+    progress > 每完成一个资产调用 progress(完成数量,总数)
+    返回报告字典
+    '''
+    checker = checker or Checker()
+    start = time.time()
+    entries = library.scan_library(root)
+    if prefix:
+        entries = [entry for entry in entries if entry.asset_id.startswith(prefix)]
+
+    issues = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for i,asset_issues in enumerate(executor.map(checker.check_asset,entries)):
+            issues.extend(asset_issues)
+            if progress:
+                progress(i + 1,len(entries))
+
+    summary = Counter(issue["type"] for issue in issues)
+    return {
+        "root":root,
+        "checked_at":time.strftime("%Y-%m-%dT%H:%M:%S",time.localtime(start)),
+        "seconds":round(time.time() - start,3),
+        "resolutions":checker.res_list,
+        "formats":checker.formats,
+        "assets":len(entries),
+        "assets_with_issues":len({issue["asset"] for issue in issues}),
+        "summary":dict(summary),
+        "issues":issues,
+    }
+
+
+def format_report(report,limit=50):
+    lines = [f"assets > {report['assets']}  with issues > {report['assets_with_issues']}  {report['seconds']}s"]
+    for issue_type,count in sorted(report["summary"].items()):
+        lines.append(f"    {issue_type:<18}{count:>8}")
+    for issue in report["issues"][:limit]:
+        lines.append(f"{issue['type']:<18}{issue['asset']:<40}{issue['path']}  {issue['detail']}")
+    if len(report["issues"]) > limit:
+        lines.append(f"... {len(report['issues']) - limit} more")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Component library integrity check")
+    parser.add_argument("root")
+    parser.add_argument("--output",help="写入json报告")
+    parser.add_argument("--json",action="store_true",help="在标准输出打印json报告")
+    parser.add_argument("--prefix",help="只检查以该前缀开头的资产,例如 DFH_fhsj")
+    parser.add_argument("--res",default=",".join(RES_LIST))
+    parser.add_argument("--formats",default=",".join(FORMATS))
+    parser.add_argument("--map",action="append",default=[],metavar="SRC=DST",help="贴图路径前缀映射,可以多次指定")
+    parser.add_argument("--no-textures",action="store_true")
+    parser.add_argument("--workers",type=int,default=8)
+    args = parser.parse_args(argv)
+
+    formats = [f for f in args.formats.split(",") if f]
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        parser.error(f"unknown formats > {unknown}")
+
+    path_map = []
+    for item in args.map:
+        if "=" not in item:
+            parser.error(f"--map 格式错误 > {item}")
+        path_map.append(tuple(item.split("=",1)))
+
+    checker = Checker(res_list=[r for r in args.res.split(",") if r],formats=formats,
+                    path_map=path_map,check_textures=not args.no_textures)
+    report = check_library(args.root,checker,prefix=args.prefix,workers=args.workers)
+
+    if args.output:
+        out_dir = os.path.dirname(args.output)
+        if out_dir and not os.path.exists(out_dir):
+            os.makedirs(out_dir)
+        with open(args.output,"w",encoding="utf-8") as f:
+            json.dump(report,f,ensure_ascii=False,indent=2)
+
+    if args.json:
+        json.dump(report,sys.stdout,ensure_ascii=False,indent=2)
+        print()
+    else:
+        print(format_report(report))
+    return 1 if report["issues"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,401 @@
+'''
+不阻塞界面的任务执行器
+
+Job由多个Task组成,Task之间可以有依赖:
+    kind="io"   > 在线程池中执行(复制,哈希,上传,文件存在检查等文件系统操作)
+    kind="main" > 在主线程中分片执行(Maya命令/API),函数可以是生成器,每次yield为一个分片
+
+JobRunner不依赖Qt/Maya,主线程调度通过schedule_main回调注入:
+    Maya中     > JobRunner(schedule_main=maya.utils.executeDeferred)
+    Qt中       > JobRunner(schedule_main=dispatcher)   通过队列信号转到主线程,见ui.MainThreadDispatcher
+    测试/批处理 > runner.run_until_complete(job)
+
+    job = Job("导出")
+    plan = job.add("plan",plan_func,kind="main")
+    copy = job.add("copy",copy_func,kind="io",deps=[plan])
+    job.add("relink",relink_func,kind="main",deps=[copy])
+    job.add_finally(restore_func)
+    runner.submit(job)
+
+Task函数接收job参数,通过 job.results[task_name] 读取依赖的结果,
+通过 job.check_cancelled() 响应取消,通过 job.advance(units,bytes_done) 汇报进度
+'''
+import time,types,threading,traceback
+from concurrent.futures import ThreadPoolExecutor
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class CancelledError(Exception):
+    pass
+
+
+class Task():
+
+    def __init__(self,name,func,kind="main",deps=None,weight=0):
+        if kind not in ("main","io"):
+            raise ValueError(f"task kind error > {kind}")
+        self.name = name
+        self.func = func
+        self.kind = kind
+        self.deps = list(deps or [])
+        #预计的进度单位,生成器任务每次yield一个单位时可以用来估算总进度
+        self.weight = weight
+        self.state = PENDING
+        self.result = None
+        self.error = None
+        self._generator = None
+        self._future = None
+
+    def __repr__(self):
+        return f"<Task {self.name} {self.kind} {self.state}>"
+
+    @property
+    def finished(self):
+        return self.state in (DONE,FAILED,CANCELLED)
+
+    def ready(self):
+        return self.state == PENDING and all(dep.state == DONE for dep in self.deps)
+
+    def blocked(self):
+        return self.state == PENDING and any(dep.state in (FAILED,CANCELLED) for dep in self.deps)
+
+
+class Job():
+
+    def __init__(self,name="job"):
+        self.name = name
+        self.tasks = []
+        self.results = {}
+        self.finalizers = []
+        self.listeners = []
+        self.state = PENDING
+        self.error = None
+
+        self.total_units = 0
+        self.done_units = 0
+        self.bytes_done = 0
+        self.message = ""
+        self.start_time = None
+        self.end_time = None
+
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<Job {self.name} {self.state} {self.done_units}/{self.total_units}>"
+
+    def add(self,name,func,kind="main",deps=None,weight=0):
+        '''
+        添加任务,返回Task,可以作为后续任务的deps
+        weight > 任务预计的进度单位
+        '''
+        task = Task(name,func,kind,deps,weight)
+        self.tasks.append(task)
+        self.total_units += weight
+        return task
+
+    def add_finally(self,func):
+        '''
+        任务结束(完成,失败或取消)后在主线程执行,用于还原场景状态
+        '''
+        self.finalizers.append(func)
+
+    def add_listener(self,func):
+        '''
+        进度变化时在主线程调用 func(job)
+        '''
+        self.listeners.append(func)
+
+    ######################################################################
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        '''
+        在任务函数中调用,已取消时抛出CancelledError
+        '''
+        if self._cancel_event.is_set():
+            raise CancelledError(self.name)
+
+    def add_units(self,units):
+        '''
+        执行过程中才知道工作量时追加总进度单位
+        '''
+        with self._lock:
+            self.total_units += units
+
+    def advance(self,units=1,bytes_done=0,message=None):
+        '''
+        汇报进度,可以在工作线程中调用
+        '''
+        with self._lock:
+            self.done_units += units
+            self.bytes_done += bytes_done
+            if message is not None:
+                self.message = message
+
+    @property
+    def finished(self):
+        return self.state in (DONE,FAILED,CANCELLED)
+
+    @property
+    def progress(self):
+        if not self.total_units:
+            return 1.0 if self.finished else 0.0
+        return min(1.0,self.done_units / float(self.total_units))
+
+    @property
+    def elapsed(self):
+        if self.start_time is None:
+            return 0.0
+        return (self.end_time or time.perf_counter()) - self.start_time
+
+    @property
+    def throughput(self):
+        '''
+        返回 (单位/秒,字节/秒)
+        '''
+        elapsed = self.elapsed
+        if elapsed <= 0:
+            return 0.0,0.0
+        return self.done_units / elapsed,self.bytes_done / elapsed
+
+    @property
+    def eta(self):
+        '''
+        剩余时间估算(秒),无法估算时返回None
+        '''
+        units_per_second,_ = self.throughput
+        if not units_per_second or not self.total_units:
+            return None
+        return max(0.0,(self.total_units - self.done_units) / units_per_second)
+
+    def status_text(self):
+        units_per_second,bytes_per_second = self.throughput
+        text = f"{self.done_units}/{self.total_units}  {units_per_second:.1f} 项/秒"
+        if self.bytes_done:
+            text += f"  {bytes_per_second / 1048576.0:.1f} MB/秒"
+        eta = self.eta
+        if eta is not None and not self.finished:
+            text += f"  剩余 {eta:.0f} 秒"
+        if self.message:
+            text += f"\n{self.message}"
+        return text
+
+
+class JobRunner():
+
+    def __init__(self,max_workers=4,schedule_main=None,slice_budget=0.03):
+        '''
+        max_workers > io任务线程数
+        schedule_main > 请求在主线程调用pump的函数,会在工作线程中调用,必须是线程安全的
+                        为None时需要手动调用pump
+        slice_budget > 每次pump在主线程中最多占用的时间(秒)
+        '''
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,thread_name_prefix="component_job")
+        self.schedule_main = schedule_main
+        self.slice_budget = slice_budget
+        self.jobs = []
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+    def shutdown(self,wait=False):
+        for job in self.jobs:
+            job.cancel()
+        self.executor.shutdown(wait=wait)
+
+    @property
+    def busy(self):
+        return any(not job.finished for job in self.jobs)
+
+    def submit(self,job):
+        job.state = RUNNING
+        job.start_time = time.perf_counter()
+        self.jobs.append(job)
+        self._request_pump()
+        return job
+
+    def _request_pump(self):
+        if self.schedule_main is None:
+            return
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.schedule_main(self._scheduled_pump)
+
+    def _scheduled_pump(self):
+        with self._lock:
+            self._scheduled = False
+        if self.pump():
+            #只在等待io任务时停止调度,io任务完成时由回调调度
+            if not all(self._waiting_io(job) for job in self.jobs):
+                self._request_pump()
+
+    def _main_ready(self,job):
+        return not job.finished and any(t.kind == "main" and (t.ready() or t.state == RUNNING) for t in job.tasks)
+
+    def _waiting_io(self,job):
+        return not self._main_ready(job) and any(t.kind == "io" and t.state == RUNNING for t in job.tasks)
+
+    ######################################################################
+
+    def pump(self,budget=None):
+        '''
+        在主线程中推进所有任务,返回是否还有未完成的任务
+        '''
+        budget = self.slice_budget if budget is None else budget
+        deadline = time.perf_counter() + budget
+
+        for job in list(self.jobs):
+            if job.finished:
+                continue
+            self._pump_job(job,deadline)
+            self._notify(job)
+
+        self.jobs = [job for job in self.jobs if not job.finished]
+        return bool(self.jobs)
+
+    def _pump_job(self,job,deadline):
+        #收集完成的io任务
+        for task in job.tasks:
+            if task.kind == "io" and task.state == RUNNING and task._future.done():
+                self._finish_io(job,task)
+
+        if job.cancelled:
+            for task in job.tasks:
+                if task.state == PENDING or (task.state == RUNNING and task.kind == "main"):
+                    task.state = CANCELLED
+                    if task._generator is not None:
+                        task._generator.close()
+
+        for task in job.tasks:
+            if task.blocked():
+                task.state = CANCELLED
+
+        self._start_io(job)
+
+        #主线程任务分片执行,至少执行一个分片,直到超出时间预算
+        while True:
+            task = next((t for t in job.tasks if t.kind == "main" and (t.state == RUNNING or t.ready())),None)
+            if task is None:
+                break
+            self._step_main(job,task)
+            if time.perf_counter() >= deadline:
+                break
+
+        #主线程任务完成后可能有新的io任务可以执行
+        self._start_io(job)
+
+        if all(task.finished for task in job.tasks):
+            self._finish_job(job)
+
+    def _start_io(self,job):
+        '''
+        启动依赖已经完成的io任务,完成时请求在主线程pump
+        '''
+        if job.cancelled:
+            return
+        for task in job.tasks:
+            if task.kind == "io" and task.ready():
+                task.state = RUNNING
+                task._future = self.executor.submit(self._run_io,job,task)
+                task._future.add_done_callback(lambda future:self._request_pump())
+
+    def _run_io(self,job,task):
+        job.check_cancelled()
+        return task.func(job)
+
+    def _finish_io(self,job,task):
+        try:
+            task.result = task._future.result()
+            task.state = DONE
+            job.results[task.name] = task.result
+        except CancelledError:
+            task.state = CANCELLED
+        except Exception as e:
+            self._fail(job,task,e)
+
+    def _step_main(self,job,task):
+        try:
+            if task._generator is None:
+                job.check_cancelled()
+                task.state = RUNNING
+                result = task.func(job)
+                if isinstance(result,types.GeneratorType):
+                    task._generator = result
+                else:
+                    task.result = result
+                    task.state = DONE
+                    job.results[task.name] = result
+                    return
+
+            job.check_cancelled()
+            next(task._generator)
+
+        except StopIteration as stop:
+            task.result = stop.value
+            task.state = DONE
+            job.results[task.name] = stop.value
+        except CancelledError:
+            task.state = CANCELLED
+        except Exception as e:
+            self._fail(job,task,e)
+
+    def _fail(self,job,task,error):
+        task.state = FAILED
+        task.error = error
+        if job.error is None:
+            job.error = error
+            job.message = f"{task.name} 失败 > {error}"
+            traceback.print_exception(type(error),error,error.__traceback__)
+        #一个任务失败后取消整个job
+        job.cancel()
+
+    def _finish_job(self,job):
+        for func in job.finalizers:
+            try:
+                func(job)
+            except Exception:
+                traceback.print_exc()
+
+        if job.error is not None:
+            job.state = FAILED
+        elif job.cancelled:
+            job.state = CANCELLED
+            job.message = job.message or "已取消"
+        else:
+            job.state = DONE
+        job.end_time = time.perf_counter()
+
+    def _notify(self,job):
+        for func in job.listeners:
+            try:
+                func(job)
+            except Exception:
+                traceback.print_exc()
+
+    ######################################################################
+
+    def run_until_complete(self,job,poll=0.005):
+        '''
+        在当前线程同步执行job,用于批处理和测试
+        '''
+        if job not in self.jobs:
+            self.submit(job)
+        while not job.finished:
+            if not self.pump(budget=1.0):
+                break
+            if not job.finished and self._waiting_io(job):
+                time.sleep(poll)
+        return job
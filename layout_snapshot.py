@@ -0,0 +1,252 @@
+'''
+组件布局快照(layout snapshot)的二进制读写
+
+文件为紧凑的列式结构,不依赖Maya,可在任意Python环境中读取,
+矩阵块按8字节对齐,可以直接mmap后作为float64数组使用(numpy.frombuffer / memoryview.cast)
+
+文件结构(小端):
+    header          > HEADER_STRUCT
+    string_index    > uint32[string_count + 1]   字符串表的偏移
+    string_data     > utf-8 字符串依次拼接
+    columns         > uint32[record_count] * len(COLUMNS)   每列为字符串表索引
+    matrices        > float64[record_count * 16]   世界矩阵(行优先,与MMatrix一致)
+'''
+import os,sys,mmap,struct
+from array import array
+
+MAGIC = b"CSNP"
+VERSION = 1
+
+#magic,version,record_count,string_count,string_index_offset,string_data_offset,columns_offset,matrix_offset
+HEADER_STRUCT = struct.Struct("<4sIIIQQQQ")
+
+COLUMNS = ("node_name","asset_name","resolution","file_format","asset_dir","parent")
+
+MATRIX_SIZE = 16
+
+
+def _align(offset,size=8):
+    return (offset + size - 1) // size * size
+
+
+def _to_little_endian(arr):
+    '''
+    array按机器字节序存储,大端机器上写文件前需要翻转
+    '''
+    if sys.byteorder != "little":
+        arr = array(arr.typecode,arr)
+        arr.byteswap()
+    return arr
+
+
+def write_snapshot(path,columns=None,matrices=None):
+    '''
+    写入布局快照
+    path > 输出文件路径
+    columns > {列名:[str,...]}  列名见COLUMNS,每列长度必须一致
+    matrices > 扁平的float列表,长度为 记录数*16
+
+    返回写入的记录数
+    '''
+    if not columns:
+        raise ValueError("columns is None")
+
+    count = len(columns[COLUMNS[0]])
+    for name in COLUMNS:
+        if len(columns.get(name,())) != count:
+            raise ValueError(f"column {name} length error")
+
+    matrix_array = array("d",matrices or [])
+    if len(matrix_array) != count * MATRIX_SIZE:
+        raise ValueError("matrices length error")
+
+    #字符串去重,资产名/目录/父层级在大场景中高度重复
+    string_table = {}
+    strings = []
+    column_arrays = []
+    for name in COLUMNS:
+        indices = array("I")
+        for value in columns[name]:
+            value = value or ""
+            index = string_table.get(value)
+            if index is None:
+                index = len(strings)
+                string_table[value] = index
+                strings.append(value)
+            indices.append(index)
+        column_arrays.append(indices)
+
+    encoded = [s.encode("utf-8") for s in strings]
+    string_index = array("I",[0])
+    for data in encoded:
+        string_index.append(string_index[-1] + len(data))
+    string_data = b"".join(encoded)
+
+    string_index_offset = HEADER_STRUCT.size
+    string_data_offset = string_index_offset + len(string_index) * 4
+    columns_offset = _align(string_data_offset + len(string_data),4)
+    matrix_offset = _align(columns_offset + count * 4 * len(COLUMNS),8)
+
+    header = HEADER_STRUCT.pack(MAGIC,VERSION,count,len(strings),
+                    string_index_offset,string_data_offset,columns_offset,matrix_offset)
+
+    out_dir = os.path.dirname(path)
+    if out_dir and not os.path.exists(out_dir):
+        os.makedirs(out_dir)
+
+    with open(path,"wb") as f:
+        f.write(header)
+        f.write(_to_little_endian(string_index).tobytes())
+        f.write(string_data)
+        f.write(b"\0" * (columns_offset - f.tell()))
+        for indices in column_arrays:
+            f.write(_to_little_endian(indices).tobytes())
+        f.write(b"\0" * (matrix_offset - f.tell()))
+        f.write(_to_little_endian(matrix_array).tobytes())
+
+    return count
+
+
+class SnapshotReader():
+    '''
+    通过mmap读取布局快照,字符串列按需解码,矩阵块不拷贝
+        with SnapshotReader(path) as snapshot:
+            for record in snapshot.records():
+                ...
+    '''
+
+    def __init__(self,path):
+        self.path = path
+        self._file = open(path,"rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(),0,access=mmap.ACCESS_READ)
+        except ValueError:
+            #空文件无法mmap
+            self._file.close()
+            raise ValueError(f"{path} 不是有效的布局快照文件")
+
+        (magic,version,self.count,self.string_count,string_index_offset,
+            string_data_offset,columns_offset,matrix_offset) = HEADER_STRUCT.unpack_from(self._mmap,0)
+
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} 不是有效的布局快照文件")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"不支持的快照版本 > {version}")
+
+        self._string_data_offset = string_data_offset
+        self._columns_offset = columns_offset
+        self._matrix_offset = matrix_offset
+
+        self._string_index = self._uint32_view(string_index_offset,self.string_count + 1)
+        self._strings = [None] * self.string_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self._string_index = None
+        if getattr(self,"_mmap",None) is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                #外部仍持有列/矩阵的memoryview,交给垃圾回收释放
+                pass
+            self._mmap = None
+        self._file.close()
+
+    def _uint32_view(self,offset,length):
+        data = memoryview(self._mmap)[offset:offset + length * 4]
+        if sys.byteorder == "little":
+            return data.cast("I")
+        arr = array("I",data.tobytes())
+        arr.byteswap()
+        return arr
+
+    def string(self,index):
+        '''
+        返回字符串表中index位置的字符串(带缓存)
+        '''
+        value = self._strings[index]
+        if value is None:
+            start = self._string_data_offset + self._string_index[index]
+            end = self._string_data_offset + self._string_index[index + 1]
+            value = self._mmap[start:end].decode("utf-8")
+            self._strings[index] = value
+        return value
+
+    def column_indices(self,name):
+        '''
+        返回列的字符串索引数组(uint32),适合做分组统计
+        '''
+        position = COLUMNS.index(name)
+        return self._uint32_view(self._columns_offset + position * self.count * 4,self.count)
+
+    def column(self,name):
+        '''
+        返回解码后的整列字符串
+        '''
+        string = self.string
+        return [string(i) for i in self.column_indices(name)]
+
+    @property
+    def matrices(self):
+        '''
+        扁平的float64矩阵数组,长度为 count*16
+        '''
+        data = memoryview(self._mmap)[self._matrix_offset:self._matrix_offset + self.count * MATRIX_SIZE * 8]
+        if sys.byteorder == "little":
+            return data.cast("d")
+        arr = array("d",data.tobytes())
+        arr.byteswap()
+        return arr
+
+    def matrix(self,index):
+        start = index * MATRIX_SIZE
+        return list(self.matrices[start:start + MATRIX_SIZE])
+
+    def to_numpy(self):
+        '''
+        返回 (count,4,4) 的numpy矩阵数组(只读,直接引用mmap内存)
+        需要安装numpy
+        '''
+        import numpy as np
+        return np.frombuffer(self._mmap,dtype="<f8",count=self.count * MATRIX_SIZE,
+                        offset=self._matrix_offset).reshape(self.count,4,4)
+
+    def records(self):
+        '''
+        逐条返回 {列名:值,"matrix":[16 float]}
+        '''
+        columns = [self.column(name) for name in COLUMNS]
+        matrices = self.matrices
+        for i in range(self.count):
+            record = {name:columns[c][i] for c,name in enumerate(COLUMNS)}
+            record["matrix"] = list(matrices[i * MATRIX_SIZE:(i + 1) * MATRIX_SIZE])
+            yield record
+
+
+def read_snapshot(path):
+    return SnapshotReader(path)
+
+
+if __name__ == "__main__":
+    #命令行查看快照内容: python layout_snapshot.py layout.csnp
+    from collections import Counter
+
+    if len(sys.argv) < 2:
+        print("usage: python layout_snapshot.py <snapshot file>")
+        sys.exit(1)
+
+    with read_snapshot(sys.argv[1]) as snapshot:
+        print(f"records > {len(snapshot)}  strings > {snapshot.string_count}")
+        counter = Counter(zip(snapshot.column("asset_name"),snapshot.column("file_format")))
+        for (asset_name,file_format),count in counter.most_common():
+            print(f"{count:>8}  {file_format:<10} {asset_name}")
@@ -0,0 +1,172 @@
+'''
+组件库目录扫描
+
+目录结构:
+    {root}/{project}_{scene}_{asset}/
+        {asset_id}_{res}.ma
+        {asset_id}_preview.png
+        alembic/{asset_id}_{res}.abc
+        cache/{asset_id}_{res}.abc
+        ass/{asset_id}_{res}.ass
+
+扫描只列出根目录一次(os.scandir,不对每个资产执行stat),
+资产内的文件列表在需要时再读取,适合网络盘上的大型组件库
+不依赖Maya/Qt
+'''
+import os,sys,time
+from collections import OrderedDict
+
+#fileFormat > (子目录,扩展名)
+FORMAT_FOLDERS = {
+    "abc":("alembic","abc"),
+    "gpuCache":("cache","abc"),
+    "ass":("ass","ass"),
+}
+
+PREVIEW_SUFFIX = "_preview.png"
+
+
+def is_asset_dir_name(name):
+    '''
+    资产目录名称为 {project}_{scene}_{asset}
+    '''
+    return not name.startswith(".") and name.count("_") >= 2
+
+
+class AssetEntry():
+    __slots__ = ("asset_id","path")
+
+    def __init__(self,asset_id,path):
+        self.asset_id = asset_id
+        self.path = path
+
+    def __repr__(self):
+        return f"<AssetEntry {self.asset_id}>"
+
+    @property
+    def preview_path(self):
+        return f"{self.path}/{self.asset_id}{PREVIEW_SUFFIX}"
+
+    def ma_path(self,res):
+        return f"{self.path}/{self.asset_id}_{res}.ma"
+
+    def file_path(self,res,file_format):
+        '''
+        返回指定分辨率和格式的缓存路径,不检查文件是否存在
+        file_format > abc,gpuCache,ass
+        '''
+        folder,extension = FORMAT_FOLDERS[file_format]
+        return f"{self.path}/{folder}/{self.asset_id}_{res}.{extension}"
+
+    def stamp(self):
+        '''
+        资产目录和缓存子目录的修改时间,导出或删除缓存时会改变
+        return [资产目录,alembic,cache,ass],不存在的目录为None
+        '''
+        result = []
+        for folder in ("",) + tuple(folder for folder,_ in FORMAT_FOLDERS.values()):
+            try:
+                result.append(os.stat(f"{self.path}/{folder}" if folder else self.path).st_mtime)
+            except OSError:
+                result.append(None)
+        return result
+
+    def list_files(self):
+        '''
+        读取资产中已经导出的缓存
+        return {fileFormat:[res,...]}
+        '''
+        result = {}
+        prefix = self.asset_id + "_"
+        for file_format,(folder,extension) in FORMAT_FOLDERS.items():
+            try:
+                entries = os.scandir(f"{self.path}/{folder}")
+            except OSError:
+                continue
+            with entries:
+                res_list = []
+                for entry in entries:
+                    base_name,ext = os.path.splitext(entry.name)
+                    if ext == "." + extension and base_name.startswith(prefix):
+                        res_list.append(base_name[len(prefix):])
+            if res_list:
+                result[file_format] = sorted(res_list)
+        return result
+
+
+def iter_library(root,batch_size=500):
+    '''
+    逐批返回资产,每批为AssetEntry列表,顺序为目录顺序
+    root > 组件库根目录
+    batch_size > 每批数量,用于边扫描边显示
+    '''
+    root = root.replace("\\","/").rstrip("/")
+    batch = []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if not is_asset_dir_name(entry.name):
+                continue
+            #is_dir使用目录项类型信息,通常不需要额外stat
+            if not entry.is_dir():
+                continue
+            batch.append(AssetEntry(entry.name,f"{root}/{entry.name}"))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def scan_library(root):
+    '''
+    返回按名称排序的AssetEntry列表
+    '''
+    entries = []
+    for batch in iter_library(root):
+        entries.extend(batch)
+    entries.sort(key=lambda entry:entry.asset_id.lower())
+    return entries
+
+
+class LRUCache():
+    '''
+    容量固定的LRU缓存,用于缩略图等占用内存较大的对象
+    '''
+
+    def __init__(self,capacity=512):
+        self.capacity = capacity
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self,key):
+        return key in self._data
+
+    def get(self,key,default=None):
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self,key,value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+
+if __name__ == "__main__":
+    #命令行扫描: python library.py Z:/.../component
+    if len(sys.argv) < 2:
+        print("usage: python library.py <library root>")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    entries = scan_library(sys.argv[1])
+    print(f"assets > {len(entries)}  {time.perf_counter() - start:.3f}s")
+    for entry in entries[:20]:
+        print(f"    {entry.asset_id}")
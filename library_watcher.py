@@ -0,0 +1,203 @@
+'''
+轮询组件库缓存文件的变化,用于只重新加载受影响的代理节点
+
+网络共享上文件通知不可靠,按目录轮询:
+    目录修改时间变化(新建,删除,替换文件) > 列出一次目录,比较被监视文件的 (修改时间,大小)
+    目录修改时间没有变化 > 跳过该目录,每full_every次轮询逐个stat一次,发现原地覆盖写入的文件
+文件变化后等待settle秒内 (修改时间,大小) 不再变化(导出完成)才报告,同一次轮询中稳定的文件一起报告
+
+    watcher = LibraryWatcher(settle=2.0)
+    watcher.set_paths(["Z:/.../DFH_fhsj_tree/ass/DFH_fhsj_tree_hiRes.ass",...])
+    watcher.poll()                          #返回稳定的变化文件列表
+    watcher.start(on_change,interval=2.0)   #后台线程轮询,on_change(paths)在轮询线程中调用
+    watcher.stop()
+不依赖Maya
+'''
+import os,time,threading
+
+#轮询间隔(秒)
+POLL_INTERVAL = 2.0
+
+#文件变化后保持不变的时间(秒)
+SETTLE_SECONDS = 2.0
+
+#每多少次轮询逐个检查修改时间没有变化的目录中的文件
+FULL_EVERY = 10
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime,stat.st_size)
+
+
+class _Directory():
+    __slots__ = ("mtime","files")
+
+    def __init__(self):
+        self.mtime = None
+        #文件名 > (修改时间,大小),不存在时为None
+        self.files = {}
+
+
+class LibraryWatcher():
+
+    def __init__(self,settle=SETTLE_SECONDS,full_every=FULL_EVERY,clock=time.monotonic):
+        '''
+        settle > 文件变化后保持不变的时间,0时立即报告
+        full_every > 每多少次轮询检查修改时间没有变化的目录,0时只依赖目录修改时间
+        clock > 计时函数,可以替换为测试用的实现
+        '''
+        self.settle = settle
+        self.full_every = full_every
+        self.clock = clock
+        #目录 > _Directory
+        self.directories = {}
+        #路径 > ((修改时间,大小),第一次发现的时间),等待稳定的文件
+        self.pending = {}
+        self.polls = 0
+        #统计 目录stat,目录列出,文件stat 的次数
+        self.dir_stats = 0
+        self.listings = 0
+        self.file_stats = 0
+        self.lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _split(path):
+        directory,_,name = path.replace("\\","/").rpartition("/")
+        return directory,name
+
+    def set_paths(self,paths):
+        '''
+        设置监视的文件,新加入的文件以当前状态为基准,不在列表中的文件停止监视
+        返回新加入的文件数量
+        '''
+        wanted = {}
+        for path in paths:
+            directory,name = self._split(path)
+            wanted.setdefault(directory,set()).add(name)
+
+        added = 0
+        with self.lock:
+            for directory in list(self.directories):
+                if directory not in wanted:
+                    del self.directories[directory]
+            for directory,names in wanted.items():
+                state = self.directories.get(directory)
+                if state is None:
+                    state = self.directories[directory] = _Directory()
+                    state.mtime = _stat(directory)
+                for name in list(state.files):
+                    if name not in names:
+                        del state.files[name]
+                for name in names - set(state.files):
+                    state.files[name] = _stat(f"{directory}/{name}")
+                    added += 1
+            self.pending = {path:item for path,item in self.pending.items()
+                            if self._split(path)[1] in wanted.get(self._split(path)[0],())}
+        return added
+
+    @property
+    def paths(self):
+        with self.lock:
+            return [f"{directory}/{name}" for directory,state in self.directories.items() for name in state.files]
+
+    def _list(self,directory,names):
+        self.listings += 1
+        found = {}
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.name in names:
+                        stat = entry.stat()
+                        found[entry.name] = (stat.st_mtime,stat.st_size)
+        except OSError:
+            pass
+        return {name:found.get(name) for name in names}
+
+    def _check_directory(self,directory,state,full):
+        '''
+        返回 {文件名:当前状态},目录没有变化并且不是完整检查时返回None
+        '''
+        self.dir_stats += 1
+        mtime = _stat(directory)
+        if mtime != state.mtime:
+            state.mtime = mtime
+            return self._list(directory,state.files)
+        if not full:
+            return None
+        self.file_stats += len(state.files)
+        return {name:_stat(f"{directory}/{name}") for name in state.files}
+
+    def poll(self):
+        '''
+        检查一次,返回已经稳定的变化文件(包括删除的文件)
+        '''
+        with self.lock:
+            self.polls += 1
+            full = bool(self.full_every) and self.polls % self.full_every == 0
+            now = self.clock()
+            checked = set()
+            for directory,state in self.directories.items():
+                current = self._check_directory(directory,state,full)
+                if current is None:
+                    continue
+                for name,stat in current.items():
+                    path = f"{directory}/{name}"
+                    checked.add(path)
+                    if stat != state.files[name]:
+                        state.files[name] = stat
+                        self.pending[path] = (stat,now)
+
+            settled = []
+            for path,(stat,since) in list(self.pending.items()):
+                directory,name = self._split(path)
+                state = self.directories[directory]
+                if path not in checked:
+                    #原地写入不改变目录修改时间,等待中的文件每次单独检查
+                    self.file_stats += 1
+                    current = _stat(path)
+                    if current != stat:
+                        state.files[name] = current
+                        self.pending[path] = (current,now)
+                        continue
+                if now - since >= self.settle:
+                    settled.append(path)
+                    del self.pending[path]
+            return sorted(settled)
+
+    def start(self,on_change,interval=POLL_INTERVAL):
+        '''
+        在后台线程中轮询,有稳定的变化文件时调用 on_change(paths)
+        '''
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    changed = self.poll()
+                except Exception as e:
+                    print(f"组件库监视失败 > {e}")
+                    continue
+                if changed:
+                    on_change(changed)
+
+        self._thread = threading.Thread(target=run,name="LibraryWatcher",daemon=True)
+        self._thread.start()
+
+    def stop(self,wait=5.0):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(wait)
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
@@ -0,0 +1,237 @@
+'''
+导出前的面数和分辨率比例检查
+
+每个res组的所有mesh按数组保存(三角面,顶点,世界包围盒),检查全部使用numpy向量运算:
+    每个res的三角面/顶点上限
+    低分辨率与高分辨率的三角面比例 proxyRes/hiRes,midRes/hiRes,proxyRes/midRes
+    各res包围盒与最高分辨率的偏差(proxy模型缺失部件或缩放错误)
+
+    arrays = {"proxyRes":MeshArrays(...),"midRes":...,"hiRes":...}   #Operator.collect_mesh_arrays
+    report = Validator().validate(arrays)
+    print(format_report(report))
+
+检查只在配置后执行,配置文件路径由环境变量 COMPONENT_POLYCOUNT_CONFIG 指定,没有配置的项不检查:
+    {"limits":{"proxyRes":{"triangles":20000}},"ratios":{"proxyRes/hiRes":0.1},"bounds_tolerance":0.05}
+    {"recommended":true}    #使用RECOMMENDED_LIMITS,RECOMMENDED_RATIOS,RECOMMENDED_BOUNDS_TOLERANCE
+不依赖Maya,需要numpy,没有安装时 available() 返回False
+numpy在使用时导入,导入common不会加载numpy
+'''
+import os,json,importlib.util
+
+#配置文件路径的环境变量,没有设置时不检查面数
+CONFIG_ENV = "COMPONENT_POLYCOUNT_CONFIG"
+
+#推荐的每个res上限,配置 "recommended":true 时使用
+RECOMMENDED_LIMITS = {
+    "proxyRes":{"triangles":20000,"vertices":20000},
+    "midRes":{"triangles":200000,"vertices":200000},
+    "hiRes":{"triangles":2000000,"vertices":2000000},
+}
+
+#推荐的 (低分辨率,高分辨率) > 三角面比例上限
+RECOMMENDED_RATIOS = {
+    ("proxyRes","hiRes"):0.1,
+    ("midRes","hiRes"):0.5,
+    ("proxyRes","midRes"):0.3,
+}
+
+#推荐的包围盒偏差上限,占最高分辨率包围盒对角线的比例
+RECOMMENDED_BOUNDS_TOLERANCE = 0.05
+
+#报告中每个res列出的最大mesh数量
+TOP_MESHES = 5
+
+#包围盒的8个角点 (min=0,max=1)
+_CORNERS = [(x,y,z) for x in (0,1) for y in (0,1) for z in (0,1)]
+
+
+def available():
+    return importlib.util.find_spec("numpy") is not None
+
+
+def world_bounds(local_bounds,matrices):
+    '''
+    local_bounds > (n,6) 物体空间包围盒 minx,miny,minz,maxx,maxy,maxz
+    matrices > (n,16) 世界矩阵(Maya行优先,行向量 p' = p * M)
+    返回 (n,6) 世界空间包围盒,8个角点一次变换
+    '''
+    import numpy as np
+    local_bounds = np.asarray(local_bounds,dtype=np.float64).reshape(-1,6)
+    matrices = np.asarray(matrices,dtype=np.float64).reshape(-1,4,4)
+    index = np.array([[corner[axis] * 3 + axis for axis in range(3)] for corner in _CORNERS])
+    #(n,8,3)
+    corners = local_bounds[:,index]
+    points = np.einsum("nci,nij->ncj",corners,matrices[:,:3,:3]) + matrices[:,None,3,:3]
+    return np.concatenate([points.min(axis=1),points.max(axis=1)],axis=1)
+
+
+class MeshArrays():
+    '''
+    一个res组的所有mesh
+    names > mesh长名称列表
+    triangles,vertices > (n,) 整数数组
+    bounds > (n,6) 世界包围盒
+    '''
+
+    def __init__(self,names,triangles,vertices,bounds):
+        import numpy as np
+        self.names = list(names)
+        self.triangles = np.asarray(triangles,dtype=np.int64).reshape(-1)
+        self.vertices = np.asarray(vertices,dtype=np.int64).reshape(-1)
+        self.bounds = np.asarray(bounds,dtype=np.float64).reshape(-1,6)
+        if not len(self.names) == len(self.triangles) == len(self.vertices) == len(self.bounds):
+            raise ValueError("mesh数组长度不一致")
+
+    @classmethod
+    def from_local(cls,names,triangles,vertices,local_bounds,matrices):
+        '''
+        由物体空间包围盒和世界矩阵创建
+        '''
+        if not names:
+            return cls([],[],[],[])
+        return cls(names,triangles,vertices,world_bounds(local_bounds,matrices))
+
+    def __len__(self):
+        return len(self.names)
+
+    def summary(self,top=TOP_MESHES):
+        import numpy as np
+        if not len(self):
+            return {"meshes":0,"triangles":0,"vertices":0,"bounds":None,"top":[]}
+        order = np.argsort(self.triangles)[::-1][:top]
+        return {
+            "meshes":len(self),
+            "triangles":int(self.triangles.sum()),
+            "vertices":int(self.vertices.sum()),
+            "bounds":np.concatenate([self.bounds[:,:3].min(axis=0),self.bounds[:,3:].max(axis=0)]).tolist(),
+            "top":[(self.names[i],int(self.triangles[i])) for i in order],
+        }
+
+
+class Validator():
+
+    def __init__(self,limits=None,ratios=None,bounds_tolerance=None):
+        '''
+        limits > {res:{"triangles":上限,"vertices":上限}},None时不检查
+        ratios > {(低分辨率,高分辨率):三角面比例上限},None时不检查
+        bounds_tolerance > 包围盒偏差上限,None时不检查
+        '''
+        self.limits = limits or {}
+        self.ratios = ratios or {}
+        self.bounds_tolerance = bounds_tolerance
+
+    @classmethod
+    def recommended(cls):
+        return cls(limits=RECOMMENDED_LIMITS,ratios=RECOMMENDED_RATIOS,bounds_tolerance=RECOMMENDED_BOUNDS_TOLERANCE)
+
+    def check_empty(self,summaries):
+        '''
+        没有mesh的res组导出时跳过,只作为警告,不影响passed
+        '''
+        return [{"res":res,"type":"empty","value":0,"limit":None,"message":f"{res} 没有mesh,导出时跳过"}
+                for res,summary in summaries.items() if not summary["meshes"]]
+
+    def check_limits(self,summaries):
+        issues = []
+        for res,summary in summaries.items():
+            if not summary["meshes"]:
+                continue
+            for key,limit in self.limits.get(res,{}).items():
+                if summary[key] > limit:
+                    issues.append({"res":res,"type":key,"value":summary[key],"limit":limit,
+                                   "message":f"{res} {key} {summary[key]} 超过上限 {limit}"})
+        return issues
+
+    def check_ratios(self,summaries):
+        issues = []
+        for (low,high),limit in self.ratios.items():
+            if low not in summaries or high not in summaries:
+                continue
+            high_triangles = summaries[high]["triangles"]
+            if not high_triangles:
+                continue
+            ratio = summaries[low]["triangles"] / float(high_triangles)
+            if ratio > limit:
+                issues.append({"res":low,"type":"ratio","value":round(ratio,4),"limit":limit,
+                               "message":f"{low}/{high} 三角面比例 {ratio:.2f} 超过 {limit}"})
+        return issues
+
+    def check_bounds(self,summaries,reference=None):
+        '''
+        与reference(默认为三角面最多的res)比较包围盒
+        '''
+        if self.bounds_tolerance is None:
+            return []
+        import numpy as np
+        valid = {res:summary for res,summary in summaries.items() if summary["bounds"] is not None}
+        if len(valid) < 2:
+            return []
+        reference = reference or max(valid,key=lambda res:valid[res]["triangles"])
+        reference_bounds = np.asarray(valid[reference]["bounds"])
+        diagonal = float(np.linalg.norm(reference_bounds[3:] - reference_bounds[:3])) or 1.0
+
+        issues = []
+        for res,summary in valid.items():
+            if res == reference:
+                continue
+            deviation = float(np.abs(np.asarray(summary["bounds"]) - reference_bounds).max()) / diagonal
+            if deviation > self.bounds_tolerance:
+                issues.append({"res":res,"type":"bounds","value":round(deviation,4),"limit":self.bounds_tolerance,
+                               "message":f"{res} 包围盒与 {reference} 偏差 {deviation:.1%}"})
+        return issues
+
+    def validate(self,res_arrays):
+        '''
+        res_arrays > {res:MeshArrays}
+        返回 {"resolutions":{res:summary},"issues":[...],"warnings":[...],"passed":bool}
+        '''
+        summaries = {res:arrays.summary() for res,arrays in res_arrays.items()}
+        issues = self.check_limits(summaries) + self.check_ratios(summaries) + self.check_bounds(summaries)
+        return {"resolutions":summaries,"issues":issues,"warnings":self.check_empty(summaries),"passed":not issues}
+
+
+def load_config(file_path):
+    '''
+    从json创建Validator,没有配置的项不检查,"recommended"为true时没有配置的项使用推荐值
+    ratios的键为 "低分辨率/高分辨率"
+    '''
+    with open(file_path,"r",encoding="utf-8") as f:
+        config = json.load(f)
+    defaults = Validator.recommended() if config.get("recommended") else Validator()
+    ratios = config.get("ratios")
+    if ratios is not None:
+        ratios = {tuple(key.split("/")):value for key,value in ratios.items()}
+    return Validator(limits=config.get("limits",defaults.limits),
+                     ratios=defaults.ratios if ratios is None else ratios,
+                     bounds_tolerance=config.get("bounds_tolerance",defaults.bounds_tolerance))
+
+
+def load_default():
+    '''
+    从CONFIG_ENV指定的配置创建Validator
+    没有设置环境变量,配置文件不存在或没有安装numpy时返回None,导出时不检查面数
+    '''
+    file_path = os.environ.get(CONFIG_ENV)
+    if not file_path or not available():
+        return None
+    if not os.path.isfile(file_path):
+        print(f"面数检查配置不存在 > {file_path}")
+        return None
+    try:
+        return load_config(file_path)
+    except (OSError,ValueError) as e:
+        print(f"读取面数检查配置失败 > {e}")
+        return None
+
+
+def format_report(report):
+    lines = [f"{'分辨率':<10}{'mesh':>8}{'三角面':>12}{'顶点':>12}  最大mesh"]
+    for res,summary in report["resolutions"].items():
+        top = f"{summary['top'][0][0].split('|')[-1]} ({summary['top'][0][1]})" if summary["top"] else ""
+        lines.append(f"{res:<10}{summary['meshes']:>8}{summary['triangles']:>12}{summary['vertices']:>12}  {top}")
+    for issue in report["issues"]:
+        lines.append(f"  [{issue['type']}] {issue['message']}")
+    for warning in report.get("warnings",()):
+        lines.append(f"  [警告] {warning['message']}")
+    lines.append("面数检查通过" if report["passed"] else f"面数检查失败 {len(report['issues'])} 项")
+    return "\n".join(lines)
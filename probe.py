@@ -0,0 +1,79 @@
+'''
+单次操作内的目录列表缓存
+
+替换/分析大量组件节点时,同一个资产目录(ass/,cache/,alembic/)会被检查很多次
+DirectoryProbe 每个目录只执行一次 os.scandir,之后的存在检查和文件大小都从内存中返回
+缓存只在一次操作内有效,操作结束后丢弃,不需要处理文件变化
+
+    probe = DirectoryProbe()
+    probe.exists("Z:/.../DFH_fhsj_tree/ass/DFH_fhsj_tree_hiRes.ass")
+    probe.size(path)
+    probe.listings > 实际列出的目录数量
+
+scandir可以替换为测试用的实现,需要返回支持with的DirEntry迭代器
+'''
+import os
+
+
+class DirectoryProbe():
+
+    def __init__(self,scandir=os.scandir):
+        self.scandir = scandir
+        #目录 > {文件名:DirEntry},目录不存在时为空字典
+        self._dirs = {}
+        self.listings = 0
+        self.queries = 0
+
+    def _key(self,path):
+        return os.path.normcase(path.replace("\\","/").rstrip("/"))
+
+    def listing(self,directory):
+        '''
+        返回目录中的文件 {文件名:DirEntry},每个目录只列出一次
+        '''
+        key = self._key(directory)
+        entries = self._dirs.get(key)
+        if entries is None:
+            entries = {}
+            self.listings += 1
+            try:
+                with self.scandir(directory) as it:
+                    for entry in it:
+                        entries[os.path.normcase(entry.name)] = entry
+            except OSError:
+                pass
+            self._dirs[key] = entries
+        return entries
+
+    def _entry(self,path):
+        self.queries += 1
+        directory,_,name = path.replace("\\","/").rpartition("/")
+        return self.listing(directory).get(os.path.normcase(name))
+
+    def exists(self,path):
+        '''
+        文件是否存在(目录返回False)
+        '''
+        entry = self._entry(path)
+        if entry is None:
+            return False
+        try:
+            return entry.is_file()
+        except OSError:
+            return False
+
+    def size(self,path):
+        '''
+        文件大小,不存在时返回0
+        DirEntry在Windows上自带大小信息,其他系统第一次访问时stat一次
+        '''
+        entry = self._entry(path)
+        if entry is None:
+            return 0
+        try:
+            return entry.stat().st_size
+        except OSError:
+            return 0
+
+    def clear(self):
+        self._dirs.clear()
@@ -0,0 +1,253 @@
+'''
+Component Tool 的性能采样
+
+    from profiler import profiler
+
+    profiler.enable()
+    with profiler.span("export",asset="DFH_fhsj_test") as span:
+        ...
+        span.add(nodes=10,bytes=2048)
+
+    @profiler.timed()
+    def export_abc(...):
+        ...
+        profiler.current().add(bytes=os.path.getsize(path))
+
+    profiler.export_chrome_trace("D:/trace.json")   #chrome://tracing 或 https://ui.perfetto.dev 打开
+    print(profiler.format_summary())
+
+未开启时span()返回同一个空对象,timed()装饰的函数只多一次属性判断
+不依赖Maya,可以在mayapy和普通Python环境中使用
+设置环境变量 COMPONENT_TOOL_PROFILE=1 时默认开启
+'''
+import os,json,time,threading,functools
+from collections import defaultdict
+
+#这些参数在汇总时累加,其余参数只记录在trace中
+COUNTER_KEYS = ("nodes","bytes","files")
+
+
+class _NullSpan():
+    '''
+    未开启采样时使用的空span
+    '''
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        return False
+
+    def add(self,**counters):
+        pass
+
+    def set(self,**args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span():
+    __slots__ = ("profiler","name","args","start","end","thread_id","depth","children_time")
+
+    def __init__(self,profiler,name,args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+        self.start = 0.0
+        self.end = 0.0
+        self.thread_id = 0
+        self.depth = 0
+        self.children_time = 0.0
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        self.depth = len(stack)
+        self.thread_id = threading.get_ident()
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.end = time.perf_counter()
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1].children_time += self.end - self.start
+        if exc_type is not None:
+            self.args["error"] = repr(exc_value)
+        self.profiler._record(self)
+        return False
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def add(self,**counters):
+        '''
+        累加计数,例如 span.add(nodes=10,bytes=1024)
+        '''
+        for key,value in counters.items():
+            self.args[key] = self.args.get(key,0) + value
+
+    def set(self,**args):
+        self.args.update(args)
+
+
+class Profiler():
+
+    def __init__(self,enabled=False):
+        self.enabled = enabled
+        self.spans = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        with self._lock:
+            self.spans = []
+        self._origin = time.perf_counter()
+
+    def _stack(self):
+        stack = getattr(self._local,"stack",None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self,span):
+        with self._lock:
+            self.spans.append(span)
+
+    def span(self,name,**args):
+        '''
+        返回一个上下文管理器,记录with块的耗时
+        name > span名称
+        args > 附加信息,写入trace的args
+        '''
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self,name,args)
+
+    def current(self):
+        '''
+        返回当前线程正在执行的span,未开启时返回空span
+        '''
+        if not self.enabled:
+            return NULL_SPAN
+        stack = self._stack()
+        return stack[-1] if stack else NULL_SPAN
+
+    def timed(self,name=None):
+        '''
+        函数装饰器,name为空时使用函数的 __qualname__
+        '''
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args,**kwargs):
+                if not self.enabled:
+                    return func(*args,**kwargs)
+                with Span(self,span_name,{}):
+                    return func(*args,**kwargs)
+            return wrapper
+        return decorator
+
+    def timed_command(self,name=None):
+        '''
+        Qt按钮槽函数使用的装饰器
+        包装函数只接收self,避免clicked信号的checked参数被传入槽函数
+        '''
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(instance):
+                if not self.enabled:
+                    return func(instance)
+                with Span(self,span_name,{}):
+                    return func(instance)
+            return wrapper
+        return decorator
+
+    ##########################################################################
+
+    def to_chrome_trace(self):
+        '''
+        转换为 Chrome Trace Event 格式(complete event "X",单位微秒)
+        '''
+        pid = os.getpid()
+        events = []
+        with self._lock:
+            spans = list(self.spans)
+
+        for span in sorted(spans,key=lambda s:s.start):
+            events.append({
+                "name":span.name,
+                "cat":span.name.split(".")[0],
+                "ph":"X",
+                "ts":(span.start - self._origin) * 1e6,
+                "dur":span.duration * 1e6,
+                "pid":pid,
+                "tid":span.thread_id,
+                "args":dict(span.args),
+            })
+        return {"traceEvents":events,"displayTimeUnit":"ms"}
+
+    def export_chrome_trace(self,file_path=None):
+        if not file_path:
+            raise ValueError("file path is None")
+
+        out_dir = os.path.dirname(file_path)
+        if out_dir and not os.path.exists(out_dir):
+            os.makedirs(out_dir)
+
+        with open(file_path,"w",encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(),f,ensure_ascii=False,default=str)
+        return file_path
+
+    def summary(self):
+        '''
+        按span名称汇总
+        return {name:{"calls","total","self","max",计数...}}  时间单位秒
+        '''
+        result = defaultdict(lambda:{"calls":0,"total":0.0,"self":0.0,"max":0.0})
+        with self._lock:
+            spans = list(self.spans)
+
+        for span in spans:
+            item = result[span.name]
+            item["calls"] += 1
+            item["total"] += span.duration
+            item["self"] += span.duration - span.children_time
+            item["max"] = max(item["max"],span.duration)
+            for key in COUNTER_KEYS:
+                if key in span.args:
+                    item[key] = item.get(key,0) + span.args[key]
+        return dict(result)
+
+    def format_summary(self,sort_key="total"):
+        '''
+        返回汇总表格字符串,时间单位毫秒
+        '''
+        summary = self.summary()
+        lines = [f"{'name':<48}{'calls':>7}{'total':>11}{'self':>11}{'mean':>10}{'max':>10}{'nodes':>9}{'bytes':>13}"]
+        for name,item in sorted(summary.items(),key=lambda kv:kv[1][sort_key],reverse=True):
+            lines.append(
+                f"{name:<48}{item['calls']:>7}"
+                f"{item['total'] * 1000:>11.2f}{item['self'] * 1000:>11.2f}"
+                f"{item['total'] * 1000 / item['calls']:>10.2f}{item['max'] * 1000:>10.2f}"
+                f"{item.get('nodes',''):>9}{item.get('bytes',''):>13}"
+            )
+        return "\n".join(lines)
+
+
+profiler = Profiler(enabled=os.environ.get("COMPONENT_TOOL_PROFILE","") not in ("","0"))
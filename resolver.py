@@ -0,0 +1,253 @@
+'''
+组件缓存路径规则
+
+    (资产目录,资产id,分辨率,格式) <> 路径
+    {asset_dir}/{asset_id}_{res}.ma              格式 ma (res为src时是源文件)
+    {asset_dir}/alembic/{asset_id}_{res}.abc     格式 abc
+    {asset_dir}/cache/{asset_id}_{res}.abc       格式 gpuCache
+    {asset_dir}/ass/{asset_id}_{res}.ass         格式 ass
+
+资产名 {asset_id}_{res} 只按最后一个 "_" 拆分,资产id中包含res字符串时也不会替换错
+路径统一使用 "/"
+
+PathResolver 缓存文件存在检查(LRU,超过max_age秒重新检查),
+替换循环中同一个文件只检查一次,批量解析时同一目录的多个文件只列出一次目录
+在 with resolver.operation(): 中改为使用probe.DirectoryProbe,每个目录只列出一次,
+存在检查和文件大小都从目录列表中返回,操作结束后丢弃
+不依赖Maya
+'''
+import os,time,contextlib
+from collections import namedtuple,defaultdict
+
+from library import FORMAT_FOLDERS,LRUCache
+from probe import DirectoryProbe
+
+MA_FORMAT = "ma"
+
+SOURCE_RES = "src"
+
+#子目录 > 格式,用于从路径反求格式
+FOLDER_FORMATS = {(folder,extension):file_format for file_format,(folder,extension) in FORMAT_FOLDERS.items()}
+
+#同一目录中需要检查的文件不少于该数量时列出目录,否则逐个检查
+LIST_DIR_THRESHOLD = 3
+
+
+def normalize(path):
+    return path.replace("\\","/").rstrip("/") if path else path
+
+
+def split_asset_name(asset_name):
+    '''
+    {asset_id}_{res} > (asset_id,res),没有 "_" 时res为空字符串
+    '''
+    asset_id,_,res = asset_name.rpartition("_")
+    if not asset_id:
+        return asset_name,""
+    return asset_id,res
+
+
+def asset_root(directory):
+    '''
+    返回资产目录,directory可以是资产目录或格式子目录(节点的assetDir属性)
+    '''
+    directory = normalize(directory)
+    parent,_,folder = directory.rpartition("/")
+    if parent and any(folder == item[0] for item in FORMAT_FOLDERS.values()):
+        return parent
+    return directory
+
+
+class ComponentPath(namedtuple("ComponentPath","asset_dir asset_id res file_format")):
+    __slots__ = ()
+
+    @property
+    def asset_name(self):
+        return f"{self.asset_id}_{self.res}"
+
+    @property
+    def path(self):
+        return build_path(*self)
+
+    def replace(self,**kwargs):
+        '''
+        返回修改了分辨率或格式的路径 .replace(res="hiRes",file_format="ass")
+        '''
+        return self._replace(**kwargs)
+
+
+def build_path(asset_dir,asset_id,res,file_format):
+    '''
+    返回规范路径,不检查文件是否存在
+    file_format > ma,abc,gpuCache,ass
+    '''
+    if file_format == MA_FORMAT:
+        return f"{normalize(asset_dir)}/{asset_id}_{res}.ma"
+    folder,extension = FORMAT_FOLDERS[file_format]
+    return f"{normalize(asset_dir)}/{folder}/{asset_id}_{res}.{extension}"
+
+
+def parse_path(path):
+    '''
+    build_path的反向解析,返回ComponentPath,不符合规则时返回None
+    '''
+    path = normalize(path)
+    directory,_,file_name = path.rpartition("/")
+    base_name,dot,extension = file_name.rpartition(".")
+    if not dot:
+        return None
+    asset_id,res = split_asset_name(base_name)
+    if not res:
+        return None
+
+    if extension == "ma":
+        return ComponentPath(directory,asset_id,res,MA_FORMAT)
+    parent,_,folder = directory.rpartition("/")
+    file_format = FOLDER_FORMATS.get((folder,extension))
+    if file_format is None or not parent:
+        return None
+    return ComponentPath(parent,asset_id,res,file_format)
+
+
+def from_node_attributes(asset_dir,asset_name,file_format):
+    '''
+    由组件节点的 assetDir,assetName,fileFormat 属性得到ComponentPath
+    '''
+    asset_id,res = split_asset_name(asset_name)
+    if file_format == "mayaAscii":
+        file_format = MA_FORMAT
+    return ComponentPath(asset_root(asset_dir),asset_id,res,file_format)
+
+
+def switch_res(path,res):
+    '''
+    同目录同格式的其他分辨率文件 .../ass/A_proxyRes.ass > .../ass/A_hiRes.ass
+    '''
+    path = normalize(path)
+    directory,_,file_name = path.rpartition("/")
+    base_name,dot,extension = file_name.rpartition(".")
+    asset_id,_ = split_asset_name(base_name if dot else file_name)
+    return f"{directory}/{asset_id}_{res}{dot}{extension}"
+
+
+class PathResolver():
+
+    def __init__(self,cache_size=4096,max_age=10.0,isfile=os.path.isfile,listdir=os.listdir,scandir=os.scandir):
+        '''
+        cache_size > 缓存的文件存在检查数量
+        max_age > 缓存有效时间(秒),导出新文件后不需要手动清除缓存
+        isfile,listdir,scandir > 文件系统函数,可以替换为测试用的实现
+        '''
+        self.max_age = max_age
+        self.isfile = isfile
+        self.listdir = listdir
+        self.scandir = scandir
+        self._cache = LRUCache(cache_size)
+        self.probe = None
+        self.hits = 0
+        self.probes = 0
+
+    def clear(self):
+        self._cache.clear()
+        if self.probe is not None:
+            self.probe.clear()
+
+    @contextlib.contextmanager
+    def operation(self):
+        '''
+        一次替换/分析操作,期间每个目录只列出一次,嵌套调用时使用外层的目录缓存
+        '''
+        if self.probe is not None:
+            yield self.probe
+            return
+        self.probe = DirectoryProbe(self.scandir)
+        try:
+            yield self.probe
+        finally:
+            self.probe = None
+
+    def invalidate(self,path):
+        self._cache.put(normalize(path),None)
+
+    def _cached(self,path,now):
+        item = self._cache.get(path)
+        if item is None or now - item[1] > self.max_age:
+            return None
+        self.hits += 1
+        return item[0]
+
+    def exists(self,path):
+        path = normalize(path)
+        if self.probe is not None:
+            return self.probe.exists(path)
+        now = time.monotonic()
+        result = self._cached(path,now)
+        if result is None:
+            self.probes += 1
+            result = self.isfile(path)
+            self._cache.put(path,(result,now))
+        return result
+
+    def size(self,path):
+        '''
+        文件大小,不存在时返回0,操作外每次都读取文件系统
+        '''
+        if self.probe is not None:
+            return self.probe.size(path)
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def resolve(self,asset_dir,asset_id,res,file_format):
+        '''
+        返回存在的文件路径,不存在时返回None
+        '''
+        path = build_path(asset_dir,asset_id,res,file_format)
+        return path if self.exists(path) else None
+
+    def exists_many(self,paths):
+        '''
+        批量检查文件是否存在,返回 {path:bool}
+        重复的路径只检查一次,同一目录中的多个文件列出一次目录
+        '''
+        if self.probe is not None:
+            return {normalize(path):self.probe.exists(path) for path in paths}
+        now = time.monotonic()
+        result = {}
+        seen = set()
+        by_dir = defaultdict(list)
+        for path in paths:
+            path = normalize(path)
+            if path in seen:
+                continue
+            seen.add(path)
+            cached = self._cached(path,now)
+            if cached is None:
+                by_dir[path.rpartition("/")[0]].append(path)
+            else:
+                result[path] = cached
+
+        for directory,dir_paths in by_dir.items():
+            if len(dir_paths) >= LIST_DIR_THRESHOLD:
+                self.probes += 1
+                try:
+                    names = set(self.listdir(directory))
+                except OSError:
+                    names = set()
+                for path in dir_paths:
+                    result[path] = path.rpartition("/")[2] in names
+                    self._cache.put(path,(result[path],now))
+            else:
+                for path in dir_paths:
+                    result[path] = self.exists(path)
+        return result
+
+    def resolve_many(self,requests):
+        '''
+        批量解析 requests > [(asset_dir,asset_id,res,file_format),...]
+        返回与requests顺序相同的路径列表,文件不存在的为None
+        '''
+        paths = [build_path(*request) for request in requests]
+        found = self.exists_many(paths)
+        return [path if found[path] else None for path in paths]
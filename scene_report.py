@@ -0,0 +1,265 @@
+'''
+场景统计报告
+
+按 (资产,分辨率,格式) 汇总场景中的组件节点:
+    节点数量,共享几何体的实例数量,可以合并为实例的重复数量
+    缓存文件大小,三角面数量,引用贴图的显存估算
+
+    records = operator.collect_scene_stats()      #Maya中批量读取节点
+    report = build_report(records)                #不依赖Maya,可以在工作线程中执行
+    write_csv(report,"D:/stats.csv") / write_json(report,"D:/stats.json")
+
+缓存文件大小在 PathResolver.operation() 中读取,每个资产目录只列出一次
+贴图引用从.ass(ass组件)或 {asset_id}_{res}.ma(abc/gpuCache组件)中解析,
+贴图尺寸只读取文件头,解析结果按(路径,大小,修改时间)缓存,重复统计时文件没有变化不再读取
+gpuCache/ass组件没有几何体信息,三角面按缓存文件大小估算,报告中标记为估算值
+'''
+import os,csv,json,time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import image_header,integrity,resolver,udim
+
+#缓存文件每个三角面的平均字节数,用于估算gpuCache/ass的三角面数量
+BYTES_PER_TRIANGLE = {"gpuCache":24,"ass":40,"abc":36}
+
+CSV_COLUMNS = ("asset_id","resolution","file_format","nodes","shapes","instances","duplicates",
+               "file_path","file_size","triangles","triangles_estimated","scene_triangles",
+               "textures","textures_missing","texture_memory")
+
+
+class StatsCache():
+    '''
+    按(路径,大小,修改时间)缓存贴图引用和贴图文件头,可以在多个报告之间共用
+    '''
+
+    def __init__(self):
+        self._references = {}
+        self._images = {}
+
+    def _stat_key(self,path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size,stat.st_mtime
+
+    def texture_references(self,path):
+        key = self._stat_key(path)
+        if key is None:
+            return []
+        cached = self._references.get(path)
+        if cached is None or cached[0] != key:
+            try:
+                cached = (key,integrity.read_texture_references(path))
+            except OSError:
+                return []
+            self._references[path] = cached
+        return cached[1]
+
+    def image_info(self,path):
+        '''
+        返回image_header.ImageInfo,文件不存在返回False,格式不支持返回None
+        '''
+        key = self._stat_key(path)
+        if key is None:
+            return False
+        cached = self._images.get(path)
+        if cached is None or cached[0] != key:
+            cached = (key,image_header.read_header(path))
+            self._images[path] = cached
+        return cached[1]
+
+    def clear(self):
+        self._references.clear()
+        self._images.clear()
+
+
+_default_cache = StatsCache()
+
+
+def texture_source(component_path):
+    '''
+    记录组件贴图引用的文件,ass直接读取缓存文件,abc/gpuCache读取同分辨率的ma文件
+    '''
+    if component_path.file_format == "ass":
+        return component_path.path
+    return component_path.replace(file_format=resolver.MA_FORMAT).path
+
+
+def estimate_triangles(file_size,file_format):
+    per_triangle = BYTES_PER_TRIANGLE.get(file_format)
+    if not per_triangle:
+        return 0
+    return file_size // per_triangle
+
+
+def _expand_textures(references,udim_index):
+    paths = []
+    for reference in references:
+        reference = reference.replace("\\","/")
+        if udim.has_token(reference):
+            paths.extend(udim_index.tile_paths(reference) or [reference])
+        else:
+            paths.append(reference)
+    return paths
+
+
+def build_report(records,path_resolver=None,cache=None,workers=8,mipmaps=True):
+    '''
+    records > Operator.collect_scene_stats 的结果
+        [{"node","asset_dir","asset_name","file_format","resolution","shape","triangles"},...]
+        shape > 子节点的第一个路径,实例共享同一个shape
+        triangles > 一个组件的三角面数量,没有几何体信息时为None
+    path_resolver > resolver.PathResolver,读取缓存文件大小
+    cache > StatsCache,为空时使用模块级缓存
+    mipmaps > 贴图显存包含mipmap
+    返回 {"created_at","seconds","totals","groups":[...]}
+    '''
+    start = time.perf_counter()
+    path_resolver = path_resolver or resolver.PathResolver()
+    cache = cache or _default_cache
+
+    groups = {}
+    for record in records:
+        key = (record["asset_dir"],record["asset_name"],record["file_format"])
+        group = groups.get(key)
+        if group is None:
+            component_path = resolver.from_node_attributes(*key)
+            group = groups[key] = {
+                "asset_id":component_path.asset_id,
+                "resolution":record["resolution"] or component_path.res,
+                "file_format":record["file_format"],
+                "nodes":0,
+                "shapes":set(),
+                "file_path":component_path.path if component_path.file_format in resolver.FORMAT_FOLDERS else "",
+                "texture_source":texture_source(component_path),
+                "triangles":None,
+            }
+        group["nodes"] += 1
+        group["shapes"].add(record["shape"] or record["node"])
+        if group["triangles"] is None and record.get("triangles") is not None:
+            group["triangles"] = record["triangles"]
+
+    #同一个资产目录的缓存文件和ma文件只列出一次目录
+    with path_resolver.operation():
+        for group in groups.values():
+            group["file_size"] = path_resolver.size(group["file_path"]) if group["file_path"] else 0
+            if not path_resolver.exists(group["texture_source"]):
+                group["texture_source"] = ""
+
+    sources = sorted({group["texture_source"] for group in groups.values() if group["texture_source"]})
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        references = dict(zip(sources,executor.map(cache.texture_references,sources)))
+
+        udim_index = udim.UdimIndex()
+        group_textures = {}
+        for key,group in groups.items():
+            found = references.get(group["texture_source"],[])
+            group_textures[key] = list(dict.fromkeys(_expand_textures(found,udim_index)))
+
+        texture_paths = sorted({path for paths in group_textures.values() for path in paths})
+        infos = dict(zip(texture_paths,executor.map(cache.image_info,texture_paths)))
+
+    memory = {path:image_header.memory_bytes(info,mipmaps) if info else 0 for path,info in infos.items()}
+
+    result = []
+    for key,group in groups.items():
+        textures = group_textures[key]
+        shapes = len(group.pop("shapes"))
+        group.pop("texture_source")
+
+        triangles = group["triangles"]
+        group["triangles_estimated"] = triangles is None
+        if triangles is None:
+            triangles = estimate_triangles(group["file_size"],group["file_format"])
+
+        group.update({
+            "shapes":shapes,
+            #共享shape的节点
+            "instances":group["nodes"] - shapes,
+            #每多一个独立shape就多加载一份几何体,可以合并为实例
+            "duplicates":shapes - 1,
+            "triangles":triangles,
+            "scene_triangles":triangles * group["nodes"],
+            "textures":len(textures),
+            "textures_missing":sum(1 for path in textures if infos[path] is False),
+            "texture_memory":sum(memory[path] for path in textures),
+            "texture_paths":textures,
+        })
+        result.append(group)
+
+    result.sort(key=lambda item:(item["asset_id"],item["resolution"],item["file_format"]))
+
+    by_resolution = Counter()
+    by_format = Counter()
+    for group in result:
+        by_resolution[group["resolution"]] += group["nodes"]
+        by_format[group["file_format"]] += group["nodes"]
+
+    #同一个缓存文件和贴图在场景中只计算一次
+    disk_files = {group["file_path"]:group["file_size"] for group in result if group["file_path"]}
+    scene_textures = {path for group in result for path in group["texture_paths"]}
+    totals = {
+        "nodes":sum(group["nodes"] for group in result),
+        "groups":len(result),
+        "assets":len({group["asset_id"] for group in result}),
+        "shapes":sum(group["shapes"] for group in result),
+        "instances":sum(group["instances"] for group in result),
+        "duplicates":sum(group["duplicates"] for group in result),
+        "disk_bytes":sum(disk_files.values()),
+        "scene_triangles":sum(group["scene_triangles"] for group in result),
+        "estimated_groups":sum(1 for group in result if group["triangles_estimated"]),
+        "textures":len(scene_textures),
+        "textures_missing":sum(1 for path in scene_textures if infos[path] is False),
+        "texture_memory":sum(memory[path] for path in scene_textures),
+        "by_resolution":dict(by_resolution),
+        "by_format":dict(by_format),
+    }
+
+    return {
+        "created_at":time.strftime("%Y-%m-%d %H:%M:%S"),
+        "seconds":round(time.perf_counter() - start,3),
+        "totals":totals,
+        "groups":result,
+    }
+
+
+def format_report(report):
+    totals = report["totals"]
+    lines = [f"{'节点':>6}{'实例':>6}{'重复':>6}  {'格式':<9}{'分辨率':<10}{'文件(MB)':>10}{'三角面':>12}{'贴图(MB)':>10}  资产"]
+    for group in report["groups"]:
+        triangles = f"~{group['triangles']}" if group["triangles_estimated"] else str(group["triangles"])
+        lines.append(f"{group['nodes']:>6}{group['instances']:>6}{group['duplicates']:>6}  {group['file_format']:<9}"
+                     f"{group['resolution']:<10}{group['file_size'] / 1048576.0:>10.2f}{triangles:>12}"
+                     f"{group['texture_memory'] / 1048576.0:>10.2f}  {group['asset_id']}")
+    lines.append(f"共 {totals['nodes']} 个节点, {totals['assets']} 个资产, {totals['groups']} 组, "
+                 f"实例 {totals['instances']}, 可合并的重复 {totals['duplicates']}")
+    lines.append(f"缓存文件 {totals['disk_bytes'] / 1048576.0:.2f} MB, 场景三角面 {totals['scene_triangles']} "
+                 f"(估算 {totals['estimated_groups']} 组), 贴图 {totals['textures']} 张 "
+                 f"{totals['texture_memory'] / 1048576.0:.2f} MB, 缺失 {totals['textures_missing']} 张")
+    return "\n".join(lines)
+
+
+def write_csv(report,file_path):
+    with open(file_path,"w",encoding="utf-8-sig",newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        for group in report["groups"]:
+            writer.writerow([group[column] for column in CSV_COLUMNS])
+    return len(report["groups"])
+
+
+def write_json(report,file_path):
+    with open(file_path,"w",encoding="utf-8") as f:
+        json.dump(report,f,ensure_ascii=False,indent=1)
+    return len(report["groups"])
+
+
+def write_report(report,file_path):
+    '''
+    按扩展名写入 .csv 或 .json
+    '''
+    if file_path.lower().endswith(".csv"):
+        return write_csv(report,file_path)
+    return write_json(report,file_path)
@@ -0,0 +1,403 @@
+'''
+组件库资产名称搜索索引
+
+资产名 {project}_{scene}_{asset} 按 "_" 拆分为单词,每个单词生成三元组(trigram)倒排表:
+    "tree" > "$tr","tre","ree","ee$"
+查询词只在开头加边界符,命中全部三元组即为单词前缀:
+    "tre" > "$tr","tre"
+排序: 完全匹配单词 > 单词前缀 > 三元组相似度(模糊匹配)
+过滤: has:ass  has:hiRes  has:ass.hiRes  只返回存在对应格式/分辨率缓存的资产
+
+    index = SearchIndex.load(path)      #文件不存在时返回空索引
+    index.sync(library.scan_library(root))
+    index.search("fhsj tree has:ass")   #[(score,record),...]
+    index.save(path)
+
+命令行:
+    python search_index.py build Z:/.../component --index D:/index.json
+    python search_index.py query "tree has:hiRes" --index D:/index.json
+'''
+import os,sys,json,math,time,heapq,argparse
+from collections import Counter,defaultdict
+
+import library
+
+VERSION = 2
+
+#出现在超过该比例资产中的三元组不参与打分(例如项目缩写),除非查询只有这些三元组
+COMMON_GRAM_RATIO = 0.2
+
+#模糊匹配至少需要命中的查询三元组比例
+MIN_GRAM_RATIO = 0.5
+
+FILTER_PREFIX = "has:"
+
+
+def split_words(asset_id):
+    return [word for word in asset_id.lower().split("_") if word]
+
+
+def word_grams(word):
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def query_grams(term):
+    padded = f"${term}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def availability_tags(formats):
+    '''
+    formats > {fileFormat:[res,...]}
+    返回过滤用的标签 ass,hires,ass.hires
+    '''
+    tags = set()
+    for file_format,res_list in (formats or {}).items():
+        file_format = file_format.lower()
+        tags.add(file_format)
+        for res in res_list:
+            tags.add(res.lower())
+            tags.add(f"{file_format}.{res.lower()}")
+    return tags
+
+
+class SearchIndex():
+
+    def __init__(self):
+        #docid > record,删除的资产为None
+        self.docs = []
+        self.ids = {}
+        self.grams = defaultdict(list)
+        self.words = defaultdict(list)
+        self.tags = defaultdict(set)
+        self.removed = 0
+        self._start_grams = None
+        self._rank = None
+        self._order = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self,asset_id):
+        return asset_id in self.ids
+
+    def get(self,asset_id):
+        docid = self.ids.get(asset_id)
+        return None if docid is None else self.docs[docid]
+
+    def records(self):
+        return [record for record in self.docs if record is not None]
+
+    ######################################################################
+
+    def add(self,asset_id,path=None,formats=None,stamp=None):
+        '''
+        添加或更新资产
+        formats > {fileFormat:[res,...]},为None时不支持has:过滤
+        stamp > AssetEntry.stamp(),读取formats时的目录修改时间,sync时比较
+        '''
+        if asset_id in self.ids:
+            self.remove(asset_id)
+
+        docid = len(self.docs)
+        words = split_words(asset_id)
+        record = {"asset_id":asset_id,"path":path or "","formats":formats or {},"stamp":stamp,"words":words}
+        self.docs.append(record)
+        self.ids[asset_id] = docid
+
+        grams = set()
+        for word in words:
+            grams |= word_grams(word)
+        for gram in grams:
+            self.grams[gram].append(docid)
+        for word in set(words):
+            self.words[word].append(docid)
+        for tag in availability_tags(formats):
+            self.tags[tag].add(docid)
+        self._start_grams = None
+        self._rank = None
+        return record
+
+    def remove(self,asset_id):
+        '''
+        删除资产,倒排表中保留失效的docid,失效数量过多时压缩
+        '''
+        docid = self.ids.pop(asset_id,None)
+        if docid is None:
+            return False
+        record = self.docs[docid]
+        self.docs[docid] = None
+        self._rank = None
+        for tag in availability_tags(record["formats"]):
+            self.tags[tag].discard(docid)
+        self.removed += 1
+        if self.removed > 1000 and self.removed > len(self.ids):
+            self.compact()
+        return True
+
+    def compact(self):
+        '''
+        重新编号,清除已删除的资产
+        '''
+        records = self.records()
+        self.__init__()
+        for record in records:
+            self.add(record["asset_id"],record["path"],record["formats"],record["stamp"])
+
+    def sync(self,entries,list_files=False):
+        '''
+        与组件库扫描结果同步,处理新增,删除和缓存变化的资产
+        entries > library.AssetEntry列表
+        list_files > 读取缓存文件列表,每个已有资产stat资产目录和3个缓存目录,
+                    修改时间变化(导出或删除了缓存)时重新列出
+        返回 (新增和更新数量,删除数量)
+        '''
+        current = {entry.asset_id:entry for entry in entries}
+        removed = [asset_id for asset_id in self.ids if asset_id not in current]
+        for asset_id in removed:
+            self.remove(asset_id)
+
+        added = 0
+        for asset_id,entry in current.items():
+            record = self.get(asset_id)
+            stamp = entry.stamp() if list_files else None
+            if record is not None and record["path"] == entry.path and (not list_files or record["stamp"] == stamp):
+                continue
+            self.add(asset_id,entry.path,entry.list_files() if list_files else None,stamp)
+            added += 1
+        return added,len(removed)
+
+    ######################################################################
+
+    def _prefix_docs(self,term):
+        '''
+        一到两个字符的查询,返回单词以term开头的docid
+        '''
+        if len(term) == 2:
+            return self.grams.get("$" + term,[])
+        if self._start_grams is None:
+            self._start_grams = defaultdict(list)
+            for gram in self.grams:
+                if gram[0] == "$":
+                    self._start_grams[gram[1]].append(gram)
+        docids = []
+        for gram in self._start_grams.get(term,[]):
+            docids.extend(self.grams[gram])
+        return docids
+
+    def _name_rank(self):
+        '''
+        docid > 按资产名排序的位置,用于同分排序和只有过滤条件的查询
+        '''
+        if self._rank is None:
+            order = sorted((docid for docid,record in enumerate(self.docs) if record is not None),
+                        key=lambda docid:self.docs[docid]["asset_id"].lower())
+            self._rank = [0] * len(self.docs)
+            for position,docid in enumerate(order):
+                self._rank[docid] = position
+            self._order = order
+        return self._rank
+
+    def _match_term(self,term):
+        '''
+        返回 {docid:score}
+        '''
+        if len(term) < 3:
+            scores = dict.fromkeys(self._prefix_docs(term),2.0)
+        else:
+            scores = self._match_grams(term)
+        #完全匹配单词最后写入
+        exact = self.words.get(term)
+        if exact:
+            scores.update(dict.fromkeys(exact,3.0))
+        return scores
+
+    def _match_grams(self,term):
+        '''
+        三元组模糊匹配,查询三元组包含开头边界符,命中全部三元组视为单词前缀
+        '''
+        all_grams = query_grams(term)
+        grams = [gram for gram in all_grams if gram in self.grams]
+        if not grams:
+            return {}
+        total = len(all_grams)
+        #跳过高频三元组,减少计数量
+        limit = max(1,int(len(self.docs) * COMMON_GRAM_RATIO))
+        grams.sort(key=lambda gram:len(self.grams[gram]))
+        selected = [gram for gram in grams if len(self.grams[gram]) <= limit] or grams[:1]
+        skipped = len(grams) - len(selected)
+
+        hits = Counter()
+        for gram in selected:
+            hits.update(self.grams[gram])
+
+        min_hits = max(1,math.ceil(total * MIN_GRAM_RATIO) - skipped)
+        scores = {}
+        for docid,count in hits.items():
+            if count >= min_hits:
+                count += skipped
+                scores[docid] = 2.0 if count == total else count / float(total)
+        return scores
+
+    def search(self,text,limit=50):
+        '''
+        查询,多个词之间为"且"的关系
+        返回 [(score,record),...] 按分数从高到低排序,同分按资产名排序
+        '''
+        terms = []
+        filters = []
+        for token in text.lower().replace("_"," ").split():
+            if token.startswith(FILTER_PREFIX):
+                filters.append(token[len(FILTER_PREFIX):])
+            else:
+                terms.append(token)
+
+        candidates = None
+        for tag in filters:
+            docids = self.tags.get(tag,set())
+            candidates = set(docids) if candidates is None else candidates & docids
+
+        docs = self.docs
+        rank = self._name_rank()
+
+        if not terms:
+            if candidates is None:
+                return []
+            result = []
+            for docid in self._order:
+                if docid in candidates:
+                    result.append((1.0,docs[docid]))
+                    if len(result) >= limit:
+                        break
+            return result
+
+        total = None
+        for term in terms:
+            scores = self._match_term(term)
+            if candidates is not None:
+                scores = {docid:score for docid,score in scores.items() if docid in candidates}
+            if total is None:
+                total = scores
+            else:
+                total = {docid:total[docid] + score for docid,score in scores.items() if docid in total}
+            if not total:
+                return []
+
+        #分数是离散的,按分数分组后只对最高的几组按名称排序
+        buckets = defaultdict(list)
+        for docid,score in total.items():
+            buckets[score].append(docid)
+
+        result = []
+        for score in sorted(buckets,reverse=True):
+            docids = [docid for docid in buckets[score] if docs[docid] is not None]
+            for docid in heapq.nsmallest(limit - len(result),docids,key=rank.__getitem__):
+                result.append((score,docs[docid]))
+            if len(result) >= limit:
+                break
+        return result
+
+    ######################################################################
+
+    def save(self,path):
+        '''
+        保存为json,包含倒排表,打开工具时不需要重建
+        '''
+        if self.removed:
+            self.compact()
+        out_dir = os.path.dirname(path)
+        if out_dir and not os.path.exists(out_dir):
+            os.makedirs(out_dir)
+        data = {
+            "version":VERSION,
+            "assets":[[record["asset_id"],record["path"],record["formats"],record["stamp"]] for record in self.docs],
+            "grams":self.grams,
+            "words":self.words,
+        }
+        temp_path = path + ".tmp"
+        with open(temp_path,"w",encoding="utf-8") as f:
+            json.dump(data,f,ensure_ascii=False,separators=(",",":"))
+        os.replace(temp_path,path)
+        return path
+
+    @classmethod
+    def load(cls,path):
+        '''
+        读取索引,文件不存在或版本不一致时返回空索引
+        '''
+        index = cls()
+        if not path or not os.path.isfile(path):
+            return index
+        try:
+            with open(path,"r",encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError,ValueError) as e:
+            print(f"读取搜索索引失败 > {e}")
+            return index
+        if data.get("version") != VERSION:
+            return index
+
+        for docid,(asset_id,asset_path,formats,stamp) in enumerate(data["assets"]):
+            index.docs.append({"asset_id":asset_id,"path":asset_path,"formats":formats,"stamp":stamp,
+                               "words":split_words(asset_id)})
+            index.ids[asset_id] = docid
+            for tag in availability_tags(formats):
+                index.tags[tag].add(docid)
+        index.grams.update(data["grams"])
+        index.words.update(data["words"])
+        return index
+
+
+def default_index_path(root):
+    '''
+    每个组件库根目录对应一个本地索引文件
+    '''
+    import hashlib
+    key = hashlib.md5(root.replace("\\","/").rstrip("/").lower().encode("utf-8")).hexdigest()[:12]
+    return os.path.join(os.path.expanduser("~"),".component_tool",f"search_index_{key}.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Component library search index")
+    sub = parser.add_subparsers(dest="command",required=True)
+
+    build = sub.add_parser("build",help="扫描组件库并更新索引")
+    build.add_argument("root")
+    build.add_argument("--index")
+    build.add_argument("--no-files",action="store_true",help="不读取缓存文件列表(has:过滤不可用)")
+
+    query = sub.add_parser("query",help="查询")
+    query.add_argument("text")
+    query.add_argument("--index")
+    query.add_argument("--root",help="未指定--index时使用该组件库的默认索引")
+    query.add_argument("--limit",type=int,default=20)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        index_path = args.index or default_index_path(args.root)
+        start = time.perf_counter()
+        index = SearchIndex.load(index_path)
+        added,removed = index.sync(library.scan_library(args.root),list_files=not args.no_files)
+        index.save(index_path)
+        print(f"assets > {len(index)}  updated > {added}  removed > {removed}  {time.perf_counter() - start:.2f}s")
+        print(f"index > {index_path}")
+        return 0
+
+    index_path = args.index or (default_index_path(args.root) if args.root else None)
+    if not index_path:
+        parser.error("query 需要 --index 或 --root")
+    index = SearchIndex.load(index_path)
+    start = time.perf_counter()
+    results = index.search(args.text,limit=args.limit)
+    elapsed = time.perf_counter() - start
+    for score,record in results:
+        formats = " ".join(f"{file_format}:{','.join(res)}" for file_format,res in record["formats"].items())
+        print(f"{score:6.2f}  {record['asset_id']:<40} {formats}")
+    print(f"{len(results)} results  {elapsed * 1000:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+'''
+基于 fake_maya 场景模型的功能测试,不需要Maya授权
+
+    python -m unittest discover tests
+    python -m pytest tests
+
+场景生成函数与bench.py共用,bench.py只负责计时和cmds调用次数
+'''
+import os,io,sys,shutil,tempfile,unittest,contextlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0,ROOT)
+
+import fake_maya
+import bench
+
+#common只导入一次,每个测试切换到新的空场景
+common = bench.load_common()
+
+RES_LIST = bench.RES_LIST
+
+
+class FakeSceneTestCase(unittest.TestCase):
+    '''
+    每个测试使用新的fake_maya场景和临时目录,屏蔽工具本身的print输出
+    '''
+
+    def setUp(self):
+        self.common = common
+        self.cmds = common.cmds
+        self.scene = fake_maya.reset()
+        self.work_dir = tempfile.mkdtemp(prefix="component_test_").replace("\\","/")
+        self.addCleanup(shutil.rmtree,self.work_dir,ignore_errors=True)
+        stdout = contextlib.redirect_stdout(io.StringIO())
+        stdout.__enter__()
+        self.addCleanup(stdout.__exit__,None,None,None)
+
+    def operator(self):
+        return common.Operator(res_list=RES_LIST)
+
+    def node_path(self,node):
+        return self.scene.path_name(self.scene.primary_path(node))
+
+    def assertMatrixAlmostEqual(self,first,second,places=6):
+        for a,b in zip(first,second):
+            self.assertAlmostEqual(a,b,places=places)
@@ -0,0 +1,332 @@
+'''
+导出: 分res导出,导出任务,缩小贴图,gpuCache批量导出,ass配置,面数检查和UDIM贴图复制
+'''
+import os,json,time,unittest
+
+import fake_maya
+from tests.support import FakeSceneTestCase,RES_LIST,bench
+
+SIZE = 300
+
+
+class ExportTestCase(FakeSceneTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.output = f"{self.work_dir}/export"
+        self.texture_dir = f"{self.work_dir}/textures"
+
+    def job_runner(self):
+        import jobs
+        runner = jobs.JobRunner()
+        self.addCleanup(runner.shutdown,wait=True)
+        return runner
+
+
+class ExportChildResTest(ExportTestCase):
+
+    def test_one_abc_export_for_all_res(self):
+        bench.build_export_scene(self.scene,self.texture_dir,SIZE)
+        operator = bench.export_operator(self.common)
+        operator.exportor.abc_res_options = {"proxyRes":{"uvWrite":False,"noNormals":True}}
+        self.scene.call_counts.clear()
+        operator.export_child_res(node_name="|RootLocator",file_path=self.output,asset_name="bench",
+                        project_code="DFH",scene="fhsj",file_type="abc")
+        self.assertEqual(self.scene.call_counts["AbcExport"],1)
+        for res in RES_LIST:
+            self.assertTrue(os.path.isfile(f"{self.output}/DFH_fhsj_bench/alembic/DFH_fhsj_bench_{res}.abc"),res)
+
+        job = operator.exportor.build_abc_job(node_name="|RootLocator|proxyRes",file_path="a.abc",
+                            options=operator.exportor.abc_res_options["proxyRes"])
+        self.assertEqual(job,'-frameRange 1 1 -worldSpace -noNormals -root |RootLocator|proxyRes -file "a.abc"')
+
+
+class ExportJobTest(ExportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        bench.build_export_scene(self.scene,self.texture_dir,SIZE)
+        self.operator = bench.export_operator(self.common)
+        self.runner = self.job_runner()
+
+    def create_job(self,file_path,**kwargs):
+        return self.operator.create_export_job(node_name="|RootLocator",file_path=file_path,asset_name="bench",
+                        project_code="DFH",scene="fhsj",file_types=["ma","ass"],**kwargs)
+
+    def test_done_with_textures(self):
+        import jobs
+        job = self.create_job(self.output,copy_texture=True)
+        self.runner.run_until_complete(job)
+        self.assertEqual(job.state,jobs.DONE,job.message)
+        self.assertTrue(os.listdir(f"{self.output}/DFH_fhsj_bench/textures"))
+
+    def test_cancel_restores_root_transform(self):
+        import jobs
+        self.cmds.setAttr("|RootLocator.translateX",5.0)
+        job = self.create_job(f"{self.work_dir}/cancel")
+        self.runner.submit(job)
+        while self.runner.pump(budget=0.0):
+            if job.done_units:
+                job.cancel()
+        self.assertEqual(job.state,jobs.CANCELLED)
+        self.assertEqual(self.cmds.getAttr("|RootLocator.translateX"),5.0)
+
+
+class ExportDownsampleTest(ExportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        bench.build_export_scene(self.scene,self.texture_dir,SIZE)
+        self.has_pillow = bench.write_texture_images(self.texture_dir)
+        self.operator = bench.export_operator(self.common)
+        self.runner = self.job_runner()
+        self.export_texture_dir = f"{self.output}/DFH_fhsj_bench/textures"
+
+    def run_job(self):
+        job = self.operator.create_export_job(node_name="|RootLocator",file_path=self.output,asset_name="bench",
+                        project_code="DFH",scene="fhsj",file_types=["ma"],copy_texture=True,downsample_texture=True)
+        self.runner.run_until_complete(job)
+        return job
+
+    def test_res_linked_to_downsampled_textures(self):
+        import jobs
+        import texture_downsample
+        linked = {}
+        export_select_res = self.operator.export_select_res
+        def record_texture(node_name=None,**kwargs):
+            file_node = self.cmds.ls(type="file")[0]
+            linked[node_name.split("|")[-1]] = self.cmds.getAttr(f"{file_node}.fileTextureName")
+            return export_select_res(node_name=node_name,**kwargs)
+        self.operator.export_select_res = record_texture
+
+        job = self.run_job()
+        self.assertEqual(job.state,jobs.DONE,job.message)
+        summary = job.results["downsample_textures"]
+        texture_count = len(os.listdir(self.texture_dir))
+        self.assertEqual(summary["resized"] + summary["copied"],texture_count * 2,summary)
+
+        self.assertIn("/textures/proxyRes/",linked["proxyRes"])
+        self.assertIn("/textures/midRes/",linked["midRes"])
+        self.assertNotIn("/textures/hiRes/",linked["hiRes"])
+        self.assertEqual(linked["hiRes"].rsplit("/",2)[1],"textures")
+        #导出结束后还原为原贴图
+        file_node = self.cmds.ls(type="file")[0]
+        self.assertEqual(self.cmds.getAttr(f"{file_node}.fileTextureName"),linked["hiRes"])
+        if self.has_pillow:
+            from PIL import Image
+            with Image.open(f"{self.export_texture_dir}/proxyRes/{sorted(os.listdir(self.texture_dir))[0]}") as image:
+                self.assertEqual(max(image.size),texture_downsample.RES_MAX_SIZE["proxyRes"])
+
+        #源贴图没有变化时不重新生成
+        job = self.run_job()
+        self.assertEqual(job.results["downsample_textures"]["skipped"],texture_count,job.results["downsample_textures"])
+
+    def test_manifest_compared_per_res(self):
+        import texture_downsample
+        self.run_job()
+        #源贴图修改后只更新了proxyRes,midRes的记录仍是旧的sha1,不能按proxyRes的记录跳过
+        source = f"{self.export_texture_dir}/{sorted(os.listdir(self.texture_dir))[0]}"
+        if self.has_pillow:
+            from PIL import Image
+            Image.new("RGB",(1024,768),(10,200,90)).save(source)
+        else:
+            with open(source,"ab") as f:
+                f.write(b"changed")
+        texture_downsample.downsample_textures([source],self.export_texture_dir,{"proxyRes":512},workers=0)
+        os.utime(source,(time.time() + 10,time.time() + 10))
+
+        summary = texture_downsample.downsample_textures([source],self.export_texture_dir,workers=0)
+        self.assertEqual(summary["unchanged"],1,summary)
+        self.assertEqual(summary["resized"] + summary["copied"],1,summary)
+        source_hash = texture_downsample.file_hash(source)
+        for res in texture_downsample.RES_MAX_SIZE:
+            manifest = texture_downsample.load_manifest(texture_downsample.res_texture_dir(self.export_texture_dir,res))
+            self.assertEqual(manifest[os.path.basename(source)]["hash"],source_hash,res)
+
+
+class GpuCacheBatchTest(ExportTestCase):
+
+    def test_batch_matches_single_export(self):
+        assets = bench.build_gpu_cache_assets(self.scene,SIZE)
+        operator = bench.export_operator(self.common)
+        operator.exportor.gpu_cache_res_thresholds = {"proxyRes":2000}
+        for asset_name,res_groups in assets:
+            for child_group in res_groups:
+                operator.export_select_res(node_name=child_group,file_path=f"{self.work_dir}/single",asset_name=asset_name,
+                                project_code="DFH",scene="fhsj",file_type="gpuCache")
+
+        self.scene.call_counts.clear()
+        results = operator.export_gpu_cache_assets(assets=assets,file_path=f"{self.work_dir}/batch",project_code="DFH",scene="fhsj")
+        self.assertEqual(len(results),len(assets) * len(RES_LIST))
+        self.assertTrue(all(results.values()),results)
+        #每个资产目录,合并阈值一次调用
+        self.assertEqual(self.scene.call_counts["gpuCache"],len(assets) * 2)
+        for asset_name,_ in assets:
+            component = f"DFH_fhsj_{asset_name}"
+            for res in RES_LIST:
+                relative = f"{component}/cache/{component}_{res}.abc"
+                self.assertEqual(os.path.getsize(f"{self.work_dir}/batch/{relative}"),
+                                 os.path.getsize(f"{self.work_dir}/single/{relative}"),relative)
+
+
+class AssProfileTest(ExportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        fake_maya.add_root_locator(self.scene,meshes_per_res=5,polygons=(1,2,4))
+        self.operator = bench.export_operator(self.common)
+
+    def export_profile(self,profile):
+        self.operator.exportor.ass_profile = profile
+        for child_group in self.operator.get_res_groups("|RootLocator"):
+            self.operator.export_select_res(node_name=child_group,file_path=f"{self.work_dir}/{profile}",asset_name="bench",
+                            project_code="DFH",scene="fhsj",file_type="ass")
+        ass_dir = f"{self.work_dir}/{profile}/DFH_fhsj_bench/ass"
+        return sum(os.path.getsize(f"{ass_dir}/{name}") for name in os.listdir(ass_dir) if name.endswith(".ass"))
+
+    def test_component_profile_smaller(self):
+        self.assertLess(self.export_profile("component"),self.export_profile("full"))
+
+    def test_standin_bounds_from_asstoc(self):
+        import asstoc
+        self.export_profile("component")
+        ass_path = f"{self.work_dir}/component/DFH_fhsj_bench/ass/DFH_fhsj_bench_proxyRes.ass"
+        bounds = asstoc.read_bounds(ass_path)
+        self.assertIsNotNone(bounds)
+        self.assertGreater(bounds[3],bounds[0])
+        transform = self.operator.import_ass(ass_path)
+        shape = self.cmds.listRelatives(transform,children=True,fullPath=True)[0]
+        self.assertEqual(self.cmds.getAttr(f"{shape}.MinBoundingBox")[0],bounds[:3])
+
+        #切换res后包围盒更新为目标文件的.asstoc
+        self.operator.replace_ass_res(transform_node=transform,target_res_type="hiRes")
+        hi_bounds = asstoc.read_bounds(ass_path.replace("proxyRes","hiRes"))
+        self.assertEqual(self.cmds.getAttr(f"{shape}.MaxBoundingBox")[0],hi_bounds[3:])
+
+
+class PolycountTest(ExportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.polycount = self.common.polycount
+        bench.preload_numpy()
+
+    def arrays(self,count,triangles,offset=0.0):
+        bounds = [[offset,0,0,offset + 1,1,1]] * count
+        return self.polycount.MeshArrays([f"mesh{i}" for i in range(count)],[triangles] * count,[triangles] * count,bounds)
+
+    def test_scene_over_limit(self):
+        meshes_per_res = SIZE // len(RES_LIST)
+        fake_maya.add_root_locator(self.scene,meshes_per_res=meshes_per_res,polygons=(100,1000,10000))
+        operator = self.operator()
+        operator.polycount_validator = self.polycount.Validator(limits={"hiRes":{"triangles":meshes_per_res * 20000 - 1}})
+        report = operator.validate_polycount("|RootLocator")
+        summaries = report["resolutions"]
+        self.assertEqual([summaries[res]["meshes"] for res in RES_LIST],[meshes_per_res] * 3)
+        self.assertEqual(summaries["hiRes"]["triangles"],meshes_per_res * 20000)
+        self.assertEqual([issue["type"] for issue in report["issues"]],["triangles"])
+
+    def test_ratio_bounds_and_empty_res(self):
+        validator = self.polycount.Validator.recommended()
+        report = validator.validate({"proxyRes":self.arrays(10,500),"midRes":self.arrays(10,600),"hiRes":self.arrays(10,1000)})
+        self.assertEqual(sorted(issue["res"] for issue in report["issues"] if issue["type"] == "ratio"),
+                         ["midRes","proxyRes","proxyRes"])
+
+        report = validator.validate({"proxyRes":self.arrays(10,10,offset=0.5),"midRes":self.polycount.MeshArrays([],[],[],[]),
+                                     "hiRes":self.arrays(10,1000)})
+        self.assertEqual([issue["type"] for issue in report["issues"]],["bounds"])
+        self.assertEqual([warning["res"] for warning in report["warnings"]],["midRes"])
+        self.assertTrue(self.polycount.Validator(limits={}).validate({"proxyRes":self.arrays(10,10),"hiRes":self.arrays(10,1000)})["passed"])
+
+    def test_no_limits_by_default(self):
+        report = self.polycount.Validator().validate({"proxyRes":self.arrays(10,900),"hiRes":self.arrays(10,10 ** 7,offset=5.0)})
+        self.assertTrue(report["passed"])
+
+        config_path = f"{self.work_dir}/polycount.json"
+        with open(config_path,"w",encoding="utf-8") as f:
+            json.dump({"limits":{"hiRes":{"triangles":100}}},f)
+        configured = self.polycount.load_config(config_path)
+        self.assertEqual(configured.limits,{"hiRes":{"triangles":100}})
+        self.assertFalse(configured.ratios)
+        self.assertIsNone(configured.bounds_tolerance)
+
+        environ = os.environ.pop(self.polycount.CONFIG_ENV,None)
+        if environ is not None:
+            self.addCleanup(os.environ.__setitem__,self.polycount.CONFIG_ENV,environ)
+        self.assertIsNone(self.polycount.load_default())
+        self.assertIsNone(self.common.Operator().polycount_validator)
+
+    def test_empty_mid_res_skipped(self):
+        #空的midRes组不阻止导出,导出时跳过
+        root,_ = fake_maya.add_root_locator(self.scene,name="EmptyMidLocator",res_list=("proxyRes","hiRes"),polygons=(100,10000))
+        self.scene.create("transform","midRes",root,exact=True)
+        operator = bench.export_operator(self.common)
+        report = operator.validate_polycount("|EmptyMidLocator")
+        self.assertTrue(report["passed"],report)
+        self.assertEqual([warning["res"] for warning in report["warnings"]],["midRes"])
+
+        for file_type in ("ma","abc"):
+            operator.export_child_res(node_name="|EmptyMidLocator",file_path=self.output,asset_name="empty_mid",
+                            project_code="DFH",scene="fhsj",file_type=file_type)
+        alembic_dir = f"{self.output}/DFH_fhsj_empty_mid/alembic"
+        for res in ("proxyRes","hiRes"):
+            self.assertTrue(os.path.isfile(f"{alembic_dir}/DFH_fhsj_empty_mid_{res}.abc"),res)
+        self.assertFalse(os.path.exists(f"{alembic_dir}/DFH_fhsj_empty_mid_midRes.abc"))
+
+
+class UdimTest(ExportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        #贴图组数不是3的倍数,每组贴图都被wood和stone两种路径引用
+        self.paths,self.set_count = bench.build_udim_scene(self.scene,self.texture_dir,400)
+
+    def test_tiles(self):
+        import udim
+        listed = []
+        def listdir(directory):
+            listed.append(directory)
+            return os.listdir(directory)
+        udim_index = udim.UdimIndex(listdir=listdir)
+        for path in self.paths:
+            self.assertEqual([tile for tile,_ in udim_index.tiles(path)],list(bench.UDIM_TILES),path)
+
+        #ZBrush从u0_v0开始编号
+        clay = udim_index.tiles(f"{self.texture_dir}/clay0_<UVTILE>.tif")
+        self.assertEqual([tile for tile,_ in clay],list(bench.UDIM_TILES))
+        self.assertTrue(clay[0][1].endswith("clay0_u0_v0.tif"))
+        self.assertEqual(udim_index.tile_paths(clay[0][1]),[path for _,path in clay])
+        self.assertEqual(listed,[self.texture_dir])
+
+    def test_tiling_mode_base(self):
+        import udim
+        #没有u0/v0的ZBrush贴图只能从节点的uvTilingMode得到编号起点
+        for u in range(1,11):
+            open(f"{self.texture_dir}/rock_u{u}_v1.tif","wb").close()
+        rock = f"{self.texture_dir}/rock_<UVTILE>.tif"
+        udim_index = udim.UdimIndex()
+        self.assertEqual([tile for tile,_ in udim_index.tiles(rock)],list(range(1001,1011)))
+        self.assertEqual([tile for tile,_ in udim_index.tiles(rock,base=udim.tiling_base(1))],list(range(1012,1021)))
+        self.assertEqual(udim_index.tiles(rock,base=udim.tiling_base(2)),udim_index.tiles(rock))
+        self.assertIsNone(udim.tiling_base(3))
+        self.assertIsNone(udim.tiling_base(0))
+
+    def test_plan_texture_copy(self):
+        for u in range(1,11):
+            open(f"{self.texture_dir}/rock_u{u}_v1.tif","wb").close()
+        operator = self.operator()
+        plan = operator.plan_texture_copy(node_name="|RootLocator",path=self.output,project_code="DFH",scene="fhsj",asset_name="bench")
+        used_sets = min(self.set_count,len(self.paths))
+        self.assertEqual(len(plan["copy"]),used_sets * len(bench.UDIM_TILES) * 2)
+
+        #ZBrush节点从u0_v0开始编号,u10超出范围不复制
+        _,groups = fake_maya.add_root_locator(self.scene,name="ZBrushRoot",polygons=(100,100,100))
+        fake_maya.add_shading(self.scene,groups[0].children[0].children[0],f"{self.texture_dir}/rock_<UVTILE>.tif",
+                              udim=True,tiling_mode=1)
+        plan = operator.plan_texture_copy(node_name="|ZBrushRoot",path=self.output,project_code="DFH",scene="fhsj",asset_name="zbrush")
+        self.assertEqual(sorted(os.path.basename(source) for source,_ in plan["copy"]),
+                         sorted(f"rock_u{u}_v1.tif" for u in range(1,10)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+'''
+批量导出队列: 导出日志,取消后继续,删除文件后重新导出,空res组和层级错误的RootLocator
+'''
+import os,unittest
+
+import fake_maya
+import export_queue
+from tests.support import FakeSceneTestCase,RES_LIST,bench
+
+SIZE = 180
+ROOT_COUNT = 6
+FILE_TYPES = ["ma","abc"]
+OUTPUTS_PER_ITEM = len(RES_LIST) * len(FILE_TYPES)
+
+
+class ExportQueueTest(FakeSceneTestCase):
+
+    def setUp(self):
+        super().setUp()
+        import jobs
+        bench.build_queue_scene(self.scene,SIZE,root_count=ROOT_COUNT)
+        self.operator = bench.export_operator(self.common)
+        self.runner = jobs.JobRunner()
+        self.addCleanup(self.runner.shutdown,wait=True)
+        self.output = f"{self.work_dir}/export"
+        self.journal_path = export_queue.default_journal_path(self.output,"DFH","fhsj")
+        self.items = [(root,self.operator.get_queue_asset_name(root,"DFH","fhsj")) for root in self.operator.find_root_locators()]
+
+    def plan(self,items=None,file_types=FILE_TYPES):
+        '''
+        每次计划都从磁盘重新读取导出日志
+        '''
+        journal = export_queue.Journal(self.journal_path)
+        pending,total,done,failed = self.operator.plan_export_queue(items=items or self.items,file_path=self.output,
+                                project_code="DFH",scene="fhsj",file_types=file_types,journal=journal)
+        queue = export_queue.ExportQueue(pending,journal,total_outputs=total,failed=failed)
+        return queue,pending,total,done,failed
+
+    def run_queue(self,queue,cancel_index=None):
+        bench.run_export_queue(self.operator,self.runner,queue,self.output,FILE_TYPES,cancel_index=cancel_index)
+
+    def test_cancel_and_resume(self):
+        self.assertEqual([asset_name for _,asset_name in self.items],[f"Asset{i}" for i in range(ROOT_COUNT)])
+        queue,pending,total,done,_ = self.plan()
+        self.assertEqual((len(pending),total,done),(ROOT_COUNT,ROOT_COUNT * OUTPUTS_PER_ITEM,0))
+        #第3个资产导出一个输出后取消
+        self.run_queue(queue,cancel_index=2)
+        self.assertTrue(queue.cancelled)
+        self.assertEqual(queue.done_outputs,2 * OUTPUTS_PER_ITEM + 1,queue.status_text())
+
+        queue,pending,total,done,_ = self.plan()
+        self.assertEqual(done,2 * OUTPUTS_PER_ITEM + 1)
+        self.assertEqual(total,ROOT_COUNT * OUTPUTS_PER_ITEM - done)
+        self.assertEqual([asset_name for _,asset_name in pending],[f"Asset{i}" for i in range(2,ROOT_COUNT)])
+        self.run_queue(queue)
+        self.assertTrue(queue.finished)
+        self.assertFalse(queue.failed)
+        self.assertEqual(queue.done_outputs,total,queue.status_text())
+        self.assertEqual(queue.eta,0.0)
+        self.assertGreater(queue.throughput,0)
+
+    def test_removed_file_exported_again(self):
+        self.run_queue(self.plan()[0])
+        #已导出的名称从RootLocator的assetName属性还原
+        self.assertEqual(self.operator.get_queue_asset_name("|Asset0","DFH","fhsj"),"Asset0")
+        os.remove(self.common.resolver.build_path(f"{self.output}/DFH_fhsj_Asset0","DFH_fhsj_Asset0","midRes","abc"))
+        _,pending,total,_,_ = self.plan()
+        self.assertEqual((pending,total),([self.items[0]],1))
+
+    def test_empty_res_group_not_journaled(self):
+        #空的midRes组不写入日志,导出一次后不再进入队列
+        root,_ = fake_maya.add_root_locator(self.scene,name="EmptyMid",res_list=("proxyRes","hiRes"),polygons=(10,1000))
+        self.scene.create("transform","midRes",root,exact=True)
+        items = [("|EmptyMid","EmptyMid")]
+        queue,pending,total,_,_ = self.plan(items)
+        self.assertEqual((pending,total),(items,4))
+        self.run_queue(queue)
+        self.assertEqual(queue.done_outputs,total,queue.status_text())
+        self.assertFalse(queue.failed)
+
+        with open(self.journal_path,"r",encoding="utf-8") as f:
+            lines = f.readlines()
+        _,pending,total,done,_ = self.plan(items)
+        self.assertEqual((pending,total,done),([],0,4))
+        with open(self.journal_path,"r",encoding="utf-8") as f:
+            self.assertEqual(f.readlines(),lines)
+        self.assertFalse(any('"DFH_fhsj_EmptyMid"' in line and '"midRes"' in line for line in lines))
+
+    def test_malformed_root_reported(self):
+        #层级错误的RootLocator记录为失败,其他资产照常进入队列
+        bad_root = self.scene.create("transform","BadRoot",exact=True)
+        self.scene.create("transform","proxyRes",bad_root,exact=True)
+        items = [("|BadRoot","BadRoot"),("|Asset0","Asset0")]
+        queue,pending,_,_,failed = self.plan(items)
+        self.assertEqual(pending,[items[1]])
+        self.assertEqual([item for item,_ in failed],[items[0]])
+        self.assertEqual(queue.failed,failed)
+        self.assertIn("失败 1",queue.status_text())
+
+
+if __name__ == "__main__":
+    unittest.main()
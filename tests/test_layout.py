@@ -0,0 +1,112 @@
+'''
+布局快照(layout snapshot)和重复组件替换为实例
+'''
+import unittest
+
+import fake_maya
+import layout_snapshot
+from tests.support import FakeSceneTestCase,bench
+
+SIZE = 100
+
+
+class LayoutSnapshotTest(FakeSceneTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.transforms = fake_maya.add_layout(self.scene,f"{self.work_dir}/library",SIZE)
+        self.expected = {}
+        for transform in self.transforms:
+            path = self.scene.primary_path(transform)
+            self.expected[transform.name] = (self.scene.path_name(path[:-1]),self.scene.world_matrix(path))
+        self.snapshot_path = f"{self.work_dir}/layout.csnp"
+
+    def test_snapshot_readable_without_maya(self):
+        self.assertEqual(self.operator().export_layout_snapshot(self.snapshot_path),SIZE)
+        with layout_snapshot.read_snapshot(self.snapshot_path) as snapshot:
+            self.assertEqual(len(snapshot),SIZE)
+            records = list(snapshot.records())
+        names = [record["node_name"] for record in records]
+        self.assertEqual(sorted(names),sorted(self.expected))
+        for record in records:
+            parent,matrix = self.expected[record["node_name"]]
+            #世界下的节点父层级为空
+            self.assertEqual(record["parent"] or "|",parent)
+            self.assertEqual(record["file_format"],"ass")
+            self.assertMatrixAlmostEqual(record["matrix"],matrix)
+
+    def test_round_trip(self):
+        operator = self.operator()
+        operator.export_layout_snapshot(self.snapshot_path)
+        self.cmds.delete([self.node_path(transform) for transform in self.transforms])
+        #缺少的父层级在还原时重新创建
+        self.cmds.delete("|layout|blockB")
+
+        self.scene.call_counts.clear()
+        new_nodes = operator.import_layout_snapshot(self.snapshot_path)
+        self.assertEqual(len(new_nodes),SIZE)
+        for node in new_nodes:
+            path = self.scene.resolve(node)
+            parent,matrix = self.expected[path[-1].name]
+            self.assertEqual(self.scene.path_name(path[:-1]),parent,node)
+            self.assertMatrixAlmostEqual(self.scene.world_matrix(path),matrix)
+
+        #每个资产导入一次,其余节点复制;每个父层级一次parent,每个节点一次xform
+        counts = self.scene.call_counts
+        self.assertEqual(counts["duplicate"],SIZE - 20)
+        self.assertEqual(counts["parent"],2)
+        self.assertEqual(counts["xform"],SIZE)
+        self.assertEqual(self.scene.undo_depth,0)
+
+    def test_invalid_file(self):
+        path = f"{self.work_dir}/broken.csnp"
+        with open(path,"wb") as f:
+            f.write(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            layout_snapshot.read_snapshot(path)
+
+
+class DuplicateComponentsTest(FakeSceneTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.transforms,self.instanced = bench.build_duplicate_scene(self.common,self.scene,self.work_dir,SIZE)
+
+    def test_report_uses_existing_instances(self):
+        report = self.operator().analyze_duplicate_components()
+        self.assertEqual({item["asset_name"]:item["master"] for item in report},self.instanced)
+        for item in report:
+            self.assertNotIn(item["master"],item["duplicates"])
+            self.assertEqual(item["saved_bytes"],1024 * len(item["duplicates"]))
+        self.assertEqual(sum(len(item["duplicates"]) for item in report),SIZE - 20)
+
+    def test_dry_run_does_not_modify_scene(self):
+        operator = self.operator()
+        self.assertEqual(operator.consolidate_duplicate_components(dry_run=True),[])
+        self.assertEqual(self.scene.undo_chunks,[])
+        self.assertEqual(len(operator.analyze_duplicate_components()),20)
+
+    def test_apply_in_one_undo_chunk(self):
+        expected = {}
+        for transform in self.transforms:
+            path = self.scene.primary_path(transform)
+            expected[transform.name] = (self.scene.path_name(path[:-1]),self.scene.world_matrix(path))
+
+        operator = self.operator()
+        new_nodes = operator.consolidate_duplicate_components(dry_run=False)
+        self.assertEqual(len(new_nodes),SIZE - 20)
+        self.assertEqual(self.scene.undo_chunks,["consolidateDuplicateComponents"])
+        self.assertEqual(self.scene.undo_depth,0)
+
+        for node in new_nodes + list(self.instanced.values()):
+            path = self.scene.resolve(node)
+            parent,matrix = expected[path[-1].name]
+            self.assertEqual(self.scene.path_name(path[:-1]),parent,node)
+            self.assertMatrixAlmostEqual(self.scene.world_matrix(path),matrix)
+            self.assertTrue(operator.is_instanced_component(node),node)
+            self.assertEqual(self.cmds.getAttr(f"{node}.resolutionType"),"proxyRes")
+        self.assertEqual(operator.analyze_duplicate_components(),[])
+
+
+if __name__ == "__main__":
+    unittest.main()
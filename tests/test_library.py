@@ -0,0 +1,204 @@
+'''
+组件库: 扫描,搜索索引,完整性检查,路径解析,预览图渲染,使用记录和文件监视
+'''
+import os,unittest
+
+from tests.support import FakeSceneTestCase,bench
+
+SIZE = 400
+
+
+class ScanLibraryTest(FakeSceneTestCase):
+
+    def test_scan(self):
+        import library
+        root = f"{self.work_dir}/library"
+        for i in range(SIZE):
+            os.makedirs(f"{root}/DFH_fhsj_asset{i:05d}")
+        self.assertEqual(len(library.scan_library(root)),SIZE)
+
+
+class SearchIndexTest(FakeSceneTestCase):
+
+    def test_queries(self):
+        index = bench.build_search_index(self.work_dir,SIZE)
+        for query in bench.SEARCH_QUERIES:
+            self.assertTrue(index.search(query),query)
+
+    def test_sync_rereads_changed_assets(self):
+        import library
+        from search_index import SearchIndex
+        #已经索引的资产导出新的缓存后,sync重新读取文件列表
+        root = f"{self.work_dir}/library"
+        entries = [library.AssetEntry(f"DFH_fhsj_sync{i}",f"{root}/DFH_fhsj_sync{i}") for i in range(3)]
+        for entry in entries:
+            os.makedirs(f"{entry.path}/ass")
+            open(entry.file_path("proxyRes","ass"),"wb").close()
+        index = SearchIndex()
+        self.assertEqual(index.sync(library.scan_library(root),list_files=True),(3,0))
+        self.assertEqual(index.sync(library.scan_library(root),list_files=True),(0,0))
+        self.assertFalse(index.search("sync has:hires"))
+
+        open(entries[1].file_path("hiRes","ass"),"wb").close()
+        #目录修改时间的精度可能较低,确保导出前后不同
+        stamp = os.stat(f"{entries[1].path}/ass").st_mtime + 1
+        os.utime(f"{entries[1].path}/ass",(stamp,stamp))
+        self.assertEqual(index.sync(library.scan_library(root),list_files=True),(1,0))
+        self.assertEqual([record["asset_id"] for _,record in index.search("sync has:hires")],["DFH_fhsj_sync1"])
+
+        index.save(f"{self.work_dir}/index.json")
+        self.assertEqual(SearchIndex.load(f"{self.work_dir}/index.json").sync(library.scan_library(root),list_files=True),(0,0))
+
+
+class IntegrityTest(FakeSceneTestCase):
+
+    def test_broken_files(self):
+        import integrity as integrity_check
+        root = f"{self.work_dir}/library"
+        asset_count = SIZE // 20
+        bench.build_integrity_library(root,asset_count)
+        report = integrity_check.check_library(root,workers=8)
+        broken = (asset_count + 9) // 10
+        self.assertEqual(report["assets"],asset_count)
+        self.assertEqual(report["summary"],{"truncated":broken,"empty":broken})
+
+
+class ResolvePathsTest(FakeSceneTestCase):
+
+    def test_resolve_many(self):
+        import resolver
+        files,requests,listdir,listed = bench.build_resolve_requests(SIZE)
+        path_resolver = resolver.PathResolver(cache_size=SIZE,isfile=files.__contains__,listdir=listdir)
+        paths = path_resolver.resolve_many(requests)
+        #每个目录只列出一次
+        self.assertEqual(len(listed),len(set(listed)))
+        for path,request in zip(paths,requests):
+            if path:
+                self.assertIn(path,files)
+                #资产名包含res字符串时按最后的res解析
+                self.assertTrue(resolver.parse_path(path)[1].startswith("DFH_fhsj_midResTree"),path)
+            else:
+                self.assertNotIn(resolver.build_path(*request),files)
+
+        #第二次解析全部命中缓存
+        probes = path_resolver.probes
+        self.assertEqual(path_resolver.resolve_many(requests),paths)
+        self.assertEqual(path_resolver.probes,probes)
+
+    def test_component_file_path(self):
+        import resolver
+        #组件节点属性拼接的路径与resolver一致,assetDir为资产目录或格式子目录
+        _,requests,_,_ = bench.build_resolve_requests(SIZE)
+        asset_dir,asset_id = requests[0][0],requests[0][1]
+        expected = resolver.build_path(asset_dir,asset_id,"hiRes","ass")
+        operator = self.operator()
+        for directory in (asset_dir,f"{asset_dir}\\ass"):
+            self.assertEqual(operator.get_component_file_path(directory,f"{asset_id}_hiRes","ass"),expected,directory)
+
+
+class ProbeReplaceTest(FakeSceneTestCase):
+
+    def test_replace_lists_each_asset_once(self):
+        library_root = "Z:/library"
+        fake_fs,asset_count = bench.build_probe_scene(self.scene,SIZE,library_root)
+        operator = self.operator()
+        operator.path_resolver = self.common.resolver.PathResolver(isfile=fake_fs.isfile,scandir=fake_fs)
+        nodes = [node for node_list in operator.get_component_node().values() for node in node_list]
+        with operator.path_resolver.operation():
+            for node in nodes:
+                operator.replace_select_res(sel_node=node,target_file_format="ass",target_res="hiRes")
+        self.assertEqual(fake_fs.counter,{"scandir":asset_count,"stat":0,"isfile":0})
+        for node in nodes:
+            self.assertEqual(self.cmds.getAttr(f"{node}.resolutionType"),"hiRes",node)
+
+        #操作外每次都检查文件
+        operator.path_resolver.clear()
+        operator.path_resolver.max_age = 0
+        operator.path_resolver.exists(f"{library_root}/DFH_fhsj_asset00000/ass/DFH_fhsj_asset00000_hiRes.ass")
+        self.assertEqual(fake_fs.counter["isfile"],1)
+
+
+class ThumbnailFarmTest(FakeSceneTestCase):
+
+    def test_render_missing_and_stale(self):
+        import thumbnail_farm
+        root = f"{self.work_dir}/library"
+        asset_count = 8
+        expected = bench.build_thumbnail_library(root,asset_count)
+        tasks,no_source = thumbnail_farm.plan(root,prefix="DFH_fhsj")
+        self.assertEqual(len(tasks),expected + 1)
+        self.assertEqual(no_source,asset_count // 4)
+
+        #崩溃的资产重启进程后重试仍失败
+        summary = bench.stub_thumbnail_farm().run(tasks)
+        self.assertEqual(summary["rendered"],expected,summary)
+        self.assertEqual(summary["failed"],1,summary)
+        tasks,_ = thumbnail_farm.plan(root,prefix="DFH_fhsj")
+        self.assertEqual([task.asset_id for task in tasks],[f"DFH_fhsj_crash{asset_count:05d}"])
+
+
+class UsageIndexTest(FakeSceneTestCase):
+
+    def test_index_and_incremental_update(self):
+        import usage_index
+        root = f"{self.work_dir}/shots"
+        scene_count = 8
+        bench.build_usage_scenes(root,scene_count)
+        with usage_index.UsageIndex(f"{self.work_dir}/usage.sqlite") as index:
+            summary = index.update(root,workers=2)
+            self.assertEqual(summary["parsed"],scene_count,summary)
+            self.assertFalse(summary["errors"])
+
+            rows = index.find("DFH_fhsj_asset00000")
+            expected = sum(1 for s in range(scene_count) for i in range(20) if (s + i) % 50 == 0)
+            self.assertEqual(len(rows),expected)
+            self.assertTrue(all(row["node"].startswith("layout_grp|") for row in rows))
+            self.assertEqual(len(index.find_cache("Z:/sets/street.ma")),scene_count)
+            hires = rows[0]["asset_name"].replace(rows[0]["resolution"],"hiRes")
+            cache_rows = index.find_cache(f"z:/library/DFH_fhsj_asset00000/ass/{hires}.ass")
+            self.assertTrue(all(row["node_type"] == "aiStandIn" for row in cache_rows))
+
+            #修改一个场景,删除一个场景
+            bench.touch_usage_scenes(root)
+            summary = index.update(root,workers=2)
+            self.assertEqual((summary["parsed"],summary["removed"]),(1,1),summary)
+            self.assertEqual(summary["scenes"],scene_count - 1)
+
+
+class LibraryWatcherTest(FakeSceneTestCase):
+
+    def test_reload_changed_files(self):
+        import library_watcher
+        bench.build_component_scene(self.scene,f"{self.work_dir}/ass_library",SIZE // 2,"ass")
+        bench.build_component_scene(self.scene,f"{self.work_dir}/gpu_library",SIZE // 2,"gpuCache")
+        reloader = self.operator().library_reloader
+        paths = reloader.build_index()
+        watcher = library_watcher.LibraryWatcher(settle=0.0,full_every=10)
+        self.assertEqual(watcher.set_paths(paths),len(paths))
+        #没有变化时不列出目录也不检查文件
+        self.assertEqual(watcher.poll(),[])
+        self.assertEqual((watcher.listings,watcher.file_stats),(0,0))
+
+        #替换写入改变目录修改时间,原地覆盖只在完整检查时发现
+        replaced = next(path for path in paths if path.endswith(".ass"))
+        overwritten = next(path for path in paths if path.endswith(".abc"))
+        with open(replaced + ".tmp","wb") as f:
+            f.write(b"\0" * 512)
+        os.replace(replaced + ".tmp",replaced)
+        with open(overwritten,"r+b") as f:
+            f.write(b"\1" * 512)
+        self.assertEqual(watcher.poll(),[replaced])
+        for _ in range(watcher.full_every - watcher.polls % watcher.full_every - 1):
+            self.assertEqual(watcher.poll(),[])
+        self.assertEqual(watcher.poll(),[overwritten])
+
+        #只重新加载引用这两个文件的节点
+        report = reloader.reload([replaced,overwritten])
+        self.assertEqual(report["standins"],bench.COMPONENTS_PER_ASSET,report)
+        self.assertEqual(report["gpu_caches"],bench.COMPONENTS_PER_ASSET,report)
+        self.assertEqual(sum(self.scene.refreshed.values()),bench.COMPONENTS_PER_ASSET)
+        self.assertTrue(all(node.attrs["dso"] for node in self.scene.nodes.values() if node.type == "aiStandIn"))
+
+
+if __name__ == "__main__":
+    unittest.main()
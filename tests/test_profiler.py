@@ -0,0 +1,112 @@
+'''
+性能采样: 嵌套span,计数,Chrome trace和汇总表格
+'''
+import json,threading,unittest
+
+from profiler import NULL_SPAN,Profiler
+from tests.support import FakeSceneTestCase,bench
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def test_disabled_returns_null_span(self):
+        profiler = Profiler()
+        self.assertIs(profiler.span("export"),NULL_SPAN)
+        self.assertIs(profiler.current(),NULL_SPAN)
+
+        @profiler.timed()
+        def work():
+            profiler.current().add(nodes=1)
+            return 1
+        self.assertEqual(work(),1)
+        self.assertEqual(profiler.spans,[])
+
+    def test_nested_spans(self):
+        profiler = Profiler(enabled=True)
+        with profiler.span("export",asset="tree") as outer:
+            outer.add(nodes=2)
+            with profiler.span("export.abc") as inner:
+                inner.add(bytes=100,files=1)
+                inner.add(bytes=50,files=1)
+        self.assertEqual([span.name for span in profiler.spans],["export.abc","export"])
+
+        summary = profiler.summary()
+        self.assertEqual(summary["export"]["nodes"],2)
+        self.assertEqual((summary["export.abc"]["bytes"],summary["export.abc"]["files"]),(150,2))
+        #父span的self时间不包含子span
+        self.assertAlmostEqual(summary["export"]["self"],outer.duration - inner.duration,places=9)
+        self.assertEqual((outer.depth,inner.depth),(0,1))
+
+    def test_error_recorded(self):
+        profiler = Profiler(enabled=True)
+        with self.assertRaises(ValueError):
+            with profiler.span("export"):
+                raise ValueError("broken")
+        self.assertIn("broken",profiler.spans[0].args["error"])
+
+    def test_threads_have_separate_stacks(self):
+        profiler = Profiler(enabled=True)
+
+        def work():
+            with profiler.span("worker"):
+                pass
+
+        with profiler.span("main"):
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+        spans = {span.name:span for span in profiler.spans}
+        self.assertEqual(spans["worker"].depth,0)
+        self.assertNotEqual(spans["worker"].thread_id,spans["main"].thread_id)
+        self.assertEqual(spans["main"].children_time,0.0)
+
+    def test_timed_command_ignores_signal_arguments(self):
+        profiler = Profiler(enabled=True)
+
+        class Window():
+            @profiler.timed_command("ui.export")
+            def export_command(self):
+                return "done"
+
+        self.assertEqual(Window().export_command(),"done")
+        self.assertEqual(profiler.spans[0].name,"ui.export")
+
+
+class OperatorProfileTest(FakeSceneTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.profiler = self.common.profiler
+        enabled = self.profiler.enabled
+        self.profiler.clear()
+        self.profiler.enable()
+        self.addCleanup(setattr,self.profiler,"enabled",enabled)
+        self.addCleanup(self.profiler.clear)
+
+    def test_operator_spans_and_trace(self):
+        bench.build_component_scene(self.scene,f"{self.work_dir}/library",100)
+        self.operator().get_component_node()
+
+        summary = self.profiler.summary()
+        self.assertEqual(summary["Operator.get_component_node"]["nodes"],100)
+
+        trace_path = self.profiler.export_chrome_trace(f"{self.work_dir}/trace/trace.json")
+        with open(trace_path,"r",encoding="utf-8") as f:
+            trace = json.load(f)
+        events = [event for event in trace["traceEvents"] if event["name"] == "Operator.get_component_node"]
+        self.assertEqual(len(events),1)
+        self.assertEqual(events[0]["ph"],"X")
+        self.assertEqual(events[0]["args"]["nodes"],100)
+        self.assertGreaterEqual(events[0]["dur"],0)
+
+        table = self.profiler.format_summary().splitlines()
+        self.assertTrue(table[0].startswith("name"))
+        self.assertTrue(any(line.startswith("Operator.get_component_node") for line in table[1:]))
+
+    def test_export_path_without_file(self):
+        with self.assertRaises(ValueError):
+            self.profiler.export_chrome_trace("")
+
+
+if __name__ == "__main__":
+    unittest.main()
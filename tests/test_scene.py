@@ -0,0 +1,124 @@
+'''
+场景: 组件和贴图节点查找,预检查,显示策略,场景统计和common的导入
+'''
+import unittest
+
+from tests.support import FakeSceneTestCase,bench
+
+SIZE = 400
+
+
+class SceneQueryTest(FakeSceneTestCase):
+
+    def test_get_component_node(self):
+        bench.build_component_scene(self.scene,f"{self.work_dir}/library",SIZE)
+        result = self.operator().get_component_node()
+        self.assertEqual(sum(len(nodes) for nodes in result.values()),SIZE)
+
+    def test_get_texture_node(self):
+        bench.build_export_scene(self.scene,f"{self.work_dir}/textures",SIZE)
+        manager = self.common.MaterialManager()
+        self.assertTrue(manager.get_texture_node(root_transform="|RootLocator",api_type=self.common.om.MFn.kMesh))
+
+
+class PreflightTest(FakeSceneTestCase):
+
+    def test_all_issues_found(self):
+        root_count = 40
+        expected = bench.build_preflight_scene(self.scene,root_count)
+        operator = self.operator()
+        report = operator.preflight_check()
+        self.assertEqual(len(report["roots"]),root_count)
+        found = {}
+        for issue in report["issues"]:
+            found[issue["type"]] = found.get(issue["type"],0) + 1
+        self.assertEqual(found,dict(expected))
+        self.assertEqual(report["errors"],expected["missing_res"] + expected["pivot"])
+        #每10个RootLocator中的第一个没有问题
+        self.assertFalse(operator.preflight_check([f"|Asset{i:04d}" for i in range(0,root_count,10)])["issues"])
+
+
+class DisplayPolicyTest(FakeSceneTestCase):
+
+    def setUp(self):
+        super().setUp()
+        import display_policy
+        self.display_policy = display_policy
+        self.shapes = bench.build_display_scene(self.scene,self.work_dir,SIZE)
+        policy = display_policy.DisplayPolicy(max_shaded=SIZE // 4,near_distance=2000.0)
+        self.manager = self.common.DisplayManager(policy,camera="persp")
+        self.addCleanup(self.manager.disable)
+
+    def shaded(self,shape):
+        if shape.type == "aiStandIn":
+            return shape.attrs["mode"] == self.display_policy.STANDIN_MODES[self.display_policy.SHADED]
+        return not shape.attrs["overrideEnabled"]
+
+    def test_near_proxies_shaded(self):
+        report = self.manager.enable(measure=True)
+        self.assertEqual(report["nodes"],SIZE)
+        for shape,expected in self.shapes:
+            self.assertEqual(self.shaded(shape),expected,shape.name)
+
+        #选择hiRes代理时实体显示
+        hires = next(shape for shape,_ in self.shapes if shape.attrs.get("dso","").endswith("hiRes.ass"))
+        self.assertFalse(self.shaded(hires))
+        self.cmds.select(self.node_path(hires.parents[0]))
+        self.assertTrue(self.shaded(hires))
+
+    def test_new_proxies_computed_on_idle(self):
+        self.manager.enable()
+        operator = self.operator()
+        for i in range(10):
+            operator.import_ass(f"{self.work_dir}/new/DFH_fhsj_new{i}_hiRes.ass")
+        self.assertEqual(len(self.manager.pending),10)
+        self.scene.idle()
+        self.assertFalse(self.manager.pending)
+        self.assertEqual(len(self.manager.records),SIZE + 10)
+        levels = [level for name,level in self.manager.levels.items() if "new" in name]
+        self.assertEqual(levels,[self.display_policy.BBOX] * 10)
+
+    def test_disable_restores_display(self):
+        self.manager.enable()
+        self.manager.disable(restore=True)
+        self.assertTrue(all(self.shaded(shape) for shape,_ in self.shapes))
+        self.assertFalse(self.scene.callbacks)
+
+
+class SceneStatsTest(FakeSceneTestCase):
+
+    def test_report(self):
+        import scene_report
+        asset_count,texture_count = bench.build_stats_scene(self.common,self.scene,self.work_dir,SIZE)
+        operator = self.operator()
+        report = scene_report.build_report(operator.collect_scene_stats(),path_resolver=operator.path_resolver,
+                            cache=scene_report.StatsCache())
+
+        totals = report["totals"]
+        self.assertEqual((totals["nodes"],totals["groups"]),(SIZE,asset_count))
+        self.assertEqual(totals["instances"],SIZE // 2)
+        self.assertEqual(totals["instances"] + totals["shapes"],SIZE)
+        self.assertEqual(totals["textures"],min(texture_count,asset_count) * 3)
+        self.assertEqual(totals["textures_missing"],0)
+        #1024的贴图和两个512的UDIM象限,包含mipmap
+        tile_memory = int(1024 * 1024 * 4 * 4 / 3) + 2 * int(512 * 512 * 4 * 4 / 3)
+        for group in report["groups"]:
+            self.assertEqual(group["texture_memory"],tile_memory,group)
+            if group["file_format"] == "abc":
+                self.assertEqual((group["triangles_estimated"],group["triangles"]),(False,200),group)
+            elif group["file_format"] == "gpuCache":
+                self.assertEqual((group["triangles_estimated"],group["triangles"]),(True,100),group)
+
+        scene_report.write_csv(report,f"{self.work_dir}/stats.csv")
+        scene_report.write_json(report,f"{self.work_dir}/stats.json")
+
+
+class ImportCommonTest(unittest.TestCase):
+
+    def test_no_ui_modules(self):
+        #common不加载Qt和OpenMayaUI,可以在mayapy批处理中使用
+        self.assertEqual(bench.import_common_seconds()[1],[])
+
+
+if __name__ == "__main__":
+    unittest.main()
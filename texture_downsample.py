@@ -0,0 +1,247 @@
+'''
+按分辨率生成低分辨率贴图
+
+所有res组原来引用同一套原始贴图,proxy组件也会加载8K贴图
+导出时为每个res生成缩小的贴图,res组导出时链接到自己的贴图:
+    {asset_dir}/textures/{file_name}            原始贴图(hiRes)
+    {asset_dir}/textures/proxyRes/{file_name}   最大边 512
+    {asset_dir}/textures/midRes/{file_name}     最大边 2048
+
+每个res目录中的 .downsample.json 记录源文件的大小,修改时间,sha1和最大边,
+每个res按自己的记录比较,源文件没有变化时跳过;修改时间变化但内容相同时只更新记录
+小于目标尺寸和Pillow无法写入的格式(exr等)直接复制,保证每个res的贴图完整
+
+缩小在进程池中执行(Pillow),Maya中使用同目录的mayapy启动子进程
+    python texture_downsample.py Z:/.../DFH_fhsj_tree/textures --workers 8
+'''
+import os,sys,json,time,shutil,hashlib
+
+RES_MAX_SIZE = {
+    "proxyRes":512,
+    "midRes":2048,
+}
+
+MANIFEST_NAME = ".downsample.json"
+
+#Pillow可以读写的格式,其他格式直接复制
+RESIZE_EXTENSIONS = (".png",".jpg",".jpeg",".tif",".tiff",".tga",".bmp")
+
+JPEG_QUALITY = 95
+
+HASH_CHUNK = 1 << 20
+
+
+def res_texture_dir(texture_dir,res):
+    texture_dir = texture_dir.replace("\\","/").rstrip("/")
+    return f"{texture_dir}/{res}"
+
+
+def res_texture_path(path,res):
+    '''
+    .../textures/wood.<UDIM>.png > .../textures/proxyRes/wood.<UDIM>.png
+    '''
+    directory,_,file_name = path.replace("\\","/").rpartition("/")
+    return f"{directory}/{res}/{file_name}"
+
+
+def file_hash(path):
+    sha1 = hashlib.sha1()
+    with open(path,"rb") as f:
+        for chunk in iter(lambda:f.read(HASH_CHUNK),b""):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def load_manifest(directory):
+    try:
+        with open(f"{directory}/{MANIFEST_NAME}","r",encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError,ValueError):
+        return {}
+
+
+def save_manifest(directory,manifest):
+    os.makedirs(directory,exist_ok=True)
+    path = f"{directory}/{MANIFEST_NAME}"
+    with open(path + ".tmp","w",encoding="utf-8") as f:
+        json.dump(manifest,f,ensure_ascii=False,indent=1,sort_keys=True)
+    os.replace(path + ".tmp",path)
+
+
+##########################################################################
+# 在子进程中执行
+##########################################################################
+
+def process_source(source,targets):
+    '''
+    处理一个源文件,只读取和解码一次,从大到小生成所有res
+    targets > [(res,最大边,目标路径,该res清单中记录的sha1),...] 内容相同且目标存在时不重新生成
+    返回 {"source","hash","outputs":{res:"resized"|"copied"|"unchanged"}}
+    '''
+    source_hash = file_hash(source)
+    outputs = {}
+    pending = []
+    for res,max_size,target,known_hash in targets:
+        if known_hash == source_hash and os.path.isfile(target):
+            outputs[res] = "unchanged"
+        else:
+            pending.append((res,max_size,target))
+
+    image = None
+    if pending and source.lower().endswith(RESIZE_EXTENSIONS):
+        try:
+            from PIL import Image
+            image = Image.open(source)
+            image.load()
+        except (ImportError,OSError):
+            image = None
+
+    for res,max_size,target in sorted(pending,key=lambda item:item[1],reverse=True):
+        os.makedirs(os.path.dirname(target),exist_ok=True)
+        temp_path = _temp_path(target)
+        outputs[res] = "copied"
+        if image is not None and max(image.size) > max_size:
+            image_format = image.format or Image.registered_extensions().get(os.path.splitext(target)[1].lower())
+            try:
+                image.thumbnail((max_size,max_size),Image.LANCZOS)
+                save_kwargs = {"quality":JPEG_QUALITY} if image_format == "JPEG" else {}
+                image.save(temp_path,format=image_format,**save_kwargs)
+                outputs[res] = "resized"
+            except (OSError,ValueError) as e:
+                #16位等Pillow不支持缩放或写入的模式
+                print(f"缩小贴图失败,使用原始贴图 > {source} {e}")
+                image = None
+        if outputs[res] == "copied":
+            shutil.copy2(source,temp_path)
+        os.replace(temp_path,target)
+    return {"source":source,"hash":source_hash,"outputs":outputs}
+
+
+def _temp_path(target):
+    #保留扩展名,Pillow按扩展名判断格式
+    base,extension = os.path.splitext(target)
+    return f"{base}.tmp{os.getpid()}{extension}"
+
+
+##########################################################################
+
+def plan_downsample(sources,texture_dir,res_max_size=None):
+    '''
+    在主进程中比较清单,返回需要处理的源文件
+    sources > 原始贴图路径列表(已经复制到资产textures目录)
+    return [(源文件,[(res,最大边,目标路径,清单中的sha1)...]),...],清单
+    每个res单独比较,最大边变化时不使用记录的sha1
+    '''
+    res_max_size = res_max_size or RES_MAX_SIZE
+    manifests = {res:load_manifest(res_texture_dir(texture_dir,res)) for res in res_max_size}
+    tasks = []
+    for source in sources:
+        try:
+            stat = os.stat(source)
+        except OSError:
+            print(f"贴图不存在,跳过 > {source}")
+            continue
+        file_name = os.path.basename(source)
+        targets = []
+        for res,max_size in res_max_size.items():
+            record = manifests[res].get(file_name) or {}
+            target = res_texture_path(source,res)
+            if record.get("max_size") != max_size:
+                record = {}
+            if (record.get("size") == stat.st_size and record.get("mtime") == stat.st_mtime
+                    and os.path.isfile(target)):
+                continue
+            targets.append((res,max_size,target,record.get("hash")))
+        if targets:
+            tasks.append((source,targets))
+    return tasks,manifests
+
+
+def _pool_context():
+    '''
+    Maya中sys.executable为maya.exe,子进程需要使用mayapy
+    '''
+    import multiprocessing
+    context = multiprocessing.get_context("spawn")
+    executable = os.path.basename(sys.executable).lower()
+    if executable.startswith("maya") and not executable.startswith("mayapy"):
+        mayapy = os.path.join(os.path.dirname(sys.executable),"mayapy" + os.path.splitext(sys.executable)[1])
+        if os.path.isfile(mayapy):
+            context.set_executable(mayapy)
+    return context
+
+
+def downsample_textures(sources,texture_dir,res_max_size=None,workers=None,job=None):
+    '''
+    为每个res生成缩小的贴图,只处理有变化的源文件
+    workers > 进程数,0时在当前进程中执行
+    job > jobs.Job,用于汇报进度和响应取消
+    返回 {"resized","copied","unchanged","skipped"} 数量
+    '''
+    res_max_size = res_max_size or RES_MAX_SIZE
+    texture_dir = texture_dir.replace("\\","/").rstrip("/")
+    sources = list(dict.fromkeys(sources))
+    tasks,manifests = plan_downsample(sources,texture_dir,res_max_size)
+
+    summary = {"resized":0,"copied":0,"unchanged":0,"skipped":len(sources) - len(tasks)}
+    if job is not None:
+        job.add_units(len(tasks))
+
+    def record(result):
+        stat = os.stat(result["source"])
+        file_name = os.path.basename(result["source"])
+        for res,status in result["outputs"].items():
+            summary[status] += 1
+            manifests[res][file_name] = {"hash":result["hash"],"size":stat.st_size,"mtime":stat.st_mtime,
+                                "max_size":res_max_size[res]}
+        if job is not None:
+            job.advance(1,bytes_done=stat.st_size,message=f"缩小贴图 > {file_name}")
+
+    try:
+        if workers == 0 or len(tasks) <= 1:
+            for task in tasks:
+                if job is not None:
+                    job.check_cancelled()
+                record(process_source(*task))
+        elif tasks:
+            #进程池只在需要时导入,导入common不加载multiprocessing
+            from concurrent.futures import ProcessPoolExecutor,as_completed
+            workers = workers or max(1,(os.cpu_count() or 2) - 1)
+            with ProcessPoolExecutor(max_workers=min(workers,len(tasks)),mp_context=_pool_context()) as executor:
+                futures = [executor.submit(process_source,*task) for task in tasks]
+                try:
+                    for future in as_completed(futures):
+                        if job is not None:
+                            job.check_cancelled()
+                        record(future.result())
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+    finally:
+        #取消或失败时保存已经完成的记录
+        for res,manifest in manifests.items():
+            save_manifest(res_texture_dir(texture_dir,res),manifest)
+    return summary
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Per resolution texture downsampling")
+    parser.add_argument("texture_dir",help="资产的textures目录")
+    parser.add_argument("--workers",type=int,default=None)
+    parser.add_argument("--proxy",type=int,default=RES_MAX_SIZE["proxyRes"])
+    parser.add_argument("--mid",type=int,default=RES_MAX_SIZE["midRes"])
+    args = parser.parse_args(argv)
+
+    texture_dir = args.texture_dir.replace("\\","/").rstrip("/")
+    sources = sorted(entry.path.replace("\\","/") for entry in os.scandir(texture_dir)
+                    if entry.is_file() and not entry.name.startswith("."))
+    start = time.perf_counter()
+    summary = downsample_textures(sources,texture_dir,{"proxyRes":args.proxy,"midRes":args.mid},workers=args.workers)
+    print(" ".join(f"{key} > {value}" for key,value in summary.items()) + f"  {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
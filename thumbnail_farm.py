@@ -0,0 +1,343 @@
+'''
+组件库预览图批量渲染
+
+为预览图缺失或过期的资产,在本地多个常驻的 mayapy 进程(thumbnail_worker.py)中
+导入 proxyRes(没有时为 midRes)的ma文件,相机对准后渲染 {asset_id}_preview.png,可选渲染转台序列:
+    {asset_id}/turntable/{asset_id}_turntable.0000.png
+
+过期检查只比较修改时间: 预览图不存在,或比源文件旧(资产重新导出)
+进程崩溃或超时时重新启动进程,任务重试一次
+
+    python thumbnail_farm.py Z:/.../component --workers 2 --prefix DFH_fhsj
+    python thumbnail_farm.py Z:/.../component --dry-run               #只列出需要渲染的资产
+    python thumbnail_farm.py Z:/.../component --worker-command "python thumbnail_worker.py --renderer stub"
+不依赖Maya,mayapy路径从 MAYAPY 或 MAYA_LOCATION 环境变量查找
+'''
+import os,sys,json,time,queue,shlex,threading,subprocess,argparse
+
+import library
+from thumbnail_worker import RESULT_PREFIX
+
+#按顺序查找可以渲染的源文件
+SOURCE_RES = ("proxyRes","midRes")
+
+PREVIEW_SIZE = (1280,720)
+
+TURNTABLE_FOLDER = "turntable"
+
+#单个资产的渲染超时(秒),超时后重新启动进程
+TASK_TIMEOUT = 600
+
+#mayapy启动较慢,进程常驻处理多个资产
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)),"thumbnail_worker.py")
+
+
+class FarmTask():
+    __slots__ = ("asset_id","source","output","turntable_dir","reason")
+
+    def __init__(self,asset_id,source,output,turntable_dir,reason):
+        self.asset_id = asset_id
+        self.source = source
+        self.output = output
+        self.turntable_dir = turntable_dir
+        self.reason = reason
+
+    def __repr__(self):
+        return f"<FarmTask {self.asset_id} {self.reason}>"
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def find_source(entry):
+    '''
+    返回 (源文件路径,修改时间),没有可以渲染的ma文件时返回 (None,None)
+    '''
+    for res in SOURCE_RES:
+        path = entry.ma_path(res)
+        mtime = _mtime(path)
+        if mtime is not None:
+            return path,mtime
+    return None,None
+
+
+def check_entry(entry,force=False):
+    '''
+    返回FarmTask,预览图是最新的或没有源文件时返回None
+    reason > missing 没有预览图, stale 预览图比源文件旧, force 强制渲染
+    '''
+    source,source_time = find_source(entry)
+    if source is None:
+        return None
+    return _check_preview(entry,source,source_time,force)
+
+
+def _check_preview(entry,source,source_time,force):
+    preview_time = _mtime(entry.preview_path)
+    if force:
+        reason = "force"
+    elif preview_time is None:
+        reason = "missing"
+    elif preview_time < source_time:
+        reason = "stale"
+    else:
+        return None
+    return FarmTask(entry.asset_id,source,entry.preview_path,f"{entry.path}/{TURNTABLE_FOLDER}",reason)
+
+
+def plan(root,prefix=None,force=False):
+    '''
+    返回 (需要渲染的FarmTask列表,没有源文件的资产数量)
+    prefix > 只检查 {prefix}_ 开头的资产,例如 DFH_fhsj
+    '''
+    tasks = []
+    no_source = 0
+    for entry in library.scan_library(root):
+        if prefix and not entry.asset_id.startswith(prefix + "_"):
+            continue
+        source,source_time = find_source(entry)
+        if source is None:
+            no_source += 1
+            continue
+        task = _check_preview(entry,source,source_time,force)
+        if task is not None:
+            tasks.append(task)
+    return tasks,no_source
+
+
+def find_mayapy():
+    '''
+    MAYAPY > MAYA_LOCATION/bin/mayapy > Maya中运行时与maya.exe同目录的mayapy
+    '''
+    extension = ".exe" if sys.platform == "win32" else ""
+    candidates = [os.environ.get("MAYAPY")]
+    if os.environ.get("MAYA_LOCATION"):
+        candidates.append(os.path.join(os.environ["MAYA_LOCATION"],"bin","mayapy" + extension))
+    if os.path.basename(sys.executable).lower().startswith("maya"):
+        candidates.append(os.path.join(os.path.dirname(sys.executable),"mayapy" + extension))
+    for path in candidates:
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+
+def default_worker_command():
+    mayapy = find_mayapy()
+    if mayapy is None:
+        raise RuntimeError("找不到mayapy,请设置 MAYAPY 或 MAYA_LOCATION 环境变量")
+    return [mayapy,WORKER_SCRIPT]
+
+
+class WorkerProcess():
+    '''
+    一个常驻的渲染进程,stdout由读取线程转发到队列,等待结果时可以超时
+    stdout按字节读取,只解码RESULT_PREFIX开头的结果行(ascii),
+    Maya和MtoA的日志在中文系统上为GBK等编码,不解码
+    '''
+
+    def __init__(self,command):
+        self.process = subprocess.Popen(command,stdin=subprocess.PIPE,stdout=subprocess.PIPE,
+                                        text=True,encoding="utf-8",bufsize=1)
+        self.results = queue.Queue()
+        self.reader = threading.Thread(target=self._read,daemon=True)
+        self.reader.start()
+
+    def _read(self):
+        prefix = RESULT_PREFIX.encode("ascii")
+        try:
+            for line in self.process.stdout.buffer:
+                if line.startswith(prefix):
+                    try:
+                        self.results.put(json.loads(line[len(prefix):].decode("ascii")))
+                    except ValueError:
+                        continue
+        except Exception as e:
+            print(f"读取渲染进程输出失败 > {e}")
+        finally:
+            #进程退出,等待结果的任务立即结束
+            self.results.put(None)
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+    def render(self,request,timeout=TASK_TIMEOUT):
+        '''
+        发送任务并等待结果,进程退出时抛出EOFError,超时抛出TimeoutError
+        '''
+        self.process.stdin.write(json.dumps(request) + "\n")
+        self.process.stdin.flush()
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                result = self.results.get(timeout=max(0.0,deadline - time.monotonic()))
+            except queue.Empty:
+                raise TimeoutError(f"渲染超时 {timeout}s")
+            if result is None:
+                try:
+                    code = self.process.wait(5.0)
+                except subprocess.TimeoutExpired:
+                    code = None
+                raise EOFError(f"渲染进程退出 code={code}")
+            if result.get("id") == request["id"]:
+                return result
+
+    def close(self,wait=5.0):
+        try:
+            if self.alive:
+                self.process.stdin.write(json.dumps({"command":"quit"}) + "\n")
+                self.process.stdin.flush()
+                self.process.stdin.close()
+                self.process.wait(wait)
+        except (OSError,ValueError,subprocess.TimeoutExpired):
+            pass
+        self.kill()
+
+    def kill(self):
+        if self.alive:
+            self.process.kill()
+        self.process.wait()
+
+
+class ThumbnailFarm():
+    '''
+    多个渲染进程从同一个队列中取任务
+    command > 渲染进程命令行,默认为 mayapy thumbnail_worker.py
+    workers > 进程数量,每个进程的Arnold线程数为 cpu数/进程数
+    retries > 进程崩溃或超时时的重试次数
+    '''
+
+    def __init__(self,command=None,workers=2,size=PREVIEW_SIZE,turntable_frames=0,timeout=TASK_TIMEOUT,retries=1):
+        self.command = list(command) if command else default_worker_command()
+        self.workers = max(1,workers)
+        self.size = size
+        self.turntable_frames = turntable_frames
+        self.timeout = timeout
+        self.retries = retries
+        self.threads_per_worker = max(1,(os.cpu_count() or 2) // self.workers)
+
+    def request(self,task_id,task):
+        return {"id":task_id,"asset_id":task.asset_id,"source":task.source,"output":task.output,
+                "width":self.size[0],"height":self.size[1],"frames":self.turntable_frames,
+                "turntable_dir":task.turntable_dir,"threads":self.threads_per_worker}
+
+    def run(self,tasks,job=None):
+        '''
+        渲染所有任务,返回 {"rendered","failed","files","seconds","worker_seconds","errors":[(asset_id,错误)]}
+        job > jobs.Job,用于汇报进度和响应取消,取消时等待正在渲染的资产完成
+        '''
+        start = time.perf_counter()
+        pending = queue.Queue()
+        for task_id,task in enumerate(tasks):
+            pending.put((task_id,task))
+        if job is not None:
+            job.add_units(len(tasks))
+
+        summary = {"rendered":0,"failed":0,"files":0,"seconds":0.0,"worker_seconds":0.0,"errors":[]}
+        lock = threading.Lock()
+
+        def record(task,result):
+            with lock:
+                if result["ok"]:
+                    summary["rendered"] += 1
+                    summary["files"] += result.get("files",0)
+                else:
+                    summary["failed"] += 1
+                    summary["errors"].append((task.asset_id,result["error"]))
+                summary["worker_seconds"] += result.get("seconds",0.0)
+            status = "完成" if result["ok"] else f"失败 > {result['error']}"
+            print(f"预览图 {task.asset_id} {status}")
+            if job is not None:
+                job.advance(1,message=task.asset_id)
+
+        def work():
+            worker = None
+            try:
+                while job is None or not job.cancelled:
+                    try:
+                        task_id,task = pending.get_nowait()
+                    except queue.Empty:
+                        break
+                    result = None
+                    for _ in range(self.retries + 1):
+                        if worker is None or not worker.alive:
+                            worker = WorkerProcess(self.command)
+                        try:
+                            result = worker.render(self.request(task_id,task),self.timeout)
+                            break
+                        except (EOFError,TimeoutError,OSError) as e:
+                            #进程崩溃或卡住,重新启动进程后重试
+                            worker.kill()
+                            worker = None
+                            result = {"id":task_id,"ok":False,"error":str(e)}
+                    record(task,result)
+            finally:
+                if worker is not None:
+                    worker.close()
+
+        threads = [threading.Thread(target=work,daemon=True) for _ in range(min(self.workers,len(tasks)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        summary["seconds"] = round(time.perf_counter() - start,3)
+        summary["worker_seconds"] = round(summary["worker_seconds"],3)
+        if job is not None:
+            job.check_cancelled()
+        return summary
+
+
+def render_library_previews(root,prefix=None,force=False,command=None,workers=2,size=PREVIEW_SIZE,
+                            turntable_frames=0,job=None):
+    '''
+    检查组件库并渲染缺失和过期的预览图
+    返回ThumbnailFarm.run的结果,并加入 planned(需要渲染),no_source(没有源文件)数量
+    '''
+    tasks,no_source = plan(root,prefix=prefix,force=force)
+    summary = {"rendered":0,"failed":0,"files":0,"seconds":0.0,"worker_seconds":0.0,"errors":[]}
+    if tasks:
+        farm = ThumbnailFarm(command=command,workers=workers,size=size,turntable_frames=turntable_frames)
+        summary = farm.run(tasks,job=job)
+    summary["planned"] = len(tasks)
+    summary["no_source"] = no_source
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render missing or stale component previews")
+    parser.add_argument("root",help="组件库根目录")
+    parser.add_argument("--prefix",help="只处理 {project}_{scene} 开头的资产")
+    parser.add_argument("--workers",type=int,default=2)
+    parser.add_argument("--width",type=int,default=PREVIEW_SIZE[0])
+    parser.add_argument("--height",type=int,default=PREVIEW_SIZE[1])
+    parser.add_argument("--turntable",type=int,default=0,help="转台帧数,0时只渲染预览图")
+    parser.add_argument("--force",action="store_true",help="重新渲染所有资产")
+    parser.add_argument("--dry-run",action="store_true",help="只列出需要渲染的资产")
+    parser.add_argument("--worker-command",help="渲染进程命令行,默认为 mayapy thumbnail_worker.py")
+    args = parser.parse_args(argv)
+
+    if args.dry_run:
+        tasks,no_source = plan(args.root,prefix=args.prefix,force=args.force)
+        for task in tasks:
+            print(f"{task.reason:<8}{task.asset_id}  < {task.source}")
+        print(f"需要渲染 {len(tasks)} 个资产, 没有源文件 {no_source} 个")
+        return 0
+
+    command = shlex.split(args.worker_command) if args.worker_command else None
+    summary = render_library_previews(args.root,prefix=args.prefix,force=args.force,command=command,
+                                      workers=args.workers,size=(args.width,args.height),
+                                      turntable_frames=args.turntable)
+    for asset_id,error in summary["errors"]:
+        print(f"  失败 {asset_id} > {error}")
+    print(f"previews > {summary['rendered']}/{summary['planned']} 失败 {summary['failed']} "
+          f"没有源文件 {summary['no_source']}  {summary['seconds']:.2f}s (渲染 {summary['worker_seconds']:.2f}s)")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
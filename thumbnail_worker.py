@@ -0,0 +1,220 @@
+'''
+预览图渲染进程,由 thumbnail_farm 启动,进程常驻处理多个资产
+
+逐行从stdin读取json任务,渲染后向stdout输出一行结果:
+    {"id":3,"asset_id":"DFH_fhsj_tree","source":".../DFH_fhsj_tree_proxyRes.ma","output":".../DFH_fhsj_tree_preview.png",
+     "width":1280,"height":720,"frames":0,"turntable_dir":"","threads":4}
+    @@thumbnail {"id":3,"ok":true,"output":"...","files":1,"seconds":2.1,"error":""}
+结果行以RESULT_PREFIX开头,Maya初始化和渲染时输出的其他内容被忽略
+{"command":"quit"} 或stdin关闭时退出
+
+    mayapy thumbnail_worker.py                      #Maya standalone + Arnold渲染
+    python thumbnail_worker.py --renderer stub      #不依赖Maya的替代渲染器,写入纯色PNG,用于测试调度和过期检查
+'''
+import os,sys,json,time,glob,zlib,shutil,struct,argparse
+
+RESULT_PREFIX = "@@thumbnail "
+
+#预览相机角度 (rotateX,rotateY)
+CAMERA_ANGLE = (-20.0,35.0)
+
+#Arnold抗锯齿采样,预览图不需要更高
+AA_SAMPLES = 3
+
+
+def turntable_path(turntable_dir,asset_id,frame):
+    return f"{turntable_dir}/{asset_id}_turntable.{frame:04d}.png"
+
+
+def frame_paths(request):
+    '''
+    需要渲染的图片,没有转台时只渲染预览图
+    '''
+    frames = request.get("frames") or 0
+    if not frames:
+        return [request["output"]]
+    os.makedirs(request["turntable_dir"],exist_ok=True)
+    return [turntable_path(request["turntable_dir"],request["asset_id"],frame) for frame in range(frames)]
+
+
+def finish_frames(request):
+    '''
+    转台第0帧复制为预览图,返回写入的文件数量
+    '''
+    frames = request.get("frames") or 0
+    if not frames:
+        return 1
+    shutil.copyfile(turntable_path(request["turntable_dir"],request["asset_id"],0),request["output"])
+    return frames + 1
+
+
+def write_png(path,width,height,color):
+    '''
+    写入纯色RGB PNG,先写入临时文件再替换,中断时不会留下不完整的预览图
+    '''
+    row = b"\0" + bytes(color) * width
+    data = zlib.compress(row * height,1)
+
+    def chunk(tag,payload):
+        return struct.pack(">I",len(payload)) + tag + payload + struct.pack(">I",zlib.crc32(tag + payload) & 0xffffffff)
+
+    temp_path = path + ".tmp"
+    with open(temp_path,"wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR",struct.pack(">IIBBBBB",width,height,8,2,0,0,0)))
+        f.write(chunk(b"IDAT",data))
+        f.write(chunk(b"IEND",b""))
+    os.replace(temp_path,path)
+
+
+def make_variants(path):
+    '''
+    生成浏览用的缩略图,没有PySide2/Pillow时跳过
+    '''
+    try:
+        import thumbnails
+        thumbnails.generate_variants(path)
+    except (ImportError,RuntimeError) as e:
+        print(f"跳过缩略图 > {e}")
+
+
+class StubRenderer():
+    '''
+    替代渲染器,按资产名称生成颜色
+    delay > 每张图片的模拟渲染时间(秒)
+    fail > 资产名称包含该字符串时渲染失败
+    crash > 资产名称包含该字符串时进程直接退出
+    log_encoding > 每个资产渲染前用该编码输出一行中文日志,模拟中文系统上Maya和MtoA的输出
+    '''
+
+    def __init__(self,delay=0.0,fail=None,crash=None,log_encoding=None):
+        self.delay = delay
+        self.fail = fail
+        self.crash = crash
+        self.log_encoding = log_encoding
+
+    def render(self,request):
+        asset_id = request["asset_id"]
+        if self.crash and self.crash in asset_id:
+            os._exit(3)
+        if self.fail and self.fail in asset_id:
+            raise RuntimeError(f"渲染失败 > {asset_id}")
+        if self.log_encoding:
+            sys.stdout.flush()
+            sys.stdout.buffer.write(f"渲染预览图 > {asset_id}\n".encode(self.log_encoding))
+            sys.stdout.buffer.flush()
+        if not os.path.isfile(request["source"]):
+            raise RuntimeError(f"源文件不存在 > {request['source']}")
+
+        checksum = zlib.crc32(asset_id.encode("utf-8"))
+        color = (checksum & 0xff,(checksum >> 8) & 0xff,(checksum >> 16) & 0xff)
+        for path in frame_paths(request):
+            time.sleep(self.delay)
+            write_png(path,request["width"],request["height"],color)
+        return finish_frames(request)
+
+
+class MayaRenderer():
+    '''
+    Maya standalone中导入源文件,相机对准后用Arnold渲染
+    转台在资产外加一个组,每帧绕Y轴旋转 360/frames 度,第0帧作为预览图
+    '''
+
+    def __init__(self):
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+        import maya.cmds as cmds
+        self.cmds = cmds
+        cmds.loadPlugin("mtoa",quiet=True)
+
+    def render(self,request):
+        cmds = self.cmds
+        cmds.file(new=True,force=True)
+        new_nodes = cmds.file(request["source"],i=True,returnNewNodes=True,ignoreVersion=True) or []
+        roots = cmds.ls(new_nodes,assemblies=True,long=True)
+        if not roots:
+            raise RuntimeError(f"源文件没有可渲染的节点 > {request['source']}")
+        turntable = cmds.group(roots,name="thumbnail_turntable")
+
+        camera,camera_shape = cmds.camera(name="thumbnail_cam")
+        cmds.setAttr(f"{camera}.rotateX",CAMERA_ANGLE[0])
+        cmds.setAttr(f"{camera}.rotateY",CAMERA_ANGLE[1])
+        cmds.setAttr(f"{camera_shape}.renderable",True)
+        for default_camera in ("perspShape","topShape","frontShape","sideShape"):
+            if cmds.objExists(default_camera):
+                cmds.setAttr(f"{default_camera}.renderable",False)
+        cmds.viewFit(camera_shape,turntable,fitFactor=0.9)
+        cmds.shadingNode("aiSkyDomeLight",asLight=True,name="thumbnail_light")
+
+        cmds.setAttr("defaultRenderGlobals.currentRenderer","arnold",type="string")
+        cmds.setAttr("defaultArnoldDriver.ai_translator","png",type="string")
+        cmds.setAttr("defaultArnoldRenderOptions.AASamples",AA_SAMPLES)
+        if request.get("threads"):
+            cmds.setAttr("defaultArnoldRenderOptions.threads_autodetect",False)
+            cmds.setAttr("defaultArnoldRenderOptions.threads",request["threads"])
+
+        paths = frame_paths(request)
+        for frame,path in enumerate(paths):
+            cmds.setAttr(f"{turntable}.rotateY",360.0 * frame / len(paths))
+            self._render_frame(camera_shape,path,request["width"],request["height"])
+        return finish_frames(request)
+
+    def _render_frame(self,camera_shape,path,width,height):
+        cmds = self.cmds
+        prefix = os.path.splitext(path)[0] + "_render"
+        cmds.setAttr("defaultRenderGlobals.imageFilePrefix",prefix,type="string")
+        cmds.arnoldRender(width=width,height=height,camera=camera_shape,batch=True)
+        #Arnold可能追加帧号或渲染层名称,取最新的一张
+        rendered = sorted(glob.glob(prefix + "*.png"),key=os.path.getmtime)
+        if not rendered:
+            raise RuntimeError(f"Arnold没有输出图片 > {prefix}")
+        os.replace(rendered[-1],path)
+        for leftover in rendered[:-1]:
+            os.remove(leftover)
+
+
+def send(result):
+    #只输出ascii,不受Maya控制台编码影响
+    sys.stdout.write(RESULT_PREFIX + json.dumps(result) + "\n")
+    sys.stdout.flush()
+
+
+def serve(renderer,stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        request = json.loads(line)
+        if request.get("command") == "quit":
+            break
+        start = time.perf_counter()
+        result = {"id":request["id"],"ok":False,"output":request["output"],"files":0,"error":""}
+        try:
+            result["files"] = renderer.render(request)
+            make_variants(request["output"])
+            result["ok"] = True
+        except Exception as e:
+            result["error"] = str(e)
+        result["seconds"] = round(time.perf_counter() - start,3)
+        send(result)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Component preview render worker")
+    parser.add_argument("--renderer",choices=("maya","stub"),default="maya")
+    parser.add_argument("--delay",type=float,default=0.0,help="stub: 每张图片的模拟渲染时间")
+    parser.add_argument("--fail",help="stub: 资产名称包含该字符串时失败")
+    parser.add_argument("--crash",help="stub: 资产名称包含该字符串时进程退出")
+    parser.add_argument("--log-encoding",help="stub: 渲染前用该编码输出中文日志")
+    args = parser.parse_args(argv)
+
+    if args.renderer == "stub":
+        renderer = StubRenderer(delay=args.delay,fail=args.fail,crash=args.crash,log_encoding=args.log_encoding)
+    else:
+        renderer = MayaRenderer()
+    serve(renderer,sys.stdin)
+
+
+if __name__ == "__main__":
+    sys.path.insert(0,os.path.dirname(os.path.abspath(__file__)))
+    main()
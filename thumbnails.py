@@ -0,0 +1,309 @@
+'''
+预览图缩略图和场景预览表(contact sheet)
+
+截图(master)保存为 {asset_id}_preview.png,同目录生成缩小的jpg:
+    {asset_id}_preview_64.jpg
+    {asset_id}_preview_256.jpg
+    {asset_id}_preview_512.jpg
+缩略图比截图新时跳过,浏览列表和预览控件只读取缩略图
+
+图片读写优先使用 PySide2 QImage(Maya自带),没有时使用 Pillow,在调用时才导入
+可以在工作线程中执行
+
+    python thumbnails.py variants Z:/.../component            #为组件库所有截图生成缩略图
+    python thumbnails.py sheet Z:/.../component DFH_fhsj      #生成场景预览表
+'''
+import os,sys,time,argparse
+
+import library
+
+SIZES = (64,256,512)
+
+QUALITY = 85
+
+SHEET_CELL = 256
+SHEET_COLUMNS = 8
+SHEET_LABEL_HEIGHT = 20
+
+
+def variant_path(master_path,size):
+    return f"{os.path.splitext(master_path)[0]}_{size}.jpg"
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def is_stale(master_path,size):
+    '''
+    缩略图不存在或比截图旧时返回True
+    '''
+    master_time = _mtime(master_path)
+    if master_time is None:
+        return False
+    variant_time = _mtime(variant_path(master_path,size))
+    return variant_time is None or variant_time < master_time
+
+
+def best_variant(master_path,size):
+    '''
+    返回不小于size的最小可用缩略图,都不可用时返回截图本身
+    '''
+    for variant_size in SIZES:
+        if variant_size >= size and not is_stale(master_path,variant_size) and _mtime(variant_path(master_path,variant_size)):
+            return variant_path(master_path,variant_size)
+    return master_path
+
+
+##########################################################################
+# 图片后端
+##########################################################################
+
+class QtBackend():
+    name = "qt"
+
+    def __init__(self):
+        from PySide2.QtGui import QImage,QPainter,QColor,QGuiApplication
+        from PySide2.QtCore import Qt
+        self.QImage = QImage
+        self.QPainter = QPainter
+        self.QColor = QColor
+        self.QGuiApplication = QGuiApplication
+        self.Qt = Qt
+
+    def load(self,path):
+        image = self.QImage(path)
+        return None if image.isNull() else image
+
+    def size(self,image):
+        return image.width(),image.height()
+
+    def scaled(self,image,size):
+        return image.scaled(size,size,self.Qt.KeepAspectRatio,self.Qt.SmoothTransformation)
+
+    def save(self,image,path):
+        return image.save(path,"JPG",QUALITY)
+
+    def new_image(self,width,height,color=(40,40,40)):
+        image = self.QImage(width,height,self.QImage.Format_RGB32)
+        image.fill(self.QColor(*color))
+        return image
+
+    def paste(self,target,image,x,y):
+        painter = self.QPainter(target)
+        painter.drawImage(x,y,image)
+        painter.end()
+
+    def text(self,target,x,y,width,height,text):
+        #绘制文字需要字体,没有QGuiApplication时跳过
+        if self.QGuiApplication.instance() is None:
+            return
+        painter = self.QPainter(target)
+        painter.setPen(self.QColor(220,220,220))
+        painter.drawText(x,y,width,height,self.Qt.AlignCenter,text)
+        painter.end()
+
+
+class PillowBackend():
+    name = "pillow"
+
+    def __init__(self):
+        from PIL import Image,ImageDraw
+        self.Image = Image
+        self.ImageDraw = ImageDraw
+
+    def load(self,path):
+        try:
+            image = self.Image.open(path)
+            image.load()
+        except OSError:
+            return None
+        return image.convert("RGB")
+
+    def size(self,image):
+        return image.size
+
+    def scaled(self,image,size):
+        width,height = image.size
+        ratio = min(size / float(width),size / float(height))
+        return image.resize((max(1,round(width * ratio)),max(1,round(height * ratio))),self.Image.LANCZOS)
+
+    def save(self,image,path):
+        image.save(path,"JPEG",quality=QUALITY)
+        return True
+
+    def new_image(self,width,height,color=(40,40,40)):
+        return self.Image.new("RGB",(width,height),color)
+
+    def paste(self,target,image,x,y):
+        target.paste(image,(x,y))
+
+    def text(self,target,x,y,width,height,text):
+        draw = self.ImageDraw.Draw(target)
+        left,top,right,bottom = draw.textbbox((0,0),text)
+        draw.text((x + max(0,(width - (right - left)) // 2),y + max(0,(height - (bottom - top)) // 2)),text,fill=(220,220,220))
+
+
+_backend = None
+
+
+def get_backend():
+    '''
+    返回可用的图片后端,PySide2优先
+    '''
+    global _backend
+    if _backend is None:
+        for backend_class in (QtBackend,PillowBackend):
+            try:
+                _backend = backend_class()
+                break
+            except ImportError:
+                continue
+        else:
+            raise RuntimeError("生成缩略图需要 PySide2 或 Pillow")
+    return _backend
+
+
+##########################################################################
+
+def generate_variants(master_path,sizes=SIZES,force=False):
+    '''
+    为截图生成缩略图,只生成过期的尺寸
+    从大到小依次缩小,截图只解码一次
+    返回生成的文件列表
+    '''
+    sizes = sorted(sizes,reverse=True)
+    stale = [size for size in sizes if force or is_stale(master_path,size)]
+    if not stale:
+        return []
+
+    backend = get_backend()
+    image = backend.load(master_path)
+    if image is None:
+        print(f"读取截图失败 > {master_path}")
+        return []
+
+    written = []
+    for size in sizes:
+        width,height = backend.size(image)
+        if max(width,height) > size:
+            image = backend.scaled(image,size)
+        if size in stale:
+            path = variant_path(master_path,size)
+            if backend.save(image,path):
+                written.append(path)
+    return written
+
+
+def generate_library_variants(root,sizes=SIZES,force=False,job=None):
+    '''
+    为组件库中所有资产的截图生成缩略图
+    job > jobs.Job,用于汇报进度和响应取消
+    返回生成的文件数量
+    '''
+    entries = library.scan_library(root)
+    if job is not None:
+        job.add_units(len(entries))
+    count = 0
+    for entry in entries:
+        if job is not None:
+            job.check_cancelled()
+        if os.path.isfile(entry.preview_path):
+            count += len(generate_variants(entry.preview_path,sizes,force))
+        if job is not None:
+            job.advance(1,message=entry.asset_id)
+    return count
+
+
+def contact_sheet_path(root,prefix):
+    return f"{root.rstrip('/')}/{prefix}_contact_sheet.jpg"
+
+
+def build_contact_sheet(root,prefix,output=None,columns=SHEET_COLUMNS,cell=SHEET_CELL,job=None):
+    '''
+    生成场景中所有资产的预览表
+    root > 组件库根目录
+    prefix > 资产前缀 {project}_{scene}
+    output > 输出路径,默认为 {root}/{prefix}_contact_sheet.jpg
+    缺少或过期的缩略图会先生成,没有截图的资产显示为空格子
+    返回输出路径,没有资产时返回None
+    '''
+    root = root.replace("\\","/")
+    output = output or contact_sheet_path(root,prefix)
+    entries = [entry for entry in library.scan_library(root) if entry.asset_id.startswith(prefix + "_")]
+    if not entries:
+        return None
+
+    #预览表比截图都新时跳过
+    output_time = _mtime(output)
+    if output_time is not None:
+        preview_times = [_mtime(entry.preview_path) or 0 for entry in entries]
+        if max(preview_times) < output_time and _mtime(root) < output_time:
+            return output
+
+    if job is not None:
+        job.add_units(len(entries))
+
+    backend = get_backend()
+    size = min((s for s in SIZES if s >= cell),default=SIZES[-1])
+    rows = (len(entries) + columns - 1) // columns
+    sheet = backend.new_image(columns * cell,rows * (cell + SHEET_LABEL_HEIGHT))
+
+    for i,entry in enumerate(entries):
+        if job is not None:
+            job.check_cancelled()
+        x = (i % columns) * cell
+        y = (i // columns) * (cell + SHEET_LABEL_HEIGHT)
+        if os.path.isfile(entry.preview_path):
+            generate_variants(entry.preview_path)
+            image = backend.load(best_variant(entry.preview_path,size))
+            if image is not None:
+                width,height = backend.size(image)
+                if max(width,height) > cell:
+                    image = backend.scaled(image,cell)
+                    width,height = backend.size(image)
+                backend.paste(sheet,image,x + (cell - width) // 2,y + (cell - height) // 2)
+        backend.text(sheet,x,y + cell,cell,SHEET_LABEL_HEIGHT,entry.asset_id[len(prefix) + 1:])
+        if job is not None:
+            job.advance(1,message=entry.asset_id)
+
+    out_dir = os.path.dirname(output)
+    if out_dir and not os.path.exists(out_dir):
+        os.makedirs(out_dir)
+    backend.save(sheet,output)
+    return output
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Component preview thumbnails")
+    sub = parser.add_subparsers(dest="command",required=True)
+
+    variants = sub.add_parser("variants",help="生成缩略图")
+    variants.add_argument("root")
+    variants.add_argument("--force",action="store_true")
+
+    sheet = sub.add_parser("sheet",help="生成场景预览表")
+    sheet.add_argument("root")
+    sheet.add_argument("prefix",help="{project}_{scene}")
+    sheet.add_argument("--output")
+    sheet.add_argument("--columns",type=int,default=SHEET_COLUMNS)
+
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    if args.command == "variants":
+        count = generate_library_variants(args.root,force=args.force)
+        print(f"thumbnails > {count}  {time.perf_counter() - start:.2f}s  ({get_backend().name})")
+    else:
+        output = build_contact_sheet(args.root,args.prefix,args.output,columns=args.columns)
+        if not output:
+            print(f"没有 {args.prefix} 的资产")
+            return 1
+        print(f"contact sheet > {output}  {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
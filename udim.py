@@ -0,0 +1,183 @@
+'''
+UDIM/UVTILE多象限贴图查找
+
+支持的贴图路径:
+    tex.<UDIM>.png          tex.1001.png ~ tex.1999.png
+    tex_<UVTILE>.png        tex_u1_v1.png (Mudbox,从1开始)  tex_u0_v0.png (ZBrush,从0开始)
+    tex.1012.png            已经指向某一个象限的路径,查找同名的其他象限
+
+UdimIndex 每个目录只列出一次,一次遍历按(前缀,后缀)建立象限索引,
+所有贴图节点都从索引中查询,不再对每个节点列出目录和执行正则
+u/v编号的起点优先使用贴图节点的uvTilingMode(tiling_base),模式未知时按同一组文件判断:
+有u0或v0的组从0开始,否则从1开始,都映射为1001起的UDIM编号
+超出1001~1999的象限不加入索引,输出警告
+
+    index = UdimIndex()
+    index.tiles("D:/tex/wood.<UDIM>.png")     #[(1001,"D:/tex/wood.1001.png"),...]
+    index.tile_paths("D:/tex/wood.1001.png")  #["D:/tex/wood.1001.png",...]
+    index.tiles("D:/tex/clay_<UVTILE>.png",base=tiling_base(1))  #ZBrush节点,u0_v0 > 1001
+不依赖Maya
+'''
+import os,re
+from collections import defaultdict
+
+UDIM_MIN = 1001
+UDIM_MAX = 1999
+
+UDIM = "udim"
+UVTILE = "uvtile"
+
+TOKENS = {"<udim>":UDIM,"<uvtile>":UVTILE}
+
+TOKEN_PATTERN = re.compile(r"<udim>|<uvtile>",re.I)
+
+#贪婪匹配前缀,文件名中有多个数字时取最后一个象限编号
+UDIM_NAME = re.compile(r"^(.*\D|)(1\d{3})(\D.*|)$")
+UVTILE_NAME = re.compile(r"^(.*)u(\d+)_v(\d+)(.*)$")
+
+#Maya file节点uvTilingMode > UVTILE编号起点 1:ZBrush(u0_v0) 2:Mudbox(u1_v1)
+TILING_BASE = {1:0,2:1}
+
+
+def uv_to_udim(u,v,base=1):
+    '''
+    u,v象限编号转换为UDIM编号 u1_v1 > 1001
+    base > 编号起点,Mudbox为1,ZBrush为0 (u0_v0 > 1001)
+    '''
+    return UDIM_MIN + (u - base) + (v - base) * 10
+
+
+def udim_to_uv(tile,base=1):
+    tile -= UDIM_MIN
+    return tile % 10 + base,tile // 10 + base
+
+
+def tiling_base(mode):
+    '''
+    file节点的uvTilingMode转换为UVTILE编号起点,其他模式(0关闭,3 UDIM,4显式)返回None
+    '''
+    return TILING_BASE.get(mode)
+
+
+def is_udim(tile):
+    return UDIM_MIN <= tile <= UDIM_MAX
+
+
+def has_token(path):
+    return bool(TOKEN_PATTERN.search(path))
+
+
+def split_name(file_name):
+    '''
+    把贴图文件名拆分为 (前缀,类型,后缀),不是多象限文件名时返回None
+    文件名可以是 <UDIM>/<UVTILE> 模板,也可以是某一个象限的文件名
+    '''
+    match = TOKEN_PATTERN.search(file_name)
+    if match:
+        return file_name[:match.start()],TOKENS[match.group(0).lower()],file_name[match.end():]
+
+    match = UVTILE_NAME.match(file_name)
+    if match:
+        return match.group(1),UVTILE,match.group(4)
+
+    match = UDIM_NAME.match(file_name)
+    if match and is_udim(int(match.group(2))):
+        return match.group(1),UDIM,match.group(3)
+    return None
+
+
+class UdimIndex():
+
+    def __init__(self,listdir=os.listdir):
+        '''
+        listdir > 列出目录的函数,可以替换为测试用的实现
+        '''
+        self.listdir = listdir
+        #目录 > {(类型,前缀,后缀):{象限编号:文件名}}
+        self._dirs = {}
+        #目录 > {(前缀,后缀):[(u,v,文件名)]},指定编号起点时重新映射
+        self._uv_items = {}
+        #(目录,前缀,后缀,编号起点) > {象限编号:文件名}
+        self._based = {}
+        self.listings = 0
+
+    def clear(self):
+        self._dirs.clear()
+        self._uv_items.clear()
+        self._based.clear()
+
+    def index(self,directory):
+        '''
+        列出目录并建立象限索引,每个目录只执行一次
+        '''
+        directory = directory.replace("\\","/").rstrip("/")
+        tiles = self._dirs.get(directory)
+        if tiles is not None:
+            return tiles
+
+        tiles = defaultdict(dict)
+        self.listings += 1
+        try:
+            names = self.listdir(directory)
+        except OSError:
+            names = []
+
+        #(前缀,后缀) > [(u,v,文件名)],同一组全部读取后再判断编号起点
+        uv_groups = defaultdict(list)
+        for name in names:
+            match = UVTILE_NAME.match(name)
+            if match:
+                uv_groups[(match.group(1),match.group(4))].append((int(match.group(2)),int(match.group(3)),name))
+                continue
+            match = UDIM_NAME.match(name)
+            if match:
+                tile = int(match.group(2))
+                if is_udim(tile):
+                    tiles[(UDIM,match.group(1),match.group(3))][tile] = name
+
+        for (prefix,suffix),items in uv_groups.items():
+            base = 0 if any(u == 0 or v == 0 for u,v,_ in items) else 1
+            tiles[(UVTILE,prefix,suffix)] = self._map_uvtiles(directory,prefix,suffix,items,base)
+
+        self._dirs[directory] = tiles
+        self._uv_items[directory] = uv_groups
+        return tiles
+
+    def _map_uvtiles(self,directory,prefix,suffix,items,base):
+        '''
+        u,v编号按base映射为象限编号,超出范围的文件输出警告
+        '''
+        found = {}
+        skipped = []
+        for u,v,name in items:
+            tile = uv_to_udim(u,v,base)
+            if is_udim(tile) and 0 <= u - base < 10:
+                found[tile] = name
+            else:
+                skipped.append(name)
+        if skipped:
+            print(f"UVTILE象限超出范围,跳过 > {directory}/{prefix}*{suffix} {skipped}")
+        return found
+
+    def tiles(self,path,base=None):
+        '''
+        返回贴图的所有象限 [(象限编号,路径),...],按编号排序
+        不是多象限路径时返回空列表
+        base > UVTILE编号起点(tiling_base的结果),为None时按同一组文件名判断
+        '''
+        directory,_,file_name = path.replace("\\","/").rpartition("/")
+        parts = split_name(file_name)
+        if parts is None:
+            return []
+        prefix,kind,suffix = parts
+        found = self.index(directory).get((kind,prefix,suffix),{})
+        if kind == UVTILE and base is not None:
+            key = (directory,prefix,suffix,base)
+            if key not in self._based:
+                items = self._uv_items[directory].get((prefix,suffix),[])
+                self._based[key] = self._map_uvtiles(directory,prefix,suffix,items,base)
+            found = self._based[key]
+        return [(tile,f"{directory}/{found[tile]}") for tile in sorted(found)]
+
+    def tile_paths(self,path,base=None):
+        return [tile_path for _,tile_path in self.tiles(path,base)]
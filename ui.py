@@ -0,0 +1,1595 @@
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+import maya.OpenMayaUI as omui
+from PySide2.QtWidgets import QSizePolicy,QTabBar,QStackedWidget,QFrame,QAction,QComboBox,QListWidget,QDialog,QCheckBox,QTabWidget,QPushButton,QLabel,QLineEdit,QMainWindow,QDialog,QFileDialog,QMessageBox,QWidget,QVBoxLayout,QHBoxLayout,QFormLayout,QGridLayout,QMenuBar,QMenu,QTableWidget,QTableWidgetItem,QAbstractItemView,QScrollArea,QStyle,QProgressBar,QListView
+from PySide2.QtCore import Qt,Signal,QSize,QObject,QRunnable,QThreadPool,QAbstractListModel,QModelIndex,QTimer
+from PySide2.QtWidgets import QApplication
+from PySide2.QtGui import QFont,QIcon,QPixmap,QImage,QColor
+from shiboken2 import wrapInstance
+import os
+from common import Operator
+from jobs import Job,JobRunner,DONE,CANCELLED
+import library
+import thumbnails
+from search_index import SearchIndex,default_index_path
+from profiler import profiler
+import scene_report
+import export_queue
+import thumbnail_farm
+import display_policy
+from library_watcher import LibraryWatcher
+
+#监视组件库时刷新场景代理列表的间隔(毫秒)
+WATCH_INDEX_INTERVAL = 30000
+
+#场景统计表格 (标题,报告字段)
+STATS_TABLE_COLUMNS = (
+    ("资产","asset_id"),
+    ("分辨率","resolution"),
+    ("格式","file_format"),
+    ("节点","nodes"),
+    ("实例","instances"),
+    ("可合并","duplicates"),
+    ("文件(MB)","file_size"),
+    ("三角面","triangles"),
+    ("贴图","textures"),
+    ("贴图(MB)","texture_memory"),
+)
+
+def maya_main_window():
+    try:
+        main_window = omui.MQtUtil.mainWindow()
+        if main_window is None:
+            print("无法获取Maya主窗口")
+            return None
+        return wrapInstance(int(main_window),QWidget)
+    except Exception as e:
+        print(f"获取Maya主窗口失败:{e}")
+        return None
+        
+class MainThreadDispatcher(QObject):
+    '''
+    JobRunner的schedule_main,可以在任意线程调用,回调通过队列信号在主线程执行
+    '''
+    dispatched = Signal(object)
+    
+    def __init__(self,parent=None):
+        super().__init__(parent)
+        self.dispatched.connect(self._call,Qt.QueuedConnection)
+    
+    def __call__(self,callback):
+        self.dispatched.emit(callback)
+    
+    def _call(self,callback):
+        callback()
+
+
+class ThumbnailSignals(QObject):
+    #path,image  图片不存在或解码失败时image为空QImage
+    loaded = Signal(str,QImage)
+
+
+class ThumbnailTask(QRunnable):
+    '''
+    在线程池中读取并缩小预览图
+    只使用QImage,QPixmap只能在主线程创建
+    '''
+    
+    def __init__(self,path,size,signals):
+        super().__init__()
+        self.path = path
+        self.size = size
+        self.signals = signals
+    
+    def run(self):
+        image = QImage()
+        #优先读取预先缩小的缩略图
+        image_path = thumbnails.best_variant(self.path,max(self.size.width(),self.size.height()))
+        if os.path.isfile(image_path):
+            image.load(image_path)
+        if not image.isNull():
+            image = image.scaled(self.size,Qt.KeepAspectRatio,Qt.SmoothTransformation)
+        self.signals.loaded.emit(self.path,image)
+
+
+class ThumbnailLoader(QObject):
+    '''
+    后台解码缩略图,主线程转换为QPixmap后放入LRU缓存
+    同一路径只请求一次
+    '''
+    pixmap_ready = Signal(str)
+    
+    def __init__(self,size=QSize(96,54),capacity=512,max_threads=4,parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.cache = library.LRUCache(capacity)
+        self.pending = set()
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.signals = ThumbnailSignals()
+        self.signals.loaded.connect(self._on_loaded)
+        
+        self.placeholder = QPixmap(size)
+        self.placeholder.fill(QColor(60,60,60))
+    
+    def get(self,path):
+        '''
+        返回缓存中的缩略图,不在缓存中时开始后台加载并返回占位图
+        '''
+        pixmap = self.cache.get(path)
+        if pixmap is not None:
+            return pixmap
+        if path not in self.pending:
+            self.pending.add(path)
+            self.pool.start(ThumbnailTask(path,self.size,self.signals))
+        return self.placeholder
+    
+    def clear(self):
+        self.pool.clear()
+        self.pending.clear()
+        self.cache.clear()
+    
+    def _on_loaded(self,path,image):
+        self.pending.discard(path)
+        #没有预览图时缓存占位图,避免重复读取
+        pixmap = QPixmap.fromImage(image) if not image.isNull() else self.placeholder
+        self.cache.put(path,pixmap)
+        self.pixmap_ready.emit(path)
+
+
+class AssetListModel(QAbstractListModel):
+    '''
+    组件库列表模型
+    rowCount只包含已经加载的行,滚动到底部时由fetchMore分批追加
+    缩略图只在视图请求可见行的DecorationRole时加载
+    '''
+    FETCH_SIZE = 200
+    
+    def __init__(self,thumbnail_loader=None,parent=None):
+        super().__init__(parent)
+        self.thumbnail_loader = thumbnail_loader
+        self.entries = []
+        self.loaded_count = 0
+        self.row_map = {}
+        if thumbnail_loader:
+            thumbnail_loader.pixmap_ready.connect(self._on_pixmap_ready)
+    
+    def set_entries(self,entries):
+        self.beginResetModel()
+        self.entries = list(entries)
+        self.loaded_count = 0
+        self.row_map = {}
+        self.endResetModel()
+    
+    def entry(self,index):
+        if not index.isValid() or index.row() >= self.loaded_count:
+            return None
+        return self.entries[index.row()]
+    
+    def rowCount(self,parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.loaded_count
+    
+    def canFetchMore(self,parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self.loaded_count < len(self.entries)
+    
+    def fetchMore(self,parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.FETCH_SIZE,len(self.entries) - self.loaded_count)
+        if count <= 0:
+            return
+        first = self.loaded_count
+        self.beginInsertRows(QModelIndex(),first,first + count - 1)
+        for row in range(first,first + count):
+            self.row_map[self.entries[row].preview_path] = row
+        self.loaded_count += count
+        self.endInsertRows()
+    
+    def data(self,index,role=Qt.DisplayRole):
+        entry = self.entry(index)
+        if entry is None:
+            return None
+        if role == Qt.DisplayRole:
+            return entry.asset_id
+        if role == Qt.DecorationRole and self.thumbnail_loader:
+            return self.thumbnail_loader.get(entry.preview_path)
+        if role == Qt.ToolTipRole:
+            return entry.path
+        return None
+    
+    def _on_pixmap_ready(self,path):
+        row = self.row_map.get(path)
+        if row is None:
+            return
+        index = self.index(row)
+        self.dataChanged.emit(index,index,[Qt.DecorationRole])
+
+
+class UI(QMainWindow):
+    
+    def __init__(self,parent=None,file_path=None,project_code=None,scene_prefix=None):
+        #在创建窗口时才获取Maya主窗口,避免导入模块时访问Qt
+        if parent is None:
+            parent = maya_main_window()
+        super().__init__(parent)
+        self.setFixedSize(400,700)
+        self.setWindowTitle("Component Tool 2022")
+        central_widget = QWidget()
+        self.central_layout = QVBoxLayout(central_widget)
+        self.setCentralWidget(central_widget)
+        
+        self.resolution_type = ["proxyRes","midRes","hiRes"]
+        self.operator = Operator(res_list=self.resolution_type)
+        #耗时操作通过JobRunner执行,主线程分片由Qt事件循环调度
+        self.dispatcher = MainThreadDispatcher(self)
+        self.job_runner = JobRunner(schedule_main=self.dispatcher)
+        #组件库文件变化时重新加载代理,场景中的代理列表定时刷新
+        self.library_watcher = LibraryWatcher()
+        self.watch_index_timer = QTimer(self)
+        self.watch_index_timer.timeout.connect(self.refresh_library_watch)
+        
+        self.file_path = file_path
+        self.project_code = project_code
+        self.scene_prefix = scene_prefix
+
+        self.create_ui()
+        self.bind()
+        
+        #打开工具时读取上次保存的搜索索引
+        if self.file_path and os.path.isfile(default_index_path(self.file_path)):
+            self.load_library_index(self.file_path)
+    
+    def bind(self):
+        self.create_locator_button.clicked.connect(self.operator.create_locator)
+        self.export_selected_res_button.clicked.connect(self.export_selected_res_button_command)
+        self.export_all_res_button.clicked.connect(self.export_all_res_button_command)
+        self.update_source_button.clicked.connect(self.update_source_button_command)
+        self.preflight_button.clicked.connect(self.preflight_command)
+        self.export_queue_button.clicked.connect(self.export_queue_command)
+        self.screen_btn.clicked.connect(self.screen_shot)
+        
+        self.import_abc_button.clicked.connect(lambda :self.import_cache(cache_type="abc"))
+        self.import_gpu_button.clicked.connect(lambda :self.import_cache(cache_type="gpuCache"))
+        self.import_ass_button.clicked.connect(lambda :self.import_cache(cache_type="ass"))
+        
+        self.switch_abc_res_button.clicked.connect(self.repalce_select_res_command)
+        self.switch_gpu_res_button.clicked.connect(self.repalce_select_res_command)
+        self.switch_ass_res_button.clicked.connect(self.repalce_select_res_command)
+        
+        self.replace_abc_res_button.clicked.connect(self.repalce_all_res_command)
+        self.replace_gpu_res_button.clicked.connect(self.repalce_all_res_command)
+        self.replace_ass_res_button.clicked.connect(self.repalce_all_res_command)
+        
+        self.import_custom_res_button.clicked.connect(self.import_source)
+        self.import_source_button.clicked.connect(self.import_source)
+        
+        self.export_snapshot_button.clicked.connect(self.export_layout_snapshot_command)
+        self.import_snapshot_button.clicked.connect(self.import_layout_snapshot_command)
+        self.analyze_duplicate_button.clicked.connect(self.analyze_duplicate_command)
+        self.consolidate_duplicate_button.clicked.connect(self.consolidate_duplicate_command)
+        self.scene_stats_button.clicked.connect(self.scene_stats_command)
+        self.export_stats_button.clicked.connect(self.export_stats_command)
+        self.profile_check_box.toggled.connect(self.profile_toggled_command)
+        self.export_profile_button.clicked.connect(self.export_profile_command)
+        self.cancel_job_button.clicked.connect(self.cancel_job_command)
+        
+        self.scan_library_button.clicked.connect(self.scan_library_command)
+        self.library_filter_text.textChanged.connect(self.search_library_command)
+        self.import_library_button.clicked.connect(self.import_library_command)
+        self.asset_view.doubleClicked.connect(self.import_library_command)
+        self.contact_sheet_button.clicked.connect(self.contact_sheet_command)
+        self.display_policy_check_box.toggled.connect(self.display_policy_command)
+        self.refresh_display_button.clicked.connect(self.refresh_display_command)
+        self.render_previews_button.clicked.connect(self.render_previews_command)
+        self.watch_library_check_box.toggled.connect(self.watch_library_command)
+
+    def create_ui(self):
+        self.create_tab_bar()
+        self.create_export_ui()
+        self.create_import_ui()
+        self.create_outline_ui()
+        self.create_library_ui()
+        self.create_progress_ui()
+
+    def create_button(self,text):
+        button = QPushButton(text)
+        button.setFixedHeight(40)
+        return button
+    
+    def create_tab_bar(self):
+        
+        self.tab_bar = QTabBar()
+        self.tab_bar.setDrawBase(False)
+        self.tab_bar.setFixedWidth(350)
+        self.tab_bar.addTab("导出")
+        self.tab_bar.addTab("导入")
+        self.tab_bar.addTab("大纲")
+        self.tab_bar.addTab("资产库")
+
+        self.stack = QStackedWidget()
+        import_widget = QWidget()
+        self.import_layout = QVBoxLayout(import_widget)
+
+        export_widget = QWidget()
+        self.export_layout = QVBoxLayout(export_widget)
+        
+        preview_widget = QWidget()
+        self.preview_widget = QVBoxLayout(preview_widget)
+
+        self.stack.addWidget(export_widget)
+        self.stack.addWidget(import_widget)
+        self.stack.addWidget(preview_widget)
+        
+        library_widget = QWidget()
+        self.library_layout = QVBoxLayout(library_widget)
+        self.stack.addWidget(library_widget)
+        self.central_layout.addWidget(self.tab_bar)
+        self.central_layout.addWidget(self.stack)
+
+        self.tab_bar.currentChanged.connect(self.stack.setCurrentIndex)
+
+    def create_export_ui(self):
+        
+        input_widget = QWidget()
+        
+        init_label=QLabel("创建大纲层级")
+        export_label = QLabel("导出文件类型选项")
+        screen_label = QLabel("预览图")
+
+        input_layout = QHBoxLayout(input_widget)
+        input_label = QLabel("资产名称")
+        self.input_text = QLineEdit()
+        self.input_text.setPlaceholderText("请输入组件名称")
+        input_layout.addWidget(input_label)
+        input_layout.addWidget(self.input_text)
+
+        self.create_locator_button = self.create_button("创建 Locator")
+
+        check_box_widget_01 = QWidget()
+        check_box_widget_02 = QWidget()
+        check_box_layout_01 = QHBoxLayout(check_box_widget_01)
+        check_box_layout_02 = QHBoxLayout(check_box_widget_02)
+        self.check_ma = QCheckBox("导出 MA")
+        self.check_ass = QCheckBox("导出 ASS")
+        self.check_gpu_cache = QCheckBox("导出 GPU")
+        self.check_abc = QCheckBox("导出 ABC")
+        self.check_texture = QCheckBox("导出 TEX")
+        self.check_texture_downsample = QCheckBox("低分辨率 TEX")
+        self.check_texture_downsample.setToolTip("为proxyRes/midRes生成缩小的贴图(512/2048)")
+        self.check_polycount = QCheckBox("面数检查")
+        self.check_polycount.setToolTip("导出所有Res前检查每个res组的面数上限和proxy/mid/hi比例,不通过时不导出\n"
+                                        "需要在环境变量 COMPONENT_POLYCOUNT_CONFIG 指定的json中配置上限")
+        
+        self.check_ma.setChecked(True)
+        self.check_ass.setChecked(True)
+        self.check_gpu_cache.setChecked(True)
+        self.check_abc.setChecked(True)
+        self.check_texture.setChecked(True)
+        self.check_polycount.setChecked(True)
+
+        check_box_layout_01.addWidget(self.check_ass)
+        check_box_layout_01.addWidget(self.check_gpu_cache)
+        check_box_layout_01.addWidget(self.check_abc)
+        check_box_layout_01.addWidget(self.check_texture)
+        check_box_layout_02.addWidget(self.check_ma)
+        check_box_layout_02.addWidget(self.check_texture_downsample)
+        check_box_layout_02.addWidget(self.check_polycount)
+        
+        export_button_widget = QWidget()
+        export_button_layout = QHBoxLayout(export_button_widget)
+        export_button_layout.setContentsMargins(0,0,0,0)
+        
+        self.export_selected_res_button = self.create_button("导出选中 Res")
+        self.export_all_res_button = self.create_button("导出所有 Res")
+        export_button_layout.addWidget(self.export_selected_res_button)
+        export_button_layout.addWidget(self.export_all_res_button)
+        
+        self.preflight_button = self.create_button("预检查")
+        self.preflight_button.setToolTip("检查选择的(未选择时为场景中所有)RootLocator的层级,轴心,命名,空组和命名空间,不导出文件")
+        export_button_layout.addWidget(self.preflight_button)
+        
+        self.export_queue_button = self.create_button("导出队列")
+        self.export_queue_button.setToolTip("按顺序导出选择的(未选择时为场景中所有)RootLocator的所有Res,中断后从导出日志继续")
+        export_button_layout.addWidget(self.export_queue_button)
+        
+        self.update_source_button = self.create_button("更新 Src")
+        
+        self.export_layout.addWidget(init_label)
+        self.export_layout.addWidget(self.create_frame())
+        self.export_layout.addWidget(self.create_locator_button)
+        #self.export_layout.addSpacing(15)
+        self.export_layout.addWidget(self.create_frame())
+        
+        self.export_layout.addWidget(input_widget)
+        self.export_layout.addSpacing(15)
+        
+        self.export_layout.addWidget(export_label)
+        self.export_layout.addWidget(self.create_frame())
+        self.export_layout.addWidget(check_box_widget_01)
+        self.export_layout.addWidget(check_box_widget_02)
+        self.export_layout.addWidget(export_button_widget)
+        #self.export_layout.addWidget(self.export_all_res_button)
+        self.export_layout.addWidget(self.update_source_button)
+        self.export_layout.addSpacing(15)
+        
+        self.export_layout.addWidget(screen_label)
+        self.export_layout.addWidget(self.create_frame())
+        
+        screen_widget,self.preview_label,self.screen_btn = self.create_screen_shot_widget()
+        
+        self.export_layout.addWidget(screen_widget)
+
+        self.export_layout.addStretch()
+
+    def create_import_ui(self):
+        import_abc_widget = QWidget()
+        import_abc_layout = QHBoxLayout(import_abc_widget)
+        import_abc_layout.setContentsMargins(2,2,2,2)
+        
+        switch_res_widget = QWidget()
+        switch_res_layout = QHBoxLayout(switch_res_widget)
+        switch_res_layout.setContentsMargins(2,2,2,2)
+        
+        replace_all_widget = QWidget()
+        replace_all_layout = QHBoxLayout(replace_all_widget)
+        replace_all_layout.setContentsMargins(2,2,2,2)
+        
+        import_label = QLabel("导入Cache选项")
+        replace_label = QLabel("切换/替换Cache选项")
+        import_ma_label = QLabel("导入当前选择Cache的Ma文件")
+        replace_current_label = QLabel("切换当前选择节点")
+        replace_all_label = QLabel("切换场景中所有节点")
+        replace_all_label_widget = QWidget()
+        replace_all_label_layout = QHBoxLayout(replace_all_label_widget)
+        replace_all_label_layout.setContentsMargins(0,0,0,0)
+        
+        self.enabled_instance_check_box = QCheckBox("启用实例")
+        self.enabled_instance_check_box.setChecked(True)
+        self.enabled_instance_check_box.setToolTip("勾选后,将以实例对象替换场景中的节点")
+        
+        replace_all_label_layout.addWidget(replace_all_label)
+        replace_all_label_layout.addSpacing(15)
+        replace_all_label_layout.addWidget(self.enabled_instance_check_box)
+        replace_all_label_layout.addStretch()
+        
+        self.import_abc_button = self.create_button("导入 Abc")
+        self.import_gpu_button = self.create_button("导入 GPU Cache")
+        self.import_ass_button = self.create_button("导入 Arnold Ass")
+        
+        self.switch_abc_res_button = self.create_button("切换选择 Res Abc")
+        self.switch_abc_res_button.setProperty("action","abc")
+        
+        self.switch_gpu_res_button = self.create_button("切换选择 Res GPU")
+        self.switch_gpu_res_button.setProperty("action","gpuCache")
+        
+        self.switch_ass_res_button = self.create_button("切换选择 Res Ass")
+        self.switch_ass_res_button.setProperty("action","ass")
+        
+        self.replace_abc_res_button = self.create_button("切换全部 Res Abc")
+        self.replace_abc_res_button.setToolTip("替换场景中所有Abc为选择的res")
+        self.replace_abc_res_button.setProperty("action","abc")
+        
+        self.replace_gpu_res_button = self.create_button("切换全部 Res GPU")
+        self.replace_gpu_res_button.setToolTip("替换场景中所有GPU为选择的res")
+        self.replace_gpu_res_button.setProperty("action","gpuCache")
+        
+        self.replace_ass_res_button = self.create_button("切换全部 Res Ass")
+        self.replace_ass_res_button.setToolTip("替换场景中所有Ass为选择的res")
+        self.replace_ass_res_button.setProperty("action","ass")
+        
+        import_abc_layout.addWidget(self.import_abc_button)
+        import_abc_layout.addWidget(self.import_gpu_button)
+        import_abc_layout.addWidget(self.import_ass_button)
+        
+        switch_res_layout.addWidget(self.switch_abc_res_button)
+        switch_res_layout.addWidget(self.switch_gpu_res_button)
+        switch_res_layout.addWidget(self.switch_ass_res_button)
+        
+        replace_all_layout.addWidget(self.replace_abc_res_button)
+        replace_all_layout.addWidget(self.replace_gpu_res_button)
+        replace_all_layout.addWidget(self.replace_ass_res_button)
+
+        self.list_widget = QListWidget()
+        self.list_widget.addItems(self.resolution_type)
+        self.list_widget.setCurrentRow(0)
+        self.list_widget.setFixedHeight(100)
+        
+        self.import_custom_res_button = self.create_button("导入选择Res ma文件")
+        self.import_custom_res_button.setProperty("action","res")
+        self.import_custom_res_button.setToolTip("选择一个或者多个缓存类型,替换为指定的Res对应的ma文件")
+        
+        self.import_source_button = self.create_button("导入Source ma文件")
+        self.import_source_button.setProperty("action","source")
+        self.import_source_button.setToolTip("选择一个或者多个缓存类型,替换为Source ma文件")
+        
+        display_widget = QWidget()
+        display_layout = QHBoxLayout(display_widget)
+        display_layout.setContentsMargins(2,2,2,2)
+        self.display_policy_check_box = QCheckBox("自动显示策略")
+        self.display_policy_check_box.setToolTip("代理数量较多时,相机附近以外的代理和未选择的hiRes代理显示为包围盒\n"
+                                                 "导入新的代理和选择变化时自动更新")
+        self.refresh_display_button = self.create_button("刷新显示")
+        self.refresh_display_button.setToolTip("移动相机或代理后,按当前视口相机重新计算所有代理的显示")
+        self.refresh_display_button.setEnabled(False)
+        display_layout.addWidget(self.display_policy_check_box)
+        display_layout.addWidget(self.refresh_display_button)
+        
+        self.import_layout.addWidget(import_label)
+        self.import_layout.addWidget(self.create_frame())
+        self.import_layout.addWidget(import_abc_widget)
+        self.import_layout.addSpacing(15)
+        
+        self.import_layout.addWidget(replace_label)
+        self.import_layout.addWidget(self.create_frame())
+        self.import_layout.addWidget(self.list_widget)
+        self.import_layout.addWidget(replace_current_label)
+        
+        self.import_layout.addWidget(self.create_frame())
+        
+        self.import_layout.addWidget(switch_res_widget)
+        self.import_layout.addSpacing(15)
+        self.import_layout.addWidget(replace_all_label_widget)
+        self.import_layout.addWidget(self.create_frame())
+        self.import_layout.addWidget(replace_all_widget)
+        self.import_layout.addSpacing(15)
+        
+        self.import_layout.addWidget(import_ma_label)
+        self.import_layout.addWidget(self.create_frame())
+        self.import_layout.addWidget(self.import_custom_res_button)
+        self.import_layout.addWidget(self.import_source_button)
+        self.import_layout.addSpacing(15)
+        
+        self.import_layout.addWidget(QLabel("视口显示"))
+        self.import_layout.addWidget(self.create_frame())
+        self.import_layout.addWidget(display_widget)
+        
+        self.import_layout.addStretch()
+
+    def create_outline_ui(self):
+        snapshot_label = QLabel("布局快照")
+        
+        snapshot_widget = QWidget()
+        snapshot_layout = QHBoxLayout(snapshot_widget)
+        snapshot_layout.setContentsMargins(2,2,2,2)
+        
+        self.export_snapshot_button = self.create_button("导出布局快照")
+        self.export_snapshot_button.setToolTip("导出场景中所有组件节点的资产,分辨率,格式,父层级和世界矩阵")
+        self.import_snapshot_button = self.create_button("导入布局快照")
+        self.import_snapshot_button.setToolTip("从快照文件批量还原组件节点,相同资产使用实例创建")
+        
+        snapshot_layout.addWidget(self.export_snapshot_button)
+        snapshot_layout.addWidget(self.import_snapshot_button)
+        
+        self.preview_widget.addWidget(snapshot_label)
+        self.preview_widget.addWidget(self.create_frame())
+        self.preview_widget.addWidget(snapshot_widget)
+        self.preview_widget.addSpacing(15)
+        
+        duplicate_label = QLabel("重复组件合并为实例")
+        
+        duplicate_widget = QWidget()
+        duplicate_layout = QHBoxLayout(duplicate_widget)
+        duplicate_layout.setContentsMargins(2,2,2,2)
+        
+        self.analyze_duplicate_button = self.create_button("分析重复组件")
+        self.analyze_duplicate_button.setToolTip("输出可以替换为实例的重复组件及预计节省的内存,不修改场景")
+        self.consolidate_duplicate_button = self.create_button("合并为实例")
+        self.consolidate_duplicate_button.setToolTip("将重复组件替换为实例,保留世界变换和父层级,可一次撤销")
+        
+        duplicate_layout.addWidget(self.analyze_duplicate_button)
+        duplicate_layout.addWidget(self.consolidate_duplicate_button)
+        
+        self.preview_widget.addWidget(duplicate_label)
+        self.preview_widget.addWidget(self.create_frame())
+        self.preview_widget.addWidget(duplicate_widget)
+        self.preview_widget.addSpacing(15)
+        
+        stats_label = QLabel("场景统计")
+        
+        stats_widget = QWidget()
+        stats_layout = QHBoxLayout(stats_widget)
+        stats_layout.setContentsMargins(2,2,2,2)
+        
+        self.scene_stats_button = self.create_button("统计场景")
+        self.scene_stats_button.setToolTip("按资产,分辨率,格式统计组件数量,实例,缓存文件大小,三角面和贴图显存")
+        self.export_stats_button = self.create_button("导出统计报告")
+        self.export_stats_button.setToolTip("导出最近一次的统计结果(csv/json),没有统计时重新统计")
+        
+        stats_layout.addWidget(self.scene_stats_button)
+        stats_layout.addWidget(self.export_stats_button)
+        
+        #最近一次的统计结果
+        self.scene_report = None
+        self.stats_summary_label = QLabel()
+        self.stats_summary_label.setWordWrap(True)
+        
+        self.stats_table = QTableWidget(0,len(STATS_TABLE_COLUMNS))
+        self.stats_table.setHorizontalHeaderLabels([title for title,_ in STATS_TABLE_COLUMNS])
+        self.stats_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.stats_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.stats_table.verticalHeader().setVisible(False)
+        self.stats_table.setMinimumHeight(200)
+        
+        self.preview_widget.addWidget(stats_label)
+        self.preview_widget.addWidget(self.create_frame())
+        self.preview_widget.addWidget(stats_widget)
+        self.preview_widget.addWidget(self.stats_summary_label)
+        self.preview_widget.addWidget(self.stats_table)
+        self.preview_widget.addSpacing(15)
+        
+        profile_label = QLabel("性能采样")
+        
+        profile_widget = QWidget()
+        profile_layout = QHBoxLayout(profile_widget)
+        profile_layout.setContentsMargins(2,2,2,2)
+        
+        self.profile_check_box = QCheckBox("启用采样")
+        self.profile_check_box.setChecked(profiler.enabled)
+        self.profile_check_box.setToolTip("记录导出,校验,贴图复制等操作的耗时,节点数量和写入字节数")
+        self.export_profile_button = self.create_button("导出性能报告")
+        self.export_profile_button.setToolTip("导出Chrome Trace(json)和汇总表格(txt)")
+        
+        profile_layout.addWidget(self.profile_check_box)
+        profile_layout.addWidget(self.export_profile_button)
+        
+        self.preview_widget.addWidget(profile_label)
+        self.preview_widget.addWidget(self.create_frame())
+        self.preview_widget.addWidget(profile_widget)
+        
+        self.preview_widget.addStretch()
+
+    def create_library_ui(self):
+        '''
+        组件库浏览,列表只创建可见行,缩略图在后台线程加载
+        '''
+        root_widget = QWidget()
+        root_layout = QHBoxLayout(root_widget)
+        root_layout.setContentsMargins(2,2,2,2)
+        
+        self.library_root_text = QLineEdit()
+        self.library_root_text.setText(self.file_path or "")
+        self.library_root_text.setPlaceholderText("组件库根目录")
+        self.scan_library_button = QPushButton("扫描")
+        root_layout.addWidget(self.library_root_text)
+        root_layout.addWidget(self.scan_library_button)
+        
+        self.library_filter_text = QLineEdit()
+        self.library_filter_text.setPlaceholderText("搜索资产  例如: fhsj tree has:ass.hiRes")
+        self.library_filter_text.setToolTip("支持前缀和模糊匹配,多个词同时满足\nhas:ass  has:hiRes  has:ass.hiRes 只显示存在对应缓存的资产")
+        
+        #全部资产和搜索索引,索引保存在本地,打开工具时直接读取
+        self.library_entries = []
+        self.search_index = None
+        
+        self.thumbnail_loader = ThumbnailLoader(parent=self)
+        self.asset_model = AssetListModel(thumbnail_loader=self.thumbnail_loader,parent=self)
+        
+        self.asset_view = QListView()
+        self.asset_view.setModel(self.asset_model)
+        self.asset_view.setViewMode(QListView.IconMode)
+        self.asset_view.setMovement(QListView.Static)
+        self.asset_view.setResizeMode(QListView.Adjust)
+        self.asset_view.setUniformItemSizes(True)
+        self.asset_view.setLayoutMode(QListView.Batched)
+        self.asset_view.setBatchSize(100)
+        self.asset_view.setIconSize(self.thumbnail_loader.size)
+        self.asset_view.setGridSize(QSize(110,80))
+        self.asset_view.setWordWrap(True)
+        
+        import_widget = QWidget()
+        import_layout = QHBoxLayout(import_widget)
+        import_layout.setContentsMargins(2,2,2,2)
+        
+        self.library_format_combo_box = QComboBox()
+        self.library_format_combo_box.addItems(list(library.FORMAT_FOLDERS))
+        self.library_format_combo_box.setToolTip("分辨率使用导入页中选择的res")
+        self.import_library_button = self.create_button("导入选择资产")
+        import_layout.addWidget(self.library_format_combo_box)
+        import_layout.addWidget(self.import_library_button)
+        
+        self.contact_sheet_button = self.create_button("生成场景预览表")
+        self.contact_sheet_button.setToolTip("将当前场景所有资产的预览图拼接为一张图片,用于审阅")
+        self.render_previews_button = self.create_button("渲染缺失预览图")
+        self.render_previews_button.setToolTip("在后台mayapy进程中为当前场景预览图缺失或过期的资产渲染预览图")
+        self.watch_library_check_box = QCheckBox("监视组件库变化")
+        self.watch_library_check_box.setToolTip("资产重新导出后,自动重新加载场景中引用该文件的ass/gpuCache代理")
+        
+        self.library_layout.addWidget(QLabel("组件库"))
+        self.library_layout.addWidget(self.create_frame())
+        self.library_layout.addWidget(root_widget)
+        self.library_layout.addWidget(self.library_filter_text)
+        self.library_layout.addWidget(self.asset_view)
+        self.library_layout.addWidget(import_widget)
+        self.library_layout.addWidget(self.contact_sheet_button)
+        self.library_layout.addWidget(self.render_previews_button)
+        self.library_layout.addWidget(self.watch_library_check_box)
+
+    def create_progress_ui(self):
+        '''
+        任务进度面板,显示进度,吞吐量和取消按钮,没有任务时隐藏
+        '''
+        self.progress_widget = QWidget()
+        progress_layout = QVBoxLayout(self.progress_widget)
+        progress_layout.setContentsMargins(2,2,2,2)
+        
+        self.progress_label = QLabel()
+        self.progress_label.setWordWrap(True)
+        #导出队列的整体进度,吞吐量和剩余时间
+        self.queue_label = QLabel()
+        self.queue_label.hide()
+        self.export_queue = None
+        
+        progress_bar_widget = QWidget()
+        progress_bar_layout = QHBoxLayout(progress_bar_widget)
+        progress_bar_layout.setContentsMargins(0,0,0,0)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0,100)
+        self.cancel_job_button = QPushButton("取消")
+        self.cancel_job_button.setToolTip("当前分片或文件完成后停止,并还原导出前的变换")
+        
+        progress_bar_layout.addWidget(self.progress_bar)
+        progress_bar_layout.addWidget(self.cancel_job_button)
+        
+        progress_layout.addWidget(self.create_frame())
+        progress_layout.addWidget(self.queue_label)
+        progress_layout.addWidget(self.progress_label)
+        progress_layout.addWidget(progress_bar_widget)
+        
+        self.central_layout.addWidget(self.progress_widget)
+        self.progress_widget.hide()
+
+    def create_frame(self):
+        separator = QFrame()
+        separator.setFrameShape(QFrame.HLine)
+        separator.setFrameShadow(QFrame.Sunken)
+        return separator
+    
+    def create_screen_shot_widget(self):
+        screen_widget = QWidget()
+        layout = QVBoxLayout(screen_widget)
+        layout.setContentsMargins(0, 6, 0, 0)
+        layout.setSpacing(6)
+
+        preview_label = QLabel("调整相机角度后点击截图生成图片预览")
+        preview_label.setFixedSize(288,162)
+        preview_label.setStyleSheet(
+            "QLabel{border:1px solid rgba(255,255,255,40); border-radius:6px;}"
+        )
+        preview_label.setAlignment(Qt.AlignCenter)
+       # preview_label.setMinimumSize(QSize(x_size=200, y_size=200))
+        #preview_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+        capture_btn = QPushButton("截屏")
+        capture_btn.setFixedHeight(40)
+
+        layout.addWidget(preview_label,alignment=Qt.AlignCenter)
+        layout.addWidget(capture_btn)
+        
+        return screen_widget,preview_label,capture_btn
+    
+    def run_job(self,job,on_done=None,on_finished=None):
+        '''
+        提交任务并在进度面板显示
+        on_done > 任务成功完成后调用 on_done(job)
+        on_finished > 任务结束后调用 on_finished(job),包括失败和取消
+        '''
+        if self.job_runner.busy:
+            om.MGlobal.displayError("已有任务正在执行,请等待完成或取消")
+            return
+        
+        def listener(job):
+            self.update_progress(job)
+            if job.state == DONE and on_done:
+                on_done(job)
+            if job.finished and on_finished:
+                on_finished(job)
+        
+        job.add_listener(listener)
+        self.progress_bar.setValue(0)
+        self.progress_label.setText(job.name)
+        self.cancel_job_button.setEnabled(True)
+        self.progress_widget.show()
+        self.job_runner.submit(job)
+        return job
+    
+    def update_progress(self,job):
+        self.progress_bar.setValue(int(job.progress * 100))
+        self.progress_label.setText(f"{job.name}  {job.status_text()}")
+        if self.export_queue is not None:
+            self.queue_label.setText(self.export_queue.status_text())
+        
+        if job.finished:
+            self.cancel_job_button.setEnabled(False)
+            if job.state == DONE:
+                print(f"{job.name} 完成 > {job.elapsed:.2f} 秒")
+            else:
+                om.MGlobal.displayWarning(f"{job.name} {job.state} > {job.message}")
+    
+    def cancel_job_command(self):
+        if self.export_queue is not None:
+            self.export_queue.cancel()
+        for job in self.job_runner.jobs:
+            job.cancel()
+        self.progress_label.setText("正在取消...")
+    
+    def closeEvent(self,event):
+        #保留当前的显示设置,只移除回调
+        self.operator.display_manager.disable(restore=False)
+        self.watch_index_timer.stop()
+        self.library_watcher.stop()
+        self.job_runner.shutdown()
+        self.thumbnail_loader.clear()
+        super().closeEvent(event)
+    
+    def get_view_camera(self):
+        '''
+        返回当前视口的相机,没有激活的视口时返回persp
+        '''
+        panel = cmds.getPanel(withFocus=True)
+        if not panel or cmds.getPanel(typeOf=panel) != "modelPanel":
+            panel = cmds.playblast(activeEditor=True)
+        try:
+            return cmds.modelPanel(panel,query=True,camera=True)
+        except RuntimeError:
+            return "persp"
+    
+    def display_policy_command(self,checked):
+        display_manager = self.operator.display_manager
+        self.refresh_display_button.setEnabled(checked)
+        if checked:
+            display_manager.camera = self.get_view_camera()
+            report = display_manager.enable(measure=True)
+            om.MGlobal.displayInfo(display_policy.format_report(report).replace("\n","  "))
+        else:
+            display_manager.disable(restore=True)
+            print("显示策略已关闭,恢复代理原来的显示")
+    
+    def refresh_display_command(self):
+        display_manager = self.operator.display_manager
+        display_manager.camera = self.get_view_camera()
+        report = display_manager.apply(measure=True)
+        print(display_policy.format_report(report))
+        om.MGlobal.displayInfo(display_policy.format_report(report).replace("\n","  "))
+    
+    def get_export_file_types(self):
+        '''
+        返回勾选的导出文件类型
+        '''
+        check_box_list = [(self.check_ma,"ma"),(self.check_abc,"abc"),(self.check_gpu_cache,"gpuCache"),(self.check_ass,"ass")]
+        return [file_type for check_box,file_type in check_box_list if check_box.isChecked()]
+    
+    def get_user_input(self):
+                    
+        return self.input_text.text()
+    
+    @profiler.timed_command()
+    def export_selected_res_button_command(self):
+        '''
+        导出当前选择组
+        导出前将把组的parent变换设置为0,并且检查povit轴心
+        '''
+        sel = cmds.ls(selection=True,long=True)
+        if not sel:
+            cmds.error("未选择任何节点")
+            
+        node_name = sel[0]
+        asset_name = self.get_user_input()
+        if not asset_name:
+            om.MGlobal.displayError("资产名称不能为空!")
+            return
+        
+        job = self.operator.create_export_job(node_name = node_name,
+                    file_path = self.file_path,
+                    asset_name = asset_name,
+                    project_code = self.project_code,
+                    scene = self.scene_prefix,
+                    file_types = self.get_export_file_types(),
+                    all_res = False
+            )
+        self.run_job(job)
+                
+    @profiler.timed_command()
+    def export_all_res_button_command(self):
+        '''
+        导出当前root下的所有组
+        贴图复制在工作线程中执行,导出在主线程中按res组分片执行,期间可以取消
+        '''
+        sel = cmds.ls(selection=True,long=True)
+        if not sel:
+            cmds.error("未选择任何节点")
+            
+        node_name = sel[0]
+        asset_name = self.get_user_input()
+        if not asset_name:
+            om.MGlobal.displayError("资产名称不能为空!")
+            return
+        
+        job = self.operator.create_export_job(node_name = node_name,
+                    file_path = self.file_path,
+                    asset_name = asset_name,
+                    project_code = self.project_code,
+                    scene = self.scene_prefix,
+                    file_types = self.get_export_file_types(),
+                    copy_texture = self.check_texture.isChecked(),
+                    all_res = True,
+                    downsample_texture = self.check_texture_downsample.isChecked(),
+                    check_polycount = self.check_polycount.isChecked()
+            )
+        self.run_job(job)
+    
+    @profiler.timed_command()
+    def preflight_command(self):
+        sel = cmds.ls(selection=True,long=True,type="transform")
+        report = self.operator.preflight_check(sel or None)
+        if not report["roots"]:
+            om.MGlobal.displayWarning("场景中没有RootLocator")
+            return
+        
+        self.operator.print_preflight_report(report)
+        if report["passed"]:
+            om.MGlobal.displayInfo(f"预检查通过 {len(report['roots'])} 个RootLocator, {report['warnings']} 个警告")
+        else:
+            om.MGlobal.displayError(f"预检查失败 {report['errors']} 个错误, 详细信息见脚本编辑器")
+    
+    @profiler.timed_command()
+    def export_queue_command(self):
+        '''
+        按顺序导出多个RootLocator,每个资产一个导出任务
+        每导出一个输出写入导出日志,重新执行时跳过日志中已经完成并且文件存在的输出
+        '''
+        if self.job_runner.busy:
+            om.MGlobal.displayError("已有任务正在执行,请等待完成或取消")
+            return
+        
+        roots = self.operator.find_root_locators()
+        sel = cmds.ls(selection=True,long=True,type="transform")
+        if sel:
+            roots = [node for node in sel if node in set(roots)]
+        if not roots:
+            om.MGlobal.displayWarning("没有可以导出的RootLocator")
+            return
+        
+        file_types = self.get_export_file_types()
+        if not file_types:
+            om.MGlobal.displayError("未勾选导出格式")
+            return
+        
+        items = [(root,self.operator.get_queue_asset_name(root,self.project_code,self.scene_prefix)) for root in roots]
+        result = self.edit_export_queue(items)
+        if result is None:
+            return
+        items,resume = result
+        
+        journal = export_queue.Journal(export_queue.default_journal_path(self.file_path,self.project_code,self.scene_prefix))
+        if not resume:
+            journal.reset()
+        
+        pending,total,done,failed = self.operator.plan_export_queue(items=items,file_path=self.file_path,
+                    project_code=self.project_code,scene=self.scene_prefix,file_types=file_types,journal=journal)
+        if not pending:
+            for (root_node,asset_name),message in failed:
+                print(f"  失败 {asset_name} ({root_node}) > {message}")
+            if failed:
+                om.MGlobal.displayError(f"导出队列 {len(failed)} 个资产无法导出,详细信息见脚本编辑器")
+            else:
+                om.MGlobal.displayInfo(f"导出日志中 {done} 个输出已经完成,没有需要导出的资产")
+            return
+        
+        self.export_queue = export_queue.ExportQueue(pending,journal,total_outputs=total,failed=failed)
+        self.export_queue.file_types = file_types
+        self.queue_label.show()
+        self.run_next_export_queue_item()
+    
+    def edit_export_queue(self,items):
+        '''
+        编辑每个RootLocator的资产名,清空资产名的项不导出
+        返回 ([(RootLocator,资产名),...],是否从日志继续),取消时返回None
+        '''
+        dialog = QDialog(self)
+        dialog.setWindowTitle("导出队列")
+        dialog.resize(420,320)
+        layout = QVBoxLayout(dialog)
+        
+        table = QTableWidget(len(items),2)
+        table.setHorizontalHeaderLabels(["RootLocator","资产名"])
+        table.horizontalHeader().setStretchLastSection(True)
+        table.verticalHeader().setVisible(False)
+        for row,(root,asset_name) in enumerate(items):
+            root_item = QTableWidgetItem(root.split("|")[-1])
+            root_item.setToolTip(root)
+            root_item.setFlags(root_item.flags() & ~Qt.ItemIsEditable)
+            table.setItem(row,0,root_item)
+            table.setItem(row,1,QTableWidgetItem(asset_name))
+        table.resizeColumnToContents(0)
+        
+        resume_check = QCheckBox("从导出日志继续(跳过已经导出的文件)")
+        resume_check.setChecked(True)
+        
+        button_widget = QWidget()
+        button_layout = QHBoxLayout(button_widget)
+        button_layout.setContentsMargins(0,0,0,0)
+        ok_button = QPushButton("导出")
+        cancel_button = QPushButton("取消")
+        ok_button.clicked.connect(dialog.accept)
+        cancel_button.clicked.connect(dialog.reject)
+        button_layout.addStretch()
+        button_layout.addWidget(ok_button)
+        button_layout.addWidget(cancel_button)
+        
+        layout.addWidget(table)
+        layout.addWidget(resume_check)
+        layout.addWidget(button_widget)
+        
+        if dialog.exec_() != QDialog.Accepted:
+            return None
+        
+        result = []
+        for row,(root,_) in enumerate(items):
+            asset_name = table.item(row,1).text().strip()
+            if asset_name:
+                result.append((root,asset_name))
+        return result,resume_check.isChecked()
+    
+    def run_next_export_queue_item(self):
+        queue = self.export_queue
+        item = queue.next_item()
+        if item is None:
+            self.finish_export_queue()
+            return
+        
+        root_node,asset_name = item
+        try:
+            job = self.operator.create_export_job(node_name = root_node,
+                        file_path = self.file_path,
+                        asset_name = asset_name,
+                        project_code = self.project_code,
+                        scene = self.scene_prefix,
+                        file_types = queue.file_types,
+                        copy_texture = self.check_texture.isChecked(),
+                        all_res = True,
+                        downsample_texture = self.check_texture_downsample.isChecked(),
+                        check_polycount = self.check_polycount.isChecked(),
+                        journal = queue.journal,
+                        on_output = lambda res,file_type:queue.output_done()
+                )
+        except RuntimeError as e:
+            #层级错误的资产跳过,继续导出下一个
+            queue.item_failed(str(e))
+            self.run_next_export_queue_item()
+            return
+        
+        job.name = f"{job.name} ({queue.index + 1}/{len(queue.items)})"
+        self.queue_label.setText(queue.status_text())
+        self.run_job(job,on_finished=self.export_queue_job_finished)
+    
+    def export_queue_job_finished(self,job):
+        queue = self.export_queue
+        if job.state == CANCELLED:
+            queue.cancel()
+        elif job.state != DONE:
+            queue.item_failed(job.message)
+        #当前任务的回调结束后再提交下一个任务
+        self.dispatcher(self.run_next_export_queue_item)
+    
+    def finish_export_queue(self):
+        queue = self.export_queue
+        self.export_queue = None
+        self.queue_label.setText(queue.status_text())
+        print(f"导出队列结束 > {queue.done_outputs}/{queue.total_outputs} 个输出, {queue.elapsed:.2f} 秒")
+        for (root_node,asset_name),message in queue.failed:
+            print(f"  失败 {asset_name} ({root_node}) > {message}")
+        
+        if queue.cancelled:
+            om.MGlobal.displayWarning("导出队列已取消,重新执行导出队列从日志继续")
+        elif queue.failed:
+            om.MGlobal.displayError(f"导出队列 {len(queue.failed)} 个资产失败,详细信息见脚本编辑器")
+        else:
+            om.MGlobal.displayInfo(f"导出队列完成 {len(queue.items)} 个资产")
+    
+    @profiler.timed_command()
+    def repalce_select_res_command(self):
+        current_clicked_button = self.sender()
+        target_file_format = current_clicked_button.property("action")
+        node_list = cmds.ls(selection=True,long=True)
+        
+        if node_list:
+            #同一资产目录只列出一次
+            with self.operator.path_resolver.operation():
+                for node in node_list:
+                    self.replace_select_res(sel_node = node,target_file_format = target_file_format)
+        else:
+            om.MGlobal.displayError("未选择任何节点!")
+    
+    def replace_select_res(self,sel_node=None,target_file_format=None):
+        '''
+        替换选择的分辨率组件,目标分辨率为列表中选择的res
+        '''
+        return self.operator.replace_select_res(sel_node = sel_node,target_file_format = target_file_format,
+                        target_res = self.list_widget.currentItem().text())
+              
+    @profiler.timed_command()
+    def repalce_all_res_command(self):
+        all_component_node_dict = self.operator.get_component_node()
+        
+        #print("all_component_node_dict >>> ",all_component_node_dict)
+        
+        current_clicked_button = self.sender()
+        target_file_format = current_clicked_button.property("action")
+        print(all_component_node_dict)
+        
+        if all_component_node_dict:
+            self.repalce_all_res(node_dict = all_component_node_dict,target_file_format = target_file_format)
+        
+        else:
+            om.MGlobal.displayError("场景中无任何节点可以替换")
+                
+    def repalce_all_res(self,node_dict=None,target_file_format=None):
+        '''
+        替换场景中所有的节点为指定类型的节点
+        node_dict > {资产名:资产节点...}
+        target_file_format > 需要替换的文件类型
+        '''
+        job = self.operator.create_replace_all_job(node_dict = node_dict,target_file_format = target_file_format,
+                        target_res = self.list_widget.currentItem().text(),
+                        use_instance = self.enabled_instance_check_box.isChecked())
+        self.run_job(job)
+        
+    @profiler.timed_command()
+    def screen_shot(self):
+        '''
+        生成图片保存路径和名称
+        拍屏后将图片保存到指定路径
+        label标签生成预览图
+        '''
+        asset_name = self.get_user_input()
+        if not asset_name:
+            om.MGlobal.displayError("资产名称不能为空!")
+            return
+        output_path = f"{self.file_path}/{self.project_code}_{self.scene_prefix}_{asset_name}/{self.project_code}_{self.scene_prefix}_{asset_name}_preview.png"
+        print(output_path)
+        
+        job = Job(f"截图 {asset_name}")
+        capture_task = job.add("screen_shot",lambda job:self.operator.screen_shot(output_path),weight=1)
+        
+        def create_thumbnails(job):
+            #截图完成后在工作线程中生成缩略图
+            image_path = job.results["screen_shot"]
+            if image_path:
+                thumbnails.generate_variants(image_path)
+            job.advance(1)
+        
+        job.add("thumbnails",create_thumbnails,kind="io",deps=[capture_task],weight=1)
+        
+        def show_preview(job):
+            image_path = job.results["screen_shot"]
+            if not image_path or not os.path.exists(image_path):
+                om.MGlobal.displayError("截图文件路径不存在")
+                return
+            size = self.preview_label.size()
+            pix = QPixmap(thumbnails.best_variant(image_path,max(size.width(),size.height())))
+            self.preview_label.setPixmap(pix)
+            self.preview_label.setScaledContents(True)
+        
+        self.run_job(job,on_done=show_preview)
+        
+    
+    @profiler.timed_command()
+    def update_source_button_command(self):
+        
+        if not self.get_user_input():
+            om.MGlobal.displayError("输入名称不能为空")
+            return
+        
+        sel = cmds.ls(selection=True,long=True)
+        
+        if not sel:
+            om.MGlobal.displayError("未选择任何物体")
+            return
+
+        node_name = sel[0]
+        
+        if not cmds.nodeType(node_name) =="transform":
+            om.MGlobal.displayError("所选节点类型错误")
+            return
+        
+        #保存原始位置
+        original_pos,original_rot,original_scale = self.operator.get_transform(node_name)
+        try:
+            
+            self.operator.reset_transform(node_name)
+            #检查轴
+            self.operator.check_pivot(node_name)
+
+            self.operator.export_source(node_name = node_name,
+                            file_path = self.file_path,
+                            asset_name = self.get_user_input(),
+                            project_code = self.project_code,
+                            scene = self.scene_prefix
+                    )
+        
+        finally:
+            
+            self.operator.set_transform(node_name,translation = original_pos,
+                            rotation = original_rot,
+                            scale = original_scale)
+    
+    def file_dialog(self,parent=None,title = None,file_filter = None):
+        file_path, _ = QFileDialog.getOpenFileName(
+            parent,
+            title,
+            self.file_path,
+            file_filter
+        )
+        if not file_path:
+            return
+            
+        return file_path.replace("\\","/")
+    
+    @profiler.timed_command()
+    def export_layout_snapshot_command(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "保存布局快照",
+            self.file_path,
+            "Layout Snapshot (*.csnp)"
+        )
+        if not file_path:
+            return
+        
+        self.operator.export_layout_snapshot(file_path.replace("\\","/"))
+    
+    @profiler.timed_command()
+    def import_layout_snapshot_command(self):
+        file_path = self.file_dialog(parent=self,title = "选择一个布局快照文件",
+                        file_filter = "Layout Snapshot (*.csnp)"
+                )
+        if not file_path:
+            return
+        
+        self.operator.import_layout_snapshot(file_path,use_instance = self.enabled_instance_check_box.isChecked())
+    
+    @profiler.timed_command()
+    def analyze_duplicate_command(self):
+        self.operator.consolidate_duplicate_components(dry_run=True)
+    
+    @profiler.timed_command()
+    def consolidate_duplicate_command(self):
+        report = self.operator.analyze_duplicate_components()
+        if not report:
+            om.MGlobal.displayInfo("场景中没有可以合并的重复组件")
+            return
+        
+        total_nodes = sum(len(item["duplicates"]) for item in report)
+        total_bytes = sum(item["saved_bytes"] for item in report)
+        result = QMessageBox.question(self,"合并为实例",
+                    f"共 {total_nodes} 个重复节点将替换为实例\n预计节省 {total_bytes / 1048576.0:.2f} MB\n是否继续?")
+        if result != QMessageBox.Yes:
+            return
+        
+        self.operator.consolidate_duplicate_components(report=report,dry_run=False)
+    
+    def scene_stats_command(self):
+        '''
+        在主线程中批量读取组件节点,在工作线程中读取文件大小和贴图文件头
+        '''
+        job = Job("场景统计")
+        collect_task = job.add("collect",lambda job:self.operator.collect_scene_stats(),weight=1)
+        
+        def build(job):
+            report = scene_report.build_report(job.results["collect"],path_resolver=self.operator.path_resolver)
+            job.advance(1,message=f"{report['totals']['nodes']} 个节点")
+            return report
+        
+        report_task = job.add("report",build,kind="io",deps=[collect_task],weight=1)
+        job.add("show",lambda job:self.set_scene_report(job.results["report"]),deps=[report_task])
+        self.run_job(job)
+    
+    def set_scene_report(self,report):
+        self.scene_report = report
+        print(scene_report.format_report(report))
+        
+        totals = report["totals"]
+        self.stats_summary_label.setText(
+            f"节点 {totals['nodes']}  资产 {totals['assets']}  实例 {totals['instances']}  可合并 {totals['duplicates']}\n"
+            f"缓存 {totals['disk_bytes'] / 1048576.0:.1f} MB  三角面 {totals['scene_triangles']}  "
+            f"贴图 {totals['textures']} 张 {totals['texture_memory'] / 1048576.0:.1f} MB  缺失 {totals['textures_missing']}")
+        
+        self.stats_table.setSortingEnabled(False)
+        self.stats_table.setRowCount(len(report["groups"]))
+        for row,group in enumerate(report["groups"]):
+            for column,(_,key) in enumerate(STATS_TABLE_COLUMNS):
+                value = group[key]
+                item = QTableWidgetItem()
+                if key in ("file_size","texture_memory"):
+                    item.setData(Qt.DisplayRole,round(value / 1048576.0,2))
+                else:
+                    item.setData(Qt.DisplayRole,value)
+                if key == "triangles" and group["triangles_estimated"]:
+                    item.setToolTip("按缓存文件大小估算")
+                self.stats_table.setItem(row,column,item)
+        self.stats_table.setSortingEnabled(True)
+        self.stats_table.resizeColumnsToContents()
+    
+    @profiler.timed_command()
+    def export_stats_command(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "保存场景统计",
+            self.file_path,
+            "CSV (*.csv);;JSON (*.json)"
+        )
+        if not file_path:
+            return
+        
+        file_path = file_path.replace("\\","/")
+        if self.scene_report is None:
+            self.set_scene_report(self.operator.build_scene_report())
+        scene_report.write_report(self.scene_report,file_path)
+        print(f"导出场景统计 > {file_path}")
+    
+    def profile_toggled_command(self,checked):
+        if checked:
+            profiler.clear()
+            profiler.enable()
+        else:
+            profiler.disable()
+    
+    def export_profile_command(self):
+        if not profiler.spans:
+            om.MGlobal.displayError("没有任何采样数据")
+            return
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "保存性能报告",
+            self.file_path,
+            "Chrome Trace (*.json)"
+        )
+        if not file_path:
+            return
+        
+        file_path = file_path.replace("\\","/")
+        profiler.export_chrome_trace(file_path)
+        
+        summary = profiler.format_summary()
+        with open(os.path.splitext(file_path)[0] + "_summary.txt","w",encoding="utf-8") as f:
+            f.write(summary)
+        print(summary)
+    
+    def load_library_index(self,root):
+        '''
+        在工作线程中读取本地搜索索引,不扫描组件库
+        '''
+        job = Job("读取搜索索引")
+        job.add("load",lambda job:SearchIndex.load(default_index_path(root)),kind="io",weight=1)
+        
+        def show_index(job):
+            self.set_search_index(job.results["load"])
+        
+        self.run_job(job,on_done=show_index)
+    
+    def set_search_index(self,index):
+        self.search_index = index
+        self.library_entries = [library.AssetEntry(record["asset_id"],record["path"]) for record in index.records()]
+        self.library_entries.sort(key=lambda entry:entry.asset_id.lower())
+        self.search_library_command(self.library_filter_text.text())
+    
+    def scan_library_command(self):
+        '''
+        在工作线程中扫描组件库并更新搜索索引
+        新增资产需要读取缓存文件列表,先显示扫描结果,索引更新完成后再刷新
+        '''
+        root = self.library_root_text.text().strip()
+        if not root or not os.path.isdir(root):
+            om.MGlobal.displayError("组件库路径不存在")
+            return
+        
+        job = Job(f"扫描 {root}")
+        scan_task = job.add("scan",lambda job:library.scan_library(root),kind="io",weight=1)
+        
+        def show_entries(job):
+            self.library_entries = job.results["scan"]
+            if self.search_index is None:
+                self.asset_model.set_entries(self.library_entries)
+            print(f"组件库资产数量 > {len(self.library_entries)}")
+        
+        def update_index(job):
+            index_path = default_index_path(root)
+            index = SearchIndex.load(index_path)
+            added,removed = index.sync(job.results["scan"],list_files=True)
+            if added or removed:
+                index.save(index_path)
+            job.advance(1,message=f"索引 更新 {added} 删除 {removed}")
+            return index
+        
+        show_task = job.add("show",show_entries,deps=[scan_task])
+        index_task = job.add("index",update_index,kind="io",deps=[scan_task],weight=1)
+        job.add("search",lambda job:self.set_search_index(job.results["index"]),deps=[show_task,index_task])
+        self.thumbnail_loader.clear()
+        self.run_job(job)
+    
+    def contact_sheet_command(self):
+        '''
+        在工作线程中生成当前场景的预览表 {root}/{project}_{scene}_contact_sheet.jpg
+        '''
+        root = self.library_root_text.text().strip()
+        if not root or not os.path.isdir(root):
+            om.MGlobal.displayError("组件库路径不存在")
+            return
+        
+        prefix = f"{self.project_code}_{self.scene_prefix}"
+        job = Job(f"预览表 {prefix}")
+        job.add("sheet",lambda job:thumbnails.build_contact_sheet(root,prefix,job=job),kind="io")
+        
+        def show_result(job):
+            output = job.results["sheet"]
+            if not output:
+                om.MGlobal.displayError(f"组件库中没有 {prefix} 的资产")
+                return
+            print(f"预览表 > {output}")
+            om.MGlobal.displayInfo(f"预览表 > {output}")
+        
+        self.run_job(job,on_done=show_result)
+    
+    def render_previews_command(self):
+        '''
+        在后台mayapy进程中渲染当前场景缺失和过期的预览图,完成后重新扫描组件库
+        '''
+        root = self.library_root_text.text().strip()
+        if not root or not os.path.isdir(root):
+            om.MGlobal.displayError("组件库路径不存在")
+            return
+        try:
+            command = thumbnail_farm.default_worker_command()
+        except RuntimeError as e:
+            om.MGlobal.displayError(str(e))
+            return
+        
+        prefix = f"{self.project_code}_{self.scene_prefix}"
+        job = Job(f"渲染预览图 {prefix}")
+        job.add("render",lambda job:thumbnail_farm.render_library_previews(root,prefix=prefix,command=command,job=job),
+                kind="io")
+        
+        def show_result(job):
+            summary = job.results["render"]
+            for asset_id,error in summary["errors"]:
+                print(f"预览图失败 {asset_id} > {error}")
+            message = (f"预览图 {summary['rendered']}/{summary['planned']} 失败 {summary['failed']} "
+                       f"没有源文件 {summary['no_source']}  {summary['seconds']:.1f}s")
+            print(message)
+            if summary["failed"]:
+                om.MGlobal.displayWarning(message)
+            else:
+                om.MGlobal.displayInfo(message)
+            if summary["rendered"]:
+                #任务结束后再扫描,listener中任务仍然占用runner
+                self.dispatcher(self.scan_library_command)
+        
+        self.run_job(job,on_done=show_result)
+    
+    def watch_library_command(self,checked):
+        '''
+        后台线程轮询场景引用的缓存文件,文件稳定后在主线程重新加载受影响的代理
+        '''
+        if checked:
+            self.refresh_library_watch()
+            self.library_watcher.start(lambda paths:self.dispatcher(lambda:self.reload_library_files(paths)))
+            self.watch_index_timer.start(WATCH_INDEX_INTERVAL)
+            print(f"监视组件库文件 > {len(self.library_watcher.paths)}")
+        else:
+            self.watch_index_timer.stop()
+            self.library_watcher.stop()
+            print("停止监视组件库")
+    
+    def refresh_library_watch(self):
+        '''
+        重新读取场景中代理引用的文件,导入和切换res后的新文件加入监视
+        '''
+        paths = self.operator.library_reloader.build_index()
+        self.library_watcher.set_paths(paths)
+    
+    def reload_library_files(self,paths):
+        self.refresh_library_watch()
+        report = self.operator.library_reloader.reload(paths)
+        for path in paths:
+            print(f"组件库文件变化 > {path}")
+        message = (f"重新加载 {report['nodes']} 个代理 (ass {report['standins']}  gpuCache {report['gpu_caches']})  "
+                   f"{report['seconds']:.2f}s")
+        print(message)
+        if report["missing"]:
+            om.MGlobal.displayWarning(f"{report['missing']} 个文件已经被删除,没有重新加载")
+        if report["nodes"]:
+            cmds.inViewMessage(assistMessage=message,position="topCenter",fade=True,fadeStayTime=2000)
+    
+    def search_library_command(self,text=""):
+        '''
+        搜索框内容变化时刷新列表,没有索引时按名称包含过滤
+        '''
+        text = text.strip()
+        if not text:
+            self.asset_model.set_entries(self.library_entries)
+            return
+        
+        if self.search_index is not None:
+            results = self.search_index.search(text,limit=1000)
+            entries = [library.AssetEntry(record["asset_id"],record["path"]) for score,record in results]
+        else:
+            text = text.lower()
+            entries = [entry for entry in self.library_entries if text in entry.asset_id.lower()]
+        self.asset_model.set_entries(entries)
+    
+    @profiler.timed_command()
+    def import_library_command(self):
+        '''
+        导入组件库中选择的资产,分辨率使用导入页列表中选择的res
+        '''
+        indexes = self.asset_view.selectionModel().selectedIndexes()
+        if not indexes:
+            om.MGlobal.displayError("未选择任何资产")
+            return
+        
+        file_format = self.library_format_combo_box.currentText()
+        target_res = self.list_widget.currentItem().text()
+        for index in indexes:
+            entry = self.asset_model.entry(index)
+            if entry is None:
+                continue
+            file_path = entry.file_path(target_res,file_format)
+            if not os.path.isfile(file_path):
+                om.MGlobal.displayError(f"{file_path} 文件路径不存在")
+                continue
+            self.operator.import_component_file(file_path,file_format)
+    
+    @profiler.timed()
+    def import_cache(self,cache_type = None):
+        
+        '''
+        导入cache,并创建属性
+            isComponent
+            assetName
+            assetDir
+            fileFormat
+            resolutionType
+        '''
+        
+        if cache_type =="abc":
+            file_path = self.file_dialog(parent=self,title = "选择一个Abc文件",
+                            file_filter = "Alembic (*.abc)"
+                    )
+            if not file_path:
+                return
+            self.operator.import_abc(file_path)
+                    
+        elif cache_type == "gpuCache":
+            file_path = self.file_dialog(parent=self,title = "选择一个gpuCache文件",
+                            file_filter = "gpuCache (*.abc)"
+                    )
+            if not file_path:
+                return
+            self.operator.import_gpu_cache(file_path)
+        
+        elif cache_type == "ass":
+            file_path = self.file_dialog(parent=self,title = "选择一个gpuCache文件",
+                            file_filter = "Arnold ASS (*.ass)"
+                    )
+            if not file_path:
+                return
+            self.operator.import_ass(file_path)
+    
+    @profiler.timed_command()
+    def import_source(self):
+        
+        current_clicked_button = self.sender()
+        target_res = self.list_widget.currentItem().text()
+        ma_type = current_clicked_button.property("action")
+        
+        sel_node = cmds.ls(selection=True,long=True)
+        with self.operator.path_resolver.operation():
+            for node in sel_node:
+                self.operator.import_select_res_ma(select_node = node,target_res = target_res,
+                                    ma_type = ma_type)
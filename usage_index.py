@@ -0,0 +1,412 @@
+'''
+镜头/布局场景的组件使用索引
+
+在进程池中并行扫描目录下的.ma文件,逐行读取,只解析关心的语句:
+    插件导入的组件节点 > 有assetName属性的transform (assetName,resolutionType,fileFormat,assetDir)
+    引用的缓存路径     > aiStandIn.dso  gpuCache.cacheFileName  AlembicNode.abc_File  file -r 引用的场景
+结果写入本地sqlite数据库,重新扫描时只解析修改时间或大小变化的文件,已删除的文件从数据库中移除:
+    scenes      (path,mtime,size,scanned_at,components,error)
+    components  (scene,node,asset_name,asset_id,resolution,file_format,asset_dir)
+    caches      (scene,node,node_type,path)
+
+    index = UsageIndex(default_db_path("Z:/proj/shots"))
+    index.update("Z:/proj/shots",workers=8)
+    index.find("DFH_fhsj_tree")             #资产id或带res的资产名,[{"scene","node","resolution",...}]
+    index.find_cache("Z:/.../DFH_fhsj_tree_hiRes.ass")
+
+    python usage_index.py update Z:/proj/shots --workers 8
+    python usage_index.py query DFH_fhsj_tree --root Z:/proj/shots
+    python usage_index.py cache Z:/.../DFH_fhsj_tree_hiRes.ass --db D:/usage.sqlite
+.mb为二进制格式,不解析
+不依赖Maya,可以在Linux上运行
+'''
+import os,re,sys,time,sqlite3,argparse
+from collections import Counter
+
+import resolver
+
+VERSION = 1
+
+SCENE_EXTENSIONS = (".ma",)
+
+#组件节点的属性 (set_import_attribute)
+COMPONENT_ATTRS = ("assetName","resolutionType","fileFormat","assetDir")
+
+#节点类型 > 缓存路径属性(.ma中使用短名称)
+CACHE_ATTRS = {
+    "aiStandIn":("dso",),
+    "gpuCache":("cfn","cacheFileName"),
+    "AlembicNode":("fn","abc_File"),
+}
+
+#每个进程一次处理的文件数量
+CHUNK_SIZE = 8
+
+#每写入多少个文件提交一次
+COMMIT_INTERVAL = 200
+
+CREATE_NODE_PATTERN = re.compile(r'^createNode\s+(\w+)(.*)$',re.S)
+FLAG_PATTERN = re.compile(r'-(n|p)\s+"([^"]*)"')
+STRING_ATTR_PATTERN = re.compile(r'^setAttr\s+(?:-\w+\s+\S+\s+)*"\.(\w+)"\s+-type\s+"string"\s+"((?:[^"\\]|\\.)*)"')
+QUOTED_PATTERN = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY,value TEXT);
+CREATE TABLE IF NOT EXISTS scenes (
+    path TEXT PRIMARY KEY,mtime REAL,size INTEGER,scanned_at REAL,components INTEGER,error TEXT);
+CREATE TABLE IF NOT EXISTS components (
+    scene TEXT,node TEXT,asset_name TEXT,asset_id TEXT,resolution TEXT,file_format TEXT,asset_dir TEXT);
+CREATE TABLE IF NOT EXISTS caches (scene TEXT,node TEXT,node_type TEXT,path TEXT);
+CREATE INDEX IF NOT EXISTS components_asset_id ON components(asset_id);
+CREATE INDEX IF NOT EXISTS components_asset_name ON components(asset_name);
+CREATE INDEX IF NOT EXISTS components_scene ON components(scene);
+CREATE INDEX IF NOT EXISTS caches_path ON caches(path COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS caches_scene ON caches(scene);
+'''
+
+
+def normalize(path):
+    return path.replace("\\","/")
+
+
+def _unescape(value):
+    return value.replace('\\"','"').replace("\\\\","\\")
+
+
+def _statement_wanted(line):
+    '''
+    只缓存需要解析的语句,mesh数据等大段setAttr直接跳过
+    '''
+    if line.startswith("createNode ") or line.startswith("file "):
+        return True
+    return line.startswith("setAttr ") and '-type "string"' in line
+
+
+def iter_statements(path):
+    '''
+    逐行读取.ma,返回需要解析的完整语句(多行语句合并为一行)
+    '''
+    buffer = None
+    with open(path,"r",encoding="utf-8",errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("//"):
+                continue
+            if buffer is None:
+                if not _statement_wanted(line):
+                    #跳过语句剩余的行
+                    buffer = False if not line.endswith(";") else None
+                    continue
+                buffer = [line]
+            elif buffer is False:
+                if line.endswith(";"):
+                    buffer = None
+                continue
+            else:
+                buffer.append(line)
+            if line.endswith(";"):
+                yield " ".join(buffer)[:-1]
+                buffer = None
+
+
+def parse_scene(path):
+    '''
+    解析一个.ma文件,在进程池中执行
+    返回 {"path","components":[(node,asset_name,resolution,file_format,asset_dir)],
+          "caches":[(node,node_type,path)],"error"}
+    '''
+    components = []
+    caches = []
+    current = None
+    node_type = None
+    attrs = {}
+
+    def flush():
+        if current and node_type == "transform" and attrs.get("assetName"):
+            components.append((current,attrs["assetName"],attrs.get("resolutionType",""),
+                               attrs.get("fileFormat",""),normalize(attrs.get("assetDir",""))))
+
+    try:
+        for statement in iter_statements(path):
+            if statement.startswith("createNode "):
+                flush()
+                match = CREATE_NODE_PATTERN.match(statement)
+                flags = dict(FLAG_PATTERN.findall(match.group(2))) if match else {}
+                node_type = match.group(1) if match else None
+                name = flags.get("n","")
+                current = f"{flags['p']}|{name}" if flags.get("p") else name
+                attrs = {}
+            elif statement.startswith("file "):
+                #文件头中每个引用有 file -rdi 和 file -r 两条语句,只记录 -r
+                if "-r" in statement.split():
+                    quoted = QUOTED_PATTERN.findall(statement)
+                    if quoted:
+                        caches.append(("","reference",normalize(_unescape(quoted[-1]))))
+            elif current:
+                match = STRING_ATTR_PATTERN.match(statement)
+                if not match:
+                    continue
+                attr,value = match.group(1),_unescape(match.group(2))
+                if attr in COMPONENT_ATTRS:
+                    attrs[attr] = value
+                elif attr in CACHE_ATTRS.get(node_type,()) and value:
+                    caches.append((current,node_type,normalize(value)))
+        flush()
+    except (OSError,UnicodeError) as e:
+        return {"path":path,"components":[],"caches":[],"error":str(e)}
+    return {"path":path,"components":components,"caches":caches,"error":""}
+
+
+def find_scenes(root):
+    '''
+    返回 {路径:(修改时间,大小)},跳过隐藏目录
+    '''
+    result = {}
+    stack = [normalize(root).rstrip("/")]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(f"{directory}/{entry.name}")
+                elif entry.name.lower().endswith(SCENE_EXTENSIONS):
+                    stat = entry.stat()
+                    result[f"{directory}/{entry.name}"] = (stat.st_mtime,stat.st_size)
+            except OSError:
+                continue
+    return result
+
+
+def default_db_path(root):
+    '''
+    每个场景目录对应一个本地数据库
+    '''
+    import hashlib
+    key = hashlib.md5(normalize(root).rstrip("/").lower().encode("utf-8")).hexdigest()[:12]
+    return os.path.join(os.path.expanduser("~"),".component_tool",f"usage_index_{key}.sqlite")
+
+
+class UsageIndex():
+
+    def __init__(self,db_path):
+        self.db_path = db_path
+        out_dir = os.path.dirname(db_path)
+        if out_dir and not os.path.exists(out_dir):
+            os.makedirs(out_dir)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._check_version()
+
+    def _check_version(self):
+        '''
+        版本不一致时删除旧表重新创建
+        '''
+        connection = self.connection
+        connection.executescript(SCHEMA)
+        row = connection.execute("SELECT value FROM meta WHERE key='version'").fetchone()
+        if row is None or row[0] != str(VERSION):
+            connection.executescript("DROP TABLE IF EXISTS scenes;DROP TABLE IF EXISTS components;"
+                                     "DROP TABLE IF EXISTS caches;")
+            connection.executescript(SCHEMA)
+            connection.execute("INSERT OR REPLACE INTO meta VALUES ('version',?)",(str(VERSION),))
+            connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM scenes").fetchone()[0]
+
+    ######################################################################
+
+    def _remove(self,paths):
+        connection = self.connection
+        for table,column in (("components","scene"),("caches","scene"),("scenes","path")):
+            connection.executemany(f"DELETE FROM {table} WHERE {column}=?",[(path,) for path in paths])
+
+    def _store(self,result,stat):
+        path = result["path"]
+        self._remove([path])
+        connection = self.connection
+        connection.execute("INSERT INTO scenes VALUES (?,?,?,?,?,?)",
+                           (path,stat[0],stat[1],time.time(),len(result["components"]),result["error"]))
+        connection.executemany("INSERT INTO components VALUES (?,?,?,?,?,?,?)",
+                               [(path,node,asset_name,resolver.split_asset_name(asset_name)[0],res,file_format,asset_dir)
+                                for node,asset_name,res,file_format,asset_dir in result["components"]])
+        connection.executemany("INSERT INTO caches VALUES (?,?,?,?)",
+                               [(path,node,node_type,cache_path) for node,node_type,cache_path in result["caches"]])
+
+    def plan(self,root):
+        '''
+        返回 (需要解析的 {路径:(修改时间,大小)},已经删除的路径列表)
+        '''
+        root = normalize(root).rstrip("/")
+        found = find_scenes(root)
+        known = {path:(mtime,size) for path,mtime,size in self.connection.execute(
+            "SELECT path,mtime,size FROM scenes WHERE path LIKE ? ESCAPE '\\'",
+            (root.replace("\\","\\\\").replace("%","\\%").replace("_","\\_") + "/%",))}
+        changed = {path:stat for path,stat in found.items() if known.get(path) != stat}
+        removed = [path for path in known if path not in found]
+        return changed,removed
+
+    def update(self,root,workers=None,job=None):
+        '''
+        扫描root下的.ma并更新数据库,只解析新增和变化的文件
+        workers > 进程数,0时在当前进程中解析
+        job > jobs.Job,用于汇报进度和响应取消,取消时保留已经写入的结果
+        返回 {"scenes","parsed","removed","unchanged","errors","seconds"}
+        '''
+        start = time.perf_counter()
+        changed,removed = self.plan(root)
+        self._remove(removed)
+        self.connection.commit()
+        if job is not None:
+            job.add_units(len(changed))
+
+        summary = {"scenes":0,"parsed":0,"removed":len(removed),"unchanged":0,"errors":0,"seconds":0.0}
+        paths = sorted(changed)
+
+        def record(result):
+            self._store(result,changed[result["path"]])
+            summary["parsed"] += 1
+            if result["error"]:
+                summary["errors"] += 1
+                print(f"解析失败 {result['path']} > {result['error']}")
+            if summary["parsed"] % COMMIT_INTERVAL == 0:
+                self.connection.commit()
+            if job is not None:
+                job.advance(1,bytes_done=changed[result["path"]][1],message=os.path.basename(result["path"]))
+
+        try:
+            if workers == 0 or len(paths) <= CHUNK_SIZE:
+                for path in paths:
+                    if job is not None:
+                        job.check_cancelled()
+                    record(parse_scene(path))
+            elif paths:
+                #进程池只在需要时导入
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                workers = workers or max(1,(os.cpu_count() or 2) - 1)
+                with ProcessPoolExecutor(max_workers=workers,mp_context=multiprocessing.get_context("spawn")) as executor:
+                    for result in executor.map(parse_scene,paths,chunksize=CHUNK_SIZE):
+                        if job is not None:
+                            job.check_cancelled()
+                        record(result)
+        finally:
+            self.connection.commit()
+
+        summary["scenes"] = len(self)
+        summary["unchanged"] = summary["scenes"] - summary["parsed"]
+        summary["seconds"] = round(time.perf_counter() - start,3)
+        return summary
+
+    ######################################################################
+
+    def find(self,asset,resolution=None):
+        '''
+        asset > 资产id(DFH_fhsj_tree)或带res的资产名(DFH_fhsj_tree_hiRes)
+        返回使用该资产的组件节点 [{"scene","node","asset_name","resolution","file_format","asset_dir"}]
+        '''
+        query = ("SELECT scene,node,asset_name,resolution,file_format,asset_dir FROM components "
+                 "WHERE (asset_id=? OR asset_name=?)")
+        params = [asset,asset]
+        if resolution:
+            query += " AND resolution=?"
+            params.append(resolution)
+        query += " ORDER BY scene,node"
+        keys = ("scene","node","asset_name","resolution","file_format","asset_dir")
+        return [dict(zip(keys,row)) for row in self.connection.execute(query,params)]
+
+    def find_cache(self,cache_path):
+        '''
+        返回引用该缓存文件的节点 [{"scene","node","node_type"}],路径不区分大小写
+        '''
+        rows = self.connection.execute(
+            "SELECT scene,node,node_type FROM caches WHERE path=? COLLATE NOCASE ORDER BY scene,node",
+            (normalize(cache_path),))
+        return [{"scene":scene,"node":node,"node_type":node_type} for scene,node,node_type in rows]
+
+    def usage_summary(self,asset):
+        '''
+        返回 {"scenes":场景数量,"nodes":节点数量,"resolutions":{res:节点数量},"formats":{格式:节点数量}}
+        '''
+        rows = self.find(asset)
+        return {
+            "scenes":len({row["scene"] for row in rows}),
+            "nodes":len(rows),
+            "resolutions":dict(Counter(row["resolution"] for row in rows)),
+            "formats":dict(Counter(row["file_format"] for row in rows)),
+        }
+
+
+def format_usage(asset,rows):
+    lines = []
+    for row in rows:
+        lines.append(f"{row['resolution']:<10}{row['file_format']:<10}{row['scene']}  {row['node']}")
+    scenes = len({row["scene"] for row in rows})
+    resolutions = Counter(row["resolution"] for row in rows)
+    lines.append(f"{asset} > {scenes} 个场景 {len(rows)} 个节点  "
+                 + "  ".join(f"{res} {count}" for res,count in sorted(resolutions.items())))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Component usage index of shot and layout scenes")
+    sub = parser.add_subparsers(dest="command",required=True)
+
+    update = sub.add_parser("update",help="扫描场景目录并更新数据库")
+    update.add_argument("root")
+    update.add_argument("--db")
+    update.add_argument("--workers",type=int,default=None)
+
+    query = sub.add_parser("query",help="查询使用资产的场景")
+    query.add_argument("asset",help="资产id或带res的资产名")
+    query.add_argument("--res",help="只列出该分辨率")
+
+    cache = sub.add_parser("cache",help="查询引用缓存文件的场景")
+    cache.add_argument("path")
+
+    for sub_parser in (query,cache):
+        sub_parser.add_argument("--db")
+        sub_parser.add_argument("--root",help="未指定--db时使用该目录的默认数据库")
+
+    args = parser.parse_args(argv)
+    db_path = args.db or (default_db_path(args.root) if args.root else None)
+    if not db_path:
+        parser.error(f"{args.command} 需要 --db 或 --root")
+
+    with UsageIndex(db_path) as index:
+        if args.command == "update":
+            summary = index.update(args.root,workers=args.workers)
+            print(f"scenes > {summary['scenes']}  parsed > {summary['parsed']}  removed > {summary['removed']}  "
+                  f"errors > {summary['errors']}  {summary['seconds']:.2f}s")
+            print(f"db > {db_path}")
+            return 1 if summary["errors"] else 0
+
+        if args.command == "query":
+            print(format_usage(args.asset,index.find(args.asset,resolution=args.res)))
+            return 0
+
+        rows = index.find_cache(args.path)
+        for row in rows:
+            print(f"{row['node_type']:<12}{row['scene']}  {row['node']}")
+        print(f"{len(rows)} 个节点")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())